@@ -0,0 +1,25 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+from .data_augmentation_module import (
+    ComposedAugmentationModule,
+    DataAugmentationModule,
+)
+from .image_augmentation_modules import (
+    CutoutAugmentationModule,
+    IntensityJitterAugmentationModule,
+    RandomShiftAugmentationModule,
+)
+
+__all__ = [
+    "ComposedAugmentationModule",
+    "CutoutAugmentationModule",
+    "DataAugmentationModule",
+    "IntensityJitterAugmentationModule",
+    "RandomShiftAugmentationModule",
+]
@@ -0,0 +1,45 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+from abc import ABC, abstractmethod
+
+import torch
+import torch.nn as nn
+
+
+class DataAugmentationModule(ABC, nn.Module):
+    """
+    An abstract interface for data augmentation modules, which randomly transform the
+    states and next states of sampled batches before a policy learner learns from
+    them (see `PolicyLearner.set_data_augmentation_module`). Each row of a batch is
+    transformed independently, with tensor operations over the whole batch.
+    """
+
+    @abstractmethod
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        """Returns a randomly transformed batch of shape `x.shape`."""
+        pass
+
+
+class ComposedAugmentationModule(DataAugmentationModule):
+    """
+    Applies several data augmentation modules in order.
+
+    Args:
+        augmentation_modules: The data augmentation modules to apply.
+    """
+
+    def __init__(self, augmentation_modules: list[DataAugmentationModule]) -> None:
+        super().__init__()
+        self._augmentation_modules = nn.ModuleList(augmentation_modules)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        for augmentation_module in self._augmentation_modules:
+            x = augmentation_module(x)
+        return x
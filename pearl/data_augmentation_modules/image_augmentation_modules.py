@@ -0,0 +1,134 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+"""
+Data augmentation modules for batches of images of shape
+(batch_size, channels, height, width), such as the pixel observations fed to
+`CNNQValueNetwork` and `CNNActorNetwork`. Each one is a handful of tensor operations
+over the whole batch, on the device of the batch, which is small compared to a
+forward pass of a convolutional network.
+"""
+
+import torch
+import torch.nn.functional as F
+
+from pearl.data_augmentation_modules.data_augmentation_module import (
+    DataAugmentationModule,
+)
+
+
+def _check_images(x: torch.Tensor) -> None:
+    if x.ndim != 4:
+        raise ValueError(
+            "Expected images of shape (batch_size, channels, height, width) but got "
+            f"a tensor of shape {tuple(x.shape)}"
+        )
+
+
+class RandomShiftAugmentationModule(DataAugmentationModule):
+    """
+    The random shift of DrQ: pads images by repeating their border pixels and crops
+    them back to their size at a random offset, which shifts each image by up to
+    `padding` pixels in each direction.
+
+    Args:
+        padding: The maximum shift, in pixels.
+    """
+
+    def __init__(self, padding: int = 4) -> None:
+        super().__init__()
+        if padding < 0:
+            raise ValueError(f"padding must be non-negative but is {padding}")
+        self._padding = padding
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        _check_images(x)
+        if self._padding == 0:
+            return x
+        batch_size, _, height, width = x.shape
+        padded = F.pad(x, [self._padding] * 4, mode="replicate")
+        shifts = torch.randint(
+            0, 2 * self._padding + 1, (2, batch_size, 1), device=x.device
+        )
+        # the rows and columns of the crops, of shapes (batch_size, height) and
+        # (batch_size, width)
+        rows = shifts[0] + torch.arange(height, device=x.device)
+        columns = shifts[1] + torch.arange(width, device=x.device)
+        # one gather for the whole batch, which yields (batch_size, height, width,
+        # channels) since the indexed dimensions are separated by a slice
+        crops = padded[
+            torch.arange(batch_size, device=x.device).view(-1, 1, 1),
+            :,
+            rows.unsqueeze(2),
+            columns.unsqueeze(1),
+        ]
+        return crops.permute(0, 3, 1, 2)
+
+
+class IntensityJitterAugmentationModule(DataAugmentationModule):
+    """
+    The intensity augmentation of DrQ: multiplies each image by
+    `1 + scale * noise`, where `noise` is a standard normal sample clipped to
+    [-2, 2], drawn once per image.
+
+    Args:
+        scale: The standard deviation of the relative change of intensity.
+    """
+
+    def __init__(self, scale: float = 0.05) -> None:
+        super().__init__()
+        if scale < 0:
+            raise ValueError(f"scale must be non-negative but is {scale}")
+        self._scale = scale
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        _check_images(x)
+        noise = torch.randn((len(x), 1, 1, 1), device=x.device).clamp_(-2.0, 2.0)
+        return x * (1.0 + self._scale * noise)
+
+
+class CutoutAugmentationModule(DataAugmentationModule):
+    """
+    Cutout: sets a square of `size` x `size` pixels at a random position of each
+    image (the same square in all channels) to `fill_value`.
+
+    Args:
+        size: The side of the square, in pixels, at most the height and width of the
+            images.
+        fill_value: The value of the pixels of the square.
+    """
+
+    def __init__(self, size: int = 8, fill_value: float = 0.0) -> None:
+        super().__init__()
+        if size <= 0:
+            raise ValueError(f"size must be positive but is {size}")
+        self._size = size
+        self._fill_value = fill_value
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        _check_images(x)
+        batch_size, _, height, width = x.shape
+        if self._size > min(height, width):
+            raise ValueError(
+                f"Cutout of size {self._size} does not fit in images of shape "
+                f"{(height, width)}"
+            )
+        # the top left corners of the squares, of shape (batch_size, 1, 1)
+        top = torch.randint(
+            0, height - self._size + 1, (batch_size, 1, 1), device=x.device
+        )
+        left = torch.randint(
+            0, width - self._size + 1, (batch_size, 1, 1), device=x.device
+        )
+        rows = torch.arange(height, device=x.device).view(1, -1, 1) - top
+        columns = torch.arange(width, device=x.device).view(1, 1, -1) - left
+        in_square = (
+            (rows >= 0) & (rows < self._size) & (columns >= 0) & (columns < self._size)
+        )
+        return x.masked_fill(in_square.unsqueeze(1), self._fill_value)
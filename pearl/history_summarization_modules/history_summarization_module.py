@@ -16,6 +16,7 @@ from pearl.api.action import Action
 from pearl.api.history import History
 from pearl.api.observation import Observation
 from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.transition import SequenceTransitionBatch
 
 
 class HistorySummarizationModule(ABC, nn.Module):
@@ -29,6 +30,51 @@ class HistorySummarizationModule(ABC, nn.Module):
     ) -> SubjectiveState:
         pass
 
+    def summarize_history_batch(
+        self,
+        observations: torch.Tensor,
+        actions: torch.Tensor | None,
+        histories: torch.Tensor | None,
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Summarizes `batch_size` independent histories at once, such as those of
+        parallel environments (see `VectorPearlAgent`), without changing the history
+        of the module.
+
+        Args:
+            observations: The latest observation of each history, of shape
+                (batch_size, ...).
+            actions: The representations of the actions taken before these
+                observations, of shape (batch_size, action_dim), or None if the
+                observations are the first ones of their episodes.
+            histories: The histories returned by the previous call, or None if the
+                observations are the first ones of their episodes.
+
+        Returns:
+            The subjective states, of shape (batch_size, ...), and the updated
+            histories, whose rows are what `get_history` would return for each
+            history.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not summarize batches of histories"
+        )
+
+    def summarize_sequences(
+        self, batch: SequenceTransitionBatch
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Summarizes the states and next states of a batch of sequences sampled from a
+        `SequenceReplayBuffer`, with one row per transition of the batch. Next states
+        are summarized without gradients.
+
+        This default summarizes the history of each transition on its own. Recurrent
+        modules override it to unroll once over the `sequence_rows` of each sequence.
+        """
+        states = self(batch.state)
+        with torch.no_grad():
+            next_states = self(batch.next_state)
+        return states, next_states
+
     @abstractmethod
     def get_history(self) -> History:
         pass
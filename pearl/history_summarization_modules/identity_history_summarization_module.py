@@ -38,6 +38,14 @@ class IdentityHistorySummarizationModule(HistorySummarizationModule):
         # is always a Tensor (not the case for tabular Q-learning, for example)
         return observation
 
+    def summarize_history_batch(
+        self,
+        observations: torch.Tensor,
+        actions: torch.Tensor | None,
+        histories: torch.Tensor | None,
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        return observations, observations
+
     def get_history(self) -> History:
         return self.history
 
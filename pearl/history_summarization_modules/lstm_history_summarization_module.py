@@ -16,6 +16,7 @@ from pearl.api.observation import Observation
 from pearl.history_summarization_modules.history_summarization_module import (
     HistorySummarizationModule,
 )
+from pearl.replay_buffers.transition import SequenceTransitionBatch
 from pearl.utils.module_utils import modules_have_similar_state_dict
 
 
@@ -78,6 +79,37 @@ class LSTMHistorySummarizationModule(HistorySummarizationModule):
         out, (_, _) = self.lstm(self.history)
         return out[-1]
 
+    def summarize_history_batch(
+        self,
+        observations: torch.Tensor,
+        actions: torch.Tensor | None,
+        histories: torch.Tensor | None,
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        batch_size = len(observations)
+        if actions is None:
+            actions = self.default_action.expand(batch_size, -1)
+        if histories is None:
+            histories = torch.zeros(
+                (
+                    batch_size,
+                    self.history_length,
+                    self.action_dim + self.observation_dim,
+                ),
+                device=observations.device,
+            )
+        observation_action_pairs = torch.cat(
+            (actions.float(), observations.float().view(batch_size, -1)), dim=-1
+        ).detach()
+        histories = torch.cat(
+            [
+                histories.view(batch_size, self.history_length, -1)[:, 1:, :],
+                observation_action_pairs.unsqueeze(1),
+            ],
+            dim=1,
+        )
+        out, (_, _) = self.lstm(histories)
+        return out[:, -1, :], histories
+
     def get_history(self) -> torch.Tensor:
         return self.history
 
@@ -85,6 +117,30 @@ class LSTMHistorySummarizationModule(HistorySummarizationModule):
         out, (_, _) = self.lstm(x)
         return out[:, -1, :]
 
+    def summarize_sequences(
+        self, batch: SequenceTransitionBatch
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Unrolls the LSTM once over the `sequence_rows` of each sequence, instead of
+        once per transition. The burn-in rows only initialize the hidden state and
+        are unrolled without gradients.
+        """
+        rows = batch.sequence_rows
+        if rows is None:
+            return super().summarize_sequences(batch)
+        assert batch.sequence_mask is not None
+        burn_in = rows.shape[1] - batch.sequence_mask.shape[1] - 1
+        hidden_state = None
+        if burn_in > 0:
+            with torch.no_grad():
+                _, hidden_state = self.lstm(rows[:, :burn_in])
+        # (number_of_sequences, sequence_length + 1, hidden_dim)
+        out, (_, _) = self.lstm(rows[:, burn_in:], hidden_state)
+        return (
+            out[:, :-1].reshape(-1, self.hidden_dim),
+            out[:, 1:].detach().reshape(-1, self.hidden_dim),
+        )
+
     def reset(self) -> None:
         self.register_buffer(
             "history",
@@ -59,6 +59,37 @@ class StackingHistorySummarizationModule(HistorySummarizationModule):
         )
         return self.history.view(-1)
 
+    def summarize_history_batch(
+        self,
+        observations: torch.Tensor,
+        actions: torch.Tensor | None,
+        histories: torch.Tensor | None,
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        batch_size = len(observations)
+        if actions is None:
+            actions = self.default_action.expand(batch_size, -1)
+        if histories is None:
+            histories = torch.zeros(
+                (
+                    batch_size,
+                    self.history_length,
+                    self.action_dim + self.observation_dim,
+                ),
+                device=observations.device,
+            )
+        observation_action_pairs = torch.cat(
+            (actions.float(), observations.float().view(batch_size, -1)), dim=-1
+        ).detach()
+        histories = torch.cat(
+            [
+                histories.view(batch_size, self.history_length, -1)[:, 1:, :],
+                observation_action_pairs.unsqueeze(1),
+            ],
+            dim=1,
+        )
+        histories = histories.view(batch_size, -1)
+        return histories, histories
+
     def get_history(self) -> torch.Tensor:
         return self.history.view(-1)
 
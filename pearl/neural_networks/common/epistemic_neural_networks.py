@@ -133,6 +133,34 @@ class Ensemble(EpistemicNeuralNetwork):
 
         return self.models[ensemble_index](x)
 
+    def forward_all(self, x: Tensor) -> Tensor:
+        """
+        Evaluates all the models of the ensemble in one vectorized forward pass.
+        Unlike `ensemble_forward`, parameters are stacked with differentiable
+        operations, so gradients flow back to the parameters of every model.
+        Input:
+            x: Feature vector of state action pairs, shared by all models
+        Output:
+            outputs of all models, of shape (ensemble_size, *x.shape[:-1], output_dim)
+        """
+        model_parameters = [dict(model.named_parameters()) for model in self.models]
+        model_buffers = [dict(model.named_buffers()) for model in self.models]
+        params = {
+            name: torch.stack([parameters[name] for parameters in model_parameters])
+            for name in model_parameters[0]
+        }
+        buffers = {
+            name: torch.stack([buffers[name] for buffers in model_buffers])
+            for name in model_buffers[0]
+        }
+
+        def call_model(
+            params: dict[str, Tensor], buffers: dict[str, Tensor], x: Tensor
+        ) -> Tensor:
+            return torch.func.functional_call(self.models[0], (params, buffers), (x,))
+
+        return torch.vmap(call_model, in_dims=(0, 0, None))(params, buffers, x)
+
     def _resample_epistemic_index(self) -> None:
         self.z = torch.randint(0, self.ensemble_size, (1,))
 
@@ -699,6 +699,34 @@ class EnsembleQValueNetwork(QValueNetwork):
         )  # (batch_size, number_of_actions_to_query)
         return q_values if len(action_batch.shape) == 3 else q_values.squeeze(-1)
 
+    def get_all_q_values(
+        self,
+        state_batch: Tensor,  # (batch_size, state_dim)
+        # (batch_size, number of query actions, action_dim) or (batch_size, action_dim)
+        action_batch: Tensor,
+    ) -> Tensor:
+        """
+        Returns the Q-values of all the networks of the ensemble, computed in one
+        vectorized forward pass, of shape (ensemble_size, batch_size, number of query
+        actions), or (ensemble_size, batch_size) if `action_batch` has one action per
+        state.
+        """
+        assert len(state_batch.shape) == 2
+        assert len(action_batch.shape) == 3 or len(action_batch.shape) == 2
+        if len(action_batch.shape) == 2:
+            extended_action_batch = action_batch.unsqueeze(1)
+        else:
+            extended_action_batch = action_batch
+
+        state_batch = extend_state_feature_by_available_action_space(
+            state_batch, extended_action_batch
+        )  # (batch_size, number_of_actions_to_query, state_dim)
+        x = torch.cat([state_batch, extended_action_batch], dim=-1)
+        q_values = self._model.forward_all(x).squeeze(
+            -1
+        )  # (ensemble_size, batch_size, number_of_actions_to_query)
+        return q_values if len(action_batch.shape) == 3 else q_values.squeeze(-1)
+
     @property
     def state_dim(self) -> int:
         return self._state_dim
@@ -71,6 +71,15 @@ class ContextualBanditBase(PolicyLearner):
     ) -> Action:
         pass
 
+    def act_batch(
+        self,
+        subjective_state: torch.Tensor,
+        available_action_space: ActionSpace,
+        exploit: bool = False,
+    ) -> torch.Tensor:
+        # `act` scores the actions in batches of states with a single forward pass
+        return self.act(subjective_state, available_action_space, exploit=exploit)
+
     @abstractmethod
     def get_scores(
         self,
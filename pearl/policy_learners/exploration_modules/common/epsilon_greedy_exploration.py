@@ -59,16 +59,7 @@ class EGreedyExploration(UniformExplorationBase):
         action_availability_mask: torch.Tensor | None = None,
         representation: torch.nn.Module | None = None,
     ) -> Action:
-        if self._epsilon_scheduling:
-            assert self.warmup_steps is not None
-            if self.time_step < self.warmup_steps:
-                assert self.warmup_steps is not None
-                frac = self.time_step / self.warmup_steps
-                assert self.start_epsilon is not None
-                assert self.end_epsilon is not None
-                self.curr_epsilon = (
-                    self.start_epsilon + (self.end_epsilon - self.start_epsilon) * frac
-                )
+        self._update_epsilon()
         self.time_step += 1
         if exploit_action is None:
             raise ValueError(
@@ -83,6 +74,55 @@ class EGreedyExploration(UniformExplorationBase):
         else:
             return exploit_action
 
+    def act_batch(
+        self,
+        subjective_state: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_action: torch.Tensor | None = None,
+        action_availability_mask: torch.Tensor | None = None,
+        representation: torch.nn.Module | None = None,
+    ) -> torch.Tensor:
+        """
+        Replaces each exploit action by a random available action with probability
+        epsilon, independently. A batch of `batch_size` decisions counts as
+        `batch_size` time steps of the epsilon schedule.
+        """
+        self._update_epsilon()
+        if exploit_action is None:
+            raise ValueError(
+                "exploit_action cannot be None for epsilon-greedy exploration"
+            )
+        if not isinstance(action_space, DiscreteActionSpace):
+            raise TypeError("action space must be discrete")
+        batch_size = len(exploit_action)
+        self.time_step += batch_size
+        device = exploit_action.device
+        if action_availability_mask is None:
+            random_indices = torch.randint(action_space.n, (batch_size,), device=device)
+        else:
+            weights = torch.as_tensor(
+                action_availability_mask, dtype=torch.float, device=device
+            ).clone()
+            # as `DiscreteSpace.sample`, chooses the first action if none is available
+            weights[:, 0] += weights.sum(dim=1) == 0
+            random_indices = torch.multinomial(weights, 1).squeeze(1)
+        random_actions = action_space.actions_batch.to(device)[random_indices]
+        is_random = torch.rand(batch_size, device=device) < self.curr_epsilon
+        return torch.where(is_random.unsqueeze(1), random_actions, exploit_action)
+
+    def _update_epsilon(self) -> None:
+        if self._epsilon_scheduling:
+            assert self.warmup_steps is not None
+            if self.time_step < self.warmup_steps:
+                assert self.warmup_steps is not None
+                frac = self.time_step / self.warmup_steps
+                assert self.start_epsilon is not None
+                assert self.end_epsilon is not None
+                self.curr_epsilon = (
+                    self.start_epsilon + (self.end_epsilon - self.start_epsilon) * frac
+                )
+
     def get_extra_state(self) -> dict[str, Any]:
         return {
             "start_epsilon": self.start_epsilon,
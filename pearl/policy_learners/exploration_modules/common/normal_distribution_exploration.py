@@ -75,6 +75,22 @@ class NormalDistributionExploration(ExplorationModule):
         # clip final action value to be within bounds of the action space
         return torch.clamp(action, low, high)
 
+    def act_batch(
+        self,
+        subjective_state: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_action: torch.Tensor | None = None,
+        action_availability_mask: torch.Tensor | None = None,
+        representation: torch.nn.Module | None = None,
+    ) -> torch.Tensor:
+        # the noise has the shape of the exploit actions, one row per decision
+        return self.act(
+            action_space=action_space,
+            subjective_state=subjective_state,
+            exploit_action=exploit_action,
+        )
+
     def compare(self, other: ExplorationModule) -> str:
         """
         Compares two NormalDistributionExploration instances for equality,
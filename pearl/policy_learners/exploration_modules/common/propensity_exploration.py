@@ -42,6 +42,22 @@ class PropensityExploration(ExplorationModule):
         action_index = torch.distributions.Categorical(values).sample()
         return action_space.actions[action_index]
 
+    def act_batch(
+        self,
+        subjective_state: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_action: torch.Tensor | None = None,
+        action_availability_mask: torch.Tensor | None = None,
+        representation: torch.nn.Module | None = None,
+    ) -> torch.Tensor:
+        if not isinstance(action_space, DiscreteActionSpace):
+            raise TypeError("action space must be discrete")
+        assert values is not None
+        # one action per row of the (batch_size, action_count) propensities
+        action_indices = torch.distributions.Categorical(values).sample()
+        return action_space.actions_batch.to(values.device)[action_indices]
+
     def compare(self, other: ExplorationModule) -> str:
         """
         Compares two PropensityExploration instances for equality.
@@ -100,6 +100,25 @@ class ScoreExplorationBase(ExplorationModule):
         )
         return actions
 
+    def act_batch(
+        self,
+        subjective_state: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_action: torch.Tensor | None = None,
+        action_availability_mask: torch.Tensor | None = None,
+        representation: torch.nn.Module | None = None,
+    ) -> torch.Tensor:
+        # scores, and thus actions, are computed for whole batches by `act`
+        return self.act(
+            subjective_state=subjective_state,
+            action_space=action_space,
+            values=values,
+            action_availability_mask=action_availability_mask,
+            exploit_action=exploit_action,
+            representation=representation,
+        )
+
     @abstractmethod
     def get_scores(
         self,
@@ -12,6 +12,7 @@ from typing import List
 import torch
 
 from pearl.api.action import Action
+from pearl.api.action_space import ActionSpace
 from pearl.api.state import SubjectiveState
 from pearl.policy_learners.exploration_modules import ExplorationModule
 
@@ -80,23 +81,40 @@ class SquareCBExploration(ScoreExplorationBase):
         values = values.view(-1, action_space.n)  # (batch_size, action_space.n)
         values = self.clamp(values)
         max_val, max_indices = torch.max(values, dim=1)
-        max_val.repeat(1, action_space.n)
-        empirical_gaps = max_val - values
+        empirical_gaps = max_val.unsqueeze(1) - values
 
-        # Construct probability distribution over actions and sample from it
-        selected_actions = torch.zeros((values.size(dim=0),), dtype=torch.int)
+        # Construct probability distribution over actions and sample from it,
+        # for all rows of the batch at once
         prob_policy = self.get_unnormalize_prob(empirical_gaps, max_val, action_space.n)
-        for batch_ind in range(values.size(dim=0)):
-            # Get sum of all the probabilities besides the maximum
-            prob_policy[batch_ind, max_indices[batch_ind]] = 0.0
-            complementary_sum = torch.sum(prob_policy)
-            prob_policy[batch_ind, max_indices[batch_ind]] = 1.0 - complementary_sum
-            # Sample from SquareCB update rule
-            dist_policy = Categorical(prob_policy[batch_ind, :])
-            selected_actions[batch_ind] = dist_policy.sample()
+        max_indices = max_indices.unsqueeze(1)
+        # Get sum of all the probabilities besides the maximum
+        prob_policy.scatter_(1, max_indices, 0.0)
+        complementary_sum = prob_policy.sum(dim=1, keepdim=True)
+        prob_policy.scatter_(1, max_indices, 1.0 - complementary_sum)
+        # Sample from SquareCB update rule
+        selected_actions = Categorical(prob_policy).sample().int()
 
         return selected_actions.squeeze(-1)
 
+    def act_batch(
+        self,
+        subjective_state: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_action: torch.Tensor | None = None,
+        action_availability_mask: torch.Tensor | None = None,
+        representation: torch.nn.Module | None = None,
+    ) -> torch.Tensor:
+        assert isinstance(action_space, DiscreteActionSpace)
+        assert values is not None
+        action_indices = self.act(
+            subjective_state=subjective_state,
+            action_space=action_space,
+            values=values,
+        ).view(-1)
+        # `act` returns action indices
+        return action_space.actions_batch.to(values.device)[action_indices.long()]
+
     def clamp(self, values: torch.Tensor) -> torch.Tensor:
         """
         Clamps value between min and max
@@ -61,16 +61,24 @@ class ThompsonSamplingExplorationLinear(ScoreExplorationBase):
             assert sigma.shape == subjective_state.shape[:-1]
             scores = torch.normal(mean=expected_reward, std=sigma)
         else:
+            features = LinearRegression.append_ones(subjective_state)
+            if features.ndim == 1:
+                features = features.unsqueeze(0)
+            # one sample of the parameters for each row of the batch, so that the
+            # decisions of a batch (e.g., of parallel environments) are independent
+            batch_size = features.shape[0]
             thompson_sampling_coefs = (
                 torch.distributions.multivariate_normal.MultivariateNormal(
                     loc=representation.coefs,  # pyre-ignore[6]
                     precision_matrix=representation.A,  # pyre-ignore[6]
-                ).sample()
-            )
-            scores = torch.matmul(
-                LinearRegression.append_ones(subjective_state),
-                thompson_sampling_coefs.t(),
-            )
+                ).sample((batch_size,))
+            )  # (batch_size, feature_dim + 1)
+            scores = (
+                features
+                * thompson_sampling_coefs.view(
+                    batch_size, *([1] * (features.ndim - 2)), -1
+                )
+            ).sum(dim=-1)
 
         return scores.view(-1, action_space.n)
 
@@ -139,7 +147,8 @@ class ThompsonSamplingExplorationLinearDisjoint(ThompsonSamplingExplorationLinea
                 exploit_action=exploit_action,
             )
             scores.append(score)
-        scores = torch.stack(scores)
+        # (batch_size, action_count)
+        scores = torch.cat(scores, dim=1)
         return scores.view(-1, action_space.n)
 
     def compare(self, other: ExplorationModule) -> str:
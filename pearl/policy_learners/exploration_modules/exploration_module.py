@@ -52,6 +52,47 @@ class ExplorationModule(ABC, nn.Module):
     ) -> Action:
         pass
 
+    def act_batch(
+        self,
+        subjective_state: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_action: torch.Tensor | None = None,
+        action_availability_mask: torch.Tensor | None = None,
+        representation: torch.nn.Module | None = None,
+    ) -> torch.Tensor:
+        """
+        Chooses one action for each of `batch_size` independent decisions, such as
+        those of parallel environments (see `VectorPearlAgent`). The arguments are
+        those of `act` with a leading batch dimension: `subjective_state` of shape
+        (batch_size, ...), `values` of shape (batch_size, action_count),
+        `exploit_action` of shape (batch_size, action_dim) and
+        `action_availability_mask` of shape (batch_size, action_count).
+
+        Returns the chosen actions, of shape (batch_size, action_dim). This default
+        implementation calls `act` once per row; modules override it to choose all
+        actions with a constant number of tensor operations.
+        """
+
+        def row(x: torch.Tensor | None, i: int) -> torch.Tensor | None:
+            return None if x is None else x[i]
+
+        return torch.stack(
+            [
+                torch.as_tensor(
+                    self.act(
+                        subjective_state=subjective_state[i],
+                        action_space=action_space,
+                        values=row(values, i),
+                        exploit_action=row(exploit_action, i),
+                        action_availability_mask=row(action_availability_mask, i),
+                        representation=representation,
+                    )
+                )
+                for i in range(len(subjective_state))
+            ]
+        )
+
     def learn(self, replay_buffer: ReplayBuffer) -> None:  # noqa: B027
         """Learns from the replay buffer. Default implementation does nothing."""
         pass
@@ -47,6 +47,24 @@ class ExplorationModuleWrapper(ExplorationModule):
             representation,
         )
 
+    def act_batch(
+        self,
+        subjective_state: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_action: torch.Tensor | None = None,
+        action_availability_mask: torch.Tensor | None = None,
+        representation: torch.nn.Module | None = None,
+    ) -> torch.Tensor:
+        return self.exploration_module.act_batch(
+            subjective_state,
+            action_space,
+            values,
+            exploit_action,
+            action_availability_mask,
+            representation,
+        )
+
     def learn(self, replay_buffer: ReplayBuffer) -> None:  # noqa: B027
         """Learns from the replay buffer. Default implementation does nothing."""
         self.exploration_module.learn(replay_buffer)
@@ -21,6 +21,8 @@ from pearl.policy_learners.exploration_modules.exploration_module import (
 from pearl.policy_learners.exploration_modules.exploration_module_wrapper import (
     ExplorationModuleWrapper,
 )
+from pearl.utils.instantiations.spaces.box_action import BoxActionSpace
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
 
 
 class Warmup(ExplorationModuleWrapper):
@@ -59,6 +61,36 @@ class Warmup(ExplorationModuleWrapper):
         self.time_step += 1
         return action
 
+    def act_batch(
+        self,
+        subjective_state: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_action: torch.Tensor | None = None,
+        action_availability_mask: torch.Tensor | None = None,
+        representation: torch.nn.Module | None = None,
+    ) -> torch.Tensor:
+        """
+        Chooses random actions while the batch starts within the first
+        `warmup_steps` steps. A batch of `batch_size` decisions counts as
+        `batch_size` steps. The random actions of discrete and bounded box action
+        spaces are drawn for the whole batch at once.
+        """
+        batch_size = len(subjective_state)
+        if self.time_step < self.warmup_steps:
+            action = _sample_batch(action_space, batch_size)
+        else:
+            action = self.exploration_module.act_batch(
+                subjective_state=subjective_state,
+                action_space=action_space,
+                values=values,
+                exploit_action=exploit_action,
+                action_availability_mask=action_availability_mask,
+                representation=representation,
+            )
+        self.time_step += batch_size
+        return action
+
     def compare(self, other: ExplorationModule) -> str:
         """
         Compares two Warmup instances for equality,
@@ -92,3 +124,21 @@ class Warmup(ExplorationModuleWrapper):
                 differences.append(f"exploration_module is different: {reason}")
 
         return "\n".join(differences)
+
+
+def _sample_batch(action_space: ActionSpace, batch_size: int) -> torch.Tensor:
+    """Returns `batch_size` actions drawn uniformly at random from `action_space`."""
+    if isinstance(action_space, DiscreteActionSpace):
+        actions_batch = action_space.actions_batch
+        random_indices = torch.randint(
+            action_space.n, (batch_size,), device=actions_batch.device
+        )
+        return actions_batch[random_indices]
+    if isinstance(action_space, BoxActionSpace):
+        low, high = action_space.low, action_space.high
+        if torch.isfinite(low).all() and torch.isfinite(high).all():
+            return low + (high - low) * torch.rand(
+                (batch_size, *low.shape), dtype=low.dtype
+            )
+    # unbounded spaces are sampled as `BoxSpace.sample` does, one action at a time
+    return torch.stack([action_space.sample() for _ in range(batch_size)])
@@ -7,6 +7,7 @@
 
 # pyre-strict
 
+import dataclasses
 from abc import ABC, abstractmethod
 from typing import Any, List, TypeVar
 
@@ -19,6 +20,9 @@ from pearl.action_representation_modules.identity_action_representation_module i
 )
 from pearl.api.action import Action
 from pearl.api.action_space import ActionSpace
+from pearl.data_augmentation_modules.data_augmentation_module import (
+    DataAugmentationModule,
+)
 from pearl.history_summarization_modules.history_summarization_module import (
     HistorySummarizationModule,
     SubjectiveState,
@@ -33,7 +37,11 @@ from pearl.policy_learners.exploration_modules.exploration_module import (
     ExplorationModule,
 )
 from pearl.replay_buffers.replay_buffer import ReplayBuffer
-from pearl.replay_buffers.transition import TransitionBatch
+from pearl.replay_buffers.transition import (
+    PrioritizedTransitionBatch,
+    SequenceTransitionBatch,
+    TransitionBatch,
+)
 from pearl.utils.device import is_distribution_enabled
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
 
@@ -99,6 +107,7 @@ class PolicyLearner(torch.nn.Module, ABC):
         self._history_summarization_module: HistorySummarizationModule = (
             IdentityHistorySummarizationModule()
         )
+        self._data_augmentation_module: DataAugmentationModule | None = None
 
         self._training_rounds = training_rounds
         self._batch_size = batch_size
@@ -147,6 +156,21 @@ class PolicyLearner(torch.nn.Module, ABC):
     ) -> None:
         pass
 
+    @property
+    def data_augmentation_module(self) -> DataAugmentationModule | None:
+        return self._data_augmentation_module
+
+    def set_data_augmentation_module(
+        self, value: DataAugmentationModule | None
+    ) -> None:
+        """
+        Sets a module randomly transforming the states and next states of the batches
+        the policy learner learns from (see `preprocess_batch`), such as
+        `RandomShiftAugmentationModule` for pixel observations. Actions are still
+        chosen from unaugmented states. None disables data augmentation.
+        """
+        self._data_augmentation_module = value
+
     def reset(self, action_space: ActionSpace) -> None:
         """Resets policy maker for a new episode. Default implementation does nothing."""
         pass
@@ -160,6 +184,39 @@ class PolicyLearner(torch.nn.Module, ABC):
     ) -> Action:
         pass
 
+    def act_batch(
+        self,
+        subjective_state: torch.Tensor,
+        available_action_space: ActionSpace,
+        exploit: bool = False,
+    ) -> torch.Tensor:
+        """
+        Chooses actions in `batch_size` subjective states at once, such as those of
+        parallel environments (see `VectorPearlAgent`), all with the same available
+        action space.
+
+        Args:
+            subjective_state: Tensor of shape (batch_size, ...) with one subjective
+                state per row.
+            available_action_space: Action space available in all states.
+            exploit: Whether actions are chosen without exploration, as in `act`.
+
+        Returns:
+            The chosen actions, of shape (batch_size, action_dim).
+
+        This default implementation calls `act` once per state. Policy learners
+        override it to choose all actions with a single forward pass of their
+        networks and a batched exploration (see `ExplorationModule.act_batch`).
+        """
+        return torch.stack(
+            [
+                torch.as_tensor(
+                    self.act(subjective_state[i], available_action_space, exploit)
+                )
+                for i in range(len(subjective_state))
+            ]
+        )
+
     def learn(
         self,
         replay_buffer: ReplayBuffer,
@@ -187,6 +244,12 @@ class PolicyLearner(torch.nn.Module, ABC):
             if isinstance(batch, TransitionBatch):
                 batch = self.preprocess_batch(batch)
                 single_report = self.learn_batch(batch)
+                if (
+                    isinstance(batch, PrioritizedTransitionBatch)
+                    and batch.indices is not None
+                    and batch.td_error is not None
+                ):
+                    replay_buffer.update_priorities(batch.indices, batch.td_error)
 
             for k, v in single_report.items():
                 if k in report:
@@ -200,10 +263,26 @@ class PolicyLearner(torch.nn.Module, ABC):
         Processes a batch of transitions before passing it to learn_batch().
         This function can be used to implement preprocessing steps such as
         transform the actions.
+
+        If a data augmentation module is set, states and next states are augmented
+        independently, before history summarization (batches of sequences are not
+        augmented).
         """
-        batch.state = self._history_summarization_module(batch.state)
-        with torch.no_grad():
-            batch.next_state = self._history_summarization_module(batch.next_state)
+        if self._data_augmentation_module is not None and not isinstance(
+            batch, SequenceTransitionBatch
+        ):
+            with torch.no_grad():
+                batch.state = self._data_augmentation_module(batch.state)
+                if batch.next_state is not None:
+                    batch.next_state = self._data_augmentation_module(batch.next_state)
+        if isinstance(batch, SequenceTransitionBatch):
+            batch = self._summarize_sequences(batch)
+        else:
+            batch.state = self._history_summarization_module(batch.state)
+            with torch.no_grad():
+                batch.next_state = self._history_summarization_module(
+                    batch.next_state
+                )
 
         batch.action = self.action_representation_module(batch.action)
         if batch.next_action is not None:
@@ -218,6 +297,29 @@ class PolicyLearner(torch.nn.Module, ABC):
             )
         return batch
 
+    def _summarize_sequences(self, batch: SequenceTransitionBatch) -> TransitionBatch:
+        """
+        Summarizes the states and next states of a batch of sequences, unrolling
+        recurrent history summarization modules once per sequence, and returns the
+        batch of its unmasked transitions.
+        """
+        batch.state, batch.next_state = (
+            self._history_summarization_module.summarize_sequences(batch)
+        )
+
+        fields = {
+            f.name: getattr(batch, f.name) for f in dataclasses.fields(TransitionBatch)
+        }
+        if batch.sequence_mask is None:
+            return TransitionBatch(**fields)
+        mask = batch.sequence_mask.view(-1)
+        return TransitionBatch(
+            **{
+                name: None if value is None else value[mask]
+                for name, value in fields.items()
+            }
+        )
+
     @abstractmethod
     def learn_batch(self, batch: TransitionBatch) -> dict[str, Any]:
         """
@@ -309,6 +309,44 @@ class ActorCriticBase(PolicyLearner):
             values=action_probabilities,
         )
 
+    def act_batch(
+        self,
+        subjective_state: torch.Tensor,
+        available_action_space: ActionSpace,
+        exploit: bool = False,
+    ) -> torch.Tensor:
+        """
+        Chooses actions in a batch of subjective states of shape
+        (batch_size, state_dim) with a single forward pass of the actor network
+        (see `PolicyLearner.act_batch`).
+        """
+        with torch.no_grad():
+            if self._is_action_continuous:
+                # pyre-fixme[29]: `Union[Module, Tensor]` is not a function.
+                exploit_action = self._actor.sample_action(subjective_state)
+                action_probabilities = None
+            else:
+                assert isinstance(available_action_space, DiscreteActionSpace)
+                actions = available_action_space.actions_batch
+                # pyre-fixme[29]: `Union[Module, Tensor]` is not a function.
+                action_probabilities = self._actor.get_policy_distribution(
+                    state_batch=subjective_state,
+                    available_actions=self.action_representation_module(actions)
+                    .unsqueeze(0)
+                    .expand(len(subjective_state), -1, -1),
+                ).view(len(subjective_state), -1)  # (batch_size x action_space_size)
+                exploit_action = actions[torch.argmax(action_probabilities, dim=-1)]
+
+        if exploit:
+            return exploit_action
+
+        return self.exploration_module.act_batch(
+            exploit_action=exploit_action,
+            action_space=available_action_space,
+            subjective_state=subjective_state,
+            values=action_probabilities,
+        )
+
     def reset(self, action_space: ActionSpace) -> None:
         # pyre-fixme[16]: `ActorCriticBase` has no attribute `_action_space`.
         self._action_space = action_space
@@ -33,13 +33,13 @@ from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
     DeepQLearning,
 )
 from pearl.replay_buffers.transition import (
-    filter_batch_by_bootstrap_mask,
+    get_discounts,
     TransitionBatch,
     TransitionWithBootstrapMaskBatch,
 )
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
 from pearl.utils.module_utils import modules_have_similar_state_dict
-from torch import optim, Tensor
+from torch import optim
 
 
 class BootstrappedDQN(DeepQLearning):
@@ -108,35 +108,29 @@ class BootstrappedDQN(DeepQLearning):
                 f"{type(self).__name__} requires a batch of type "
                 f"`TransitionWithBootstrapMaskBatch`, but got {type(batch)}."
             )
-        loss_ensemble = torch.tensor(0.0).to(batch.device)
         mask = batch.bootstrap_mask
-        for z in range(self.ensemble_size):
-            z = torch.tensor(z).to(batch.device)
-            # if this batch doesn't have any items for the z-th ensemble, move on
-            if mask is None or mask[:, z].sum() == 0:
-                continue
-
-            # filter the batch to only the transitions belonging to ensemble `z`
-            batch_filtered = filter_batch_by_bootstrap_mask(batch=batch, z=z)
-            state_action_values = self._Q.get_q_values(
-                state_batch=batch_filtered.state,
-                action_batch=batch_filtered.action,
-                curr_available_actions_batch=batch_filtered.curr_available_actions,
-                z=z,
-            )
-
-            # compute the Bellman target
-            expected_state_action_values = (
-                self._get_next_state_values(
-                    batch=batch_filtered, batch_size=batch_filtered.state.shape[0], z=z
-                )
-                * self._discount_factor
-                * (1 - batch_filtered.terminated.float())
-            ) + batch_filtered.reward  # (batch_size), r + gamma * V(s)
-
-            criterion = torch.nn.MSELoss()
-            loss = criterion(state_action_values, expected_state_action_values)
-            loss_ensemble += loss
+        if mask is None:
+            mask = torch.ones(len(batch), self.ensemble_size, device=batch.device)
+        mask = mask.t()  # (ensemble_size, batch_size)
+
+        # all ensemble members are evaluated on the whole batch in one pass
+        state_action_values = self._Q.get_all_q_values(
+            state_batch=batch.state, action_batch=batch.action
+        )  # (ensemble_size, batch_size)
+
+        # compute the Bellman targets
+        expected_state_action_values = (
+            self._get_all_next_state_values(batch=batch, batch_size=len(batch))
+            * get_discounts(batch, self._discount_factor)
+            * (1 - batch.terminated.float())
+        ) + batch.reward  # (ensemble_size, batch_size), r + gamma * V(s)
+
+        # the mean squared error of each member over its own transitions, summed
+        # over members; members without any transition in the batch contribute 0
+        squared_errors = (state_action_values - expected_state_action_values) ** 2
+        loss_ensemble = (
+            (squared_errors * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        ).sum()
 
         # Optimize the model
         self._optimizer.zero_grad()
@@ -188,10 +182,25 @@ class BootstrappedDQN(DeepQLearning):
             values=q_values,
         )
 
+    def act_batch(
+        self,
+        subjective_state: torch.Tensor,
+        available_action_space: ActionSpace,
+        exploit: bool = False,
+    ) -> torch.Tensor:
+        # actions follow the sampled ensemble member of `act`, one state at a time
+        return PolicyLearner.act_batch(
+            self, subjective_state, available_action_space, exploit
+        )
+
     @torch.no_grad()
-    def _get_next_state_values(
-        self, batch: TransitionBatch, batch_size: int, z: Tensor
+    def _get_all_next_state_values(
+        self, batch: TransitionBatch, batch_size: int
     ) -> torch.Tensor:
+        """
+        Returns the double Q-learning values of the next states of the batch for all
+        ensemble members, of shape (ensemble_size, batch_size).
+        """
         assert (next_state := batch.next_state) is not None
         assert isinstance(self._action_space, DiscreteActionSpace)
 
@@ -200,29 +209,27 @@ class BootstrappedDQN(DeepQLearning):
             self._get_next_actions_and_mask(batch, batch_size)
         )
 
-        # for dueling, this does a forward pass; since the batch of next available
-        # actions is already input
-        next_state_action_values = self._Q.get_q_values(
+        # (ensemble_size x batch_size x action_space_size)
+        next_state_action_values = self._Q.get_all_q_values(
             state_batch=next_state,  # (batch_size x state_dim)
             # (batch_size x action_space_size x action_dim)
             action_batch=next_available_actions,
-            z=z,
-        )  # (batch_size x action_space_size)
-
-        target_next_state_action_values = self._Q_target.get_q_values(
+        )
+        target_next_state_action_values = self._Q_target.get_all_q_values(
             state_batch=next_state,
             action_batch=next_available_actions,
-            z=z,
         )
 
         # Make sure that unavailable actions' Q values are assigned to -inf
-        next_state_action_values[next_unavailable_actions_mask] = -float("inf")
+        next_state_action_values = next_state_action_values.masked_fill(
+            next_unavailable_actions_mask, -float("inf")
+        )
 
         # Get argmax actions indices
-        argmax_actions = next_state_action_values.max(1)[1]  # (batch_size)
-        return target_next_state_action_values[
-            torch.arange(batch_size), argmax_actions
-        ]  # (batch_size)
+        argmax_actions = next_state_action_values.argmax(
+            dim=-1, keepdim=True
+        )  # (ensemble_size x batch_size x 1)
+        return target_next_state_action_values.gather(-1, argmax_actions).squeeze(-1)
 
     def compare(self, other: PolicyLearner) -> str:
         """
@@ -34,7 +34,7 @@ from pearl.policy_learners.policy_learner import PolicyLearner
 from pearl.policy_learners.sequential_decision_making.actor_critic_base import (
     ActorCriticBase,
 )
-from pearl.replay_buffers.transition import TransitionBatch
+from pearl.replay_buffers.transition import get_discounts, TransitionBatch
 from pearl.utils.functional_utils.learning.critic_utils import (
     twin_critic_action_value_loss,
 )
@@ -142,7 +142,9 @@ class DeepDeterministicPolicyGradient(ActorCriticBase):
             # r + gamma * (min{Qtarget_1(s', a from target actor network),
             #                  Qtarget_2(s', a from target actor network)})
             expected_state_action_values = (
-                next_q * self._discount_factor * (1 - batch.terminated.float())
+                next_q
+                * get_discounts(batch, self._discount_factor)
+                * (1 - batch.terminated.float())
             ) + batch.reward  # shape (batch_size)
 
         assert isinstance(self._critic, TwinCritic), "DDPG requires TwinCritic critic"
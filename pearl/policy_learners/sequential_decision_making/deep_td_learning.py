@@ -36,7 +36,11 @@ from pearl.policy_learners.exploration_modules.exploration_module import (
     ExplorationModule,
 )
 from pearl.policy_learners.policy_learner import PolicyLearner
-from pearl.replay_buffers.transition import TransitionBatch
+from pearl.replay_buffers.transition import (
+    get_discounts,
+    PrioritizedTransitionBatch,
+    TransitionBatch,
+)
 
 from pearl.utils.functional_utils.learning.loss_fn_utils import compute_cql_loss
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
@@ -257,6 +261,43 @@ class DeepTDLearning(PolicyLearner):
             values=q_values,
         )
 
+    def act_batch(
+        self,
+        subjective_state: torch.Tensor,
+        available_action_space: ActionSpace,
+        exploit: bool = False,
+    ) -> torch.Tensor:
+        """
+        Chooses actions in a batch of subjective states of shape
+        (batch_size, state_dim) with a single forward pass of the Q-value network
+        (see `PolicyLearner.act_batch`).
+        """
+        assert isinstance(available_action_space, DiscreteActionSpace)
+        actions = available_action_space.actions_batch.to(subjective_state.device)
+        with torch.no_grad():
+            batched_actions_representation = (
+                self.action_representation_module(actions.to(subjective_state))
+                .unsqueeze(0)
+                .expand(len(subjective_state), -1, -1)
+            )  # (batch_size x number of actions x action_dim)
+            q_values = self._Q.get_q_values(
+                state_batch=subjective_state,
+                action_batch=batched_actions_representation,
+                curr_available_actions_batch=None,
+            )  # (batch_size x number of actions)
+            exploit_action = actions[torch.argmax(q_values, dim=1)]
+
+        if exploit:
+            return exploit_action
+
+        assert self.exploration_module is not None
+        return self.exploration_module.act_batch(
+            subjective_state=subjective_state,
+            action_space=available_action_space,
+            exploit_action=exploit_action,
+            values=q_values,
+        )
+
     @abstractmethod
     def get_next_state_values(
         self, batch: TransitionBatch, batch_size: int
@@ -316,12 +357,18 @@ class DeepTDLearning(PolicyLearner):
         # Compute the Bellman Target
         expected_state_action_values = (
             self.get_next_state_values(batch, batch_size)
-            * self._discount_factor
+            * get_discounts(batch, self._discount_factor)
             * (1 - terminated_batch.float())
         ) + reward_batch  # (batch_size), r + gamma * V(s)
 
-        criterion = torch.nn.MSELoss()
-        bellman_loss = criterion(predictions, expected_state_action_values)
+        if batch.weight is not None:
+            # importance-weighted squared errors, e.g. for prioritized replay
+            bellman_loss = (
+                batch.weight * (predictions - expected_state_action_values) ** 2
+            ).mean()
+        else:
+            criterion = torch.nn.MSELoss()
+            bellman_loss = criterion(predictions, expected_state_action_values)
 
         # Conservative TD updates for offline learning.
         if self._is_conservative:
@@ -361,6 +408,9 @@ class DeepTDLearning(PolicyLearner):
         # Calculate the mean absolute error between predicted and expected values
         abs_diff = torch.abs(state_action_values - expected_state_action_values)
         mean_error = abs_diff.mean().item()
+        if isinstance(batch, PrioritizedTransitionBatch):
+            # used as new priorities by the prioritized replay buffer
+            batch.td_error = abs_diff.detach()
         return {"loss": mean_error}
 
     @cached_property
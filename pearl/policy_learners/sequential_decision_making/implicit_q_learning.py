@@ -43,7 +43,7 @@ from pearl.policy_learners.sequential_decision_making.actor_critic_base import (
     ActorCriticBase,
 )
 
-from pearl.replay_buffers.transition import TransitionBatch
+from pearl.replay_buffers.transition import get_discounts, TransitionBatch
 from pearl.utils.functional_utils.learning.critic_utils import (
     twin_critic_action_value_loss,
 )
@@ -279,7 +279,7 @@ class ImplicitQLearning(ActorCriticBase):
             # compute targets for batch of (state, action, next_state): target y = r + gamma * V(s')
             target = (
                 values_next_states
-                * self._discount_factor
+                * get_discounts(batch, self._discount_factor)
                 * (1 - batch.terminated.float())
             ) + batch.reward  # shape: (batch_size)
 
@@ -212,26 +212,21 @@ class ProximalPolicyOptimization(ActorCriticBase):
         for the definition of truncated lambda return.
         """
         assert isinstance(replay_buffer, TensorBasedReplayBuffer)
-        assert len(replay_buffer.memory) > 0
-        (
-            state_list,
-            action_list,
-            available_actions_list,
-            unavailable_actions_mask_list,
-        ) = ([], [], [], [])
-        for transition in reversed(replay_buffer.memory):
-            state_list.append(transition.state)
-            action_list.append(transition.action)
-            available_actions_list.append(transition.curr_available_actions)
-            unavailable_actions_mask_list.append(
-                transition.curr_unavailable_actions_mask
-            )
-        history_summary_batch = self._history_summarization_module(
-            torch.cat(state_list)
-        ).detach()
-        action_representation_batch = self.action_representation_module(
-            torch.cat(action_list)
-        )
+        memory = replay_buffer.memory
+        assert len(memory) > 0
+        # Columns hold the transitions in chronological order.
+        state_batch = memory.column("state")
+        action_batch = memory.column("action")
+        reward_batch = memory.column("reward")
+        terminated_batch = memory.column("terminated")
+        truncated_batch = memory.column("truncated")
+        assert state_batch is not None
+        assert action_batch is not None
+        assert reward_batch is not None
+        assert terminated_batch is not None
+        assert truncated_batch is not None
+        history_summary_batch = self._history_summarization_module(state_batch).detach()
+        action_representation_batch = self.action_representation_module(action_batch)
 
         # Transitions in the reply buffer memory are in the CPU
         # (only sampled batches are moved to the used device, kept in replay_buffer.device)
@@ -260,9 +255,12 @@ class ProximalPolicyOptimization(ActorCriticBase):
         # kept in replay_buffer.device_for_batches)
         # To use it in expressions involving the critic,
         # we must move them to the device being used first.
-        next_state = replay_buffer.memory[-1].next_state
+        next_state = memory[-1].next_state
         assert next_state is not None
         next_state_in_device = next_state.to(replay_buffer.device_for_batches)
+        reward_batch = reward_batch.to(state_values.device)
+        terminated_batch = terminated_batch.to(state_values.device)
+        truncated_batch = truncated_batch.to(state_values.device)
 
         # Obtain the value of the most recent state stored in the replay buffer.
         # This value is used to compute the generalized advantage estimation (gae)
@@ -271,29 +269,31 @@ class ProximalPolicyOptimization(ActorCriticBase):
             self._history_summarization_module(next_state_in_device)
         ).detach()[0]  # shape (1,)
         gae = torch.tensor([0.0]).to(state_values.device)
-        for i, transition in enumerate(reversed(replay_buffer.memory)):
-            original_transition_device = transition.device
-            transition.to(state_values.device)
+        gae_list, lam_return_list = [], []
+        for i in reversed(range(len(memory))):
+            terminated = terminated_batch[i : i + 1]
+            truncated = truncated_batch[i : i + 1]
             td_error = (
-                transition.reward
-                + self._discount_factor * next_value * (~transition.terminated)
+                reward_batch[i : i + 1]
+                + self._discount_factor * next_value * (~terminated)
                 - state_values[i]
             )
             gae = (
                 td_error
                 + self._discount_factor
                 * self._trace_decay_param
-                * (not (transition.terminated or transition.truncated))
+                * (not (terminated or truncated))
                 * gae
             )
-            assert isinstance(transition, PPOTransition)
-            transition.gae = gae
+            gae_list.append(gae)
             # truncated lambda return of the state
-            transition.lam_return = gae + state_values[i]
-            # action probabilities from the current policy
-            transition.action_probs = action_probs[i]
+            lam_return_list.append(gae + state_values[i])
             next_value = state_values[i]
-            transition.to(original_transition_device)
+
+        memory.set_column("gae", torch.cat(gae_list[::-1]))
+        memory.set_column("lam_return", torch.cat(lam_return_list[::-1]))
+        # action probabilities from the current policy
+        memory.set_column("action_probs", action_probs.squeeze(-1))
 
     def compare(self, other: PolicyLearner) -> str:
         """
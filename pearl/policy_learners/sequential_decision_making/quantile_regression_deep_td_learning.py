@@ -33,7 +33,11 @@ from pearl.policy_learners.policy_learner import (
     DistributionalPolicyLearner,
     PolicyLearner,
 )
-from pearl.replay_buffers.transition import TransitionBatch
+from pearl.replay_buffers.transition import (
+    get_discounts,
+    PrioritizedTransitionBatch,
+    TransitionBatch,
+)
 from pearl.safety_modules.risk_sensitive_safety_modules import (  # noqa
     RiskNeutralSafetyModule,  # noqa
 )
@@ -226,9 +230,10 @@ class QuantileRegressionDeepTDLearning(DistributionalPolicyLearner):
         with torch.no_grad():
             quantile_next_state_greedy_action_values = self._get_next_state_quantiles(
                 batch, batch_size
-            ) * self._discount_factor * (1 - batch.terminated.float()).unsqueeze(
-                -1
-            ) + batch.reward.unsqueeze(-1)
+            ) * (
+                get_discounts(batch, self._discount_factor)
+                * (1 - batch.terminated.float())
+            ).unsqueeze(-1) + batch.reward.unsqueeze(-1)
 
         """
         Step 3: pairwise distributional quantile loss:
@@ -258,7 +263,13 @@ class QuantileRegressionDeepTDLearning(DistributionalPolicyLearner):
             - sum(dim=1) approximates the (sum_{i=1}^N [ .. ]) term in Equation (1),
             - mean() takes average over the other quantile dimension (E_j [ .. ]) and over batch
         """
-        quantile_bellman_loss = quantile_huber_loss.sum(dim=1).mean()
+        if batch.weight is not None:
+            # importance-weighted per-sample losses, e.g. for prioritized replay
+            quantile_bellman_loss = (
+                batch.weight * quantile_huber_loss.sum(dim=1).mean(dim=1)
+            ).mean()
+        else:
+            quantile_bellman_loss = quantile_huber_loss.sum(dim=1).mean()
 
         # optimize model (parameters of quantile q network)
         self._optimizer.zero_grad()
@@ -269,13 +280,13 @@ class QuantileRegressionDeepTDLearning(DistributionalPolicyLearner):
         if (self._training_steps + 1) % self._target_update_freq == 0:
             update_target_network(self._Q_target, self._Q, self._soft_update_tau)
 
-        return {
-            "loss": torch.abs(
-                quantile_state_action_values - quantile_next_state_greedy_action_values
-            )
-            .mean()
-            .item()
-        }
+        abs_quantile_errors = torch.abs(
+            quantile_state_action_values - quantile_next_state_greedy_action_values
+        ).detach()
+        if isinstance(batch, PrioritizedTransitionBatch):
+            # used as new priorities by the prioritized replay buffer
+            batch.td_error = abs_quantile_errors.mean(dim=1)
+        return {"loss": abs_quantile_errors.mean().item()}
 
     def compare(self, other: PolicyLearner) -> str:
         """
@@ -181,7 +181,8 @@ class REINFORCE(ActorCriticBase):
 
     def learn(self, replay_buffer: ReplayBuffer) -> dict[str, Any]:
         assert type(replay_buffer) is REINFORCEReplayBuffer
-        assert len(replay_buffer.memory) > 0
+        memory = replay_buffer.memory
+        assert len(memory) > 0
         # compute return for all states in the buffer
 
         # Transitions in the reply buffer memory are in the CPU
@@ -189,23 +190,26 @@ class REINFORCE(ActorCriticBase):
         # kept in replay_buffer.device_for_batches)
         # To use it in expressions involving the critic,
         # we must move them to the device being used first.
-        next_state = replay_buffer.memory[-1].next_state
-        terminated = replay_buffer.memory[-1].terminated
+        last_transition = memory[-1]
+        next_state = last_transition.next_state
+        terminated = last_transition.terminated
         assert next_state is not None
         assert terminated is not None
         next_state_in_device = next_state.to(replay_buffer.device_for_batches)
         terminated_in_device = terminated.to(replay_buffer.device_for_batches)
 
-        cum_reward = self._critic(
+        next_value = self._critic(
             self._history_summarization_module(next_state_in_device)
         ).detach() * (~terminated_in_device)
 
-        # move cum_reward to CPU to process CPU-stored transitions
-        cum_reward = cum_reward.cpu()
-        for transition in reversed(replay_buffer.memory):
-            cum_reward += transition.reward
-            assert isinstance(transition, REINFORCETransition)
-            transition.cum_reward = cum_reward
+        # The return of each transition is the sum of the rewards from that
+        # transition on (columns are in chronological order), plus the value
+        # of the final next state.
+        reward_batch = memory.column("reward")
+        assert reward_batch is not None
+        returns = reward_batch.flip(0).cumsum(0).flip(0)
+        cum_reward = returns.view(-1, *next_value.shape[1:]) + next_value.cpu()
+        memory.set_column("cum_reward", cum_reward)
         # sample from replay buffer and learn
         result = super().learn(replay_buffer)
         return result
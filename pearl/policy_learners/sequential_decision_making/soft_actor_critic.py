@@ -35,7 +35,7 @@ from pearl.policy_learners.policy_learner import PolicyLearner
 from pearl.policy_learners.sequential_decision_making.actor_critic_base import (
     ActorCriticBase,
 )
-from pearl.replay_buffers.transition import TransitionBatch
+from pearl.replay_buffers.transition import get_discounts, TransitionBatch
 from pearl.utils.functional_utils.learning.critic_utils import (
     twin_critic_action_value_loss,
 )
@@ -190,7 +190,7 @@ class SoftActorCritic(ActorCriticBase):
         assert terminated_batch is not None
         expected_state_action_values = (
             self._get_next_state_expected_values(batch)
-            * self._discount_factor
+            * get_discounts(batch, self._discount_factor)
             * (1 - terminated_batch.float())
         ) + reward_batch  # (batch_size), r + gamma * V(s)
 
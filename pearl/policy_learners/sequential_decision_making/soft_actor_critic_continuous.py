@@ -32,7 +32,7 @@ from pearl.policy_learners.policy_learner import PolicyLearner
 from pearl.policy_learners.sequential_decision_making.actor_critic_base import (
     ActorCriticBase,
 )
-from pearl.replay_buffers.transition import TransitionBatch
+from pearl.replay_buffers.transition import get_discounts, TransitionBatch
 from pearl.utils.functional_utils.learning.critic_utils import (
     twin_critic_action_value_loss,
 )
@@ -161,7 +161,7 @@ class ContinuousSoftActorCritic(ActorCriticBase):
         if terminated_batch is not None:
             expected_state_action_values = (
                 self._get_next_state_expected_values(batch)
-                * self._discount_factor
+                * get_discounts(batch, self._discount_factor)
                 * (1 - terminated_batch.float())
             ) + reward_batch  # shape of expected_state_action_values: (batch_size)
         else:
@@ -31,7 +31,7 @@ from pearl.policy_learners.policy_learner import PolicyLearner
 from pearl.policy_learners.sequential_decision_making.ddpg import (
     DeepDeterministicPolicyGradient,
 )
-from pearl.replay_buffers.transition import TransitionBatch
+from pearl.replay_buffers.transition import get_discounts, TransitionBatch
 from pearl.utils.functional_utils.learning.critic_utils import (
     twin_critic_action_value_loss,
     update_critic_target_network,
@@ -187,7 +187,9 @@ class TD3(DeepDeterministicPolicyGradient):
             # r + gamma * (min{Qtarget_1(s', a from target actor network),
             #                  Qtarget_2(s', a from target actor network)})
             expected_state_action_values = (
-                next_q * self._discount_factor * (1 - batch.terminated.float())
+                next_q
+                * get_discounts(batch, self._discount_factor)
+                * (1 - batch.terminated.float())
             ) + batch.reward  # (batch_size)
 
         # update twin critics towards bellman target
@@ -7,9 +7,31 @@
 # pyre-strict
 
 from .basic_replay_buffer import BasicReplayBuffer
+from .codecs import ByteCodec, CastCodec, Codec, QuantizedCodec, ZlibCodec
+from .columnar_storage import ColumnarStorage
+from .epoch_iterator import EpochIterator
+from .eviction_policies import (
+    EpisodeStratifiedEvictionPolicy,
+    EvictionPolicy,
+    FIFOEvictionPolicy,
+    RecencyBiasedEvictionPolicy,
+    ReservoirEvictionPolicy,
+)
+from .frame_deduplicated_replay_buffer import FrameDeduplicatedReplayBuffer
+from .memory_mapped_replay_buffer import (
+    MemoryMappedColumnarStorage,
+    MemoryMappedReplayBuffer,
+)
+from .prefetching_replay_buffer import PrefetchingReplayBuffer
 from .replay_buffer import ReplayBuffer
+from .shared_memory_replay_buffer import (
+    SharedMemoryColumnarStorage,
+    SharedMemoryReplayBuffer,
+)
 from .tensor_based_replay_buffer import TensorBasedReplayBuffer
 from .transition import (
+    PrioritizedTransitionBatch,
+    SequenceTransitionBatch,
     Transition,
     TransitionBatch,
     TransitionWithBootstrapMask,
@@ -17,11 +39,31 @@ from .transition import (
 )
 
 __all__ = [
+    "ByteCodec",
+    "CastCodec",
+    "Codec",
+    "ColumnarStorage",
+    "EpisodeStratifiedEvictionPolicy",
+    "EpochIterator",
+    "EvictionPolicy",
+    "FIFOEvictionPolicy",
+    "FrameDeduplicatedReplayBuffer",
+    "MemoryMappedColumnarStorage",
+    "MemoryMappedReplayBuffer",
+    "PrefetchingReplayBuffer",
+    "PrioritizedTransitionBatch",
+    "QuantizedCodec",
+    "RecencyBiasedEvictionPolicy",
     "ReplayBuffer",
+    "ReservoirEvictionPolicy",
+    "SequenceTransitionBatch",
+    "SharedMemoryColumnarStorage",
+    "SharedMemoryReplayBuffer",
     "TensorBasedReplayBuffer",
     "Transition",
     "TransitionBatch",
     "TransitionWithBootstrapMask",
     "TransitionWithBootstrapMaskBatch",
     "BasicReplayBuffer",
+    "ZlibCodec",
 ]
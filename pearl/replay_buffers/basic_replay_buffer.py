@@ -11,13 +11,13 @@ from pearl.api.action import Action
 from pearl.api.reward import Reward
 from pearl.api.state import SubjectiveState
 from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
-from pearl.replay_buffers.transition import Transition
+from pearl.replay_buffers.transition import Transition, TransitionBatch
 from torch import Tensor
 
 
 class BasicReplayBuffer(TensorBasedReplayBuffer):
-    def __init__(self, capacity: int) -> None:
-        super().__init__(capacity)
+    def __init__(self, capacity: int, device_resident: bool = False) -> None:
+        super().__init__(capacity, device_resident=device_resident)
 
     def _store_transition(
         self,
@@ -47,3 +47,15 @@ class BasicReplayBuffer(TensorBasedReplayBuffer):
             cost=self._process_single_cost(cost),
         )
         self.memory.append(transition)
+
+    def _store_batch(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions_ids: Tensor | None,
+        next_available_actions_ids: Tensor | None,
+    ) -> None:
+        self.memory.append_batch(
+            self._transition_from_batch(
+                batch, curr_available_actions_ids, next_available_actions_ids
+            )
+        )
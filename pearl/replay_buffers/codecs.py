@@ -0,0 +1,173 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+"""
+Codecs encoding the columns of a `ColumnarStorage`, so that more transitions fit
+in memory. They are set per column with `ColumnarStorage.set_codec` (or
+`TensorBasedReplayBuffer.set_codecs`), and rows are decoded in batches when they
+are gathered, so sampled batches hold the dtype of the pushed values as usual.
+
+There are two kinds of codecs:
+    - `Codec`s map rows to rows of a smaller dtype, which are stored in a
+      preallocated column like any other (`CastCodec`, `QuantizedCodec`).
+    - `ByteCodec`s compress each row to a variable number of bytes, which are kept
+      in a list (`ZlibCodec`).
+"""
+
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+from torch import Tensor
+
+
+class Codec(ABC):
+    """Encodes rows to rows of the same shape and a dtype taking less memory."""
+
+    @abstractmethod
+    def encode(self, values: Tensor) -> Tensor:
+        """Encodes rows given with a leading row dimension."""
+        pass
+
+    @abstractmethod
+    def decode(self, encoded: Tensor, dtype: torch.dtype) -> Tensor:
+        """Decodes rows returned by `encode` to rows of dtype `dtype`."""
+        pass
+
+
+class CastCodec(Codec):
+    """
+    Stores rows in a reduced-precision floating point dtype, such as `torch.float16`
+    or `torch.bfloat16`.
+
+    Args:
+        dtype: The storage dtype.
+    """
+
+    def __init__(self, dtype: torch.dtype = torch.float16) -> None:
+        if not dtype.is_floating_point:
+            raise ValueError(f"dtype must be a floating point dtype but is {dtype}")
+        self.dtype = dtype
+
+    def encode(self, values: Tensor) -> Tensor:
+        return values.to(self.dtype)
+
+    def decode(self, encoded: Tensor, dtype: torch.dtype) -> Tensor:
+        return encoded.to(dtype)
+
+
+class QuantizedCodec(Codec):
+    """
+    Stores rows as `uint8`, with `value = offset + scale * code`. Values are rounded
+    to the nearest code and clamped to `[offset, offset + 255 * scale]`, so for
+    instance `scale=1/255` stores values in `[0, 1]` with rounding errors of at most
+    `1/510`, and the default `scale=1` stores pixel intensities losslessly.
+
+    Args:
+        scale: The difference between the values of consecutive codes.
+        offset: The value of code 0.
+    """
+
+    def __init__(self, scale: float = 1.0, offset: float = 0.0) -> None:
+        if scale <= 0:
+            raise ValueError(f"scale must be positive but is {scale}")
+        self.scale = scale
+        self.offset = offset
+
+    def encode(self, values: Tensor) -> Tensor:
+        codes = ((values.float() - self.offset) / self.scale).round_()
+        return codes.clamp_(0, 255).to(torch.uint8)
+
+    def decode(self, encoded: Tensor, dtype: torch.dtype) -> Tensor:
+        return (encoded.to(dtype) * self.scale + self.offset).to(dtype)
+
+
+class ByteCodec(ABC):
+    """
+    Compresses each row to bytes. Rows are compressed and decompressed independently,
+    with `number_of_threads` threads, since sampled rows are scattered over the
+    storage.
+
+    Args:
+        number_of_threads: The number of threads compressing and decompressing the
+            rows of a batch.
+    """
+
+    def __init__(self, number_of_threads: int = 1) -> None:
+        if number_of_threads < 1:
+            raise ValueError(
+                f"number_of_threads must be positive but is {number_of_threads}"
+            )
+        self.number_of_threads = number_of_threads
+        self._executor: ThreadPoolExecutor | None = None
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        pass
+
+    def encode(self, values: Tensor) -> list[bytes]:
+        """Compresses rows given with a leading row dimension."""
+        if len(values) == 0:
+            return []
+        rows = values.detach().cpu().contiguous().view(len(values), -1)
+        rows = rows.view(torch.uint8)
+        return self._map(self.compress, [row.numpy().tobytes() for row in rows])
+
+    def decode(
+        self, encoded: list[bytes], row_shape: torch.Size, dtype: torch.dtype
+    ) -> Tensor:
+        """Decompresses rows returned by `encode` into a tensor."""
+        if len(encoded) == 0:
+            return torch.empty((0, *row_shape), dtype=dtype)
+        # a bytearray is writable, so the tensor sharing its memory is too
+        buffer = bytearray(b"".join(self._map(self.decompress, encoded)))
+        return torch.frombuffer(buffer, dtype=dtype).view(len(encoded), *row_shape)
+
+    def _map(self, fn: Callable[[bytes], bytes], rows: list[bytes]) -> list[bytes]:
+        if self.number_of_threads == 1 or len(rows) < 2 * self.number_of_threads:
+            return [fn(row) for row in rows]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.number_of_threads)
+        return list(self._executor.map(fn, rows))
+
+    def __getstate__(self) -> dict[str, object]:
+        # thread pools cannot be pickled; a new one is started when needed
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+
+class ZlibCodec(ByteCodec):
+    """
+    Compresses rows losslessly with zlib, which suits sparse observations and images
+    with large uniform areas. zlib releases the GIL, so several threads decompress
+    the rows of a batch in parallel.
+
+    Args:
+        level: The zlib compression level, from 1 (fastest) to 9 (smallest).
+        number_of_threads: See `ByteCodec`.
+    """
+
+    def __init__(self, level: int = 1, number_of_threads: int = 1) -> None:
+        super().__init__(number_of_threads)
+        if not 1 <= level <= 9:
+            raise ValueError(f"level must be between 1 and 9 but is {level}")
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
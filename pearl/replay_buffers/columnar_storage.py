@@ -0,0 +1,581 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import dataclasses
+from collections.abc import Iterable
+from typing import Any
+
+import torch
+from pearl.replay_buffers.codecs import ByteCodec, Codec
+from pearl.replay_buffers.eviction_policies import EvictionPolicy, FIFOEvictionPolicy
+from pearl.replay_buffers.transition import Transition
+from torch import Tensor
+
+
+class ColumnarStorage:
+    """
+    Preallocated, column-oriented circular storage for transitions.
+
+    Every field of a transition is stored in its own tensor with `capacity` rows.
+    A column is allocated lazily, the first time a value for its field is written,
+    and its row shape is fixed by that first value. If a later value has a dtype
+    that does not fit in the column, the column is promoted to the common dtype
+    (mirroring what `torch.cat` would have done with per-transition tensors).
+    Once the storage is full, new rows overwrite the oldest ones, unless another
+    eviction policy is set (see `set_eviction_policy`).
+
+    Columns are allocated on the device of the first values written to them,
+    unless the storage was moved to a device with `to`.
+
+    Columns can be stored encoded by a codec (see `set_codec` and
+    `pearl.replay_buffers.codecs`), to fit more rows in memory. Rows are encoded when
+    they are written and decoded when they are read, so reads return the dtype of
+    the written values as usual.
+
+    Rows are addressed in two ways:
+        - physical indices, the positions of rows in the column tensors. Sampling
+          uses these, since every physical index in `[0, len(self))` holds a valid
+          row.
+        - logical indices, where 0 is the oldest row currently stored. These are
+          used by `__getitem__`, `column` and `set_column`. Once an eviction policy
+          other than `FIFOEvictionPolicy` has overwritten rows, rows are no longer
+          in insertion order, and logical indices are physical indices.
+
+    Args:
+        capacity: Maximum number of rows stored.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive but is {capacity}")
+        self.capacity = capacity
+        self._columns: dict[str, Tensor] = {}
+        # the device columns are allocated on, if set with `to`
+        self._device: torch.device | None = None
+        self._size = 0
+        self._next_index = 0
+        # the number of rows ever written, and the number of times rows were written
+        # otherwise than by appending them (see `version`)
+        self._number_of_rows_written = 0
+        self._generation = 0
+        self._transition_type: type[Transition] = Transition
+        self._codecs: dict[str, Codec | ByteCodec] = {}
+        # the rows of columns encoded by byte codecs, which are not tensors
+        self._byte_columns: dict[str, list[bytes]] = {}
+        # the row shapes and dtypes of the values written to encoded columns
+        self._decoded_specs: dict[str, tuple[torch.Size, torch.dtype]] = {}
+        self._eviction_policy: EvictionPolicy = FIFOEvictionPolicy()
+        self._eviction_policy.reset(capacity)
+        # the number of rows kept by the last append, or their physical indices if
+        # they were chosen by the eviction policy (see `written_indices`)
+        self._number_of_rows_last_written = 0
+        self._last_written_indices: Tensor | None = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def column_names(self) -> list[str]:
+        return list(self._columns) + list(self._byte_columns)
+
+    def has_column(self, name: str) -> bool:
+        return name in self._columns or name in self._byte_columns
+
+    def to(self, device: torch.device) -> None:
+        """
+        Moves the columns to `device`, where the columns allocated later are stored
+        too. Values written to them are copied to `device`.
+        """
+        self._device = device
+        for name, column in self._columns.items():
+            self._columns[name] = column.to(device)
+
+    def set_codec(self, name: str, codec: Codec | ByteCodec) -> None:
+        """
+        Stores the column `name` encoded by `codec`. This must be done before the
+        column is first written.
+        """
+        if self.has_column(name):
+            raise ValueError(
+                f"The codec of column {name} must be set before it is written"
+            )
+        self._codecs[name] = codec
+
+    @property
+    def eviction_policy(self) -> EvictionPolicy:
+        return self._eviction_policy
+
+    def set_eviction_policy(self, eviction_policy: EvictionPolicy) -> None:
+        """
+        Sets the policy choosing the rows that new rows overwrite once the storage is
+        full (see `pearl.replay_buffers.eviction_policies`). This must be done before
+        rows are written.
+        """
+        if self._size > 0:
+            raise ValueError("The eviction policy must be set before rows are written")
+        eviction_policy.reset(self.capacity)
+        self._eviction_policy = eviction_policy
+
+    def memory_footprint(self) -> dict[str, tuple[int, str]]:
+        """
+        Returns the number of bytes allocated by each column and its stored dtype.
+        Columns encoded by byte codecs hold their compressed rows, with dtype "bytes".
+        """
+        footprint = {
+            name: (column.nbytes, str(column.dtype))
+            for name, column in self._columns.items()
+        }
+        for name, rows in self._byte_columns.items():
+            footprint[name] = (sum(len(row) for row in rows), "bytes")
+        return footprint
+
+    @property
+    def next_index(self) -> int:
+        """The physical index the next appended row will be written to."""
+        return self._next_index
+
+    @property
+    def version(self) -> tuple[int, int]:
+        """
+        A (generation, number of rows written) pair identifying the content of the
+        storage. Appending rows increases the number of rows written, and clearing
+        the storage, overwriting a column or overwriting rows chosen by the eviction
+        policy starts a new generation.
+        """
+        return (self._generation, self._number_of_rows_written)
+
+    def append(self, transition: Transition) -> int:
+        """
+        Writes a transition at the write cursor, overwriting the oldest row if the
+        storage is full (or the row chosen by the eviction policy).
+
+        Every non-None field of `transition` must have a leading dimension of size 1
+        (the convention used for single transitions throughout Pearl). The set of
+        non-None fields must be the same for all transitions stored at a given time.
+
+        Returns:
+            The physical index the transition was written to, or -1 if the eviction
+            policy discarded it.
+        """
+        self._append_rows(transition, number_of_rows=1)
+        if self._last_written_indices is None:
+            return (self._next_index - 1) % self.capacity
+        if len(self._last_written_indices) == 0:
+            return -1
+        return int(self._last_written_indices[0].item())
+
+    def append_batch(self, transitions: Transition) -> Tensor:
+        """
+        Writes several transitions at once, given as a transition whose non-None fields
+        all have the same leading dimension `n`, with a constant number of tensor
+        operations per field. If `n` exceeds the capacity, only the last `capacity`
+        transitions are kept, as if they had been appended one by one.
+
+        Returns:
+            The physical indices the kept transitions were written to (see
+            `written_indices`).
+        """
+        number_of_rows = len(
+            next(
+                getattr(transitions, f.name)
+                for f in dataclasses.fields(transitions)
+                if getattr(transitions, f.name) is not None
+            )
+        )
+        self._append_rows(transitions, number_of_rows)
+        return self.written_indices
+
+    @property
+    def written_indices(self) -> Tensor:
+        """
+        The physical indices the rows kept by the last `append` or `append_batch`
+        were written to, in the order of the rows.
+        """
+        if self._last_written_indices is not None:
+            return self._last_written_indices
+        number_of_rows = self._number_of_rows_last_written
+        return (
+            self._next_index - number_of_rows + torch.arange(number_of_rows)
+        ) % self.capacity
+
+    def _append_rows(self, transitions: Transition, number_of_rows: int) -> None:
+        """Writes `number_of_rows` rows."""
+        values = self._values_to_append(transitions, number_of_rows)
+        if not isinstance(self._eviction_policy, FIFOEvictionPolicy):
+            self._append_rows_chosen_by_policy(values, number_of_rows)
+            return
+        # rows that would be overwritten by later rows of the same call are skipped
+        number_of_skipped_rows = max(0, number_of_rows - self.capacity)
+        index = (self._next_index + number_of_skipped_rows) % self.capacity
+        for name, value in values.items():
+            self._write_rows(name, index, value[number_of_skipped_rows:])
+        self._number_of_rows_last_written = number_of_rows - number_of_skipped_rows
+        self._last_written_indices = None
+        self._advance(number_of_rows)
+
+    def _values_to_append(
+        self, transitions: Transition, number_of_rows: int
+    ) -> dict[str, Tensor]:
+        """
+        Returns the non-None fields of `transitions` by name, after checking that
+        they match the stored columns and have `number_of_rows` rows.
+        """
+        values = {
+            f.name: getattr(transitions, f.name)
+            for f in dataclasses.fields(transitions)
+            if getattr(transitions, f.name) is not None
+        }
+        if self._size > 0 and set(values) != set(self.column_names):
+            raise ValueError(
+                f"Transition has fields {sorted(values)} but the transitions already "
+                f"stored have fields {sorted(self.column_names)}"
+            )
+        for name, value in values.items():
+            if value.ndim == 0 or value.shape[0] != number_of_rows:
+                raise ValueError(
+                    f"Field {name} must have a leading dimension of size "
+                    f"{number_of_rows} but has shape {tuple(value.shape)}"
+                )
+        self._transition_type = type(transitions)
+        return values
+
+    def _append_rows_chosen_by_policy(
+        self, values: dict[str, Tensor], number_of_rows: int
+    ) -> None:
+        """
+        Writes rows to the physical indices chosen by the eviction policy. Rows
+        appended to a storage that is not full keep the write cursor up to date, and
+        overwriting rows starts a new generation (see `version`).
+        """
+        is_episode_end = torch.zeros(number_of_rows, dtype=torch.bool)
+        for name in ["terminated", "truncated"]:
+            if name in values:
+                is_episode_end |= values[name].reshape(number_of_rows).bool().cpu()
+        size = self._size
+        indices = self._eviction_policy.select_indices(is_episode_end.tolist(), size)
+        # rows overwritten by later rows of the same call are skipped
+        row_of_index = {index: row for row, index in enumerate(indices) if index >= 0}
+        row_of_index = dict(sorted(row_of_index.items(), key=lambda item: item[1]))
+        rows = torch.tensor(list(row_of_index.values()), dtype=torch.long)
+        physical_indices = torch.tensor(list(row_of_index), dtype=torch.long)
+        for name, value in values.items():
+            self._write_rows_at(name, physical_indices, value[rows.to(value.device)])
+        self._last_written_indices = physical_indices
+        number_of_appended_rows = sum(index >= size for index in row_of_index)
+        self._advance(number_of_appended_rows)
+        if number_of_appended_rows < len(row_of_index):
+            self._generation += 1
+
+    def gather(
+        self, indices: Tensor, names: Iterable[str] | None = None
+    ) -> dict[str, Tensor]:
+        """
+        Returns the rows at the given physical indices, with one `index_select` per column
+        and one batched decoding per encoded column.
+
+        Args:
+            indices: 1-dimensional tensor of physical indices.
+            names: The columns to gather. Defaults to all columns. Names of columns
+                that do not exist are ignored.
+        Returns:
+            A dictionary mapping column names to tensors of shape
+            (len(indices), *row_shape).
+        """
+        if names is None:
+            names = self.column_names
+        result = {}
+        for name in names:
+            if name in self._byte_columns:
+                rows = self._byte_columns[name]
+                codec = self._codecs[name]
+                assert isinstance(codec, ByteCodec)
+                row_shape, dtype = self._decoded_specs[name]
+                result[name] = codec.decode(
+                    [rows[index] for index in indices.tolist()], row_shape, dtype
+                )
+                continue
+            column = self._columns.get(name)
+            if column is None:
+                continue
+            values = column.index_select(0, indices.to(column.device))
+            codec = self._codecs.get(name)
+            if codec is not None:
+                assert isinstance(codec, Codec)
+                values = codec.decode(values, self._decoded_specs[name][1])
+            result[name] = values
+        return result
+
+    def logical_to_physical(self, indices: Tensor) -> Tensor:
+        """Maps logical indices (0 is the oldest row) to physical indices."""
+        return (indices + self._start) % self.capacity
+
+    def column(self, name: str) -> Tensor | None:
+        """
+        Returns all rows of a column in logical order (oldest first), or None if the
+        column does not exist. The result may share memory with the storage.
+        """
+        if name in self._codecs:
+            if not self.has_column(name):
+                return None
+            physical_indices = self.logical_to_physical(torch.arange(self._size))
+            return self.gather(physical_indices, [name])[name]
+        column = self._columns.get(name)
+        if column is None:
+            return None
+        if self._start == 0:
+            return column[: self._size]
+        return torch.cat([column[self._start :], column[: self._start]])
+
+    def set_column(self, name: str, values: Tensor) -> None:
+        """
+        Overwrites all rows of a column, allocating it if needed.
+
+        Args:
+            name: The column name.
+            values: Tensor of shape (len(self), *row_shape) in logical order.
+        """
+        if values.shape[0] != self._size:
+            raise ValueError(
+                f"Expected {self._size} values for column {name} "
+                f"but got {values.shape[0]}"
+            )
+        # rows are written from the oldest one, wrapping around the end of the column
+        self._write_rows(name, self._start, values)
+        self._generation += 1
+
+    def __getitem__(self, index: int) -> Transition:
+        """
+        Returns the row with the given logical index as a transition whose fields
+        have a leading dimension of size 1, as they were when pushed.
+        """
+        if not -self._size <= index < self._size:
+            raise IndexError(
+                f"index {index} is out of range for storage with {self._size} rows"
+            )
+        physical_index = (index % self._size + self._start) % self.capacity
+        return self._transition_type(**self.gather(torch.tensor([physical_index])))
+
+    def state_dict(
+        self, since_version: tuple[int, int] | None = None
+    ) -> dict[str, Any]:
+        """
+        Returns the rows and write cursor of the storage. Columns share memory with
+        the storage, and encoded columns are returned encoded, with their codecs.
+
+        Args:
+            since_version: A former `version` of the storage. If given, and if the
+                storage has only been appended to since then and not by more than
+                `capacity` rows, only the rows appended since then are returned,
+                with their physical indices, and `load_state_dict` applies them to
+                a storage restored at that version.
+        """
+        state: dict[str, Any] = {
+            "capacity": self.capacity,
+            "size": self._size,
+            "next_index": self._next_index,
+            "version": self.version,
+            "codecs": dict(self._codecs),
+            "decoded_specs": dict(self._decoded_specs),
+            "eviction_policy": self._eviction_policy.state_dict(),
+        }
+        if since_version is not None:
+            generation, number_of_rows_written = since_version
+            number_of_new_rows = self._number_of_rows_written - number_of_rows_written
+            if generation == self._generation and number_of_new_rows < self.capacity:
+                indices = (
+                    self._next_index
+                    - number_of_new_rows
+                    + torch.arange(number_of_new_rows)
+                ) % self.capacity
+                state["since_version"] = since_version
+                state["indices"] = indices
+                state["columns"] = {
+                    name: column.index_select(0, indices.to(column.device))
+                    for name, column in self._columns.items()
+                }
+                state["byte_columns"] = {
+                    name: [rows[index] for index in indices.tolist()]
+                    for name, rows in self._byte_columns.items()
+                }
+                return state
+        state["columns"] = {
+            name: column[: self._size] for name, column in self._columns.items()
+        }
+        state["byte_columns"] = {
+            name: rows[: self._size] for name, rows in self._byte_columns.items()
+        }
+        return state
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        """
+        Restores rows returned by `state_dict`, either all rows or the rows appended
+        since the current version of the storage.
+        """
+        if state_dict["capacity"] != self.capacity:
+            raise ValueError(
+                f"Cannot load rows of a storage of capacity {state_dict['capacity']} "
+                f"into a storage of capacity {self.capacity}"
+            )
+        columns: dict[str, Tensor] = state_dict["columns"]
+        byte_columns: dict[str, list[bytes]] = state_dict["byte_columns"]
+        if "indices" in state_dict:
+            since_version = tuple(state_dict["since_version"])
+            if since_version != self.version:
+                raise ValueError(
+                    f"Rows appended since version {since_version} cannot be applied "
+                    f"to a storage at version {self.version}"
+                )
+            for name, values in columns.items():
+                column = self._fit_column(
+                    name, values.shape[1:], values.dtype, values.device
+                )
+                column.index_copy_(
+                    0, state_dict["indices"].to(column.device), values.to(column)
+                )
+            for name, rows in byte_columns.items():
+                stored_rows = self._byte_columns.setdefault(
+                    name, [b""] * self.capacity
+                )
+                for index, row in zip(state_dict["indices"].tolist(), rows):
+                    stored_rows[index] = row
+        else:
+            self.clear()
+            # rows are stored as they were encoded
+            self._codecs = dict(state_dict["codecs"])
+            for name, values in columns.items():
+                column = self._fit_column(
+                    name, values.shape[1:], values.dtype, values.device
+                )
+                column[: len(values)].copy_(values)
+            for name, rows in byte_columns.items():
+                self._byte_columns[name] = list(rows) + [b""] * (
+                    self.capacity - len(rows)
+                )
+        self._decoded_specs = dict(state_dict["decoded_specs"])
+        self._eviction_policy.load_state_dict(state_dict["eviction_policy"])
+        self._size = state_dict["size"]
+        self._next_index = state_dict["next_index"]
+        self._generation, self._number_of_rows_written = state_dict["version"]
+
+    def clear(self) -> None:
+        # codecs are kept, as they are set before columns are written
+        self._columns = {}
+        self._byte_columns = {}
+        self._decoded_specs = {}
+        self._eviction_policy.reset(self.capacity)
+        self._size = 0
+        self._next_index = 0
+        self._generation += 1
+
+    @property
+    def _start(self) -> int:
+        """Physical index of the oldest row."""
+        return self._next_index if self._size == self.capacity else 0
+
+    def _advance(self, number_of_rows: int) -> None:
+        self._next_index = (self._next_index + number_of_rows) % self.capacity
+        self._size = min(self._size + number_of_rows, self.capacity)
+        self._number_of_rows_written += number_of_rows
+
+    def _write_rows(self, name: str, index: int, values: Tensor) -> None:
+        """
+        Writes `values` (with a leading row dimension of at most `capacity`) starting
+        at physical `index`, wrapping around the end of the column.
+        """
+        codec = self._codecs.get(name)
+        if codec is not None:
+            self._fit_decoded_spec(name, values.shape[1:], values.dtype)
+            if isinstance(codec, ByteCodec):
+                rows = self._byte_columns.setdefault(name, [b""] * self.capacity)
+                for offset, row in enumerate(codec.encode(values)):
+                    rows[(index + offset) % self.capacity] = row
+                return
+            values = codec.encode(values)
+        column = self._fit_column(name, values.shape[1:], values.dtype, values.device)
+        number_of_rows_before_end = self.capacity - index
+        column[index : index + len(values)].copy_(values[:number_of_rows_before_end])
+        if len(values) > number_of_rows_before_end:
+            column[: len(values) - number_of_rows_before_end].copy_(
+                values[number_of_rows_before_end:]
+            )
+
+    def _write_rows_at(self, name: str, indices: Tensor, values: Tensor) -> None:
+        """Writes `values` (with a leading row dimension) at physical `indices`."""
+        codec = self._codecs.get(name)
+        if codec is not None:
+            self._fit_decoded_spec(name, values.shape[1:], values.dtype)
+            if isinstance(codec, ByteCodec):
+                rows = self._byte_columns.setdefault(name, [b""] * self.capacity)
+                for index, row in zip(indices.tolist(), codec.encode(values)):
+                    rows[index] = row
+                return
+            values = codec.encode(values)
+        column = self._fit_column(name, values.shape[1:], values.dtype, values.device)
+        column.index_copy_(0, indices.to(column.device), values.to(column))
+
+    def _fit_column(
+        self,
+        name: str,
+        row_shape: torch.Size,
+        dtype: torch.dtype,
+        device: torch.device,
+    ) -> Tensor:
+        """
+        Returns the column `name`, allocating it if it does not exist yet
+        and promoting its dtype if values of `dtype` do not fit in it.
+        """
+        column = self._columns.get(name)
+        if column is None:
+            if self._device is not None:
+                device = self._device
+            column = self._allocate_column(name, row_shape, dtype, device)
+            self._columns[name] = column
+            return column
+        if column.shape[1:] != row_shape:
+            raise ValueError(
+                f"Field {name} has row shape {tuple(row_shape)} but rows of "
+                f"shape {tuple(column.shape[1:])} are already stored"
+            )
+        promoted_dtype = torch.promote_types(column.dtype, dtype)
+        if promoted_dtype != column.dtype:
+            column = self._promote_column(name, promoted_dtype)
+        return column
+
+    def _fit_decoded_spec(
+        self, name: str, row_shape: torch.Size, dtype: torch.dtype
+    ) -> None:
+        """
+        Records the row shape and dtype of values written to an encoded column,
+        promoting the dtype as `_fit_column` does for other columns.
+        """
+        spec = self._decoded_specs.get(name)
+        if spec is None:
+            self._decoded_specs[name] = (row_shape, dtype)
+            return
+        if spec[0] != row_shape:
+            raise ValueError(
+                f"Field {name} has row shape {tuple(row_shape)} but rows of "
+                f"shape {tuple(spec[0])} are already stored"
+            )
+        self._decoded_specs[name] = (row_shape, torch.promote_types(spec[1], dtype))
+
+    def _allocate_column(
+        self,
+        name: str,
+        row_shape: torch.Size,
+        dtype: torch.dtype,
+        device: torch.device,
+    ) -> Tensor:
+        """Allocates the tensor backing a column with `capacity` rows."""
+        return torch.empty((self.capacity, *row_shape), dtype=dtype, device=device)
+
+    def _promote_column(self, name: str, dtype: torch.dtype) -> Tensor:
+        column = self._columns[name].to(dtype)
+        self._columns[name] = column
+        return column
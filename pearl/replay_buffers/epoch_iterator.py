@@ -0,0 +1,155 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+from collections.abc import Iterator
+from typing import Any
+
+import numpy as np
+import torch
+from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
+from pearl.replay_buffers.transition import TransitionBatch
+from torch import Tensor
+
+
+class EpochIterator:
+    """
+    Iterates over the transitions of a replay buffer in epochs, for offline training:
+    every epoch draws a random permutation of the stored transitions and yields
+    consecutive slices of it as batches, so that each transition is used exactly
+    once per epoch. Each batch is built with a single gather of its rows, and no
+    indices are drawn between batches.
+
+    Iterating over an `EpochIterator` yields the remaining batches of the current
+    epoch, after which the next epoch starts. `next_batch` returns batches
+    indefinitely, moving on to the next epoch when needed.
+
+    The permutation of an epoch only depends on `seed`, the epoch number and the
+    number of transitions, so iteration can be resumed mid-epoch from `state_dict`.
+    The number of transitions of an epoch is fixed when it starts; transitions
+    pushed during an epoch are included from the next epoch on.
+
+    Args:
+        replay_buffer: The replay buffer to iterate over.
+        batch_size: The number of transitions of a batch.
+        drop_last: Whether the last batch of an epoch is skipped if it holds fewer
+            than `batch_size` transitions.
+        seed: The non-negative seed of the permutations. Defaults to a seed drawn
+            from the torch random number generator.
+    """
+
+    def __init__(
+        self,
+        replay_buffer: TensorBasedReplayBuffer,
+        batch_size: int,
+        drop_last: bool = False,
+        seed: int | None = None,
+    ) -> None:
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive but is {batch_size}")
+        self._replay_buffer = replay_buffer
+        self.batch_size = batch_size
+        self.drop_last = drop_last
+        if seed is None:
+            seed = int(torch.randint(0, 2**31, ()).item())
+        self.seed = seed
+        self.epoch = 0
+        # the position in the permutation of the current epoch, and the number of
+        # transitions it permutes (None until the epoch starts)
+        self._position = 0
+        self._epoch_size: int | None = None
+        self._permutation: Tensor | None = None
+
+    def __len__(self) -> int:
+        """The number of batches of an epoch of the transitions currently stored."""
+        return self._number_of_batches(len(self._replay_buffer))
+
+    def __iter__(self) -> Iterator[TransitionBatch]:
+        self._start_epoch_if_needed()
+        while not self._is_epoch_over():
+            yield self._next_batch_of_epoch()
+        self._end_epoch()
+
+    def next_batch(self) -> TransitionBatch:
+        """Returns the next batch, starting a new epoch if the current one is over."""
+        self._start_epoch_if_needed()
+        if self._is_epoch_over():
+            self._end_epoch()
+            self._start_epoch_if_needed()
+            if self._is_epoch_over():
+                raise ValueError(
+                    f"Can't get a batch of size {self.batch_size} from a replay "
+                    f"buffer with only {len(self._replay_buffer)} elements"
+                )
+        return self._next_batch_of_epoch()
+
+    def state_dict(self) -> dict[str, Any]:
+        return {
+            "seed": self.seed,
+            "epoch": self.epoch,
+            "position": self._position,
+            "epoch_size": self._epoch_size,
+        }
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        self.seed = state_dict["seed"]
+        self.epoch = state_dict["epoch"]
+        self._position = state_dict["position"]
+        self._epoch_size = state_dict["epoch_size"]
+        self._permutation = None
+
+    def _number_of_batches(self, epoch_size: int) -> int:
+        if self.drop_last:
+            return epoch_size // self.batch_size
+        return -(-epoch_size // self.batch_size)
+
+    def _start_epoch_if_needed(self) -> None:
+        if self._epoch_size is None:
+            self._epoch_size = len(self._replay_buffer)
+            self._position = 0
+            self._permutation = None
+        if self._permutation is None:
+            if self._epoch_size > len(self._replay_buffer):
+                raise ValueError(
+                    f"The epoch permutes {self._epoch_size} transitions but the "
+                    f"replay buffer only holds {len(self._replay_buffer)}"
+                )
+            generator = torch.Generator().manual_seed(self._epoch_seed())
+            self._permutation = torch.randperm(self._epoch_size, generator=generator)
+
+    def _epoch_seed(self) -> int:
+        """
+        Returns the seed of the permutation of the current epoch, derived from the
+        (seed, epoch) pair so that iterators with nearby seeds do not replay each
+        other's permutations one epoch apart.
+        """
+        seed_sequence = np.random.SeedSequence((self.seed, self.epoch))
+        return int(seed_sequence.generate_state(1, dtype=np.uint64)[0])
+
+    def _is_epoch_over(self) -> bool:
+        assert self._epoch_size is not None
+        number_of_remaining_transitions = self._epoch_size - self._position
+        return number_of_remaining_transitions <= 0 or (
+            self.drop_last and number_of_remaining_transitions < self.batch_size
+        )
+
+    def _next_batch_of_epoch(self) -> TransitionBatch:
+        assert self._permutation is not None
+        # physical indices in [0, len(replay_buffer)) all hold transitions
+        indices = self._permutation[self._position : self._position + self.batch_size]
+        self._position += len(indices)
+        replay_buffer = self._replay_buffer
+        return replay_buffer._create_transition_batch(
+            indices, replay_buffer.is_action_continuous
+        )
+
+    def _end_epoch(self) -> None:
+        self.epoch += 1
+        self._position = 0
+        self._epoch_size = None
+        self._permutation = None
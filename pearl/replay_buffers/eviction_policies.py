@@ -0,0 +1,225 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+"""
+Eviction policies choosing which rows of a full `ColumnarStorage` new rows overwrite.
+A policy is set with `ColumnarStorage.set_eviction_policy` (or
+`TensorBasedReplayBuffer.set_eviction_policy`) before rows are written, and each
+insertion and eviction takes constant time:
+    - `FIFOEvictionPolicy` (the default) overwrites the oldest row.
+    - `ReservoirEvictionPolicy` keeps a uniform sample of all rows ever written.
+    - `RecencyBiasedEvictionPolicy` overwrites a random row, so that the probability
+      of a row being kept decays exponentially with its age.
+    - `EpisodeStratifiedEvictionPolicy` overwrites the oldest row of the episode
+      with the most rows, so that rows are spread over as many episodes as possible.
+"""
+
+import random
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any
+
+
+class EvictionPolicy(ABC):
+    """
+    Chooses the physical indices new rows are written to. Rows are written to free
+    rows while the storage is not full, and to the index returned by
+    `_select_evicted_index` once it is, or discarded if that index is -1.
+    """
+
+    def __init__(self) -> None:
+        self.capacity = 0
+        # the number of rows given to `select_indices` since the last reset
+        self._number_of_rows_seen = 0
+
+    def reset(self, capacity: int) -> None:
+        """Starts tracking an empty storage of `capacity` rows."""
+        self.capacity = capacity
+        self._number_of_rows_seen = 0
+
+    def select_indices(self, is_episode_end: list[bool], size: int) -> list[int]:
+        """
+        Returns the physical index each new row is written to, or -1 if it is
+        discarded. Rows are written in order, so a row may overwrite an earlier row
+        of the same call.
+
+        Args:
+            is_episode_end: Whether each new row is the last one of its episode.
+            size: The number of rows stored before the new rows are written.
+        """
+        indices = []
+        for row_is_episode_end in is_episode_end:
+            self._number_of_rows_seen += 1
+            if size < self.capacity:
+                index = size
+                size += 1
+            else:
+                index = self._select_evicted_index()
+            if index >= 0:
+                self._record(index, row_is_episode_end)
+            indices.append(index)
+        return indices
+
+    @abstractmethod
+    def _select_evicted_index(self) -> int:
+        """
+        Returns the physical index of the row a new row overwrites once the storage
+        is full, or -1 to discard the new row.
+        """
+        pass
+
+    def _record(self, index: int, is_episode_end: bool) -> None:
+        """Records that a new row was written to physical index `index`."""
+        pass
+
+    def state_dict(self) -> dict[str, Any]:
+        return {"number_of_rows_seen": self._number_of_rows_seen}
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        self._number_of_rows_seen = state_dict["number_of_rows_seen"]
+
+
+class FIFOEvictionPolicy(EvictionPolicy):
+    """
+    Overwrites the oldest row. `ColumnarStorage` writes rows circularly under this
+    policy, which keeps rows in insertion order (see `ColumnarStorage` for logical
+    indices), without calling `select_indices`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._next_evicted_index = 0
+
+    def reset(self, capacity: int) -> None:
+        super().reset(capacity)
+        self._next_evicted_index = 0
+
+    def _select_evicted_index(self) -> int:
+        index = self._next_evicted_index
+        self._next_evicted_index = (index + 1) % self.capacity
+        return index
+
+    def state_dict(self) -> dict[str, Any]:
+        state = super().state_dict()
+        state["next_evicted_index"] = self._next_evicted_index
+        return state
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        self._next_evicted_index = state_dict["next_evicted_index"]
+
+
+class ReservoirEvictionPolicy(EvictionPolicy):
+    """
+    Reservoir sampling: once `n` rows have been written to a storage of capacity `c`,
+    each of them is stored with probability `c / n`, so that the stored rows are a
+    uniform sample of the whole history. The `n`-th row overwrites a random row with
+    probability `c / n` and is discarded otherwise.
+    """
+
+    def _select_evicted_index(self) -> int:
+        index = random.randrange(self._number_of_rows_seen)
+        return index if index < self.capacity else -1
+
+
+class RecencyBiasedEvictionPolicy(EvictionPolicy):
+    """
+    Overwrites a row drawn uniformly at random, so that a row is still stored after
+    `k` more rows with probability `(1 - 1 / capacity) ** k`. Recent rows are favored
+    as with first-in-first-out eviction, but a fraction of older rows is retained
+    (the stored rows are `capacity` rows old on average).
+    """
+
+    def _select_evicted_index(self) -> int:
+        return random.randrange(self.capacity)
+
+
+class EpisodeStratifiedEvictionPolicy(EvictionPolicy):
+    """
+    Overwrites the oldest row of the episode with the most stored rows. Stored rows
+    are thus spread over as many episodes as possible, and long episodes do not crowd
+    out short ones. Episodes end with rows that are terminated or truncated.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._reset_episodes()
+
+    def reset(self, capacity: int) -> None:
+        super().reset(capacity)
+        self._reset_episodes()
+
+    def _reset_episodes(self) -> None:
+        self._episode = 0
+        # the physical indices of the stored rows of each episode, oldest first
+        self._episode_rows: dict[int, deque[int]] = {}
+        # the episodes with a given number of stored rows, as ordered sets, and the
+        # largest such number
+        self._episodes_by_size: dict[int, dict[int, None]] = {}
+        self._max_size = 0
+
+    def _select_evicted_index(self) -> int:
+        episode = next(iter(self._episodes_by_size[self._max_size]))
+        index = self._episode_rows[episode].popleft()
+        self._resize(episode, -1)
+        return index
+
+    def _record(self, index: int, is_episode_end: bool) -> None:
+        self._episode_rows.setdefault(self._episode, deque()).append(index)
+        self._resize(self._episode, 1)
+        if is_episode_end:
+            self._episode += 1
+
+    def _resize(self, episode: int, delta: int) -> None:
+        """
+        Moves `episode`, whose number of rows has just changed by `delta`, to its
+        new size in `_episodes_by_size`. Rows are only removed from the largest
+        episodes, so the largest size changes by at most one.
+        """
+        size = len(self._episode_rows[episode])
+        previous_size = size - delta
+        if previous_size > 0:
+            episodes = self._episodes_by_size[previous_size]
+            del episodes[episode]
+            if len(episodes) == 0:
+                del self._episodes_by_size[previous_size]
+                if previous_size == self._max_size and delta < 0:
+                    self._max_size = size
+        if size == 0:
+            del self._episode_rows[episode]
+            return
+        self._episodes_by_size.setdefault(size, {})[episode] = None
+        self._max_size = max(self._max_size, size)
+
+    def state_dict(self) -> dict[str, Any]:
+        state = super().state_dict()
+        state["episode"] = self._episode
+        state["episode_rows"] = {
+            episode: list(rows) for episode, rows in self._episode_rows.items()
+        }
+        # the order of the episodes of a size decides which one is evicted from
+        # next, so it is saved as it is rather than rebuilt
+        state["episodes_by_size"] = {
+            size: list(episodes) for size, episodes in self._episodes_by_size.items()
+        }
+        state["max_size"] = self._max_size
+        return state
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        self._reset_episodes()
+        self._episode = state_dict["episode"]
+        self._episode_rows = {
+            episode: deque(rows) for episode, rows in state_dict["episode_rows"].items()
+        }
+        self._episodes_by_size = {
+            size: dict.fromkeys(episodes)
+            for size, episodes in state_dict["episodes_by_size"].items()
+        }
+        self._max_size = state_dict["max_size"]
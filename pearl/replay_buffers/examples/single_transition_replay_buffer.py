@@ -7,7 +7,7 @@
 
 # pyre-strict
 
-from typing import Optional
+from typing import Any, Optional
 
 import torch
 from pearl.api.action import Action
@@ -43,6 +43,7 @@ def to_default_device_if_tensor(obj: object) -> object:
 
 class SingleTransitionReplayBuffer(ReplayBuffer):
     def __init__(self) -> None:
+        super().__init__()
         self._transition: SingleTransition | None = None
 
     @property
@@ -91,5 +92,11 @@ class SingleTransitionReplayBuffer(ReplayBuffer):
     def clear(self) -> None:
         raise Exception("Cannot clear SingleTransitionReplayBuffer")
 
+    def state_dict(self) -> dict[str, Any]:
+        return {"transition": self._transition}
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        self._transition = state_dict["transition"]
+
     def __len__(self) -> int:
         return 1
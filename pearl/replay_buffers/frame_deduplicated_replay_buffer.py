@@ -0,0 +1,386 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+from typing import Any
+
+import torch
+from pearl.api.action import Action
+from pearl.api.reward import Reward
+from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.basic_replay_buffer import BasicReplayBuffer
+from pearl.replay_buffers.transition import Transition, TransitionBatch
+from torch import Tensor
+
+
+class FrameStore:
+    """
+    A circular store of frames (by default uint8 images, but any tensors of a fixed
+    shape and dtype), each written once and addressed by a frame id.
+
+    Frame ids are sequence numbers (the i-th frame written has id i), so they stay
+    valid as long as the frame has not been overwritten. `add` never overwrites
+    frames whose id is at least the `keep_from` argument it is given: the store grows
+    instead, which keeps the frames of all stored transitions available whatever the
+    lengths of episodes are.
+
+    Args:
+        initial_capacity: Number of frames the store holds before it needs to grow.
+        dtype: The dtype of frames.
+    """
+
+    def __init__(self, initial_capacity: int, dtype: torch.dtype = torch.uint8) -> None:
+        self._initial_capacity = initial_capacity
+        self._dtype = dtype
+        self._frames: Tensor | None = None
+        self._num_frames_written = 0
+        # incremented when frames are moved (see `version`)
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return self._num_frames_written
+
+    @property
+    def dtype(self) -> torch.dtype:
+        return self._dtype
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes allocated by the frames."""
+        return 0 if self._frames is None else self._frames.nbytes
+
+    @property
+    def version(self) -> tuple[int, int]:
+        """
+        A (generation, number of frames written) pair identifying the content of the
+        store. Writing frames increases the number of frames written, and growing or
+        clearing the store starts a new generation.
+        """
+        return (self._generation, self._num_frames_written)
+
+    def add(self, frame: Tensor, keep_from: int) -> int:
+        """
+        Writes a frame and returns its id. Frames with ids greater than or equal to
+        `keep_from` are preserved.
+        """
+        if frame.dtype != self._dtype:
+            raise ValueError(
+                f"Frames must be of dtype {self._dtype} but are {frame.dtype}"
+            )
+        if self._frames is None:
+            self._frames = torch.empty(
+                (self._initial_capacity, *frame.shape),
+                dtype=self._dtype,
+                device=frame.device,
+            )
+        elif frame.shape != self._frames.shape[1:]:
+            raise ValueError(
+                f"Frames of shape {tuple(self._frames.shape[1:])} are stored "
+                f"but got a frame of shape {tuple(frame.shape)}"
+            )
+        frame_id = self._num_frames_written
+        # the frame is written over the frame with id `frame_id - len(frames)`
+        if frame_id - len(self._frames) < keep_from:
+            frames = self._frames
+        else:
+            frames = self._grow(keep_from)
+        frames[frame_id % len(frames)] = frame
+        self._num_frames_written += 1
+        return frame_id
+
+    def get(self, frame_ids: Tensor) -> Tensor:
+        """Returns the frames with the given ids, with shape (*frame_ids.shape, *frame_shape)."""
+        assert self._frames is not None
+        physical_indices = frame_ids.to(self._frames.device) % len(self._frames)
+        return self._frames[physical_indices]
+
+    def equals(self, frame_ids: list[int], frames: Tensor) -> bool:
+        return self._frames is not None and torch.equal(
+            self.get(torch.tensor(frame_ids)), frames
+        )
+
+    def clear(self) -> None:
+        self._frames = None
+        self._num_frames_written = 0
+        self._generation += 1
+
+    def state_dict(
+        self, since_version: tuple[int, int] | None = None
+    ) -> dict[str, Any]:
+        """
+        Returns the frames of the store, or only the frames written since
+        `since_version` if the store has not grown or been cleared since then (see
+        `ColumnarStorage.state_dict`).
+        """
+        state: dict[str, Any] = {
+            "dtype": self._dtype,
+            "number_of_slots": None if self._frames is None else len(self._frames),
+            "version": self.version,
+        }
+        if (
+            since_version is not None
+            and since_version[0] == self._generation
+            and self._frames is not None
+            and self._num_frames_written - since_version[1] <= len(self._frames)
+        ):
+            frame_ids = torch.arange(since_version[1], self._num_frames_written)
+            state["since_version"] = since_version
+            state["frame_ids"] = frame_ids
+            state["frames"] = self.get(frame_ids)
+        else:
+            state["frames"] = self._frames
+        return state
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        if state_dict["dtype"] != self._dtype:
+            raise ValueError(
+                f"Cannot load frames of dtype {state_dict['dtype']} into a store of "
+                f"frames of dtype {self._dtype}"
+            )
+        frames = state_dict["frames"]
+        if "frame_ids" in state_dict:
+            since_version = tuple(state_dict["since_version"])
+            if since_version != self.version:
+                raise ValueError(
+                    f"Frames written since version {since_version} cannot be applied "
+                    f"to a store at version {self.version}"
+                )
+            if self._frames is None:
+                self._frames = torch.empty(
+                    (state_dict["number_of_slots"], *frames.shape[1:]),
+                    dtype=self._dtype,
+                    device=frames.device,
+                )
+            self._frames[state_dict["frame_ids"] % len(self._frames)] = frames.to(
+                self._frames.device
+            )
+        else:
+            self._frames = None if frames is None else frames.clone()
+        self._generation, self._num_frames_written = state_dict["version"]
+
+    def _grow(self, keep_from: int) -> Tensor:
+        assert self._frames is not None
+        old_frames = self._frames
+        new_frames = torch.empty(
+            (2 * len(old_frames), *old_frames.shape[1:]),
+            dtype=old_frames.dtype,
+            device=old_frames.device,
+        )
+        kept_ids = torch.arange(
+            keep_from, self._num_frames_written, device=old_frames.device
+        )
+        new_frames[kept_ids % len(new_frames)] = old_frames[kept_ids % len(old_frames)]
+        self._frames = new_frames
+        self._generation += 1
+        return new_frames
+
+
+class FrameDeduplicatedReplayBuffer(BasicReplayBuffer):
+    """
+    A `BasicReplayBuffer` for pixel observations that stores every frame only once.
+
+    States are expected to be uint8 stacks of `frame_stack_size` frames along their
+    first dimension, the last frame being the most recent (as produced by
+    `gymnasium.wrappers.FrameStackObservation`). With `frame_stack_size=1`, a whole
+    state is a single frame. Storing states and next states as they are duplicates
+    every frame `2 * frame_stack_size` times; this buffer instead writes frames to a
+    `FrameStore` and stores frame ids in the `state` and `next_state` columns:
+        - the state of a transition continuing an episode is the next state of the
+          previous transition, so it reuses its frame ids,
+        - the next state shares all but its last frame with the state, so only that
+          frame is written,
+        - repeated frames within a stack (such as the padding of stacks at the start
+          of an episode) are written once.
+    In the common case, each transition thus adds a single frame. Stacks are rebuilt
+    from frame ids at sampling time, and sampled batches are identical to those of a
+    `BasicReplayBuffer`.
+
+    Args:
+        capacity: Size of the replay buffer.
+        frame_stack_size: Number of frames in a state.
+    """
+
+    _requires_insertion_order = True
+    _requires_consecutive_transitions = True
+
+    def __init__(self, capacity: int, frame_stack_size: int = 1) -> None:
+        super().__init__(capacity=capacity)
+        self._frame_stack_size = frame_stack_size
+        self._frame_store = FrameStore(initial_capacity=capacity + 2 * frame_stack_size)
+        self._state_shape: torch.Size | None = None
+        self._last_next_state_frame_ids: list[int] | None = None
+        self._frames_version_at_last_snapshot: tuple[int, int] | None = None
+
+    def _store_transition(
+        self,
+        state: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions_tensor_with_padding: Tensor | None,
+        curr_unavailable_actions_mask: Tensor | None,
+        next_state: SubjectiveState | None,
+        next_available_actions_tensor_with_padding: Tensor | None,
+        next_unavailable_actions_mask: Tensor | None,
+        cost: float | None = None,
+    ) -> None:
+        state_frames = self._to_frames(self._process_non_optional_single_state(state))
+        keep_from = self._first_frame_id_to_keep()
+
+        if self._last_next_state_frame_ids is not None and self._frame_store.equals(
+            self._last_next_state_frame_ids, state_frames
+        ):
+            state_frame_ids = self._last_next_state_frame_ids
+        else:
+            state_frame_ids = self._add_frames(state_frames, [], keep_from)
+        # the frames of the state must survive the writes of the next state's frames
+        keep_from = min(keep_from, min(state_frame_ids))
+
+        next_state_frame_ids = None
+        processed_next_state = self._process_single_state(next_state)
+        if processed_next_state is not None:
+            next_state_frames = self._to_frames(processed_next_state)
+            if torch.equal(next_state_frames[:-1], state_frames[1:]):
+                next_state_frame_ids = self._add_frames(
+                    next_state_frames[-1:], state_frame_ids[1:], keep_from
+                )
+            else:
+                next_state_frame_ids = self._add_frames(
+                    next_state_frames, [], keep_from
+                )
+        self._last_next_state_frame_ids = next_state_frame_ids
+
+        self.memory.append(
+            Transition(
+                state=torch.tensor([state_frame_ids]),
+                action=self._process_single_action(action),
+                reward=self._process_single_reward(reward),
+                next_state=(
+                    None
+                    if next_state_frame_ids is None
+                    else torch.tensor([next_state_frame_ids])
+                ),
+                curr_available_actions=curr_available_actions_tensor_with_padding,
+                curr_unavailable_actions_mask=curr_unavailable_actions_mask,
+                next_available_actions=next_available_actions_tensor_with_padding,
+                next_unavailable_actions_mask=next_unavailable_actions_mask,
+                terminated=self._process_single_terminated(terminated),
+                truncated=self._process_single_truncated(truncated),
+                cost=self._process_single_cost(cost),
+            )
+        )
+
+    def _store_batch(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions_ids: Tensor | None,
+        next_available_actions_ids: Tensor | None,
+    ) -> None:
+        # whether a state reuses stored frames depends on the previous transition
+        self._store_batch_row_by_row(
+            batch, curr_available_actions_ids, next_available_actions_ids
+        )
+
+    def _gather_columns(self, indices: Tensor, names: list[str]) -> dict[str, Tensor]:
+        columns = super()._gather_columns(indices, names)
+        assert self._state_shape is not None
+        for name in ["state", "next_state"]:
+            frame_ids = columns.get(name)
+            if frame_ids is not None:
+                columns[name] = self._frame_store.get(frame_ids).view(
+                    len(frame_ids), *self._state_shape
+                )
+        return columns
+
+    def memory_footprint(self) -> dict[str, tuple[int, str]]:
+        footprint = super().memory_footprint()
+        footprint["frames"] = (self._frame_store.nbytes, str(self._frame_store.dtype))
+        return footprint
+
+    def clear(self) -> None:
+        super().clear()
+        self._frame_store.clear()
+        self._last_next_state_frame_ids = None
+
+    def state_dict(self) -> dict[str, Any]:
+        state = super().state_dict()
+        state["frame_store"] = self._frame_store.state_dict()
+        state["state_shape"] = (
+            None if self._state_shape is None else list(self._state_shape)
+        )
+        state["last_next_state_frame_ids"] = self._last_next_state_frame_ids
+        return state
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        self._frame_store.load_state_dict(state_dict["frame_store"])
+        state_shape = state_dict["state_shape"]
+        self._state_shape = None if state_shape is None else torch.Size(state_shape)
+        self._last_next_state_frame_ids = state_dict["last_next_state_frame_ids"]
+        self._frames_version_at_last_snapshot = self._frame_store.version
+
+    def _snapshot_state_dict(self, incremental: bool) -> dict[str, Any]:
+        state = super()._snapshot_state_dict(incremental)
+        if incremental and self._frames_version_at_last_snapshot is not None:
+            state["frame_store"] = self._frame_store.state_dict(
+                since_version=self._frames_version_at_last_snapshot
+            )
+        self._frames_version_at_last_snapshot = self._frame_store.version
+        return state
+
+    def _to_frames(self, state: Tensor) -> Tensor:
+        """Splits a state with a leading dimension of size 1 into its frames."""
+        state = state.squeeze(0)
+        if self._state_shape is None:
+            self._state_shape = state.shape
+        elif state.shape != self._state_shape:
+            raise ValueError(
+                f"States of shape {tuple(self._state_shape)} are stored "
+                f"but got a state of shape {tuple(state.shape)}"
+            )
+        if self._frame_stack_size == 1:
+            return state.unsqueeze(0)
+        if state.shape[0] != self._frame_stack_size:
+            raise ValueError(
+                f"Expected states to be stacks of {self._frame_stack_size} frames "
+                f"but got a state of shape {tuple(state.shape)}"
+            )
+        return state
+
+    def _add_frames(
+        self, frames: Tensor, previous_frame_ids: list[int], keep_from: int
+    ) -> list[int]:
+        """
+        Writes frames that follow the frames with ids `previous_frame_ids` in a stack,
+        skipping frames identical to the one before them. Returns the ids of the
+        whole stack.
+        """
+        frame_ids = list(previous_frame_ids)
+        for frame in frames:
+            if len(frame_ids) > 0 and self._frame_store.equals(
+                frame_ids[-1:], frame.unsqueeze(0)
+            ):
+                frame_ids.append(frame_ids[-1])
+            else:
+                frame_ids.append(self._frame_store.add(frame, keep_from))
+        return frame_ids
+
+    def _first_frame_id_to_keep(self) -> int:
+        """
+        Returns the smallest frame id used by the transitions that remain stored
+        after the next push. Frame ids only grow along the buffer, so this is the
+        smallest state frame id of the oldest surviving transition.
+        """
+        first_surviving_row = 1 if len(self.memory) == self.capacity else 0
+        if len(self.memory) <= first_surviving_row:
+            return len(self._frame_store)
+        physical_index = self.memory.logical_to_physical(
+            torch.tensor([first_surviving_row])
+        )
+        return int(self.memory.gather(physical_index, ["state"])["state"].min().item())
@@ -0,0 +1,97 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import functools
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyHistogram:
+    """
+    A histogram of durations with logarithmic buckets: bucket `i` counts the durations
+    of `[2 ** (i - 1), 2 ** i)` microseconds, so recording a duration takes constant
+    time and memory. Percentiles are estimated by the upper bound of their bucket
+    (thus within a factor of 2), while the mean and maximum are exact.
+    """
+
+    NUMBER_OF_BUCKETS = 32
+
+    def __init__(self) -> None:
+        self.counts: list[int] = [0] * self.NUMBER_OF_BUCKETS
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        bucket = int(seconds * 1e6).bit_length()
+        self.counts[min(bucket, self.NUMBER_OF_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Returns an estimate of the `q`-th percentile, in seconds."""
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        cumulative_count = 0
+        for bucket, count in enumerate(self.counts):
+            cumulative_count += count
+            if cumulative_count >= rank and cumulative_count > 0:
+                return min(2**bucket * 1e-6, self.max_seconds)
+        return self.max_seconds
+
+    def summary(self) -> dict[str, float]:
+        """Returns the count, and the mean, percentiles and maximum in milliseconds."""
+        mean = self.total_seconds / self.count if self.count > 0 else 0.0
+        return {
+            "count": self.count,
+            "mean_ms": 1e3 * mean,
+            "p50_ms": 1e3 * self.percentile(50),
+            "p90_ms": 1e3 * self.percentile(90),
+            "p99_ms": 1e3 * self.percentile(99),
+            "max_ms": 1e3 * self.max_seconds,
+        }
+
+
+class ReplayBufferInstrumentation:
+    """
+    The latency histograms of the instrumented operations of a replay buffer (see
+    `ReplayBuffer.enable_instrumentation`). Durations are measured on the host, so
+    the operations of a device resident replay buffer may still be running on the
+    device when they are recorded.
+    """
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, LatencyHistogram] = {}
+
+    def timed(self, operation: str, fn: Callable[..., T]) -> Callable[..., T]:
+        """Returns `fn` recording its durations in the histogram of `operation`."""
+        histogram = self.latencies.setdefault(operation, LatencyHistogram())
+
+        @functools.wraps(fn)
+        def timed_fn(*args: Any, **kwargs: Any) -> T:
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.record(time.perf_counter() - start)
+
+        return timed_fn
+
+    def summary(self) -> dict[str, float]:
+        """Returns the summaries of all histograms, with keys `<operation>/<stat>`."""
+        return {
+            f"{operation}/{name}": value
+            for operation, histogram in self.latencies.items()
+            for name, value in histogram.summary().items()
+        }
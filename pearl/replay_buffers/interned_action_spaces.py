@@ -0,0 +1,244 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import torch
+from pearl.api.action_space import ActionSpace
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+from torch import Tensor
+
+
+class InternedActionSpaces:
+    """
+    A table of the distinct sets of available actions seen by a replay buffer.
+
+    Each distinct (action space, maximum number of actions) pair is stored once,
+    as a padded tensor of available actions and a mask of unavailable actions
+    (see `TensorBasedReplayBuffer.create_action_tensor_and_mask`), and is identified
+    by a small integer id. Transitions then only need to store ids, and the padded
+    tensors of a batch are rebuilt with a single `index_select`.
+
+    Action spaces are compared by content, so that environments creating a new
+    action space object at every step share entries. The most recently interned
+    objects are also remembered by identity, so that the common case of an
+    environment reusing the same action space object costs no comparison at all.
+    """
+
+    _MAX_CACHED_OBJECTS = 16
+
+    def __init__(self) -> None:
+        self._ids_by_content: dict[tuple[int, tuple[int, ...], bytes], int] = {}
+        # maps id(action_space) to the action space (kept alive so that its id is not
+        # reused), its maximum number of actions and its interned id
+        self._ids_by_object: dict[int, tuple[ActionSpace, int, int]] = {}
+        self._actions: Tensor | None = None
+        self._unavailable_actions_masks: Tensor | None = None
+        self._device: torch.device = torch.device("cpu")
+
+    def __len__(self) -> int:
+        return len(self._ids_by_content)
+
+    def get_id(self, action_space: ActionSpace, max_number_actions: int) -> int | None:
+        """Returns the id of the given set of available actions, or None if it is new."""
+        cached = self._ids_by_object.get(id(action_space))
+        if (
+            cached is not None
+            and cached[0] is action_space
+            and cached[1] == max_number_actions
+        ):
+            return cached[2]
+        interned_id = self._ids_by_content.get(
+            self._content_key(action_space, max_number_actions)
+        )
+        if interned_id is not None:
+            self._cache_object(action_space, max_number_actions, interned_id)
+        return interned_id
+
+    def add(
+        self,
+        action_space: ActionSpace,
+        max_number_actions: int,
+        available_actions_with_padding: Tensor,
+        unavailable_actions_mask: Tensor,
+    ) -> int:
+        """
+        Adds a new set of available actions, given with its padded tensor of shape
+        (max_number_actions, action_dim) and mask of shape (max_number_actions,),
+        and returns its id.
+        """
+        interned_id = self._add_tensors(
+            self._content_key(action_space, max_number_actions),
+            available_actions_with_padding,
+            unavailable_actions_mask,
+        )
+        self._cache_object(action_space, max_number_actions, interned_id)
+        return interned_id
+
+    def intern_batch(
+        self,
+        available_actions_with_padding: Tensor,
+        unavailable_actions_mask: Tensor,
+    ) -> Tensor:
+        """
+        Returns the ids of a batch of sets of available actions, given as padded tensors
+        of shape (batch_size, max_number_actions, action_dim) and masks of shape
+        (batch_size, max_number_actions), adding new sets to the table. Available
+        actions must come first in the padded tensors, as in
+        `TensorBasedReplayBuffer.create_action_tensor_and_mask`.
+
+        Only the distinct sets of the batch are looked up, so the cost of this method
+        is a constant number of tensor operations plus one lookup per distinct set.
+        """
+        max_number_actions = available_actions_with_padding.shape[1]
+        rows = torch.cat(
+            [
+                available_actions_with_padding.flatten(1).float(),
+                unavailable_actions_mask.float(),
+            ],
+            dim=1,
+        )
+        distinct_rows, inverse_indices = torch.unique(
+            rows.cpu(), dim=0, return_inverse=True
+        )
+        action_tensor_size = rows.shape[1] - max_number_actions
+        distinct_ids = torch.empty(len(distinct_rows), dtype=torch.long)
+        for i, row in enumerate(distinct_rows):
+            actions = row[:action_tensor_size].view(max_number_actions, -1)
+            mask = row[action_tensor_size:].bool()
+            key = self._actions_key(max_number_actions, actions[~mask])
+            interned_id = self._ids_by_content.get(key)
+            if interned_id is None:
+                interned_id = self._add_tensors(key, actions, mask)
+            distinct_ids[i] = interned_id
+        return distinct_ids[inverse_indices]
+
+    def _add_tensors(
+        self,
+        key: tuple[int, tuple[int, ...], bytes],
+        available_actions_with_padding: Tensor,
+        unavailable_actions_mask: Tensor,
+    ) -> int:
+        available_actions_with_padding = available_actions_with_padding.to(
+            self._device
+        )
+        unavailable_actions_mask = unavailable_actions_mask.to(self._device)
+        if self._actions is None or self._unavailable_actions_masks is None:
+            self._actions = available_actions_with_padding.unsqueeze(0)
+            self._unavailable_actions_masks = unavailable_actions_mask.unsqueeze(0)
+        else:
+            if available_actions_with_padding.shape != self._actions.shape[1:]:
+                raise ValueError(
+                    "Available actions of shape "
+                    f"{tuple(available_actions_with_padding.shape)} cannot be stored "
+                    "with available actions of shape "
+                    f"{tuple(self._actions.shape[1:])}; max_number_actions and the "
+                    "action dimension must not change"
+                )
+            self._actions = torch.cat(
+                [self._actions, available_actions_with_padding.unsqueeze(0)]
+            )
+            self._unavailable_actions_masks = torch.cat(
+                [self._unavailable_actions_masks, unavailable_actions_mask.unsqueeze(0)]
+            )
+        interned_id = len(self._actions) - 1
+        self._ids_by_content[key] = interned_id
+        return interned_id
+
+    def get(self, ids: Tensor) -> tuple[Tensor, Tensor]:
+        """
+        Returns the padded available actions, of shape
+        (len(ids), max_number_actions, action_dim), and the unavailable actions masks,
+        of shape (len(ids), max_number_actions), of the given ids.
+
+        If a single set of available actions was ever interned, the results are
+        expanded views of it and no gathering is done.
+        """
+        assert self._actions is not None and self._unavailable_actions_masks is not None
+        if len(self) == 1:
+            return (
+                self._actions.expand(len(ids), -1, -1),
+                self._unavailable_actions_masks.expand(len(ids), -1),
+            )
+        ids = ids.to(self._actions.device)
+        return (
+            self._actions.index_select(0, ids),
+            self._unavailable_actions_masks.index_select(0, ids),
+        )
+
+    def to(self, device: torch.device) -> None:
+        """Moves the table to `device`, where the entries added later are stored too."""
+        self._device = device
+        if self._actions is not None and self._unavailable_actions_masks is not None:
+            self._actions = self._actions.to(device)
+            self._unavailable_actions_masks = self._unavailable_actions_masks.to(device)
+
+    def clear(self) -> None:
+        self._ids_by_content = {}
+        self._ids_by_object = {}
+        self._actions = None
+        self._unavailable_actions_masks = None
+
+    def memory_footprint(self) -> dict[str, tuple[int, str]]:
+        """Returns the number of bytes and dtype of the padded actions and masks."""
+        return {
+            name: (tensor.nbytes, str(tensor.dtype))
+            for name, tensor in [
+                ("available_actions", self._actions),
+                ("unavailable_actions_masks", self._unavailable_actions_masks),
+            ]
+            if tensor is not None
+        }
+
+    def state_dict(self) -> dict[str, Tensor | None]:
+        return {
+            "actions": self._actions,
+            "unavailable_actions_masks": self._unavailable_actions_masks,
+        }
+
+    def load_state_dict(self, state_dict: dict[str, Tensor | None]) -> None:
+        self.clear()
+        self._actions = state_dict["actions"]
+        self._unavailable_actions_masks = state_dict["unavailable_actions_masks"]
+        self.to(self._device)
+        if self._actions is None or self._unavailable_actions_masks is None:
+            return
+        # available actions come first in the padded tensors
+        max_number_actions = self._actions.shape[1]
+        for interned_id, (actions, mask) in enumerate(
+            zip(self._actions, self._unavailable_actions_masks)
+        ):
+            key = self._actions_key(max_number_actions, actions[~mask])
+            self._ids_by_content[key] = interned_id
+
+    def _content_key(
+        self, action_space: ActionSpace, max_number_actions: int
+    ) -> tuple[int, tuple[int, ...], bytes]:
+        assert isinstance(action_space, DiscreteActionSpace)
+        return self._actions_key(max_number_actions, action_space.actions_batch)
+
+    @staticmethod
+    def _actions_key(
+        max_number_actions: int, actions_batch: Tensor
+    ) -> tuple[int, tuple[int, ...], bytes]:
+        actions_batch = actions_batch.detach().cpu().float()
+        return (
+            max_number_actions,
+            tuple(actions_batch.shape),
+            actions_batch.numpy().tobytes(),
+        )
+
+    def _cache_object(
+        self, action_space: ActionSpace, max_number_actions: int, interned_id: int
+    ) -> None:
+        if len(self._ids_by_object) >= self._MAX_CACHED_OBJECTS:
+            self._ids_by_object.clear()
+        self._ids_by_object[id(action_space)] = (
+            action_space,
+            max_number_actions,
+            interned_id,
+        )
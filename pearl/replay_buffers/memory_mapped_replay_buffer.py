@@ -0,0 +1,279 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import json
+import os
+from typing import Any
+
+import numpy as np
+import torch
+from pearl.api.action_space import ActionSpace
+from pearl.replay_buffers.basic_replay_buffer import BasicReplayBuffer
+from pearl.replay_buffers.codecs import ByteCodec, Codec
+from pearl.replay_buffers.columnar_storage import ColumnarStorage
+from pearl.replay_buffers.eviction_policies import EvictionPolicy, FIFOEvictionPolicy
+from torch import Tensor
+
+
+def _to_numpy_dtype(dtype: torch.dtype) -> np.dtype:
+    try:
+        return torch.empty(0, dtype=dtype).numpy().dtype
+    except TypeError:
+        raise ValueError(f"dtype {dtype} cannot be stored in a memory-mapped file")
+
+
+class MemoryMappedColumnarStorage(ColumnarStorage):
+    """
+    A `ColumnarStorage` whose columns live in memory-mapped files under `directory`,
+    so that its capacity is bounded by disk space rather than RAM. The operating
+    system pages rows in and out as they are read and written.
+
+    Each column is stored in the raw file `<name>.bin`. Column shapes and dtypes are
+    recorded in `metadata.json` whenever a column is allocated, and the row count,
+    write cursor and version are kept in the memory-mapped file `cursor.bin`, which is
+    updated on every write. A storage created on a directory that already holds data
+    reopens it.
+
+    Only first-in-first-out eviction is supported, since the state of other eviction
+    policies changes with every row and is not kept on disk.
+
+    Args:
+        capacity: Maximum number of rows stored. Must match the capacity of the
+            data already in `directory`, if any.
+        directory: Directory holding the files. It is created if needed.
+    """
+
+    _METADATA_FILE = "metadata.json"
+    _CURSOR_FILE = "cursor.bin"
+
+    def __init__(self, capacity: int, directory: str) -> None:
+        super().__init__(capacity)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._memmaps: dict[str, np.memmap] = {}
+        self._column_metadata: dict[str, dict[str, str | list[int]]] = {}
+        metadata_path = self._path(self._METADATA_FILE)
+        if os.path.exists(metadata_path):
+            self._reopen(metadata_path)
+        else:
+            self._cursor: np.memmap = np.memmap(
+                self._path(self._CURSOR_FILE), dtype=np.int64, mode="w+", shape=(4,)
+            )
+            self._write_metadata()
+
+    def flush(self) -> None:
+        """Flushes all pending writes to disk."""
+        for memmap in self._memmaps.values():
+            memmap.flush()
+        self._cursor.flush()
+
+    def clear(self) -> None:
+        super().clear()
+        for name in list(self._memmaps):
+            del self._memmaps[name]
+            os.remove(self._column_path(name))
+        self._column_metadata = {}
+        self._save_cursor()
+        self._write_metadata()
+
+    def to(self, device: torch.device) -> None:
+        if torch.device(device).type != "cpu":
+            raise ValueError(f"{type(self).__name__} can only be stored on the CPU")
+        super().to(device)
+
+    def set_codec(self, name: str, codec: Codec | ByteCodec) -> None:
+        # codecs are not recorded in the metadata, so a reopened storage could not
+        # decode its columns
+        raise ValueError(f"{type(self).__name__} does not support codecs")
+
+    def set_eviction_policy(self, eviction_policy: EvictionPolicy) -> None:
+        if not isinstance(eviction_policy, FIFOEvictionPolicy):
+            # the state of the policy would be lost when the storage is reopened
+            raise ValueError(
+                f"{type(self).__name__} only supports first-in-first-out eviction"
+            )
+        super().set_eviction_policy(eviction_policy)
+
+    def set_column(self, name: str, values: Tensor) -> None:
+        super().set_column(name, values)
+        self._save_cursor()
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        self._save_cursor()
+
+    def _reopen(self, metadata_path: str) -> None:
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+        if metadata["capacity"] != self.capacity:
+            raise ValueError(
+                f"{self.directory} holds a storage of capacity {metadata['capacity']} "
+                f"but capacity {self.capacity} was requested"
+            )
+        self._cursor = np.memmap(
+            self._path(self._CURSOR_FILE), dtype=np.int64, mode="r+", shape=(4,)
+        )
+        (
+            self._size,
+            self._next_index,
+            self._generation,
+            self._number_of_rows_written,
+        ) = (int(value) for value in self._cursor)
+        for name, column_metadata in metadata["columns"].items():
+            dtype = np.dtype(column_metadata["dtype"])
+            row_shape = tuple(column_metadata["row_shape"])
+            self._map_column(name, row_shape, dtype, mode="r+")
+
+    def _advance(self, number_of_rows: int) -> None:
+        super()._advance(number_of_rows)
+        self._save_cursor()
+
+    def _save_cursor(self) -> None:
+        self._cursor[:] = np.array(
+            [
+                self._size,
+                self._next_index,
+                self._generation,
+                self._number_of_rows_written,
+            ],
+            dtype=np.int64,
+        )
+
+    def _allocate_column(
+        self,
+        name: str,
+        row_shape: torch.Size,
+        dtype: torch.dtype,
+        device: torch.device,
+    ) -> Tensor:
+        column = self._map_column(
+            name, tuple(row_shape), _to_numpy_dtype(dtype), mode="w+"
+        )
+        self._write_metadata()
+        return column
+
+    def _promote_column(self, name: str, dtype: torch.dtype) -> Tensor:
+        old_column = self._columns[name]
+        promoted_path = self._column_path(name) + ".promoted"
+        promoted = np.memmap(
+            promoted_path,
+            dtype=_to_numpy_dtype(dtype),
+            mode="w+",
+            shape=tuple(old_column.shape),
+        )
+        promoted[:] = old_column.numpy()
+        promoted.flush()
+        del promoted, old_column
+        del self._columns[name], self._memmaps[name]
+        os.replace(promoted_path, self._column_path(name))
+        column = self._map_column(
+            name,
+            tuple(self._column_metadata[name]["row_shape"]),
+            _to_numpy_dtype(dtype),
+            mode="r+",
+        )
+        self._write_metadata()
+        return column
+
+    def _map_column(
+        self, name: str, row_shape: tuple[int, ...], dtype: np.dtype, mode: str
+    ) -> Tensor:
+        memmap = np.memmap(
+            self._column_path(name),
+            dtype=dtype,
+            mode=mode,
+            shape=(self.capacity, *row_shape),
+        )
+        self._memmaps[name] = memmap
+        self._column_metadata[name] = {"dtype": dtype.str, "row_shape": list(row_shape)}
+        column = torch.from_numpy(memmap)
+        self._columns[name] = column
+        return column
+
+    def _write_metadata(self) -> None:
+        # written to a temporary file first so that a crash never leaves
+        # a truncated metadata file behind
+        path = self._path(self._METADATA_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"capacity": self.capacity, "columns": self._column_metadata}, f)
+        os.replace(path + ".tmp", path)
+
+    def _column_path(self, name: str) -> str:
+        return self._path(f"{name}.bin")
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.directory, file_name)
+
+
+class MemoryMappedReplayBuffer(BasicReplayBuffer):
+    """
+    A `BasicReplayBuffer` whose transitions are stored on disk in memory-mapped files,
+    for capacities that do not fit in RAM (see `MemoryMappedColumnarStorage`).
+
+    Only the rows of sampled transitions are read from disk, and batches are moved to
+    `device_for_batches` as with any other replay buffer. Creating a buffer on a
+    directory written by an earlier buffer (possibly in another process) reopens the
+    transitions stored there without re-ingesting them.
+
+    Args:
+        capacity: Size of the replay buffer.
+        directory: Directory holding the memory-mapped files.
+    """
+
+    _ACTION_SPACES_FILE = "action_spaces.pt"
+
+    def __init__(self, capacity: int, directory: str) -> None:
+        super().__init__(capacity=capacity)
+        self.memory: MemoryMappedColumnarStorage = MemoryMappedColumnarStorage(
+            capacity, directory
+        )
+        self._action_spaces_path: str = os.path.join(
+            directory, self._ACTION_SPACES_FILE
+        )
+        if os.path.exists(self._action_spaces_path):
+            self._action_spaces.load_state_dict(torch.load(self._action_spaces_path))
+
+    def flush(self) -> None:
+        """Flushes all pending writes to disk."""
+        self.memory.flush()
+
+    def clear(self) -> None:
+        super().clear()
+        if os.path.exists(self._action_spaces_path):
+            os.remove(self._action_spaces_path)
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        torch.save(self._action_spaces.state_dict(), self._action_spaces_path)
+
+    def _intern_action_space(
+        self, action_space: ActionSpace | None, max_number_actions: int
+    ) -> Tensor | None:
+        # the table of interned action spaces is saved whenever it changes, since the
+        # stored ids are meaningless without it
+        number_of_action_spaces = len(self._action_spaces)
+        interned_id = super()._intern_action_space(action_space, max_number_actions)
+        self._save_action_spaces_if_changed(number_of_action_spaces)
+        return interned_id
+
+    def _intern_action_space_batch(
+        self,
+        available_actions_with_padding: Tensor | None,
+        unavailable_actions_mask: Tensor | None,
+    ) -> Tensor | None:
+        number_of_action_spaces = len(self._action_spaces)
+        interned_ids = super()._intern_action_space_batch(
+            available_actions_with_padding, unavailable_actions_mask
+        )
+        self._save_action_spaces_if_changed(number_of_action_spaces)
+        return interned_ids
+
+    def _save_action_spaces_if_changed(self, number_of_action_spaces: int) -> None:
+        if len(self._action_spaces) != number_of_action_spaces:
+            torch.save(self._action_spaces.state_dict(), self._action_spaces_path)
@@ -0,0 +1,273 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import queue
+import threading
+from typing import Any
+
+import torch
+from pearl.api.action import Action
+from pearl.api.action_space import ActionSpace
+from pearl.api.reward import Reward
+from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.replay_buffer import ReplayBuffer
+from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
+from pearl.replay_buffers.transition import TransitionBatch
+from torch import Tensor
+
+
+class PrefetchingReplayBuffer(ReplayBuffer):
+    """
+    A replay buffer wrapping another one, whose batches are sampled and collated by a
+    background thread while the learner trains on previous batches.
+
+    The background thread keeps up to `number_of_prefetched_batches` batches of the
+    most recently requested batch size in a bounded queue. Batches are built on the
+    CPU and packed (see `TransitionBatch.pack`) into pinned memory when they are
+    moved to a CUDA device, so that `sample` hands them over with a single
+    asynchronous copy. If the wrapped replay buffer is device resident (see
+    `TensorBasedReplayBuffer.device_resident`), batches are instead gathered on its
+    device, where they stay, and are neither packed nor pinned.
+
+    Pushing and clearing go through this wrapper and are serialized with the
+    background sampling, so the wrapped buffer must not be modified directly while
+    the prefetcher runs. Prefetched batches may not include the transitions pushed
+    after they were sampled.
+
+    Args:
+        replay_buffer: The replay buffer to sample from.
+        number_of_prefetched_batches: Maximum number of batches sampled ahead.
+        pin_memory: Whether batches are packed into pinned memory. Defaults to
+            whether batches are moved to a CUDA device.
+    """
+
+    def __init__(
+        self,
+        replay_buffer: ReplayBuffer,
+        number_of_prefetched_batches: int = 2,
+        pin_memory: bool | None = None,
+    ) -> None:
+        super().__init__()
+        if number_of_prefetched_batches < 1:
+            raise ValueError(
+                "number_of_prefetched_batches must be positive but is "
+                f"{number_of_prefetched_batches}"
+            )
+        self._replay_buffer = replay_buffer
+        self._requires_consecutive_transitions: bool = (
+            replay_buffer._requires_consecutive_transitions
+        )
+        self._number_of_prefetched_batches = number_of_prefetched_batches
+        self._pin_memory = pin_memory
+        self._device_for_batches: torch.device = replay_buffer.device_for_batches
+        self._device_resident: bool = (
+            isinstance(replay_buffer, TensorBasedReplayBuffer)
+            and replay_buffer.device_resident
+        )
+        if not self._device_resident:
+            # batches are collated on the CPU and moved by `sample`
+            replay_buffer.device_for_batches = torch.device("cpu")
+        # serializes the accesses to the wrapped replay buffer
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[tuple[int, object]] = queue.Queue(
+            maxsize=number_of_prefetched_batches
+        )
+        self._batch_size: int | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def replay_buffer(self) -> ReplayBuffer:
+        """The wrapped replay buffer."""
+        return self._replay_buffer
+
+    @property
+    def device_for_batches(self) -> torch.device:
+        return self._device_for_batches
+
+    @device_for_batches.setter
+    def device_for_batches(self, new_device_for_batches: torch.device) -> None:
+        self._device_for_batches = new_device_for_batches
+        if self._device_resident:
+            # the transitions of a device-resident replay buffer follow its batches
+            with self._lock:
+                self._replay_buffer.device_for_batches = new_device_for_batches
+
+    @property
+    def is_action_continuous(self) -> bool:
+        return self._replay_buffer.is_action_continuous
+
+    @is_action_continuous.setter
+    def is_action_continuous(self, value: bool) -> None:
+        with self._lock:
+            self._replay_buffer.is_action_continuous = value
+
+    def push(
+        self,
+        state: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions: ActionSpace | None = None,
+        next_state: SubjectiveState | None = None,
+        next_available_actions: ActionSpace | None = None,
+        max_number_actions: int | None = None,
+        cost: float | None = None,
+    ) -> None:
+        with self._lock:
+            self._replay_buffer.push(
+                state=state,
+                action=action,
+                reward=reward,
+                terminated=terminated,
+                truncated=truncated,
+                curr_available_actions=curr_available_actions,
+                next_state=next_state,
+                next_available_actions=next_available_actions,
+                max_number_actions=max_number_actions,
+                cost=cost,
+            )
+
+    def push_batch(self, batch: TransitionBatch) -> None:
+        with self._lock:
+            self._replay_buffer.push_batch(batch)
+
+    def sample(self, batch_size: int) -> object:
+        """
+        Returns the next prefetched batch of `batch_size` transitions. Prefetched
+        batches of another size are discarded.
+        """
+        if len(self) < batch_size:
+            # the wrapped replay buffer decides how to handle too large batches
+            with self._lock:
+                batch = self._replay_buffer.sample(batch_size)
+            return self._to_device_for_batches(batch)
+        self._batch_size = batch_size
+        if self._thread is None:
+            self._start()
+        while True:
+            prefetched_batch_size, batch = self._queue.get()
+            if isinstance(batch, Exception):
+                self.close()
+                raise batch
+            if prefetched_batch_size == batch_size:
+                return self._to_device_for_batches(batch)
+
+    def update_priorities(self, indices: Tensor, td_errors: Tensor) -> None:
+        """Forwards the TD errors to the wrapped replay buffer."""
+        with self._lock:
+            self._replay_buffer.update_priorities(indices, td_errors)
+
+    def clear(self) -> None:
+        self.close()
+        with self._lock:
+            self._replay_buffer.clear()
+
+    def state_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return self._replay_buffer.state_dict()
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        # batches prefetched from the former state are discarded
+        self.close()
+        with self._lock:
+            self._replay_buffer.load_state_dict(state_dict)
+
+    def close(self) -> None:
+        """
+        Stops the background thread and discards the prefetched batches. It is
+        restarted by the next call to `sample`.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._discard_prefetched_batches()
+        self._thread.join()
+        self._discard_prefetched_batches()
+        self._thread = None
+        self._stop_event.clear()
+
+    def memory_footprint(self) -> dict[str, tuple[int, str]]:
+        with self._lock:
+            return self._replay_buffer.memory_footprint()
+
+    @property
+    def occupancy(self) -> float | None:
+        return self._replay_buffer.occupancy
+
+    def __len__(self) -> int:
+        return len(self._replay_buffer)
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self._replay_buffer})"
+
+    def _take_snapshot(self, incremental: bool, copy: bool) -> dict[str, Any]:
+        with self._lock:
+            return self._replay_buffer._take_snapshot(incremental, copy)
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(target=self._prefetch, daemon=True)
+        self._thread.start()
+
+    def _prefetch(self) -> None:
+        while not self._stop_event.is_set():
+            batch_size = self._batch_size
+            assert batch_size is not None
+            try:
+                with self._lock:
+                    if len(self._replay_buffer) < batch_size:
+                        batch = None
+                    else:
+                        batch = self._replay_buffer.sample(batch_size)
+                if batch is None:
+                    # the wrapped replay buffer was cleared; wait for new transitions
+                    self._stop_event.wait(0.001)
+                    continue
+                if (
+                    isinstance(batch, TransitionBatch)
+                    and not self._device_resident
+                    and (
+                        self._should_pin_memory()
+                        or self._device_for_batches.type != "cpu"
+                    )
+                ):
+                    batch = batch.pack(pin_memory=self._should_pin_memory())
+            except Exception as e:
+                self._put((batch_size, e))
+                return
+            self._put((batch_size, batch))
+
+    def _put(self, item: tuple[int, object]) -> None:
+        # waits for room in the queue without missing a call to `close`
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.01)
+                return
+            except queue.Full:
+                pass
+
+    def _discard_prefetched_batches(self) -> None:
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _should_pin_memory(self) -> bool:
+        if self._device_resident:
+            return False
+        if self._pin_memory is not None:
+            return self._pin_memory
+        return self._device_for_batches.type == "cuda" and torch.cuda.is_available()
+
+    def _to_device_for_batches(self, batch: object) -> object:
+        if not isinstance(batch, TransitionBatch):
+            return batch
+        return batch.to(self._device_for_batches)
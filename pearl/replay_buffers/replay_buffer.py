@@ -7,13 +7,22 @@
 
 # pyre-strict
 
+import glob
+import os
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Any
 
 import torch
 from pearl.api.action import Action
 from pearl.api.action_space import ActionSpace
 from pearl.api.reward import Reward
 from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.instrumentation import ReplayBufferInstrumentation
+from pearl.replay_buffers.transition import TransitionBatch
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+from torch import Tensor
 
 
 class ReplayBuffer(ABC):
@@ -23,21 +32,47 @@ class ReplayBuffer(ABC):
     Replay buffers store transitions collected from an agent's experience,
     and batches of those transitions can be sampled to train the agent.
 
-    They are stored in the CPU since they may grow quite large,
-    but contain a property `device` which specifies where
-    batches are stored.
+    They are stored in the CPU since they may grow quite large (unless they are
+    device resident, see `TensorBasedReplayBuffer.device_resident`), but contain a
+    property `device_for_batches` which specifies where batches are stored.
+
+    Replay buffers implementing `state_dict` and `load_state_dict` can be saved to
+    and restored from snapshot directories with `save` and `load`.
+
+    `instrumentation_summary` reports the memory footprint and occupancy of a replay
+    buffer, and the latencies of its operations if `enable_instrumentation` was
+    called, as a dictionary that can be passed to a `LearningLogger`.
     """
 
+    _SNAPSHOT_FILE_PATTERN = "snapshot-{:05d}.pt"
+    # the methods timed by instrumentation, and the names of their latencies
+    _INSTRUMENTED_METHODS: dict[str, str] = {
+        "push": "push",
+        "push_batch": "push_batch",
+        "sample": "sample",
+        "_create_transition_batch": "collate",
+    }
+    # whether transitions are combined with the transitions pushed before them, so
+    # that the transitions of an episode must be pushed consecutively (which
+    # interleaving the transitions of several environments would break)
+    _requires_consecutive_transitions: bool = False
+
     def __init__(self) -> None:
         super().__init__()
         self._is_action_continuous: bool = False
+        # the directory of the last snapshot, the number of snapshot files written
+        # to it, and the write of the last snapshot if it is still in progress
+        self._last_snapshot_path: str | None = None
+        self._number_of_snapshot_files: int = 0
+        self._pending_snapshot: Future[None] | None = None
+        self._instrumentation: ReplayBufferInstrumentation | None = None
 
     @property
     @abstractmethod
     def device_for_batches(self) -> torch.device:
         """
-        The device on which _batches_ are stored
-        (the replay buffer is always stored in the CPU).
+        The device on which _batches_ are stored (the replay buffer itself is stored
+        in the CPU unless it is device resident).
         """
         pass
 
@@ -65,10 +100,52 @@ class ReplayBuffer(ABC):
         """Saves a transition."""
         pass
 
+    def push_batch(self, batch: TransitionBatch) -> None:
+        """
+        Saves a batch of transitions, in the order of the batch.
+
+        The available actions of discrete action spaces are given as in sampled batches,
+        that is, as padded tensors of shape (batch_size, max_number_actions, action_dim)
+        with unavailable actions masks of shape (batch_size, max_number_actions).
+
+        This default implementation pushes the transitions one at a time. Replay buffers
+        storing tensors override it to write all transitions with a constant number of
+        tensor operations.
+        """
+        for i in range(len(batch.reward)):
+            self.push(
+                state=batch.state[i],
+                action=batch.action[i],
+                reward=_to_scalar_if_single_element(batch.reward[i]),
+                terminated=bool(batch.terminated[i].item()),
+                truncated=bool(batch.truncated[i].item()),
+                curr_available_actions=_to_action_space(
+                    batch.curr_available_actions, batch.curr_unavailable_actions_mask, i
+                ),
+                next_state=None if batch.next_state is None else batch.next_state[i],
+                next_available_actions=_to_action_space(
+                    batch.next_available_actions, batch.next_unavailable_actions_mask, i
+                ),
+                max_number_actions=(
+                    None
+                    if batch.curr_available_actions is None
+                    else batch.curr_available_actions.shape[1]
+                ),
+                cost=None if batch.cost is None else batch.cost[i].item(),
+            )
+
     @abstractmethod
     def sample(self, batch_size: int) -> object:
         pass
 
+    def update_priorities(self, indices: Tensor, td_errors: Tensor) -> None:
+        """
+        Receives the TD errors of the transitions at `indices` (as given in a sampled
+        `PrioritizedTransitionBatch`) once a learner has trained on them. Replay
+        buffers sampling transitions by priority override it; others ignore it.
+        """
+        pass
+
     @abstractmethod
     def clear(self) -> None:
         """Empties replay buffer"""
@@ -81,6 +158,188 @@ class ReplayBuffer(ABC):
     def __str__(self) -> str:
         return self.__class__.__name__
 
+    @property
+    def instrumentation(self) -> ReplayBufferInstrumentation | None:
+        return self._instrumentation
+
+    def enable_instrumentation(self) -> None:
+        """
+        Starts recording the latencies of `push`, `push_batch`, `sample` and of the
+        collation of sampled batches. The methods of this replay buffer are replaced
+        by timed ones, so that replay buffers without instrumentation pay nothing.
+        Latencies are recorded in the current process only.
+        """
+        if self._instrumentation is not None:
+            return
+        self._instrumentation = ReplayBufferInstrumentation()
+        for method_name, operation in self._INSTRUMENTED_METHODS.items():
+            method = getattr(self, method_name, None)
+            if method is not None:
+                setattr(
+                    self,
+                    method_name,
+                    self._instrumentation.timed(operation, method),
+                )
+
+    def disable_instrumentation(self) -> None:
+        """Restores the methods replaced by `enable_instrumentation`."""
+        for method_name in self._INSTRUMENTED_METHODS:
+            self.__dict__.pop(method_name, None)
+        self._instrumentation = None
+
+    def memory_footprint(self) -> dict[str, tuple[int, str]]:
+        """
+        Returns the number of bytes allocated by each part of the storage of the
+        replay buffer (such as each transition field), with its dtype.
+        """
+        return {}
+
+    @property
+    def occupancy(self) -> float | None:
+        """The fraction of the capacity in use, or None if the capacity is unbounded."""
+        return None
+
+    def instrumentation_summary(self) -> dict[str, Any]:
+        """
+        Returns a flat dictionary of the size, occupancy and memory footprint of the
+        replay buffer, and the latency statistics of its operations if instrumentation
+        is enabled (see `LatencyHistogram.summary`). Keys start with "replay_buffer/".
+        """
+        summary: dict[str, Any] = {"replay_buffer/size": len(self)}
+        if self.occupancy is not None:
+            summary["replay_buffer/occupancy"] = self.occupancy
+        memory_footprint = self.memory_footprint()
+        summary["replay_buffer/bytes"] = sum(
+            number_of_bytes for number_of_bytes, _ in memory_footprint.values()
+        )
+        for name, (number_of_bytes, dtype) in memory_footprint.items():
+            summary[f"replay_buffer/bytes/{name}"] = number_of_bytes
+            summary[f"replay_buffer/dtype/{name}"] = dtype
+        if self._instrumentation is not None:
+            for key, value in self._instrumentation.summary().items():
+                summary[f"replay_buffer/latency/{key}"] = value
+        return summary
+
+    def __getstate__(self) -> dict[str, Any]:
+        # timed methods are closures, which cannot be pickled: copies of the replay
+        # buffer (such as those sent to other processes) are not instrumented
+        state = self.__dict__.copy()
+        for method_name in self._INSTRUMENTED_METHODS:
+            state.pop(method_name, None)
+        state["_instrumentation"] = None
+        return state
+
+    def state_dict(self) -> dict[str, Any]:
+        """
+        Returns the state of the replay buffer: its transitions and everything needed
+        to resume pushing and sampling, as tensors and plain Python values. Tensors
+        may share memory with the replay buffer.
+        """
+        raise NotImplementedError(f"{type(self)} does not implement state_dict")
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        """Restores a state returned by `state_dict`, replacing the current one."""
+        raise NotImplementedError(f"{type(self)} does not implement load_state_dict")
+
+    def save(
+        self, path: str, background: bool = False, incremental: bool = False
+    ) -> Future[None]:
+        """
+        Writes a snapshot of the replay buffer to the directory `path` with a single
+        `torch.save`, which `load` restores.
+
+        Args:
+            path: The snapshot directory. It is created if needed.
+            background: If True, the state is copied and written by a background
+                thread, and pushing and sampling can resume right away. Snapshots
+                are written in the order they are taken.
+            incremental: If True and the last snapshot of this replay buffer was
+                saved to (or loaded from) `path`, only the transitions written since
+                then are appended to the directory, in a new file. Otherwise, the
+                directory is replaced with a full snapshot.
+
+        Returns:
+            A future that completes once the snapshot is written, immediately unless
+            `background` is True.
+        """
+        self._wait_for_pending_snapshot()
+        path = os.path.abspath(path)
+        incremental = incremental and path == self._last_snapshot_path
+        snapshot_index = self._number_of_snapshot_files if incremental else 0
+        state = self._take_snapshot(incremental, copy=background)
+        self._last_snapshot_path = path
+        self._number_of_snapshot_files = snapshot_index + 1
+
+        def write() -> None:
+            os.makedirs(path, exist_ok=True)
+            if snapshot_index == 0:
+                for file_path in _snapshot_files(path):
+                    os.remove(file_path)
+            file_path = os.path.join(
+                path, self._SNAPSHOT_FILE_PATTERN.format(snapshot_index)
+            )
+            # written to a temporary file first so that an interrupted write never
+            # leaves a truncated snapshot behind
+            torch.save(state, file_path + ".tmp")
+            os.replace(file_path + ".tmp", file_path)
+
+        future: Future[None] = Future()
+        if not background:
+            write()
+            future.set_result(None)
+            return future
+
+        def write_in_background() -> None:
+            try:
+                write()
+                future.set_result(None)
+            except BaseException as e:
+                future.set_exception(e)
+
+        self._pending_snapshot = future
+        threading.Thread(target=write_in_background, daemon=True).start()
+        return future
+
+    def load(self, path: str) -> None:
+        """
+        Restores the replay buffer from the snapshot directory `path` written by
+        `save`, applying its full snapshot and then its incremental ones. Snapshots
+        are unpickled, so only snapshots from trusted sources should be loaded.
+        """
+        self._wait_for_pending_snapshot()
+        path = os.path.abspath(path)
+        file_paths = _snapshot_files(path)
+        if len(file_paths) == 0:
+            raise ValueError(f"{path} does not contain any replay buffer snapshot")
+        for file_path in file_paths:
+            self.load_state_dict(
+                torch.load(file_path, map_location="cpu", weights_only=False)
+            )
+        self._last_snapshot_path = path
+        self._number_of_snapshot_files = len(file_paths)
+
+    def _take_snapshot(self, incremental: bool, copy: bool) -> dict[str, Any]:
+        """
+        Returns the state written by `save`, with its tensors copied if `copy` is
+        True (and otherwise only the tensors that are partial views).
+        """
+        return _copy_tensors(
+            self._snapshot_state_dict(incremental), only_partial_views=not copy
+        )
+
+    def _snapshot_state_dict(self, incremental: bool) -> dict[str, Any]:
+        """
+        Returns the state written by `save`. Replay buffers supporting incremental
+        snapshots override this to only include the transitions written since the
+        last snapshot if `incremental` is True.
+        """
+        return self.state_dict()
+
+    def _wait_for_pending_snapshot(self) -> None:
+        if self._pending_snapshot is not None:
+            self._pending_snapshot.result()
+            self._pending_snapshot = None
+
     @property
     def is_action_continuous(self) -> bool:
         """Whether the action space is continuous or not."""
@@ -90,3 +349,49 @@ class ReplayBuffer(ABC):
     def is_action_continuous(self, value: bool) -> None:
         """Set whether the action space is continuous or not."""
         self._is_action_continuous = value
+
+
+def _to_scalar_if_single_element(value: Tensor) -> Tensor | float:
+    return value.item() if value.numel() == 1 else value
+
+
+def _to_action_space(
+    available_actions: Tensor | None,
+    unavailable_actions_mask: Tensor | None,
+    index: int,
+) -> ActionSpace | None:
+    """Returns the action space of row `index` of a batch of padded available actions."""
+    if available_actions is None:
+        return None
+    actions = available_actions[index]
+    if unavailable_actions_mask is not None:
+        actions = actions[~unavailable_actions_mask[index].bool()]
+    return DiscreteActionSpace(actions=list(actions))
+
+
+def _snapshot_files(path: str) -> list[str]:
+    """Returns the snapshot files of a directory, in the order they were written."""
+    return sorted(glob.glob(os.path.join(path, "snapshot-[0-9]*.pt")))
+
+
+def _copy_tensors(value: Any, only_partial_views: bool = False) -> Any:
+    """
+    Returns `value` with the tensors it contains (in nested dictionaries, lists and
+    tuples) copied. If `only_partial_views` is True, only tensors viewing part of a
+    larger storage are copied, which `torch.save` would otherwise write entirely.
+    """
+    if isinstance(value, Tensor):
+        if (
+            only_partial_views
+            and value.untyped_storage().nbytes()
+            == value.numel() * value.element_size()
+        ):
+            return value
+        return value.clone()
+    if isinstance(value, dict):
+        return {
+            key: _copy_tensors(item, only_partial_views) for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return type(value)(_copy_tensors(item, only_partial_views) for item in value)
+    return value
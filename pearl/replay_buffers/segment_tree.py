@@ -0,0 +1,121 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+from collections.abc import Callable
+
+import torch
+from torch import Tensor
+
+
+class SegmentTree:
+    """
+    A binary segment tree over `capacity` leaves, stored in a flat tensor.
+
+    Node 1 is the root and the children of node `i` are nodes `2 * i` and `2 * i + 1`.
+    Each internal node holds the reduction of its two children, so the root holds
+    the reduction of all leaves.
+
+    All operations are vectorized over batches of leaves: updating `k` leaves
+    costs one pass over the `log(capacity)` levels of the tree, each level being
+    a constant number of tensor operations, rather than `k` separate traversals.
+
+    Args:
+        capacity: Number of leaves.
+        reduction: Associative binary operation applied elementwise to tensors.
+        neutral_element: Neutral element of `reduction`; the initial value of all leaves.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        reduction: Callable[[Tensor, Tensor], Tensor],
+        neutral_element: float,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive but is {capacity}")
+        self.capacity = capacity
+        self._depth: int = max(1, (capacity - 1).bit_length())
+        self._num_leaves: int = 1 << self._depth
+        self._reduction = reduction
+        self._neutral_element = neutral_element
+        # float64 limits the rounding errors accumulated in internal nodes
+        self._tree: Tensor = torch.full(
+            (2 * self._num_leaves,), neutral_element, dtype=torch.float64
+        )
+
+    def update(self, indices: Tensor, values: Tensor) -> None:
+        """
+        Sets the leaves at `indices` to `values` and recomputes their ancestors.
+        If `indices` contains duplicates, one of the corresponding values is kept.
+        """
+        nodes = indices.to(torch.long).view(-1) + self._num_leaves
+        self._tree[nodes] = values.to(self._tree).view(-1)
+        for _ in range(self._depth):
+            nodes = torch.unique(nodes // 2)
+            self._tree[nodes] = self._reduction(
+                self._tree[2 * nodes], self._tree[2 * nodes + 1]
+            )
+
+    def reduce(self) -> float:
+        """Returns the reduction of all leaves."""
+        return self._tree[1].item()
+
+    def __getitem__(self, indices: Tensor) -> Tensor:
+        """Returns the values of the leaves at `indices`."""
+        return self._tree[indices.to(torch.long) + self._num_leaves]
+
+    def clear(self) -> None:
+        self._tree.fill_(self._neutral_element)
+
+    def state_dict(self) -> dict[str, Tensor]:
+        return {"tree": self._tree}
+
+    def load_state_dict(self, state_dict: dict[str, Tensor]) -> None:
+        tree = state_dict["tree"]
+        if tree.shape != self._tree.shape:
+            raise ValueError(
+                f"Can't load a segment tree of {tree.shape[0] // 2} leaves into one "
+                f"of {self._num_leaves} leaves"
+            )
+        self._tree.copy_(tree)
+
+
+class SumSegmentTree(SegmentTree):
+    """
+    A segment tree whose nodes hold sums, supporting proportional sampling
+    through `find_prefix_sum_index`.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity, reduction=torch.add, neutral_element=0.0)
+
+    def find_prefix_sum_index(self, prefix_sums: Tensor) -> Tensor:
+        """
+        For each value `s` in `prefix_sums`, returns the highest index `i` such that
+        the sum of leaves `0, ..., i - 1` is at most `s`. Drawing `s` uniformly
+        from `[0, total)` thus draws `i` with probability proportional to leaf `i`.
+        """
+        values = prefix_sums.to(self._tree).view(-1).clone()
+        nodes = torch.ones_like(values, dtype=torch.long)
+        for _ in range(self._depth):
+            left_children = 2 * nodes
+            left_sums = self._tree[left_children]
+            go_right = values >= left_sums
+            values = torch.where(go_right, values - left_sums, values)
+            nodes = left_children + go_right.long()
+        return nodes - self._num_leaves
+
+
+class MinSegmentTree(SegmentTree):
+    """A segment tree whose nodes hold minimums."""
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(
+            capacity, reduction=torch.minimum, neutral_element=float("inf")
+        )
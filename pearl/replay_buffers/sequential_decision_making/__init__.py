@@ -8,10 +8,18 @@
 
 from .bootstrap_replay_buffer import BootstrapReplayBuffer
 from .hindsight_experience_replay_buffer import HindsightExperienceReplayBuffer
+from .history_replay_buffer import HistoryReplayBuffer
+from .n_step_replay_buffer import NStepReplayBuffer
+from .prioritized_replay_buffer import PrioritizedReplayBuffer
 from .sarsa_replay_buffer import SARSAReplayBuffer
+from .sequence_replay_buffer import SequenceReplayBuffer
 
 __all__ = [
     "BootstrapReplayBuffer",
     "SARSAReplayBuffer",
     "HindsightExperienceReplayBuffer",
+    "HistoryReplayBuffer",
+    "NStepReplayBuffer",
+    "PrioritizedReplayBuffer",
+    "SequenceReplayBuffer",
 ]
@@ -7,17 +7,11 @@
 
 # pyre-strict
 
-import random
+from typing import Any
 
 import torch
-from pearl.api.action import Action
-from pearl.api.reward import Reward
-from pearl.api.state import SubjectiveState
 from pearl.replay_buffers import BasicReplayBuffer  # noqa E501
-from pearl.replay_buffers.transition import (
-    TransitionWithBootstrapMask,
-    TransitionWithBootstrapMaskBatch,
-)
+from pearl.replay_buffers.transition import TransitionWithBootstrapMaskBatch
 from torch import Tensor
 
 
@@ -29,6 +23,10 @@ class BootstrapReplayBuffer(BasicReplayBuffer):
     `w_k ~ Bernoulli(p)` for each piece of experience, and `w_k = 1` means
     the experience is included in the training data.
 
+    Masks are not stored: the mask of the `k`-th Q-network for the transition at a
+    given position of the buffer is derived from a hash of (position, k), seeded
+    per buffer, when the transition is sampled (see `hashed_bootstrap_masks`).
+
     [1] Ian Osband, Charles Blundell, Alexander Pritzel, and Benjamin
         Van Roy, Deep exploration via bootstrapped DQN. Advances in Neural
         Information Processing Systems, 2016. https://arxiv.org/abs/1602.04621.
@@ -48,68 +46,48 @@ class BootstrapReplayBuffer(BasicReplayBuffer):
         super().__init__(capacity=capacity)
         self.p = p
         self.ensemble_size = ensemble_size
+        self._seed: int = int(torch.randint(0, 2**32, ()).item())
 
-    def _store_transition(
-        self,
-        state: SubjectiveState,
-        action: Action,
-        reward: Reward,
-        terminated: bool,
-        truncated: bool,
-        curr_available_actions_tensor_with_padding: Tensor | None,
-        curr_unavailable_actions_mask: Tensor | None,
-        next_state: SubjectiveState | None,
-        next_available_actions_tensor_with_padding: Tensor | None,
-        next_unavailable_actions_mask: Tensor | None,
-        cost: float | None = None,
-    ) -> None:
-        # sample the bootstrap mask from Bernoulli(p) on each push
-        probs = torch.tensor(self.p).repeat(1, self.ensemble_size)
-        bootstrap_mask = torch.bernoulli(probs)
+    def state_dict(self) -> dict[str, Any]:
+        # masks are a function of the positions of transitions and of the seed
+        state = super().state_dict()
+        state["seed"] = self._seed
+        return state
 
-        self.memory.append(
-            TransitionWithBootstrapMask(
-                state=self._process_non_optional_single_state(state),
-                action=self._process_single_action(action),
-                reward=self._process_single_reward(reward),
-                next_state=self._process_single_state(next_state),
-                curr_available_actions=curr_available_actions_tensor_with_padding,
-                curr_unavailable_actions_mask=curr_unavailable_actions_mask,
-                next_available_actions=next_available_actions_tensor_with_padding,
-                next_unavailable_actions_mask=next_unavailable_actions_mask,
-                terminated=self._process_single_terminated(terminated),
-                truncated=self._process_single_truncated(truncated),
-                cost=self._process_single_cost(cost),
-                bootstrap_mask=bootstrap_mask,
-            )
-        )
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        self._seed = state_dict["seed"]
 
-    def sample(self, batch_size: int) -> TransitionWithBootstrapMaskBatch:
-        if batch_size > len(self):
-            raise ValueError(
-                f"Can't get a batch of size {batch_size} from a "
-                f"replay buffer with only {len(self)} elements"
-            )
-        samples = random.sample(self.memory, batch_size)
-        transition_batch = self._create_transition_batch(
-            # pyre-fixme[6]: For 1st argument expected `List[Transition]` but got
-            #  `List[Union[Transition, TransitionBatch]]`.
-            transitions=samples,
-            is_action_continuous=self._is_action_continuous,
-        )
-        # pyre-fixme[16]: Item `Transition` of `Union[Transition, TransitionBatch]`
-        #  has no attribute `bootstrap_mask`.
-        bootstrap_mask_batch = torch.cat([x.bootstrap_mask for x in samples])
-        return TransitionWithBootstrapMaskBatch(
-            state=transition_batch.state,
-            action=transition_batch.action,
-            reward=transition_batch.reward,
-            next_state=transition_batch.next_state,
-            curr_available_actions=transition_batch.curr_available_actions,
-            curr_unavailable_actions_mask=transition_batch.curr_unavailable_actions_mask,
-            next_available_actions=transition_batch.next_available_actions,
-            next_unavailable_actions_mask=transition_batch.next_unavailable_actions_mask,
-            terminated=transition_batch.terminated,
-            truncated=transition_batch.truncated,
-            bootstrap_mask=bootstrap_mask_batch,
+    def _create_transition_batch(
+        self,
+        indices: Tensor,
+        is_action_continuous: bool,
+    ) -> TransitionWithBootstrapMaskBatch:
+        transition_batch = super()._create_transition_batch(
+            indices, is_action_continuous
         )
+        return TransitionWithBootstrapMaskBatch.without_validation(
+            **transition_batch.__dict__,
+            bootstrap_mask=hashed_bootstrap_masks(
+                indices, self.ensemble_size, self.p, self._seed
+            ),
+        ).to(self.device_for_batches)
+
+
+def hashed_bootstrap_masks(
+    indices: Tensor, ensemble_size: int, p: float, seed: int
+) -> Tensor:
+    """
+    Returns the Bernoulli(p) bootstrap masks of the transitions at the given
+    positions, of shape (len(indices), ensemble_size), as floats. The mask of
+    (index, k) is a deterministic function of (index, k, seed): a 32-bit integer hash
+    of them, mapped to [0, 1), is compared to `p`.
+    """
+    heads = torch.arange(ensemble_size, device=indices.device)
+    x = (indices.long().view(-1, 1) * ensemble_size + heads) ^ seed
+    x = x & 0xFFFFFFFF
+    # integer hash with good avalanche, computed on 32 bits held in int64
+    x = (((x >> 16) ^ x) * 0x45D9F3B) & 0xFFFFFFFF
+    x = (((x >> 16) ^ x) * 0x45D9F3B) & 0xFFFFFFFF
+    x = (x >> 16) ^ x
+    return (x.double() / 2**32 < p).float()
@@ -8,27 +8,50 @@
 # pyre-strict
 
 from collections.abc import Callable
+from enum import Enum
+from typing import Any
 
+import torch
 from pearl.api.action import Action
 from pearl.api.action_space import ActionSpace
 from pearl.api.reward import Reward
 from pearl.api.state import SubjectiveState
 
 from pearl.replay_buffers import BasicReplayBuffer
+from pearl.replay_buffers.transition import Transition, TransitionBatch
 from pearl.utils.tensor_like import assert_is_tensor_like
+from torch import Tensor
+
+
+class GoalSelectionStrategy(Enum):
+    """
+    How the additional goals of the transitions of an episode are chosen, among the
+    goals achieved in that episode (see the HER paper, section 4.5).
+        - FINAL: the goal achieved at the end of the episode.
+        - FUTURE: goals achieved later in the episode than the transition.
+        - EPISODE: goals achieved anywhere in the episode.
+    """
+
+    FINAL = 0
+    FUTURE = 1
+    EPISODE = 2
 
 
 class HindsightExperienceReplayBuffer(BasicReplayBuffer):
     """
     paper: https://arxiv.org/pdf/1707.01495.pdf
-    final mode for alternative only for now
 
     TLDR:
     HindsightExperienceReplayBuffer is used for sparse reward problems.
     After an episode ends, apart from pushing original data in,
-    it will replace original goal with final state in the episode,
+    it will replace original goal with goals achieved in the episode,
     and replay the transitions again for new rewards and push
 
+    Relabeling is done in bulk when an episode ends: the transitions of the episode
+    are gathered from the storage, their goals are replaced with a constant number
+    of tensor operations, and the relabeled transitions are written with a single
+    bulk insert.
+
     capacity: size of the replay buffer
     goal_dim: dimension of goal of the problem.
               Subjective state input to `push` method will be the final state representation
@@ -38,9 +61,18 @@ class HindsightExperienceReplayBuffer(BasicReplayBuffer):
     terminated_fn: This is different from paper. Original paper doesn't have it.
              We need it for games which may end earlier.
              If this is not defined, then use terminated value from original trajectory.
+    strategy: how additional goals are chosen (see `GoalSelectionStrategy`).
+    number_of_additional_goals: number of relabeled transitions per transition for
+             the FUTURE and EPISODE strategies (the k of the paper). The FINAL
+             strategy relabels each transition once.
+    batched_fns: if True, `reward_fn` and `terminated_fn` are called once per episode
+             on tensors of states of shape (batch_size, state_dim) and actions of shape
+             (batch_size, action_dim), and return tensors of shape (batch_size,).
+             Otherwise, they are called once per relabeled transition.
     """
 
-    # TODO: improve unclear docstring
+    _requires_insertion_order = True
+    _requires_consecutive_transitions = True
 
     def __init__(
         self,
@@ -48,24 +80,19 @@ class HindsightExperienceReplayBuffer(BasicReplayBuffer):
         goal_dim: int,
         reward_fn: Callable[[SubjectiveState, Action], Reward],
         terminated_fn: Callable[[SubjectiveState, Action], bool] | None = None,
+        strategy: GoalSelectionStrategy = GoalSelectionStrategy.FINAL,
+        number_of_additional_goals: int = 4,
+        batched_fns: bool = False,
     ) -> None:
         super().__init__(capacity=capacity)
         self._goal_dim = goal_dim
         self._reward_fn = reward_fn
         self._terminated_fn = terminated_fn
-        self._trajectory: list[
-            tuple[
-                SubjectiveState,
-                Action,
-                SubjectiveState,
-                ActionSpace,
-                ActionSpace,
-                bool,
-                bool,
-                int | None,
-                float | None,
-            ]
-        ] = []
+        self._strategy = strategy
+        self._number_of_additional_goals = number_of_additional_goals
+        self._batched_fns = batched_fns
+        # physical indices of the stored transitions of the current episode
+        self._trajectory: Tensor = torch.empty(0, dtype=torch.long)
 
     def push(
         self,
@@ -81,7 +108,16 @@ class HindsightExperienceReplayBuffer(BasicReplayBuffer):
         cost: float | None = None,
     ) -> None:
         next_state = assert_is_tensor_like(next_state)
-        # assuming state and goal are all list, so we could use + to cat
+        if curr_available_actions is None:
+            raise ValueError(
+                f"{type(self)} requires curr_available_actions not to be None"
+            )
+
+        if next_available_actions is None:
+            raise ValueError(
+                f"{type(self)} requires next_available_actions not to be None"
+            )
+
         super().push(
             # input here already have state and goal cat together
             state,
@@ -95,62 +131,127 @@ class HindsightExperienceReplayBuffer(BasicReplayBuffer):
             max_number_actions,
             cost,
         )
+        self._add_to_trajectory(1)
+        if terminated or truncated:
+            self._relabel_complete_episodes()
 
-        if curr_available_actions is None:
-            raise ValueError(
-                f"{type(self)} requires curr_available_actions not to be None"
-            )
+    def push_batch(self, batch: TransitionBatch) -> None:
+        """
+        Pushes a batch of consecutive transitions, which may span several episodes,
+        and the relabeled transitions of each episode that ends in the batch. Rows
+        after the last episode end are relabeled once their episode ends.
+        """
+        if batch.next_state is None:
+            raise ValueError(f"{type(self)} requires next_state not to be None")
+        super().push_batch(batch)
+        self._add_to_trajectory(len(batch.reward))
+        self._relabel_complete_episodes()
 
-        if next_available_actions is None:
-            raise ValueError(
-                f"{type(self)} requires next_available_actions not to be None"
-            )
+    def clear(self) -> None:
+        super().clear()
+        self._trajectory = torch.empty(0, dtype=torch.long)
 
-        self._trajectory.append(
-            (
-                state,
-                action,
-                next_state,
-                curr_available_actions,
-                next_available_actions,
-                terminated,
-                truncated,
-                max_number_actions,
-                cost,
-            )
+    def state_dict(self) -> dict[str, Any]:
+        state = super().state_dict()
+        state["trajectory"] = self._trajectory
+        return state
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        self._trajectory = state_dict["trajectory"]
+
+    def _add_to_trajectory(self, number_of_rows: int) -> None:
+        """Adds the last `number_of_rows` rows written to the current episode."""
+        number_of_kept_rows = min(number_of_rows, self.capacity)
+        indices = (
+            self.memory.next_index
+            - number_of_kept_rows
+            + torch.arange(number_of_kept_rows)
+        ) % self.capacity
+        # rows of episodes longer than the capacity have been overwritten
+        self._trajectory = torch.cat([self._trajectory, indices])[-self.capacity :]
+
+    def _relabel_complete_episodes(self) -> None:
+        """
+        Pushes the relabeled transitions of the episodes of the trajectory that have
+        ended, and keeps the transitions of the unfinished episode, if any.
+        """
+        columns = self.memory.gather(self._trajectory)
+        is_episode_end = (
+            columns["terminated"].bool() | columns["truncated"].bool()
+        ).view(-1)
+        episode_end_indices = is_episode_end.nonzero().view(-1)
+        if len(episode_end_indices) == 0:
+            return
+        number_of_complete_rows = int(episode_end_indices[-1].item()) + 1
+        self._trajectory = self._trajectory[number_of_complete_rows:]
+        columns = {
+            name: column[:number_of_complete_rows] for name, column in columns.items()
+        }
+        is_episode_end = is_episode_end[:number_of_complete_rows]
+
+        relabeled_rows = self._relabel(columns, is_episode_end)
+        number_of_relabeled_rows = len(relabeled_rows.reward)
+        self.memory.append_batch(relabeled_rows)
+        # the oldest rows of the unfinished episode may have been overwritten
+        number_of_overwritten_rows = max(
+            0, number_of_relabeled_rows - (self.capacity - len(self._trajectory))
         )
-        if terminated or truncated:
-            additional_goal = next_state[: -self._goal_dim]  # final mode
-            for (
-                state,
-                action,
-                next_state,
-                curr_available_actions,
-                next_available_actions,
-                terminated,
-                truncated,
-                max_number_actions,
-                cost,
-            ) in self._trajectory:
-                # replace current_goal with additional_goal
-                state = assert_is_tensor_like(state)
-                next_state = assert_is_tensor_like(next_state)
-                state[-self._goal_dim :] = additional_goal
-                next_state[-self._goal_dim :] = additional_goal
-                super().push(
-                    state,
-                    action,
-                    self._reward_fn(state, action),
-                    (
-                        terminated
-                        if self._terminated_fn is None
-                        else self._terminated_fn(state, action)
-                    ),
-                    truncated,
-                    curr_available_actions,
-                    next_state,
-                    next_available_actions,
-                    max_number_actions,
-                    cost,
-                )
-            self._trajectory = []
+        self._trajectory = self._trajectory[number_of_overwritten_rows:]
+
+    def _relabel(
+        self, columns: dict[str, Tensor], is_episode_end: Tensor
+    ) -> Transition:
+        """
+        Returns the relabeled transitions of the given rows of complete episodes.
+        """
+        number_of_rows = len(is_episode_end)
+        positions = torch.arange(number_of_rows)
+        # first and last rows of the episode of each row
+        episode_indices = is_episode_end.long().cumsum(0) - is_episode_end.long()
+        episode_ends = is_episode_end.nonzero().view(-1)
+        episode_starts = torch.cat(
+            [torch.zeros(1, dtype=torch.long), episode_ends[:-1] + 1]
+        )
+        first_rows = episode_starts[episode_indices]
+        last_rows = episode_ends[episode_indices]
+
+        # rows to relabel and rows whose achieved goals are used
+        if self._strategy == GoalSelectionStrategy.FINAL:
+            rows, goal_rows = positions, last_rows
+        else:
+            rows = positions.repeat_interleave(self._number_of_additional_goals)
+            first_goal_rows = (
+                rows
+                if self._strategy == GoalSelectionStrategy.FUTURE
+                else first_rows[rows]
+            )
+            number_of_goal_rows = last_rows[rows] - first_goal_rows + 1
+            goal_rows = first_goal_rows + (
+                torch.rand(len(rows)) * number_of_goal_rows
+            ).long().clamp(max=number_of_goal_rows - 1)
+
+        next_state = columns["next_state"]
+        goals = next_state[goal_rows, : -self._goal_dim]
+        relabeled = {name: column[rows] for name, column in columns.items()}
+        relabeled["state"][:, -self._goal_dim :] = goals
+        relabeled["next_state"][:, -self._goal_dim :] = goals
+        relabeled["reward"] = self._apply(
+            self._reward_fn, relabeled["state"], relabeled["action"]
+        ).to(columns["reward"].dtype)
+        if self._terminated_fn is not None:
+            relabeled["terminated"] = self._apply(
+                self._terminated_fn, relabeled["state"], relabeled["action"]
+            ).to(columns["terminated"].dtype)
+        return Transition(**relabeled)
+
+    def _apply(
+        self,
+        fn: Callable[[SubjectiveState, Action], Reward | bool],
+        states: Tensor,
+        actions: Tensor,
+    ) -> Tensor:
+        """Calls `reward_fn` or `terminated_fn` on rows of states and actions."""
+        if self._batched_fns:
+            return torch.as_tensor(fn(states, actions)).view(-1)
+        return torch.tensor([fn(states[i], actions[i]) for i in range(len(states))])
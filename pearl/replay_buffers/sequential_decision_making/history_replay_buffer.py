@@ -0,0 +1,248 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+from typing import Any
+
+import torch
+from pearl.api.action import Action
+from pearl.api.reward import Reward
+from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.basic_replay_buffer import BasicReplayBuffer
+from pearl.replay_buffers.frame_deduplicated_replay_buffer import FrameStore
+from pearl.replay_buffers.transition import Transition, TransitionBatch
+from torch import Tensor
+
+
+class HistoryReplayBuffer(BasicReplayBuffer):
+    """
+    A replay buffer for agents using a history summarization module such as
+    `StackingHistorySummarizationModule` or `LSTMHistorySummarizationModule`, whose
+    states are windows of the last `history_length` (action, observation) rows.
+
+    `PearlAgent.observe` pushes the full windows of both the state and the next state,
+    and consecutive windows of an episode only differ by one row. Instead of storing
+    windows, this buffer writes each row once to a ring of rows (a `FrameStore`), in
+    the order of the episode, and stores in the `state` and `next_state` columns the
+    pair (id of the last row of the window, id of the first row of its episode).
+    Rows of a window before the start of its episode are the zero padding of the
+    history summarization modules. Windows are rebuilt at sampling time with one
+    vectorized gather, and sampled batches are identical to those of a
+    `BasicReplayBuffer`.
+
+    Windows may be pushed flattened (as `StackingHistorySummarizationModule` does) or
+    with shape (history_length, row_dim) (as `LSTMHistorySummarizationModule` does);
+    batches have the shape of pushed windows.
+
+    Args:
+        capacity: Size of the replay buffer.
+        history_length: The number of rows in a window.
+    """
+
+    _requires_insertion_order = True
+    _requires_consecutive_transitions = True
+
+    def __init__(self, capacity: int, history_length: int) -> None:
+        super().__init__(capacity=capacity)
+        self._history_length = history_length
+        self._rows = FrameStore(
+            initial_capacity=capacity + 2 * history_length, dtype=torch.float32
+        )
+        self._window_shape: torch.Size | None = None
+        # the last pushed next state window and its (last row id, first row id) pair
+        self._last_next_window: Tensor | None = None
+        self._last_next_window_ids: list[int] | None = None
+        self._rows_version_at_last_snapshot: tuple[int, int] | None = None
+
+    def _store_transition(
+        self,
+        state: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions_tensor_with_padding: Tensor | None,
+        curr_unavailable_actions_mask: Tensor | None,
+        next_state: SubjectiveState | None,
+        next_available_actions_tensor_with_padding: Tensor | None,
+        next_unavailable_actions_mask: Tensor | None,
+        cost: float | None = None,
+    ) -> None:
+        window = self._to_rows(self._process_non_optional_single_state(state))
+        keep_from = self._first_row_id_to_keep()
+
+        if self._last_next_window is not None and torch.equal(
+            self._last_next_window, window
+        ):
+            assert self._last_next_window_ids is not None
+            window_ids = self._last_next_window_ids
+        else:
+            window_ids = self._add_window(window, keep_from)
+        # the rows of the state must survive the writes of the next state's rows
+        keep_from = min(keep_from, self._first_used_row_id(window_ids))
+
+        next_window_ids = None
+        processed_next_state = self._process_single_state(next_state)
+        if processed_next_state is not None:
+            next_window = self._to_rows(processed_next_state)
+            last_row_id, first_row_id = window_ids
+            if last_row_id == len(self._rows) - 1 and torch.equal(
+                next_window[:-1], window[1:]
+            ):
+                # the next state continues the episode of the state: its last row
+                # is written right after the last row of the state
+                next_window_ids = [
+                    self._rows.add(next_window[-1], keep_from),
+                    first_row_id,
+                ]
+            else:
+                next_window_ids = self._add_window(next_window, keep_from)
+            self._last_next_window = next_window
+        else:
+            self._last_next_window = None
+        self._last_next_window_ids = next_window_ids
+
+        self.memory.append(
+            Transition(
+                state=torch.tensor([window_ids]),
+                action=self._process_single_action(action),
+                reward=self._process_single_reward(reward),
+                next_state=(
+                    None if next_window_ids is None else torch.tensor([next_window_ids])
+                ),
+                curr_available_actions=curr_available_actions_tensor_with_padding,
+                curr_unavailable_actions_mask=curr_unavailable_actions_mask,
+                next_available_actions=next_available_actions_tensor_with_padding,
+                next_unavailable_actions_mask=next_unavailable_actions_mask,
+                terminated=self._process_single_terminated(terminated),
+                truncated=self._process_single_truncated(truncated),
+                cost=self._process_single_cost(cost),
+            )
+        )
+
+    def _store_batch(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions_ids: Tensor | None,
+        next_available_actions_ids: Tensor | None,
+    ) -> None:
+        # whether a state reuses stored rows depends on the previous transition
+        self._store_batch_row_by_row(
+            batch, curr_available_actions_ids, next_available_actions_ids
+        )
+
+    def _gather_columns(self, indices: Tensor, names: list[str]) -> dict[str, Tensor]:
+        columns = super()._gather_columns(indices, names)
+        assert self._window_shape is not None
+        for name in ["state", "next_state"]:
+            window_ids = columns.get(name)
+            if window_ids is not None:
+                columns[name] = self._build_windows(window_ids).view(
+                    len(window_ids), *self._window_shape
+                )
+        return columns
+
+    def _build_windows(self, window_ids: Tensor) -> Tensor:
+        """
+        Builds windows of shape (batch_size, history_length, row_dim) from a tensor of
+        (last row id, first row id of the episode) pairs of shape (batch_size, 2).
+        """
+        last_row_ids, first_row_ids = window_ids[:, :1], window_ids[:, 1:]
+        # (batch_size, history_length), oldest row first
+        row_ids = last_row_ids + torch.arange(
+            1 - self._history_length, 1, device=window_ids.device
+        )
+        is_padding = (row_ids < first_row_ids).unsqueeze(-1)
+        rows = self._rows.get(row_ids)
+        return rows.masked_fill(is_padding.to(rows.device), 0.0)
+
+    def memory_footprint(self) -> dict[str, tuple[int, str]]:
+        footprint = super().memory_footprint()
+        footprint["rows"] = (self._rows.nbytes, str(self._rows.dtype))
+        return footprint
+
+    def clear(self) -> None:
+        super().clear()
+        self._rows.clear()
+        self._last_next_window = None
+        self._last_next_window_ids = None
+
+    def state_dict(self) -> dict[str, Any]:
+        state = super().state_dict()
+        state["rows"] = self._rows.state_dict()
+        state["window_shape"] = (
+            None if self._window_shape is None else list(self._window_shape)
+        )
+        state["last_next_window"] = self._last_next_window
+        state["last_next_window_ids"] = self._last_next_window_ids
+        return state
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        self._rows.load_state_dict(state_dict["rows"])
+        window_shape = state_dict["window_shape"]
+        self._window_shape = None if window_shape is None else torch.Size(window_shape)
+        self._last_next_window = state_dict["last_next_window"]
+        self._last_next_window_ids = state_dict["last_next_window_ids"]
+        self._rows_version_at_last_snapshot = self._rows.version
+
+    def _snapshot_state_dict(self, incremental: bool) -> dict[str, Any]:
+        state = super()._snapshot_state_dict(incremental)
+        if incremental and self._rows_version_at_last_snapshot is not None:
+            state["rows"] = self._rows.state_dict(
+                since_version=self._rows_version_at_last_snapshot
+            )
+        self._rows_version_at_last_snapshot = self._rows.version
+        return state
+
+    def _to_rows(self, window: Tensor) -> Tensor:
+        """Reshapes a window with a leading dimension of size 1 into its rows."""
+        window = window.squeeze(0)
+        if self._window_shape is None:
+            self._window_shape = window.shape
+        elif window.shape != self._window_shape:
+            raise ValueError(
+                f"States of shape {tuple(self._window_shape)} are stored "
+                f"but got a state of shape {tuple(window.shape)}"
+            )
+        return window.float().view(self._history_length, -1)
+
+    def _add_window(self, window: Tensor, keep_from: int) -> list[int]:
+        """
+        Writes the rows of a window that starts an episode, that is, its rows after
+        the leading zero padding, and returns its (last row id, first row id) pair.
+        """
+        is_row_used = window.any(dim=-1)
+        number_of_padding_rows = (
+            int(is_row_used.int().argmax().item())
+            if is_row_used.any()
+            else self._history_length
+        )
+        first_row_id = len(self._rows)
+        for row in window[number_of_padding_rows:]:
+            self._rows.add(row, keep_from)
+        return [len(self._rows) - 1, first_row_id]
+
+    def _first_used_row_id(self, window_ids: list[int]) -> int:
+        last_row_id, first_row_id = window_ids
+        return max(first_row_id, last_row_id - self._history_length + 1)
+
+    def _first_row_id_to_keep(self) -> int:
+        """
+        Returns the smallest row id used by the transitions that remain stored after
+        the next push. Row ids only grow along the buffer, so this is the first row
+        used by the state of the oldest surviving transition.
+        """
+        first_surviving_row = 1 if len(self.memory) == self.capacity else 0
+        if len(self.memory) <= first_surviving_row:
+            return len(self._rows)
+        physical_index = self.memory.logical_to_physical(
+            torch.tensor([first_surviving_row])
+        )
+        window_ids = self.memory.gather(physical_index, ["state"])["state"][0]
+        return self._first_used_row_id(window_ids.tolist())
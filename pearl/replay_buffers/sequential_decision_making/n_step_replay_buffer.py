@@ -0,0 +1,131 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+from collections import deque
+from typing import Any
+
+import torch
+from pearl.api.action import Action
+from pearl.api.action_space import ActionSpace
+from pearl.api.reward import Reward
+from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.basic_replay_buffer import BasicReplayBuffer
+from pearl.replay_buffers.replay_buffer import ReplayBuffer
+from pearl.replay_buffers.transition import Transition, TransitionBatch
+
+
+class NStepReplayBuffer(BasicReplayBuffer):
+    """
+    A replay buffer storing n-step transitions, for TD learners to bootstrap `n`
+    steps ahead instead of one.
+
+    The last `n` transitions of the current episode are kept in a rolling window.
+    Once the window is full, its first transition is stored with the discounted sum
+    of the `n` rewards as reward, and with the next state, next available actions,
+    terminated and truncated flags of the last transition of the window. At the end
+    of an episode, the remaining transitions are stored with the shorter windows
+    left. Each stored transition has a `discount` of `discount_factor ** k`, where
+    `k` is the number of steps it spans, which learners apply to the value of its
+    next state (see `get_discounts`).
+
+    Args:
+        capacity: Size of the replay buffer.
+        n: Number of steps of the stored transitions.
+        discount_factor: Discount factor used to sum rewards. It should be the
+            discount factor of the learner.
+    """
+
+    _requires_consecutive_transitions = True
+
+    def __init__(self, capacity: int, n: int = 3, discount_factor: float = 0.99) -> None:
+        super().__init__(capacity=capacity)
+        if n < 1:
+            raise ValueError(f"n must be positive but is {n}")
+        self._n = n
+        self._discount_factor = discount_factor
+        # the last transitions of the current episode, not stored yet
+        self._window: deque[Transition] = deque()
+
+    def push(
+        self,
+        state: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions: ActionSpace | None = None,
+        next_state: SubjectiveState | None = None,
+        next_available_actions: ActionSpace | None = None,
+        max_number_actions: int | None = None,
+        cost: float | None = None,
+    ) -> None:
+        if cost is not None:
+            raise ValueError(f"{type(self)} does not support costs")
+        curr_available_actions_ids, next_available_actions_ids = (
+            self._intern_available_actions(
+                curr_available_actions, next_available_actions, max_number_actions
+            )
+        )
+        self._window.append(
+            Transition(
+                state=self._process_non_optional_single_state(state),
+                action=self._process_single_action(action),
+                reward=self._process_single_reward(reward),
+                next_state=self._process_single_state(next_state),
+                curr_available_actions=curr_available_actions_ids,
+                next_available_actions=next_available_actions_ids,
+                terminated=self._process_single_terminated(terminated),
+                truncated=self._process_single_truncated(truncated),
+            )
+        )
+        if terminated or truncated:
+            while len(self._window) > 0:
+                self._store_first_transition_of_window()
+        elif len(self._window) == self._n:
+            self._store_first_transition_of_window()
+
+    def push_batch(self, batch: TransitionBatch) -> None:
+        # windows are built from consecutive transitions, one transition at a time
+        ReplayBuffer.push_batch(self, batch)
+
+    def clear(self) -> None:
+        super().clear()
+        self._window.clear()
+
+    def state_dict(self) -> dict[str, Any]:
+        state = super().state_dict()
+        state["window"] = [dict(transition.__dict__) for transition in self._window]
+        return state
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        self._window = deque(
+            Transition(**transition) for transition in state_dict["window"]
+        )
+
+    def _store_first_transition_of_window(self) -> None:
+        first, last = self._window[0], self._window[-1]
+        rewards = torch.cat([transition.reward for transition in self._window])
+        discounts = self._discount_factor ** torch.arange(
+            len(self._window), dtype=torch.float
+        )
+        self.memory.append(
+            Transition(
+                state=first.state,
+                action=first.action,
+                reward=(rewards * discounts.to(rewards.device)).sum().view(1),
+                next_state=last.next_state,
+                curr_available_actions=first.curr_available_actions,
+                next_available_actions=last.next_available_actions,
+                terminated=last.terminated,
+                truncated=last.truncated,
+                discount=torch.tensor([self._discount_factor ** len(self._window)]),
+            )
+        )
+        self._window.popleft()
@@ -0,0 +1,186 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+from typing import Any
+
+import torch
+from pearl.api.action import Action
+from pearl.api.reward import Reward
+from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.basic_replay_buffer import BasicReplayBuffer
+from pearl.replay_buffers.segment_tree import MinSegmentTree, SumSegmentTree
+from pearl.replay_buffers.transition import (
+    PrioritizedTransitionBatch,
+    TransitionBatch,
+)
+from torch import Tensor
+
+
+class PrioritizedReplayBuffer(BasicReplayBuffer):
+    r"""A replay buffer implementing proportional prioritized experience replay [1].
+
+    Transition `i` is sampled with probability `P(i) = p_i^alpha / sum_k p_k^alpha`,
+    where its priority `p_i` is the absolute TD error it had when it was last learned
+    from (plus a small `epsilon`). New transitions get the highest priority seen so far,
+    so that they are learned from at least once. Priorities are kept in a sum-tree, so
+    sampling and priority updates take O(log(capacity)) time per transition, and a batch
+    of updates is a single vectorized pass over the tree.
+
+    Sampled batches are `PrioritizedTransitionBatch`es whose `weight` field holds the
+    importance sampling weights `(N * P(i))^(-beta)`, normalized so that the largest
+    possible weight is 1, and whose `indices` field holds the positions of the sampled
+    transitions. Learners that support prioritized replay (such as `DeepTDLearning`
+    and `QuantileRegressionDeepTDLearning`) weight their losses with `weight` and set
+    `td_error` in `learn_batch`; `PolicyLearner.learn` then passes it to
+    `update_priorities`.
+
+    [1] Tom Schaul, John Quan, Ioannis Antonoglou and David Silver,
+        Prioritized experience replay. ICLR 2016. https://arxiv.org/abs/1511.05952.
+
+    Args:
+        capacity: Size of the replay buffer.
+        alpha: How much prioritization is used, 0 corresponding to uniform sampling.
+        beta: Exponent of the importance sampling correction, 1 corresponding to
+            full correction. It is commonly annealed towards 1 during training,
+            which can be done by setting the `beta` attribute.
+        epsilon: Constant added to absolute TD errors so that no transition has
+            zero probability of being sampled.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        alpha: float = 0.6,
+        beta: float = 0.4,
+        epsilon: float = 1e-6,
+    ) -> None:
+        super().__init__(capacity=capacity)
+        self._alpha = alpha
+        self.beta = beta
+        self._epsilon = epsilon
+        self._sum_tree = SumSegmentTree(capacity)
+        self._min_tree = MinSegmentTree(capacity)
+        self._max_priority = 1.0
+
+    def _store_transition(
+        self,
+        state: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions_tensor_with_padding: Tensor | None,
+        curr_unavailable_actions_mask: Tensor | None,
+        next_state: SubjectiveState | None,
+        next_available_actions_tensor_with_padding: Tensor | None,
+        next_unavailable_actions_mask: Tensor | None,
+        cost: float | None = None,
+    ) -> None:
+        super()._store_transition(
+            state,
+            action,
+            reward,
+            terminated,
+            truncated,
+            curr_available_actions_tensor_with_padding,
+            curr_unavailable_actions_mask,
+            next_state,
+            next_available_actions_tensor_with_padding,
+            next_unavailable_actions_mask,
+            cost,
+        )
+        indices = self.memory.written_indices
+        self._set_priorities(indices, torch.full((len(indices),), self._max_priority))
+
+    def _store_batch(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions_ids: Tensor | None,
+        next_available_actions_ids: Tensor | None,
+    ) -> None:
+        super()._store_batch(
+            batch, curr_available_actions_ids, next_available_actions_ids
+        )
+        indices = self.memory.written_indices
+        self._set_priorities(indices, torch.full((len(indices),), self._max_priority))
+
+    def sample(self, batch_size: int) -> PrioritizedTransitionBatch:
+        if batch_size > len(self):
+            raise ValueError(
+                f"Can't get a batch of size {batch_size} from a replay buffer with "
+                f"only {len(self)} elements"
+            )
+        indices = self._sample_indices(batch_size)
+        transition_batch = self._create_transition_batch(
+            indices=indices,
+            is_action_continuous=self._is_action_continuous,
+        )
+
+        # importance sampling weights, normalized by the largest possible weight,
+        # which is that of the transition with the lowest priority
+        total = self._sum_tree.reduce()
+        probabilities = self._sum_tree[indices] / total
+        min_probability = self._min_tree.reduce() / total
+        weights = (probabilities / min_probability) ** (-self.beta)
+
+        return PrioritizedTransitionBatch.without_validation(
+            **{**transition_batch.__dict__, "weight": weights.float()},
+            indices=indices,
+        ).to(self.device_for_batches)
+
+    def _sample_indices(self, batch_size: int) -> Tensor:
+        """
+        Draws `batch_size` indices proportionally to priorities, using one uniform
+        draw in each of `batch_size` equal segments of the total priority mass.
+        """
+        segment_length = self._sum_tree.reduce() / batch_size
+        prefix_sums = (
+            torch.arange(batch_size, dtype=torch.float64)
+            + torch.rand(batch_size, dtype=torch.float64)
+        ) * segment_length
+        indices = self._sum_tree.find_prefix_sum_index(prefix_sums)
+        # guards against rounding errors at the upper end of the total mass
+        return indices.clamp(max=len(self) - 1)
+
+    def update_priorities(self, indices: Tensor, td_errors: Tensor) -> None:
+        """
+        Sets the priorities of the transitions at `indices` (as given in a sampled
+        batch) to the absolute values of `td_errors`.
+        """
+        if indices.numel() == 0:
+            return
+        priorities = td_errors.detach().abs().view(-1).cpu().double() + self._epsilon
+        self._max_priority = max(self._max_priority, priorities.max().item())
+        self._set_priorities(indices.cpu(), priorities)
+
+    def _set_priorities(self, indices: Tensor, priorities: Tensor) -> None:
+        scaled_priorities = priorities.double() ** self._alpha
+        self._sum_tree.update(indices, scaled_priorities)
+        self._min_tree.update(indices, scaled_priorities)
+
+    def clear(self) -> None:
+        super().clear()
+        self._sum_tree.clear()
+        self._min_tree.clear()
+        self._max_priority = 1.0
+
+    def state_dict(self) -> dict[str, Any]:
+        state = super().state_dict()
+        state["sum_tree"] = self._sum_tree.state_dict()
+        state["min_tree"] = self._min_tree.state_dict()
+        state["max_priority"] = self._max_priority
+        state["beta"] = self.beta
+        return state
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        self._sum_tree.load_state_dict(state_dict["sum_tree"])
+        self._min_tree.load_state_dict(state_dict["min_tree"])
+        self._max_priority = state_dict["max_priority"]
+        self.beta = state_dict["beta"]
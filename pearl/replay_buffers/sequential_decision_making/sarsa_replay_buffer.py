@@ -7,13 +7,16 @@
 
 # pyre-strict
 
+from typing import Any
+
 import torch
 
 from pearl.api.action import Action
 from pearl.api.reward import Reward
 from pearl.api.state import SubjectiveState
 from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
-from pearl.replay_buffers.transition import Transition
+from pearl.replay_buffers.transition import Transition, TransitionBatch
+from pearl.utils.device import get_default_device
 from torch import Tensor
 
 
@@ -24,6 +27,8 @@ class SARSAReplayBuffer(TensorBasedReplayBuffer):
     that contains that information.
     """
 
+    _requires_consecutive_transitions = True
+
     def __init__(self, capacity: int) -> None:
         super().__init__(capacity)
         self.cache: Transition | None = None
@@ -101,3 +106,32 @@ class SARSAReplayBuffer(TensorBasedReplayBuffer):
                     truncated=self._process_single_truncated(truncated),
                 )
             )
+
+    def _store_batch(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions_ids: Tensor | None,
+        next_available_actions_ids: Tensor | None,
+    ) -> None:
+        # batches of complete SARSA tuples are stored directly; their next actions
+        # cannot be inferred across the rows of a batch
+        if batch.next_action is None:
+            raise ValueError(f"{type(self)} requires batches with next_action")
+        self.memory.append_batch(
+            self._transition_from_batch(
+                batch,
+                curr_available_actions_ids,
+                next_available_actions_ids,
+                next_action=batch.next_action.to(get_default_device()),
+            )
+        )
+
+    def state_dict(self) -> dict[str, Any]:
+        state = super().state_dict()
+        state["cache"] = None if self.cache is None else dict(self.cache.__dict__)
+        return state
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        cache = state_dict["cache"]
+        self.cache = None if cache is None else Transition(**cache)
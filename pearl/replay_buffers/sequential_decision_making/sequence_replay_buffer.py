@@ -0,0 +1,139 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import torch
+from pearl.replay_buffers.sequential_decision_making.history_replay_buffer import (
+    HistoryReplayBuffer,
+)
+from pearl.replay_buffers.transition import SequenceTransitionBatch
+from torch import Tensor
+
+
+class SequenceReplayBuffer(HistoryReplayBuffer):
+    """
+    A `HistoryReplayBuffer` sampling contiguous sub-trajectories of
+    `sequence_length` transitions instead of independent transitions, for recurrent
+    history summarization modules (see `LSTMHistorySummarizationModule`) to be
+    unrolled once per sequence rather than once per transition, as in R2D2
+    (https://openreview.net/pdf?id=r1lyTjAqYX).
+
+    Sampled batches are `SequenceTransitionBatch`es. Besides the state and next state
+    windows of every transition, they hold the rows of each sequence preceded by a
+    burn-in prefix of `burn_in` rows, over which the recurrent module is unrolled
+    without gradients to initialize its hidden state. Sequences are cut at the end of
+    their episode and of the replay buffer; the transitions past the cut are masked
+    out by `PolicyLearner.preprocess_batch`.
+
+    Args:
+        capacity: Size of the replay buffer.
+        history_length: The number of rows in a window.
+        sequence_length: The number of transitions of a sequence.
+        burn_in: The number of rows preceding the first state of a sequence that
+            are unrolled without gradients. Rows are only kept as long as a stored
+            window uses them, so it is at most `history_length - 1`, which is the
+            default.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        history_length: int,
+        sequence_length: int,
+        burn_in: int | None = None,
+    ) -> None:
+        super().__init__(capacity=capacity, history_length=history_length)
+        if burn_in is None:
+            burn_in = history_length - 1
+        if not 0 <= burn_in < history_length:
+            raise ValueError(
+                f"burn_in must be between 0 and history_length - 1 = "
+                f"{history_length - 1} but is {burn_in}"
+            )
+        if sequence_length < 1:
+            raise ValueError(
+                f"sequence_length must be positive but is {sequence_length}"
+            )
+        self._sequence_length = sequence_length
+        self._burn_in = burn_in
+
+    def sample(self, batch_size: int) -> SequenceTransitionBatch:
+        """
+        Samples `max(1, batch_size // sequence_length)` sequences, so that batches
+        hold about `batch_size` transitions, padding included.
+        """
+        if batch_size > len(self):
+            raise ValueError(
+                f"Can't get a batch of size {batch_size} from a replay buffer with "
+                f"only {len(self)} elements"
+            )
+        number_of_sequences = max(1, batch_size // self._sequence_length)
+        first_indices = torch.randint(len(self), (number_of_sequences, 1))
+        logical_indices = first_indices + torch.arange(self._sequence_length)
+        is_stored = logical_indices < len(self)
+        physical_indices = self.memory.logical_to_physical(
+            logical_indices.clamp(max=len(self) - 1).view(-1)
+        )
+
+        columns = self.memory.gather(
+            physical_indices, ["state", "next_state", "terminated", "truncated"]
+        )
+        shape = (number_of_sequences, self._sequence_length)
+        last_row_ids = columns["state"][:, 0].view(shape)
+        first_row_ids = columns["state"][:, 1].view(shape)
+        is_done = (columns["terminated"].bool() | columns["truncated"].bool()).view(
+            shape
+        )
+        # transitions continue the first transition of their sequence if their
+        # states and next states are its windows moved forward by one row per step
+        steps = torch.arange(self._sequence_length)
+        is_continuation = (
+            is_stored
+            & (first_row_ids == first_row_ids[:, :1])
+            & (last_row_ids == last_row_ids[:, :1] + steps)
+        )
+        next_state_ids = columns.get("next_state")
+        if next_state_ids is not None:
+            is_continuation &= (
+                next_state_ids[:, 1].view(shape) == first_row_ids[:, :1]
+            ) & (next_state_ids[:, 0].view(shape) == last_row_ids[:, :1] + steps + 1)
+        is_after_done = torch.cat(
+            [torch.zeros(number_of_sequences, 1, dtype=torch.bool), is_done[:, :-1]],
+            dim=1,
+        )
+        sequence_mask = (is_continuation & ~is_after_done).long().cummin(dim=1)[0]
+
+        batch = self._create_transition_batch(
+            indices=physical_indices, is_action_continuous=self._is_action_continuous
+        )
+        return SequenceTransitionBatch.without_validation(
+            **batch.__dict__,
+            sequence_rows=self._build_sequences(
+                last_row_ids[:, 0],
+                first_row_ids[:, 0],
+                number_of_steps=sequence_mask.sum(dim=1),
+            ),
+            sequence_mask=sequence_mask.bool(),
+        ).to(self.device_for_batches)
+
+    def _build_sequences(
+        self, last_row_ids: Tensor, first_row_ids: Tensor, number_of_steps: Tensor
+    ) -> Tensor:
+        """
+        Builds the rows of sequences of shape
+        (number_of_sequences, burn_in + sequence_length + 1, row_dim), given the ids
+        of the last row of their first state, of the first row of their episode, and
+        their numbers of unmasked transitions.
+        """
+        offsets = torch.arange(-self._burn_in, self._sequence_length + 1)
+        row_ids = last_row_ids.view(-1, 1) + offsets
+        is_padding = (row_ids < first_row_ids.view(-1, 1)) | (
+            offsets > number_of_steps.view(-1, 1)
+        )
+        rows = self._rows.get(row_ids.masked_fill(is_padding, 0))
+        return rows.masked_fill(is_padding.unsqueeze(-1).to(rows.device), 0.0)
@@ -0,0 +1,426 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import os
+import time
+from typing import Any
+
+import torch
+import torch.multiprocessing as mp
+from pearl.api.action_space import ActionSpace
+from pearl.replay_buffers.basic_replay_buffer import BasicReplayBuffer
+from pearl.replay_buffers.codecs import ByteCodec, Codec
+from pearl.replay_buffers.columnar_storage import ColumnarStorage
+from pearl.replay_buffers.eviction_policies import EvictionPolicy, FIFOEvictionPolicy
+from pearl.replay_buffers.interned_action_spaces import InternedActionSpaces
+from pearl.replay_buffers.transition import Transition
+from torch import Tensor
+
+
+def _check_owner(owner_pid: int, what: str) -> None:
+    if os.getpid() != owner_pid:
+        raise ValueError(
+            f"{what} must be allocated in the process that created the replay buffer, "
+            "before the buffer is shared with other processes: push a first "
+            "transition before starting them"
+        )
+
+
+class SharedMemoryColumnarStorage(ColumnarStorage):
+    """
+    A `ColumnarStorage` whose columns and write cursor live in shared memory, so that
+    a copy of the storage sent to another process (as an argument of a
+    `torch.multiprocessing` process) reads and writes the same rows without any
+    pickling or copying of transitions.
+
+    Columns are allocated on the CPU by the first write of their field, which must
+    happen in the process that created the storage, before it is shared: processes
+    only share the columns that existed when they received the storage. For the same
+    reason, column dtypes cannot be promoted. Only first-in-first-out eviction is
+    supported.
+
+    Processes append rows concurrently: `lock` is only held to reserve the rows of
+    an append, by advancing the write cursor, and the rows are then written without
+    it. Appends are committed (counted in `len`) in the order of their reservations,
+    so the rows of a storage that is not full are always completely written. Once
+    the storage is full, a row may be read while it is overwritten. Clearing,
+    loading and reading the state wait for the appends in progress while holding
+    `lock`.
+
+    Args:
+        capacity: Maximum number of rows stored.
+        lock: An inter-process lock, which must be reentrant.
+    """
+
+    def __init__(self, capacity: int, lock: Any) -> None:
+        # holds the row count, the write cursor, the version, and the numbers of rows
+        # reserved and committed by appends; created before the base class
+        # initializes them
+        self._cursor: Tensor = torch.zeros(6, dtype=torch.long).share_memory_()
+        self._owner_pid: int = os.getpid()
+        self._lock = lock
+        super().__init__(capacity)
+
+    @property
+    def _size(self) -> int:
+        return int(self._cursor[0].item())
+
+    @_size.setter
+    def _size(self, value: int) -> None:
+        self._cursor[0] = value
+
+    @property
+    def _next_index(self) -> int:
+        return int(self._cursor[1].item())
+
+    @_next_index.setter
+    def _next_index(self, value: int) -> None:
+        self._cursor[1] = value
+
+    @property
+    def _number_of_rows_written(self) -> int:
+        return int(self._cursor[2].item())
+
+    @_number_of_rows_written.setter
+    def _number_of_rows_written(self, value: int) -> None:
+        self._cursor[2] = value
+
+    @property
+    def _generation(self) -> int:
+        return int(self._cursor[3].item())
+
+    @_generation.setter
+    def _generation(self, value: int) -> None:
+        self._cursor[3] = value
+
+    def to(self, device: torch.device) -> None:
+        if torch.device(device).type != "cpu":
+            raise ValueError(f"{type(self).__name__} can only be stored on the CPU")
+        super().to(device)
+
+    def set_codec(self, name: str, codec: Codec | ByteCodec) -> None:
+        if isinstance(codec, ByteCodec):
+            # compressed rows are Python objects, which cannot be shared
+            raise ValueError(f"{type(self).__name__} does not support byte codecs")
+        super().set_codec(name, codec)
+
+    def set_eviction_policy(self, eviction_policy: EvictionPolicy) -> None:
+        if not isinstance(eviction_policy, FIFOEvictionPolicy):
+            # the state of the policy would not be shared by the writing processes
+            raise ValueError(
+                f"{type(self).__name__} only supports first-in-first-out eviction"
+            )
+        super().set_eviction_policy(eviction_policy)
+
+    def clear(self) -> None:
+        # the columns are kept, since other processes hold them
+        with self._lock:
+            self._wait_for_appends()
+            self._size = 0
+            self._next_index = 0
+            self._generation += 1
+
+    def state_dict(
+        self, since_version: tuple[int, int] | None = None
+    ) -> dict[str, Any]:
+        with self._lock:
+            self._wait_for_appends()
+            return super().state_dict(since_version)
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        with self._lock:
+            self._wait_for_appends()
+            super().load_state_dict(state_dict)
+
+    def _append_rows(self, transitions: Transition, number_of_rows: int) -> None:
+        values = self._values_to_append(transitions, number_of_rows)
+        # rows that would be overwritten by later rows of the same call are skipped
+        number_of_skipped_rows = max(0, number_of_rows - self.capacity)
+        number_of_written_rows = number_of_rows - number_of_skipped_rows
+        with self._lock:
+            reservation = int(self._cursor[4].item())
+            index = (self._next_index + number_of_skipped_rows) % self.capacity
+            self._next_index = (self._next_index + number_of_rows) % self.capacity
+            self._cursor[4] = reservation + number_of_rows
+        try:
+            for name, value in values.items():
+                self._write_rows(name, index, value[number_of_skipped_rows:])
+        finally:
+            # commits follow the order of reservations, and the reservation is
+            # committed even if writing failed, so that later appends do not wait
+            # forever; only the append whose turn it is updates the row count
+            while int(self._cursor[5].item()) != reservation:
+                time.sleep(0)
+            self._size = min(self._size + number_of_rows, self.capacity)
+            self._number_of_rows_written += number_of_rows
+            self._cursor[5] = reservation + number_of_rows
+        self._number_of_rows_last_written = number_of_written_rows
+        self._last_written_indices = (
+            index + torch.arange(number_of_written_rows)
+        ) % self.capacity
+
+    def _wait_for_appends(self) -> None:
+        """Waits for the appends in progress to commit, while holding the lock."""
+        while not torch.equal(self._cursor[4], self._cursor[5]):
+            time.sleep(0)
+
+    def _allocate_column(
+        self,
+        name: str,
+        row_shape: torch.Size,
+        dtype: torch.dtype,
+        device: torch.device,
+    ) -> Tensor:
+        _check_owner(self._owner_pid, f"Column {name}")
+        return torch.empty((self.capacity, *row_shape), dtype=dtype).share_memory_()
+
+    def _promote_column(self, name: str, dtype: torch.dtype) -> Tensor:
+        raise ValueError(
+            f"Column {name} stores values of dtype {self._columns[name].dtype} and "
+            f"cannot be promoted to {dtype} in shared memory"
+        )
+
+
+class SharedInternedActionSpaces(InternedActionSpaces):
+    """
+    An `InternedActionSpaces` table in shared memory, with room for
+    `max_number_of_action_spaces` sets of available actions.
+
+    Every process keeps its own lookup dictionaries, and adds the entries appended by
+    other processes to them before looking an action space up. Entries are appended
+    while holding `lock`. As with `SharedMemoryColumnarStorage`, the table is
+    allocated by the first action space interned, in the process that created it.
+
+    Args:
+        max_number_of_action_spaces: Maximum number of distinct sets of available
+            actions.
+        lock: An inter-process lock, which must be reentrant.
+    """
+
+    def __init__(self, max_number_of_action_spaces: int, lock: Any) -> None:
+        super().__init__()
+        self._max_number_of_action_spaces = max_number_of_action_spaces
+        self._lock = lock
+        # holds the number of entries and the number of times the table was cleared
+        self._count_and_generation: Tensor = torch.zeros(
+            2, dtype=torch.long
+        ).share_memory_()
+        # number of entries of the shared table in this process' dictionaries, and the
+        # generation they belong to
+        self._number_of_synced_entries = 0
+        self._synced_generation = 0
+        self._owner_pid: int = os.getpid()
+
+    def __len__(self) -> int:
+        return int(self._count_and_generation[0].item())
+
+    def get_id(self, action_space: ActionSpace, max_number_actions: int) -> int | None:
+        self._sync()
+        return super().get_id(action_space, max_number_actions)
+
+    def intern_batch(
+        self,
+        available_actions_with_padding: Tensor,
+        unavailable_actions_mask: Tensor,
+    ) -> Tensor:
+        self._sync()
+        return super().intern_batch(
+            available_actions_with_padding, unavailable_actions_mask
+        )
+
+    def get(self, ids: Tensor) -> tuple[Tensor, Tensor]:
+        assert self._actions is not None and self._unavailable_actions_masks is not None
+        if len(self) == 1:
+            return (
+                self._actions[0].expand(len(ids), -1, -1),
+                self._unavailable_actions_masks[0].expand(len(ids), -1),
+            )
+        return (
+            self._actions.index_select(0, ids),
+            self._unavailable_actions_masks.index_select(0, ids),
+        )
+
+    def clear(self) -> None:
+        # the table is kept, since other processes hold it; they notice the new
+        # generation and clear their dictionaries
+        with self._lock:
+            self._count_and_generation[0] = 0
+            self._count_and_generation[1] += 1
+            self._sync()
+
+    def state_dict(self) -> dict[str, Tensor | None]:
+        # only the entries in use of the preallocated table
+        number_of_entries = len(self)
+        return {
+            "actions": None
+            if self._actions is None or number_of_entries == 0
+            else self._actions[:number_of_entries],
+            "unavailable_actions_masks": None
+            if self._unavailable_actions_masks is None or number_of_entries == 0
+            else self._unavailable_actions_masks[:number_of_entries],
+        }
+
+    def load_state_dict(self, state_dict: dict[str, Tensor | None]) -> None:
+        self.clear()
+        actions = state_dict["actions"]
+        unavailable_actions_masks = state_dict["unavailable_actions_masks"]
+        if actions is None or unavailable_actions_masks is None:
+            return
+        # entries are written into the shared table, which other processes sync from
+        max_number_actions = actions.shape[1]
+        for available_actions, mask in zip(actions, unavailable_actions_masks):
+            self._add_tensors(
+                self._actions_key(max_number_actions, available_actions[~mask]),
+                available_actions,
+                mask,
+            )
+
+    def _add_tensors(
+        self,
+        key: tuple[int, tuple[int, ...], bytes],
+        available_actions_with_padding: Tensor,
+        unavailable_actions_mask: Tensor,
+    ) -> int:
+        with self._lock:
+            # another process may have added the same entry since the lookup
+            self._sync()
+            interned_id = self._ids_by_content.get(key)
+            if interned_id is not None:
+                return interned_id
+            return self._append_entry(
+                key, available_actions_with_padding, unavailable_actions_mask
+            )
+
+    def _append_entry(
+        self,
+        key: tuple[int, tuple[int, ...], bytes],
+        available_actions_with_padding: Tensor,
+        unavailable_actions_mask: Tensor,
+    ) -> int:
+        if self._actions is None or self._unavailable_actions_masks is None:
+            _check_owner(self._owner_pid, "The table of available actions")
+            self._actions = torch.empty(
+                (
+                    self._max_number_of_action_spaces,
+                    *available_actions_with_padding.shape,
+                ),
+                dtype=available_actions_with_padding.dtype,
+            ).share_memory_()
+            self._unavailable_actions_masks = torch.empty(
+                (self._max_number_of_action_spaces, *unavailable_actions_mask.shape),
+                dtype=unavailable_actions_mask.dtype,
+            ).share_memory_()
+        elif available_actions_with_padding.shape != self._actions.shape[1:]:
+            raise ValueError(
+                "Available actions of shape "
+                f"{tuple(available_actions_with_padding.shape)} cannot be stored "
+                "with available actions of shape "
+                f"{tuple(self._actions.shape[1:])}; max_number_actions and the "
+                "action dimension must not change"
+            )
+        interned_id = len(self)
+        if interned_id == self._max_number_of_action_spaces:
+            raise ValueError(
+                f"More than {self._max_number_of_action_spaces} distinct sets of "
+                "available actions cannot be stored"
+            )
+        self._actions[interned_id] = available_actions_with_padding
+        self._unavailable_actions_masks[interned_id] = unavailable_actions_mask
+        self._count_and_generation[0] = interned_id + 1
+        self._ids_by_content[key] = interned_id
+        self._number_of_synced_entries = interned_id + 1
+        return interned_id
+
+    def _sync(self) -> None:
+        """Adds the entries appended by other processes to the lookup dictionaries."""
+        generation = int(self._count_and_generation[1].item())
+        if generation != self._synced_generation:
+            self._ids_by_content = {}
+            self._ids_by_object = {}
+            self._number_of_synced_entries = 0
+            self._synced_generation = generation
+        number_of_entries = len(self)
+        if self._number_of_synced_entries == number_of_entries:
+            return
+        assert self._actions is not None and self._unavailable_actions_masks is not None
+        # available actions come first in the padded tensors
+        max_number_actions = self._actions.shape[1]
+        for interned_id in range(self._number_of_synced_entries, number_of_entries):
+            mask = self._unavailable_actions_masks[interned_id]
+            key = self._actions_key(
+                max_number_actions, self._actions[interned_id][~mask]
+            )
+            self._ids_by_content[key] = interned_id
+        self._number_of_synced_entries = number_of_entries
+
+
+class SharedMemoryReplayBuffer(BasicReplayBuffer):
+    """
+    A `BasicReplayBuffer` stored in shared memory, so that several actor processes
+    can push transitions while a learner process samples them.
+
+    Transitions and interned available actions are stored in
+    `SharedMemoryColumnarStorage` and `SharedInternedActionSpaces`, which share a
+    single inter-process lock. Pushes only hold it to reserve their rows (and to
+    intern new sets of available actions), and write their rows without it, so
+    actors do not wait for each other's writes. Samples never take it: they draw
+    rows among the ones already committed and gather them while other processes
+    keep pushing. Clearing, loading and snapshots hold the lock for their whole
+    duration.
+
+    The buffer is shared by passing it as an argument to `torch.multiprocessing`
+    processes. At least one transition must be pushed before starting them, so that
+    the columns are allocated (see `SharedMemoryColumnarStorage`).
+
+    Args:
+        capacity: Size of the replay buffer.
+        max_number_of_action_spaces: Maximum number of distinct sets of available
+            actions of discrete action spaces.
+        context: The multiprocessing context the lock is created in. The processes
+            sharing the buffer must be started with a compatible start method: a
+            lock created in the "fork" context cannot be sent to processes started
+            with "spawn" or "forkserver". Defaults to the "spawn" context, whose
+            locks can be shared with processes of any start method.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        max_number_of_action_spaces: int = 1024,
+        context: Any = None,
+    ) -> None:
+        super().__init__(capacity=capacity)
+        if context is None:
+            context = mp.get_context("spawn")
+        # reentrant, so that snapshots can be taken while holding it
+        self._lock: Any = context.RLock()
+        self.memory: SharedMemoryColumnarStorage = SharedMemoryColumnarStorage(
+            capacity, self._lock
+        )
+        self._action_spaces: SharedInternedActionSpaces = SharedInternedActionSpaces(
+            max_number_of_action_spaces, self._lock
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+
+    def state_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return super().state_dict()
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        with self._lock:
+            super().load_state_dict(state_dict)
+
+    def _take_snapshot(self, incremental: bool, copy: bool) -> dict[str, Any]:
+        # other processes keep writing to the shared tensors once the lock is
+        # released, so snapshots are always copied while holding it
+        with self._lock:
+            return super()._take_snapshot(incremental, copy=True)
@@ -8,9 +8,7 @@
 # pyre-strict
 
 import random
-
-from collections import deque
-from typing import Deque
+from typing import Any
 
 import torch
 
@@ -18,6 +16,10 @@ from pearl.api.action import Action
 from pearl.api.action_space import ActionSpace
 from pearl.api.reward import Reward
 from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.codecs import ByteCodec, Codec
+from pearl.replay_buffers.columnar_storage import ColumnarStorage
+from pearl.replay_buffers.eviction_policies import EvictionPolicy, FIFOEvictionPolicy
+from pearl.replay_buffers.interned_action_spaces import InternedActionSpaces
 from pearl.replay_buffers.replay_buffer import ReplayBuffer
 from pearl.replay_buffers.transition import Transition, TransitionBatch
 from pearl.utils.device import get_default_device
@@ -26,15 +28,51 @@ from torch import Tensor
 
 
 class TensorBasedReplayBuffer(ReplayBuffer):
+    """
+    A replay buffer storing transitions in a `ColumnarStorage`, that is,
+    one preallocated tensor per transition field, filled as a circular buffer.
+    Subclasses implement `_store_transition` to append transitions to `self.memory`.
+
+    Sampling draws row indices and gathers each column with a single `index_select`,
+    so the costs of `push` and `sample` do not depend on the number of stored transitions.
+
+    For discrete action spaces, each distinct set of available actions is stored once
+    in an `InternedActionSpaces` table. `push` passes the ids of the current and next
+    available actions to `_store_transition` in place of the padded available actions
+    (and None in place of the masks); the padded tensors and masks are rebuilt from
+    the ids in `_gather_columns`.
+
+    If the replay buffer is device resident (see `device_resident`), transitions are
+    stored on `device_for_batches` rather than on the CPU, so that sampling gathers
+    rows on that device and batches need not be copied.
+
+    Once the replay buffer is full, new transitions overwrite the oldest ones, unless
+    another eviction policy is set with `set_eviction_policy`.
+
+    Args:
+        capacity: Size of the replay buffer.
+        device_resident: Whether transitions are stored on `device_for_batches`.
+    """
+
+    # whether stored rows refer to the rows stored before them, which eviction
+    # policies other than first-in-first-out would overwrite out of order
+    _requires_insertion_order: bool = False
+
     def __init__(
         self,
         capacity: int,
+        device_resident: bool = False,
     ) -> None:
         super().__init__()
         self.capacity = capacity
-        # TODO: we want a unifying transition type
-        self.memory: Deque[Transition | TransitionBatch] = deque([], maxlen=capacity)
+        self.memory: ColumnarStorage = ColumnarStorage(capacity)
+        self._action_spaces = InternedActionSpaces()
         self._device_for_batches: torch.device = get_default_device()
+        self._device_resident = False
+        if device_resident:
+            self.device_resident = True
+        # the version of the storage when the last snapshot was taken or loaded
+        self._version_at_last_snapshot: tuple[int, int] | None = None
 
     def _store_transition(
         self,
@@ -68,59 +106,12 @@ class TensorBasedReplayBuffer(ReplayBuffer):
         max_number_actions: int | None = None,
         cost: float | None = None,
     ) -> None:
-        if self._is_action_continuous:
-            (
-                curr_available_actions_tensor_with_padding,
-                curr_unavailable_actions_mask,
-                next_available_actions_tensor_with_padding,
-                next_unavailable_actions_mask,
-            ) = (
-                None,
-                None,
-                None,
-                None,
-            )
-        else:
-            # If the action space is discrete and max_number_actions is not specified,
-            # then we assume that the size of the action space does not change over time
-            # and use this size as max_number_actions.
-            if max_number_actions is None:
-                assert isinstance(curr_available_actions, DiscreteActionSpace)
-                max_number_actions = curr_available_actions.n
-            (
-                curr_available_actions_tensor_with_padding,
-                curr_unavailable_actions_mask,
-            ) = self.create_action_tensor_and_mask(
-                max_number_actions, curr_available_actions
-            )
-
-            (
-                next_available_actions_tensor_with_padding,
-                next_unavailable_actions_mask,
-            ) = self.create_action_tensor_and_mask(
-                max_number_actions, next_available_actions
-            )
-
-            # Transitions require a "batch" dimension in the tensors,
-            # so we add a dimension of size 1.
-            if curr_available_actions_tensor_with_padding is not None:
-                curr_available_actions_tensor_with_padding = (
-                    curr_available_actions_tensor_with_padding.unsqueeze(0)
-                )
-            if curr_unavailable_actions_mask is not None:
-                curr_unavailable_actions_mask = curr_unavailable_actions_mask.unsqueeze(
-                    0
-                )
-
-            if next_available_actions_tensor_with_padding is not None:
-                next_available_actions_tensor_with_padding = (
-                    next_available_actions_tensor_with_padding.unsqueeze(0)
-                )
-            if next_unavailable_actions_mask is not None:
-                next_unavailable_actions_mask = next_unavailable_actions_mask.unsqueeze(
-                    0
-                )
-
+        (
+            curr_available_actions_tensor_with_padding,
+            next_available_actions_tensor_with_padding,
+        ) = self._intern_available_actions(
+            curr_available_actions, next_available_actions, max_number_actions
+        )
         self._store_transition(
             state,
             action,
@@ -128,13 +119,164 @@ class TensorBasedReplayBuffer(ReplayBuffer):
             terminated,
             truncated,
             curr_available_actions_tensor_with_padding,
-            curr_unavailable_actions_mask,
+            None,
             next_state,
             next_available_actions_tensor_with_padding,
-            next_unavailable_actions_mask,
+            None,
             cost,
         )
 
+    def _intern_available_actions(
+        self,
+        curr_available_actions: ActionSpace | None,
+        next_available_actions: ActionSpace | None,
+        max_number_actions: int | None,
+    ) -> tuple[Tensor | None, Tensor | None]:
+        """
+        Returns the interned ids of the current and next available actions of a
+        transition, each of shape (1,), or None for continuous action spaces.
+        """
+        if self._is_action_continuous:
+            return None, None
+        # If the action space is discrete and max_number_actions is not specified,
+        # then we assume that the size of the action space does not change over time
+        # and use this size as max_number_actions.
+        if max_number_actions is None:
+            assert isinstance(curr_available_actions, DiscreteActionSpace)
+            max_number_actions = curr_available_actions.n
+        # Available actions are interned: transitions store the ids of their
+        # action spaces in the available actions fields (with a leading "batch"
+        # dimension of size 1), and the masks are rebuilt from the ids as well.
+        return (
+            self._intern_action_space(curr_available_actions, max_number_actions),
+            self._intern_action_space(next_available_actions, max_number_actions),
+        )
+
+    def _store_batch(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions_ids: Tensor | None,
+        next_available_actions_ids: Tensor | None,
+    ) -> None:
+        """
+        Implements the way the replay buffer stores a batch of transitions, given with
+        the interned ids of their current and next available actions.
+        """
+        raise NotImplementedError(f"{type(self)} has not implemented _store_batch")
+
+    def push_batch(self, batch: TransitionBatch) -> None:
+        """
+        Saves a batch of transitions with a constant number of tensor operations
+        (see `ReplayBuffer.push_batch`). The available actions of each distinct
+        action space of the batch are interned once.
+        """
+        if self._is_action_continuous:
+            curr_available_actions_ids, next_available_actions_ids = None, None
+        else:
+            curr_available_actions_ids = self._intern_action_space_batch(
+                batch.curr_available_actions, batch.curr_unavailable_actions_mask
+            )
+            next_available_actions_ids = self._intern_action_space_batch(
+                batch.next_available_actions, batch.next_unavailable_actions_mask
+            )
+        self._store_batch(batch, curr_available_actions_ids, next_available_actions_ids)
+
+    def _intern_action_space_batch(
+        self,
+        available_actions_with_padding: Tensor | None,
+        unavailable_actions_mask: Tensor | None,
+    ) -> Tensor | None:
+        if available_actions_with_padding is None:
+            return None
+        if unavailable_actions_mask is None:
+            unavailable_actions_mask = torch.zeros(
+                available_actions_with_padding.shape[:2], dtype=torch.bool
+            )
+        return self._action_spaces.intern_batch(
+            available_actions_with_padding, unavailable_actions_mask
+        )
+
+    def _transition_from_batch(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions_ids: Tensor | None,
+        next_available_actions_ids: Tensor | None,
+        transition_type: type[Transition] = Transition,
+        **kwargs: Tensor | None,
+    ) -> Transition:
+        """
+        Returns a transition of `transition_type` holding all rows of a batch, in the
+        format in which `push` stores single transitions. Fields that `push` does not
+        store, such as `next_action`, are only set if given in `kwargs`.
+        """
+        device = get_default_device()
+        return transition_type(
+            state=batch.state.to(device),
+            action=batch.action.to(device),
+            reward=_as_column(batch.reward),
+            next_state=(
+                None if batch.next_state is None else batch.next_state.to(device)
+            ),
+            curr_available_actions=curr_available_actions_ids,
+            next_available_actions=next_available_actions_ids,
+            terminated=_as_column(batch.terminated),
+            truncated=_as_column(batch.truncated),
+            cost=None if batch.cost is None else _as_column(batch.cost),
+            discount=None if batch.discount is None else _as_column(batch.discount),
+            **kwargs,
+        )
+
+    def _store_batch_row_by_row(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions_ids: Tensor | None,
+        next_available_actions_ids: Tensor | None,
+    ) -> None:
+        """
+        Stores a batch with one `_store_transition` call per row, for replay buffers
+        whose storage of a transition depends on the transitions stored before it.
+        """
+        for i in range(len(batch.reward)):
+            self._store_transition(
+                state=batch.state[i],
+                action=batch.action[i],
+                reward=batch.reward[i].item(),
+                terminated=bool(batch.terminated[i].item()),
+                truncated=bool(batch.truncated[i].item()),
+                curr_available_actions_tensor_with_padding=_row(
+                    curr_available_actions_ids, i
+                ),
+                curr_unavailable_actions_mask=None,
+                next_state=None if batch.next_state is None else batch.next_state[i],
+                next_available_actions_tensor_with_padding=_row(
+                    next_available_actions_ids, i
+                ),
+                next_unavailable_actions_mask=None,
+                cost=None if batch.cost is None else batch.cost[i].item(),
+            )
+
+    def _intern_action_space(
+        self, action_space: ActionSpace | None, max_number_actions: int
+    ) -> Tensor | None:
+        """Returns the interned id of an action space, as a tensor of shape (1,)."""
+        if action_space is None:
+            return None
+        interned_id = self._action_spaces.get_id(action_space, max_number_actions)
+        if interned_id is None:
+            (
+                available_actions_tensor_with_padding,
+                unavailable_actions_mask,
+            ) = self.create_action_tensor_and_mask(max_number_actions, action_space)
+            assert available_actions_tensor_with_padding is not None
+            assert unavailable_actions_mask is not None
+            interned_id = self._action_spaces.add(
+                action_space,
+                max_number_actions,
+                available_actions_tensor_with_padding,
+                unavailable_actions_mask,
+            )
+        return torch.tensor([interned_id])
+
     @property
     def device_for_batches(self) -> torch.device:
         return self._device_for_batches
@@ -142,6 +284,30 @@ class TensorBasedReplayBuffer(ReplayBuffer):
     @device_for_batches.setter
     def device_for_batches(self, new_device_for_batches: torch.device) -> None:
         self._device_for_batches = new_device_for_batches
+        if self._device_resident:
+            self._move_storage(new_device_for_batches)
+
+    @property
+    def device_resident(self) -> bool:
+        """
+        Whether transitions are stored on `device_for_batches`, such as an accelerator
+        the learner runs on, instead of the CPU. Rows are then written to device
+        tensors by `push`, sampled rows are gathered on the device, and
+        `TransitionBatch.to(device_for_batches)` is a no-op. This is worthwhile when
+        the replay buffer fits in the memory of the device, and behaves identically
+        on the CPU. Stored transitions are moved when this or `device_for_batches`
+        changes.
+        """
+        return self._device_resident
+
+    @device_resident.setter
+    def device_resident(self, value: bool) -> None:
+        self._device_resident = value
+        self._move_storage(self._device_for_batches if value else get_default_device())
+
+    def _move_storage(self, device: torch.device) -> None:
+        self.memory.to(device)
+        self._action_spaces.to(device)
 
     def _process_single_state(
         self, state: SubjectiveState | None
@@ -276,27 +442,107 @@ class TensorBasedReplayBuffer(ReplayBuffer):
                 f"Can't get a batch of size {batch_size} from a replay buffer with "
                 f"only {len(self)} elements"
             )
-        samples = random.sample(self.memory, batch_size)
         return self._create_transition_batch(
-            # pyre-fixme[6]: For 1st argument expected `List[Transition]` but got
-            #  `List[Union[Transition, TransitionBatch]]`.
-            transitions=samples,
+            indices=self._sample_indices(batch_size),
             is_action_continuous=self._is_action_continuous,
         )
 
+    def _sample_indices(self, batch_size: int) -> Tensor:
+        """
+        Draws `batch_size` distinct physical indices of stored transitions,
+        uniformly at random, in time independent of the size of the buffer.
+        """
+        return torch.tensor(
+            random.sample(range(len(self)), batch_size), dtype=torch.long
+        )
+
     def __len__(self) -> int:
         return len(self.memory)
 
+    def set_codecs(self, codecs: dict[str, Codec | ByteCodec]) -> None:
+        """
+        Stores transition fields encoded by codecs (see `pearl.replay_buffers.codecs`),
+        for instance `{"state": QuantizedCodec(), "next_state": QuantizedCodec()}` to
+        store pixel observations as bytes. This must be done before transitions are
+        pushed.
+
+        Codecs apply to the columns of `self.memory`, which hold ids rather than
+        observations in replay buffers deduplicating observations (such as
+        `FrameDeduplicatedReplayBuffer`). Rows are decoded when batches are sampled,
+        which `PrefetchingReplayBuffer` moves to a background thread.
+
+        Args:
+            codecs: Maps the names of `Transition` fields to their codecs.
+        """
+        for name, codec in codecs.items():
+            self.memory.set_codec(name, codec)
+
+    def set_eviction_policy(self, eviction_policy: EvictionPolicy) -> None:
+        """
+        Sets the policy choosing the transitions that new transitions overwrite once
+        the replay buffer is full (see `pearl.replay_buffers.eviction_policies`), for
+        instance `ReservoirEvictionPolicy()` to keep a uniform sample of all pushed
+        transitions. This must be done before transitions are pushed.
+
+        Replay buffers whose transitions refer to the transitions pushed before them
+        (such as `HistoryReplayBuffer`) only support first-in-first-out eviction.
+        """
+        if self._requires_insertion_order and not isinstance(
+            eviction_policy, FIFOEvictionPolicy
+        ):
+            raise ValueError(
+                f"{type(self).__name__} only supports first-in-first-out eviction"
+            )
+        self.memory.set_eviction_policy(eviction_policy)
+
+    def memory_footprint(self) -> dict[str, tuple[int, str]]:
+        footprint = self.memory.memory_footprint()
+        for name, value in self._action_spaces.memory_footprint().items():
+            footprint[f"action_spaces/{name}"] = value
+        return footprint
+
+    @property
+    def occupancy(self) -> float:
+        return len(self) / self.capacity
+
     def clear(self) -> None:
-        self.memory = deque([], maxlen=self.capacity)
+        self.memory.clear()
+        self._action_spaces.clear()
+
+    def state_dict(self) -> dict[str, Any]:
+        return {
+            "memory": self.memory.state_dict(),
+            "action_spaces": self._action_spaces.state_dict(),
+            "is_action_continuous": self._is_action_continuous,
+        }
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        self.memory.load_state_dict(state_dict["memory"])
+        self._action_spaces.load_state_dict(state_dict["action_spaces"])
+        self._is_action_continuous = state_dict["is_action_continuous"]
+        self._version_at_last_snapshot = self.memory.version
+
+    def _snapshot_state_dict(self, incremental: bool) -> dict[str, Any]:
+        # transitions are the bulk of the state: incremental snapshots only hold the
+        # rows appended since the last snapshot, and the rest of the state in full
+        state = self.state_dict()
+        if incremental and self._version_at_last_snapshot is not None:
+            state["memory"] = self.memory.state_dict(
+                since_version=self._version_at_last_snapshot
+            )
+        self._version_at_last_snapshot = self.memory.version
+        return state
 
     def _create_transition_batch(
         self,
-        transitions: list[Transition],
+        indices: Tensor,
         is_action_continuous: bool,
     ) -> TransitionBatch:
-        if len(transitions) == 0:
-            return TransitionBatch(
+        """
+        Creates a batch from the transitions stored at the given physical indices.
+        """
+        if len(indices) == 0:
+            return TransitionBatch.without_validation(
                 state=torch.empty(0),
                 action=torch.empty(0),
                 reward=torch.empty(0),
@@ -311,86 +557,84 @@ class TensorBasedReplayBuffer(ReplayBuffer):
                 cost=torch.empty(0),
             ).to(self.device_for_batches)
 
-        has_next_state = transitions[0].next_state is not None
-        has_next_action = transitions[0].next_action is not None
-        has_curr_available_actions = transitions[0].curr_available_actions is not None
-        has_next_available_actions = transitions[0].next_available_actions is not None
-        has_cost_available = transitions[0].cost is not None
-
-        state_list = []
-        action_list = []
-        reward_list = []
-        cost_list = []
-        terminated_list = []
-        truncated_list = []
-        next_state_list = []
-        next_action_list = []
-        curr_available_actions_list = []
-        curr_unavailable_actions_mask_list = []
-        next_available_actions_list = []
-        next_unavailable_actions_mask_list = []
-        for x in transitions:
-            state_list.append(x.state)
-            action_list.append(x.action)
-            reward_list.append(x.reward)
-            terminated_list.append(x.terminated)
-            truncated_list.append(x.truncated)
-            if has_cost_available:
-                cost_list.append(x.cost)
-            if has_next_state:
-                next_state_list.append(x.next_state)
-            if has_next_action:
-                next_action_list.append(x.next_action)
-            if not is_action_continuous and has_curr_available_actions:
-                curr_available_actions_list.append(x.curr_available_actions)
-                curr_unavailable_actions_mask_list.append(
-                    x.curr_unavailable_actions_mask
-                )
-
-            if not is_action_continuous and has_next_available_actions:
-                next_available_actions_list.append(x.next_available_actions)
-                next_unavailable_actions_mask_list.append(
-                    x.next_unavailable_actions_mask
-                )
-
-        state_batch = torch.cat(state_list).type(torch.float32)
-        action_batch = torch.cat(action_list)
-        reward_batch = torch.cat(reward_list)
-        terminated_batch = torch.cat(terminated_list)
-        truncated_batch = torch.cat(truncated_list)
-        if has_cost_available:
-            cost_batch = torch.cat(cost_list)
-        else:
-            cost_batch = None
-        next_state_batch, next_action_batch = None, None
-        if has_next_state:
-            next_state_batch = torch.cat(next_state_list).type(torch.float32)
-        if has_next_action:
-            next_action_batch = torch.cat(next_action_list)
-        curr_available_actions_batch, curr_unavailable_actions_mask_batch = None, None
-        if not is_action_continuous and has_curr_available_actions:
-            curr_available_actions_batch = torch.cat(curr_available_actions_list)
-            curr_unavailable_actions_mask_batch = torch.cat(
-                curr_unavailable_actions_mask_list
-            )
+        names = [
+            "state",
+            "action",
+            "reward",
+            "terminated",
+            "truncated",
+            "next_state",
+            "next_action",
+            "cost",
+            "discount",
+        ]
+        if not is_action_continuous:
+            names += [
+                "curr_available_actions",
+                "curr_unavailable_actions_mask",
+                "next_available_actions",
+                "next_unavailable_actions_mask",
+            ]
+        columns = self._gather_columns(indices, names)
+
+        next_state_batch = columns.get("next_state")
+        if next_state_batch is not None:
+            next_state_batch = next_state_batch.type(torch.float32)
+        batch = TransitionBatch.without_validation(
+            state=columns["state"].type(torch.float32),
+            action=columns["action"],
+            reward=columns["reward"],
+            next_state=next_state_batch,
+            next_action=columns.get("next_action"),
+            curr_available_actions=columns.get("curr_available_actions"),
+            curr_unavailable_actions_mask=columns.get("curr_unavailable_actions_mask"),
+            next_available_actions=columns.get("next_available_actions"),
+            next_unavailable_actions_mask=columns.get("next_unavailable_actions_mask"),
+            terminated=columns["terminated"],
+            truncated=columns["truncated"],
+            cost=columns.get("cost"),
+            discount=columns.get("discount"),
+        )
+        return self._to_device_for_batches(batch)
 
-        next_available_actions_batch, next_unavailable_actions_mask_batch = None, None
-        if not is_action_continuous and has_next_available_actions:
-            next_available_actions_batch = torch.cat(next_available_actions_list)
-            next_unavailable_actions_mask_batch = torch.cat(
-                next_unavailable_actions_mask_list
+    def _to_device_for_batches(self, batch: TransitionBatch) -> TransitionBatch:
+        """
+        Moves a batch gathered from the storage to `device_for_batches`. Batches
+        gathered on the CPU for another device are packed first (in pinned memory for
+        a CUDA device), so that they are moved with a single copy.
+        """
+        device = self.device_for_batches
+        if batch.device.type == "cpu" and device.type != "cpu":
+            batch = batch.pack(
+                pin_memory=device.type == "cuda" and torch.cuda.is_available()
             )
-        return TransitionBatch(
-            state=state_batch,
-            action=action_batch,
-            reward=reward_batch,
-            next_state=next_state_batch,
-            next_action=next_action_batch,
-            curr_available_actions=curr_available_actions_batch,
-            curr_unavailable_actions_mask=curr_unavailable_actions_mask_batch,
-            next_available_actions=next_available_actions_batch,
-            next_unavailable_actions_mask=next_unavailable_actions_mask_batch,
-            terminated=terminated_batch,
-            truncated=truncated_batch,
-            cost=cost_batch,
-        ).to(self.device_for_batches)
+        return batch.to(device)
+
+    def _gather_columns(self, indices: Tensor, names: list[str]) -> dict[str, Tensor]:
+        """
+        Returns the columns `names` at the given physical indices, as they will appear
+        in batches (before states are cast to float). Subclasses that store some
+        fields in an encoded form override this to decode them.
+        """
+        columns = self.memory.gather(indices, names)
+        for prefix in ["curr", "next"]:
+            interned_ids = columns.get(f"{prefix}_available_actions")
+            if interned_ids is not None:
+                (
+                    columns[f"{prefix}_available_actions"],
+                    columns[f"{prefix}_unavailable_actions_mask"],
+                ) = self._action_spaces.get(interned_ids)
+        return columns
+
+
+def _as_column(values: Tensor) -> Tensor:
+    """
+    Returns per-transition scalars of shape (batch_size,) or (batch_size, 1) with shape
+    (batch_size,), as they are stored by `push`.
+    """
+    return values.view(-1) if values.ndim == 2 and values.shape[1] == 1 else values
+
+
+def _row(values: Tensor | None, index: int) -> Tensor | None:
+    """Returns row `index` of `values` with a leading dimension of size 1."""
+    return None if values is None else values[index : index + 1]
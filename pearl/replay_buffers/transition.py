@@ -7,9 +7,10 @@
 
 # pyre-strict
 
+import copy
 import dataclasses
-from dataclasses import dataclass, field
-from typing import cast, Final, TypeVar
+from dataclasses import dataclass, field, MISSING
+from typing import Any, cast, Final, TypeVar
 
 import torch
 from torch import Tensor
@@ -42,6 +43,8 @@ class Transition:
             representing mask for next unavailable actions.
         weight (torch.Tensor | None): Tensor of shape (1) representing the weight of the transition.
         cost (torch.Tensor | None): Tensor of shape (1); the cost associated with the transition.
+        discount (torch.Tensor | None): Tensor of shape (1); the discount applied to the
+            value of next_state, for transitions spanning several steps.
     """
 
     state: torch.Tensor
@@ -57,6 +60,7 @@ class Transition:
     next_unavailable_actions_mask: torch.Tensor | None = None
     weight: torch.Tensor | None = None
     cost: torch.Tensor | None = None
+    discount: torch.Tensor | None = None
 
     def to(self: T, device: torch.device) -> T:
         # iterate over all fields, move to correct device
@@ -86,6 +90,10 @@ TB = TypeVar("TB", bound="TransitionBatch")
 # making usage simpler.
 _UNSET: Final = object()
 
+# the alignment, in bytes, of the tensors of packed batches (see
+# `TransitionBatch.pack`), a multiple of the size of the elements of any dtype
+_PACKED_ALIGNMENT: Final = 16
+
 
 @dataclass(frozen=False)
 class TransitionBatch:
@@ -112,6 +120,10 @@ class TransitionBatch:
         weight (torch.Tensor | None): Tensor
         time_diff (torch.Tensor | None): Tensor
         cost (torch.Tensor | None): Tensor
+        discount (torch.Tensor | None): Tensor of shape (batch_size) with the discounts
+            to apply to the values of next states, for transitions spanning several
+            steps (see `NStepReplayBuffer`). If None, learners use their discount
+            factor.
     """
 
     state: torch.Tensor
@@ -129,6 +141,7 @@ class TransitionBatch:
     weight: torch.Tensor | None = None
     time_diff: torch.Tensor | None = None
     cost: torch.Tensor | None = None
+    discount: torch.Tensor | None = None
 
     def __post_init__(self) -> None:
         """
@@ -217,7 +230,111 @@ class TransitionBatch:
                 f"(since batch_size is {batch_size})"
             )
 
+    @classmethod
+    def without_validation(cls: type[TB], **kwargs: Any) -> TB:
+        """
+        Creates a batch without the checks of `__post_init__`, for trusted producers
+        such as replay buffers, whose batches are valid by construction. Unlike the
+        constructor, it requires `terminated` and `truncated`.
+        """
+        batch = cls.__new__(cls)
+        for f in dataclasses.fields(cls):
+            if f.name in kwargs:
+                value = kwargs.pop(f.name)
+            elif f.default is MISSING or f.default is _UNSET:
+                raise TypeError(f"Missing argument {f.name} of {cls.__name__}")
+            else:
+                value = f.default
+            setattr(batch, f.name, value)
+        if len(kwargs) > 0:
+            raise TypeError(f"Unexpected arguments {sorted(kwargs)} of {cls.__name__}")
+        return batch
+
+    def pack(self: TB, pin_memory: bool = False) -> TB:
+        """
+        Returns a copy of the batch whose tensors are views into a single contiguous
+        byte buffer, each starting at a multiple of 16 bytes. `to` moves a packed
+        batch to another device with a single copy of that buffer, rather than one
+        copy per field, which is asynchronous if the buffer is in pinned memory (see
+        `pin_memory`) and the copy is to a CUDA device.
+
+        Args:
+            pin_memory: Whether the buffer is allocated in pinned memory. Only
+                applies to batches on the CPU.
+        """
+        tensors = self._tensors()
+        offsets = {}
+        number_of_bytes = 0
+        for name, tensor in tensors.items():
+            offsets[name] = number_of_bytes
+            number_of_bytes += _aligned_number_of_bytes(tensor)
+        buffer = torch.empty(
+            number_of_bytes,
+            dtype=torch.uint8,
+            device=self.device,
+            pin_memory=pin_memory and self.device.type == "cpu",
+        )
+        packed_batch = copy.copy(self)
+        for name, tensor in tensors.items():
+            view = _view_of_buffer(buffer, offsets[name], tensor.dtype, tensor.shape)
+            setattr(packed_batch, name, view.copy_(tensor))
+        return packed_batch
+
+    def _tensors(self) -> dict[str, torch.Tensor]:
+        """Returns the fields of the batch which are tensors."""
+        return {
+            f.name: value
+            for f in dataclasses.fields(self)
+            if isinstance(value := getattr(self, f.name), torch.Tensor)
+        }
+
+    def _packed_buffer(self) -> torch.Tensor | None:
+        """
+        Returns the byte buffer of a packed batch (see `pack`), that is, the storage
+        of its tensors if they are contiguous views into a common storage no larger
+        than them, and None if the batch is not packed.
+        """
+        tensors = self._tensors()
+        if len(tensors) == 0 or any(
+            getattr(self, f.name) is not None and f.name not in tensors
+            for f in dataclasses.fields(self)
+        ):
+            return None
+        storage = next(iter(tensors.values())).untyped_storage()
+        number_of_bytes = 0
+        for tensor in tensors.values():
+            if (
+                not tensor.is_contiguous()
+                or tensor.untyped_storage().data_ptr() != storage.data_ptr()
+            ):
+                return None
+            number_of_bytes += _aligned_number_of_bytes(tensor)
+        if storage.nbytes() > number_of_bytes:
+            # the tensors are views into a larger tensor, which is not worth copying
+            return None
+        return torch.empty(0, dtype=torch.uint8, device=storage.device).set_(
+            storage, 0, (storage.nbytes(),), (1,)
+        )
+
     def to(self: TB, device: torch.device) -> TB:
+        buffer = self._packed_buffer()
+        if buffer is not None:
+            # a single copy of the buffer moves the whole batch
+            moved_buffer = buffer.to(
+                device,
+                non_blocking=buffer.is_pinned() and torch.device(device).type == "cuda",
+            )
+            if moved_buffer is not buffer:
+                for name, tensor in self._tensors().items():
+                    view = _view_of_buffer(
+                        moved_buffer,
+                        tensor.storage_offset() * tensor.element_size(),
+                        tensor.dtype,
+                        tensor.shape,
+                    )
+                    super().__setattr__(name, view)
+            return self
+
         # iterate over all fields
         for f in dataclasses.fields(self.__class__):
             if getattr(self, f.name) is not None:
@@ -250,6 +367,64 @@ class TransitionWithBootstrapMaskBatch(TransitionBatch):
     bootstrap_mask: torch.Tensor | None = None
 
 
+@dataclass(frozen=False)
+class PrioritizedTransitionBatch(TransitionBatch):
+    """
+    A batch sampled from a `PrioritizedReplayBuffer`. Its `weight` field holds the
+    importance sampling weights of the sampled transitions.
+
+    Args:
+        indices (torch.Tensor | None): Tensor of shape (batch_size) with the positions
+            of the sampled transitions in the replay buffer.
+        td_error (torch.Tensor | None): Tensor of shape (batch_size). Learners set it
+            to the per-sample TD errors computed in `learn_batch`; they are then
+            used as the new priorities of the sampled transitions.
+    """
+
+    indices: torch.Tensor | None = None
+    td_error: torch.Tensor | None = None
+
+
+@dataclass(frozen=False)
+class SequenceTransitionBatch(TransitionBatch):
+    """
+    A batch of contiguous sub-trajectories sampled from a `SequenceReplayBuffer`.
+    Its transition fields hold the `number_of_sequences * sequence_length`
+    transitions of the sequences, sequence after sequence.
+
+    Args:
+        sequence_rows (torch.Tensor | None): Tensor of shape
+            (number_of_sequences, burn_in + sequence_length + 1, row_dim) with the
+            (action, observation) rows of each sequence: `burn_in` rows preceding its
+            first state, then the last rows of its states, then the last row of the
+            next state of its last transition. Rows before the start of an episode
+            and after the end of a sequence are zeros.
+        sequence_mask (torch.Tensor | None): Boolean tensor of shape
+            (number_of_sequences, sequence_length), False for the transitions past
+            the end of the episode or of the replay buffer, which are padding.
+    """
+
+    sequence_rows: torch.Tensor | None = None
+    sequence_mask: torch.Tensor | None = None
+
+
+def _aligned_number_of_bytes(tensor: Tensor) -> int:
+    """Returns the size of `tensor` in a packed batch, padding included."""
+    number_of_bytes = tensor.numel() * tensor.element_size()
+    return -(-number_of_bytes // _PACKED_ALIGNMENT) * _PACKED_ALIGNMENT
+
+
+def _view_of_buffer(
+    buffer: Tensor, offset: int, dtype: torch.dtype, shape: torch.Size
+) -> Tensor:
+    """
+    Returns the tensor of dtype `dtype` and shape `shape` stored contiguously in
+    the byte buffer `buffer` from byte `offset` on.
+    """
+    number_of_bytes = shape.numel() * torch.empty(0, dtype=dtype).element_size()
+    return buffer[offset : offset + number_of_bytes].view(dtype).view(shape)
+
+
 def filter_batch_by_bootstrap_mask(
     batch: TransitionWithBootstrapMaskBatch, z: Tensor
 ) -> TransitionBatch:
@@ -301,4 +476,16 @@ def filter_batch_by_bootstrap_mask(
         ),
         weight=_filter_tensor(batch.weight),
         cost=_filter_tensor(batch.cost),
+        discount=_filter_tensor(batch.discount),
     ).to(batch.device)
+
+
+def get_discounts(batch: TransitionBatch, discount_factor: float) -> Tensor:
+    """
+    Returns the discounts to apply to the values of the next states of a batch, of
+    shape (batch_size): the per-sample discounts of the batch if it has some, and
+    `discount_factor` otherwise.
+    """
+    if batch.discount is not None:
+        return batch.discount
+    return torch.full_like(batch.reward, discount_factor, dtype=torch.float)
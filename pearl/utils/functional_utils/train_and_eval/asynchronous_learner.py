@@ -0,0 +1,284 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import copy
+import threading
+from types import TracebackType
+from typing import Any
+
+import torch
+from pearl.history_summarization_modules.history_summarization_module import (
+    HistorySummarizationModule,
+)
+from pearl.pearl_agent import PearlAgent
+from pearl.policy_learners.exploration_modules.exploration_module import (
+    ExplorationModule,
+)
+from pearl.policy_learners.policy_learner import PolicyLearner
+from pearl.replay_buffers.prefetching_replay_buffer import PrefetchingReplayBuffer
+from pearl.replay_buffers.replay_buffer import ReplayBuffer
+
+
+class AsynchronousLearner:
+    """
+    Trains the policy learner of an agent in a background thread while the agent
+    keeps acting, so that environment steps and gradient updates overlap instead
+    of alternating.
+
+    The background thread trains a copy of the policy learner of the agent with
+    `PolicyLearner.learn`, and publishes its learned state (parameters and buffers)
+    every `weight_sync_period` calls to `learn`. The agent acts with its own policy
+    learner, which loads the latest published state in `step`. The state of
+    exploration modules and the histories of history summarization modules belong
+    to acting and are not overwritten. `stop` copies the final learned state and
+    the states of the optimizers back to the policy learner of the agent.
+
+    While it runs, the replay buffer of the agent is wrapped in a
+    `PrefetchingReplayBuffer`, which serializes the pushes of the agent with the
+    sampling of the background thread (and samples batches ahead of time).
+
+    The background thread calls `learn` at most `update_to_data_ratio` times per
+    environment step recorded by `step`, and waits for more steps when it is ahead.
+    When it is behind by more than `max_lag` calls, `step` waits for it, so that
+    the achieved ratio matches `update_to_data_ratio` even if learning is slower
+    than acting. If `max_lag` is None, the agent never waits for the background
+    thread, and fewer calls are made if learning is slower. Safety modules are not
+    trained, and on-policy learners, which learn from the episodes collected since
+    their last update, are not supported.
+
+    Args:
+        agent: The agent.
+        update_to_data_ratio: The number of calls to `learn` per environment step.
+        weight_sync_period: The number of calls to `learn` between two publications
+            of the learned state.
+        learning_start_step: The number of environment steps before the first call
+            to `learn`.
+        max_lag: The number of calls to `learn` the background thread may be behind
+            before `step` waits for it, or None to never wait.
+    """
+
+    def __init__(
+        self,
+        agent: PearlAgent,
+        update_to_data_ratio: float = 1.0,
+        weight_sync_period: int = 1,
+        learning_start_step: int = 0,
+        max_lag: int | None = 16,
+    ) -> None:
+        if agent.policy_learner.on_policy:
+            raise ValueError(
+                f"{type(agent.policy_learner).__name__} does not support "
+                "asynchronous learning since it is on-policy"
+            )
+        if update_to_data_ratio <= 0:
+            raise ValueError(
+                f"update_to_data_ratio must be positive but is {update_to_data_ratio}"
+            )
+        if weight_sync_period < 1:
+            raise ValueError(
+                f"weight_sync_period must be positive but is {weight_sync_period}"
+            )
+        if max_lag is not None and max_lag < 0:
+            raise ValueError(f"max_lag must be non-negative but is {max_lag}")
+        self._agent = agent
+        self._update_to_data_ratio = update_to_data_ratio
+        self._weight_sync_period = weight_sync_period
+        self._learning_start_step = learning_start_step
+        self._max_lag = max_lag
+        # guards the counters, the published state and the error below, wakes up
+        # the background thread when steps are recorded or it is stopped, and the
+        # acting thread when calls to `learn` are made or the background thread fails
+        self._condition = threading.Condition()
+        self._number_of_steps = 0
+        self._number_of_learn_calls = 0
+        self._learned_state: dict[str, torch.Tensor] | None = None
+        self._error: BaseException | None = None
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self._learning_policy_learner: PolicyLearner | None = None
+        self._acting_state_keys: set[str] = set()
+        self._replay_buffer: ReplayBuffer | None = None
+        self._last_report: dict[str, Any] = {}
+
+    @property
+    def number_of_learn_calls(self) -> int:
+        """The number of calls to `learn` made by the background thread."""
+        return self._number_of_learn_calls
+
+    @property
+    def last_report(self) -> dict[str, Any]:
+        """The report of the last call to `learn`."""
+        return self._last_report
+
+    def start(self) -> None:
+        """Starts the background thread."""
+        if self._thread is not None:
+            raise RuntimeError("The asynchronous learner is already running")
+        agent = self._agent
+        self._replay_buffer = agent.replay_buffer
+        if not isinstance(agent.replay_buffer, PrefetchingReplayBuffer):
+            agent.replay_buffer = PrefetchingReplayBuffer(agent.replay_buffer)
+        self._learning_policy_learner = copy.deepcopy(agent.policy_learner)
+        self._acting_state_keys = _acting_state_keys(agent.policy_learner)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._learn, daemon=True)
+        self._thread.start()
+
+    def step(self, number_of_steps: int = 1) -> None:
+        """
+        Records `number_of_steps` environment steps, which allows the background
+        thread to learn further, waits until it is at most `max_lag` calls to
+        `learn` behind, and loads the latest learned state into the policy learner
+        of the agent. Called by the acting thread after each step.
+        """
+        with self._condition:
+            self._raise_error()
+            self._number_of_steps += number_of_steps
+            self._condition.notify_all()
+            while self._thread is not None and self._error is None and self._lags():
+                self._condition.wait()
+            self._raise_error()
+            learned_state, self._learned_state = self._learned_state, None
+        if learned_state is not None:
+            self._agent.policy_learner.load_state_dict(learned_state, strict=False)
+
+    def stop(self) -> None:
+        """
+        Stops the background thread, copies the learned state back to the policy
+        learner of the agent and restores its replay buffer.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        thread.join()
+        self._thread = None
+        agent = self._agent
+        replay_buffer = self._replay_buffer
+        assert replay_buffer is not None
+        prefetching_replay_buffer = agent.replay_buffer
+        if prefetching_replay_buffer is not replay_buffer:
+            assert isinstance(prefetching_replay_buffer, PrefetchingReplayBuffer)
+            prefetching_replay_buffer.close()
+            replay_buffer.device_for_batches = (
+                prefetching_replay_buffer.device_for_batches
+            )
+            agent.replay_buffer = replay_buffer
+        learning_policy_learner = self._learning_policy_learner
+        assert learning_policy_learner is not None
+        agent.policy_learner.load_state_dict(
+            self._learned_state_of(learning_policy_learner), strict=False
+        )
+        for name, value in vars(learning_policy_learner).items():
+            if isinstance(value, torch.optim.Optimizer):
+                getattr(agent.policy_learner, name).load_state_dict(value.state_dict())
+        agent.policy_learner._training_steps = learning_policy_learner._training_steps
+        self._learned_state = None
+        self._learning_policy_learner = None
+        self._raise_error()
+
+    def __enter__(self) -> "AsynchronousLearner":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def _learn(self) -> None:
+        policy_learner = self._learning_policy_learner
+        assert policy_learner is not None
+        try:
+            while True:
+                with self._condition:
+                    while not self._stopping and not self._can_learn():
+                        self._condition.wait()
+                    if self._stopping:
+                        return
+                self._last_report = policy_learner.learn(self._agent.replay_buffer)
+                learned_state = None
+                if (self._number_of_learn_calls + 1) % self._weight_sync_period == 0:
+                    learned_state = self._learned_state_of(policy_learner)
+                with self._condition:
+                    self._number_of_learn_calls += 1
+                    if learned_state is not None:
+                        self._learned_state = learned_state
+                    self._condition.notify_all()
+        except BaseException as e:
+            with self._condition:
+                self._error = e
+                self._condition.notify_all()
+
+    def _can_learn(self) -> bool:
+        return self._number_of_learn_calls < self._number_of_allowed_learn_calls()
+
+    def _lags(self) -> bool:
+        return (
+            self._max_lag is not None
+            and self._number_of_learn_calls + self._max_lag
+            < self._number_of_allowed_learn_calls()
+        )
+
+    def _number_of_allowed_learn_calls(self) -> int:
+        if self._number_of_steps < self._learning_start_step:
+            return 0
+        return int(self._update_to_data_ratio * self._number_of_steps)
+
+    def _learned_state_of(
+        self, policy_learner: PolicyLearner
+    ) -> dict[str, torch.Tensor]:
+        return {
+            name: value.clone()
+            for name, value in _learned_state(
+                policy_learner, self._acting_state_keys
+            ).items()
+        }
+
+    def _raise_error(self) -> None:
+        error, self._error = self._error, None
+        if error is not None:
+            raise RuntimeError("The asynchronous learner failed") from error
+
+
+def _acting_state_keys(policy_learner: PolicyLearner) -> set[str]:
+    """
+    Returns the keys of the state dict of `policy_learner` that hold the state of
+    acting rather than learned state, that is, the state of exploration modules
+    and the buffers of history summarization modules (such as their histories).
+    """
+    parameter_names = {name for name, _ in policy_learner.named_parameters()}
+    keys = set()
+    for prefix, module in policy_learner.named_modules():
+        if isinstance(module, (ExplorationModule, HistorySummarizationModule)):
+            keys.update(
+                name
+                for name in module.state_dict(prefix=f"{prefix}.")
+                if name not in parameter_names
+            )
+    return keys
+
+
+def _learned_state(
+    policy_learner: PolicyLearner, acting_state_keys: set[str]
+) -> dict[str, torch.Tensor]:
+    """
+    Returns the tensors of the state dict of `policy_learner` that are not in
+    `acting_state_keys` (see `_acting_state_keys`), detached but not copied.
+    """
+    return {
+        name: value.detach()
+        for name, value in policy_learner.state_dict().items()
+        if name not in acting_state_keys and isinstance(value, torch.Tensor)
+    }
@@ -0,0 +1,267 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+"""
+Distributed data collection in the style of Ape-X: several actor processes, each
+acting with its own copy of a `PearlAgent`, push transitions to a
+`SharedMemoryReplayBuffer`, while the learner process (the calling process) trains
+the policy learner of the agent on it and broadcasts its learned weights to the
+actors through `SharedWeights`. Everything runs on the CPUs of one machine.
+"""
+
+import copy
+import queue
+import time
+from collections.abc import Callable
+from typing import Any
+
+import torch
+import torch.multiprocessing as mp
+from pearl.api.environment import Environment
+from pearl.pearl_agent import PearlAgent
+from pearl.policy_learners.policy_learner import PolicyLearner
+from pearl.replay_buffers.shared_memory_replay_buffer import SharedMemoryReplayBuffer
+from pearl.utils.functional_utils.experimentation.set_seed import set_seed
+from pearl.utils.functional_utils.train_and_eval.asynchronous_learner import (
+    _acting_state_keys,
+    _learned_state,
+)
+
+
+class SharedWeights:
+    """
+    The learned state of a policy learner (see `AsynchronousLearner`) in shared
+    memory, which a learner process publishes and actor processes load into their
+    copies of the policy learner. Like `SharedMemoryReplayBuffer`, it is shared by
+    passing it as an argument to `torch.multiprocessing` processes, and accesses are
+    serialized by an inter-process lock.
+
+    Args:
+        policy_learner: The policy learner whose learned state is shared. Its
+            learned state must be on the CPU.
+        context: The multiprocessing context the lock is created in, which must be
+            compatible with the start method of the processes sharing the weights
+            (see `SharedMemoryReplayBuffer`). Defaults to the "spawn" context.
+    """
+
+    def __init__(self, policy_learner: PolicyLearner, context: Any = None) -> None:
+        self._acting_state_keys: set[str] = _acting_state_keys(policy_learner)
+        self._state: dict[str, torch.Tensor] = {
+            name: value.clone().share_memory_()
+            for name, value in _learned_state(
+                policy_learner, self._acting_state_keys
+            ).items()
+        }
+        # the number of publications
+        self._version: torch.Tensor = torch.zeros(1, dtype=torch.long).share_memory_()
+        if context is None:
+            context = mp.get_context("spawn")
+        self._lock: Any = context.Lock()
+
+    @property
+    def version(self) -> int:
+        return int(self._version.item())
+
+    def publish(self, policy_learner: PolicyLearner) -> None:
+        """Copies the learned state of `policy_learner` to shared memory."""
+        learned_state = _learned_state(policy_learner, self._acting_state_keys)
+        with self._lock:
+            for name, value in self._state.items():
+                value.copy_(learned_state[name])
+            self._version += 1
+
+    def load(self, policy_learner: PolicyLearner, loaded_version: int = -1) -> int:
+        """
+        Loads the shared learned state into `policy_learner` if it was published
+        after `loaded_version`, and returns the version of the loaded state.
+        """
+        if self.version == loaded_version:
+            return loaded_version
+        with self._lock:
+            policy_learner.load_state_dict(self._state, strict=False)
+            return self.version
+
+
+def distributed_learning(
+    agent: PearlAgent,
+    env_factory: Callable[[], Environment],
+    number_of_actors: int,
+    number_of_steps: int,
+    update_to_data_ratio: float = 1.0,
+    weight_sync_period: int = 1,
+    learning_start_step: int = 0,
+    seed: int | None = None,
+) -> dict[str, Any]:
+    """
+    Performs online learning with `number_of_actors` actor processes collecting
+    transitions in parallel, each in its own environment, for a total of
+    `number_of_steps` environment steps.
+
+    Each actor acts with a copy of `agent` and pushes its transitions to the replay
+    buffer of the agent, which must be a `SharedMemoryReplayBuffer`. It loads the
+    latest weights published by the learner before each step. The calling process
+    is the learner: it calls `agent.learn()` at most `update_to_data_ratio` times per
+    environment step collected by the actors, and publishes the learned weights of
+    its policy learner every `weight_sync_period` calls.
+
+    Actors are started with the "spawn" method, so `env_factory` must be picklable
+    (for instance a module level function, or a `functools.partial` of an
+    environment class), and the replay buffer must be created with a
+    multiprocessing context whose locks can be sent to spawned processes (such as
+    its default "spawn" context). Agents must be on the CPU, and on-policy learners
+    are not supported since they learn from their own episodes.
+
+    Args:
+        agent: The agent, which learns in the calling process.
+        env_factory: Creates the environment of an actor.
+        number_of_actors: The number of actor processes.
+        number_of_steps: The number of environment steps, summed over actors.
+        update_to_data_ratio: The maximum number of calls to `agent.learn()` per
+            environment step.
+        weight_sync_period: The number of calls to `agent.learn()` between two
+            publications of the learned weights.
+        learning_start_step: The number of environment steps before the first call
+            to `agent.learn()`.
+        seed: The seed of the actors, each of which uses `seed + actor_index`.
+    Returns:
+        Dict[str, Any]: the returns of the completed episodes of all actors, in the
+        order in which they are received, under the key "return", and the number of
+        calls to `agent.learn()` under the key "number_of_learn_calls".
+    """
+    if number_of_actors < 1:
+        raise ValueError(f"number_of_actors must be positive but is {number_of_actors}")
+    if update_to_data_ratio <= 0:
+        raise ValueError(
+            f"update_to_data_ratio must be positive but is {update_to_data_ratio}"
+        )
+    if agent.policy_learner.on_policy:
+        raise ValueError(
+            f"{type(agent.policy_learner).__name__} does not support distributed "
+            "learning since it is on-policy"
+        )
+    if agent.device.type != "cpu":
+        raise ValueError(f"Distributed learning runs on the CPU, not {agent.device}")
+    replay_buffer = agent.replay_buffer
+    if not isinstance(replay_buffer, SharedMemoryReplayBuffer):
+        raise ValueError(
+            "Distributed learning requires a SharedMemoryReplayBuffer but the agent "
+            f"has a {type(replay_buffer).__name__}"
+        )
+    if len(replay_buffer) == 0:
+        # the first push allocates the shared columns of the replay buffer
+        env = env_factory()
+        observation, action_space = env.reset(seed=seed)
+        agent.reset(observation, action_space)
+        agent.observe(env.step(agent.act(exploit=False)))
+        env.close()
+
+    context = mp.get_context("spawn")
+    # the locks sent to the actors must come from the context that starts them
+    shared_weights = SharedWeights(agent.policy_learner, context)
+    # the number of steps taken by all actors
+    step_counter = context.Value("q", 0)
+    returns_queue = context.Queue()
+    actors = [
+        context.Process(
+            target=_run_actor,
+            args=(
+                # each actor acts with its own copy of the agent, which shares the
+                # replay buffer
+                copy.deepcopy(agent, memo={id(replay_buffer): replay_buffer}),
+                env_factory,
+                shared_weights,
+                step_counter,
+                number_of_steps,
+                returns_queue,
+                None if seed is None else seed + actor_index,
+            ),
+            daemon=True,
+        )
+        for actor_index in range(number_of_actors)
+    ]
+    returns = []
+    number_of_learn_calls = 0
+    try:
+        for actor in actors:
+            actor.start()
+        while any(actor.is_alive() for actor in actors):
+            _receive_returns(returns_queue, returns)
+            number_of_steps_taken = step_counter.value
+            if (
+                number_of_steps_taken < learning_start_step
+                or number_of_learn_calls + 1
+                > update_to_data_ratio * number_of_steps_taken
+            ):
+                time.sleep(0.001)
+                continue
+            agent.learn()
+            number_of_learn_calls += 1
+            if number_of_learn_calls % weight_sync_period == 0:
+                shared_weights.publish(agent.policy_learner)
+    finally:
+        for actor in actors:
+            if actor.is_alive():
+                actor.terminate()
+            actor.join()
+    _receive_returns(returns_queue, returns)
+    for actor_index, actor in enumerate(actors):
+        if actor.exitcode != 0:
+            raise RuntimeError(
+                f"Actor {actor_index} failed with exit code {actor.exitcode}"
+            )
+    return {"return": returns, "number_of_learn_calls": number_of_learn_calls}
+
+
+def _receive_returns(
+    returns_queue: "mp.Queue[float]", returns: list[float]
+) -> None:
+    while True:
+        try:
+            returns.append(returns_queue.get_nowait())
+        except queue.Empty:
+            return
+
+
+def _run_actor(
+    agent: PearlAgent,
+    env_factory: Callable[[], Environment],
+    shared_weights: SharedWeights,
+    step_counter: Any,
+    number_of_steps: int,
+    returns_queue: "mp.Queue[float]",
+    seed: int | None,
+) -> None:
+    # actors share the cores of the machine
+    torch.set_num_threads(1)
+    if seed is not None:
+        set_seed(seed)
+    env = env_factory()
+    loaded_version = shared_weights.load(agent.policy_learner)
+    is_first_episode = True
+    while step_counter.value < number_of_steps:
+        # the environment is seeded once, at its first reset
+        observation, action_space = env.reset(seed=seed if is_first_episode else None)
+        is_first_episode = False
+        agent.reset(observation, action_space)
+        episode_return = 0.0
+        done = False
+        while not done:
+            with step_counter.get_lock():
+                if step_counter.value >= number_of_steps:
+                    break
+                step_counter.value += 1
+            action = agent.act(exploit=False)
+            action_result = env.step(action)
+            agent.observe(action_result)
+            episode_return += float(action_result.reward)
+            done = action_result.done
+            loaded_version = shared_weights.load(agent.policy_learner, loaded_version)
+        if done:
+            returns_queue.put(episode_return)
+    env.close()
@@ -19,7 +19,12 @@ import torch
 
 from pearl.api.environment import Environment
 from pearl.pearl_agent import PearlAgent
-from pearl.replay_buffers import BasicReplayBuffer
+from pearl.replay_buffers import (
+    BasicReplayBuffer,
+    EpochIterator,
+    PrefetchingReplayBuffer,
+    TensorBasedReplayBuffer,
+)
 from pearl.replay_buffers.replay_buffer import ReplayBuffer
 from pearl.replay_buffers.transition import TransitionBatch
 from pearl.utils.functional_utils.experimentation.set_seed import set_seed
@@ -111,35 +116,96 @@ def get_offline_data_in_buffer(
     if is_action_continuous:
         offline_data_replay_buffer._is_action_continuous = True
 
-    for transition in raw_transitions_buffer:
-        if transition["curr_available_actions"].__class__.__name__ == "Discrete":
-            transition["curr_available_actions"] = DiscreteActionSpace(
-                actions=list(
-                    torch.arange(transition["curr_available_actions"].n).view(-1, 1)
-                )
+    raw_transitions = list(raw_transitions_buffer)
+    if len(raw_transitions) == 0:
+        return offline_data_replay_buffer
+
+    # all transitions are pushed as a single batch
+    curr_available_actions, curr_unavailable_actions_mask = None, None
+    next_available_actions, next_unavailable_actions_mask = None, None
+    if not is_action_continuous:
+        padded_action_spaces: dict[object, tuple[torch.Tensor, torch.Tensor]] = {}
+        curr_available_actions, curr_unavailable_actions_mask = (
+            _stack_padded_action_spaces(
+                [t["curr_available_actions"] for t in raw_transitions],
+                max_number_actions_if_discrete,
+                padded_action_spaces,
             )
-        if transition["next_available_actions"].__class__.__name__ == "Discrete":
-            transition["next_available_actions"] = DiscreteActionSpace(
-                actions=list(
-                    torch.arange(transition["next_available_actions"].n).view(-1, 1)
-                )
+        )
+        next_available_actions, next_unavailable_actions_mask = (
+            _stack_padded_action_spaces(
+                [t["next_available_actions"] for t in raw_transitions],
+                max_number_actions_if_discrete,
+                padded_action_spaces,
             )
+        )
 
-        offline_data_replay_buffer.push(
-            state=transition["observation"],
-            action=transition["action"],
-            reward=transition["reward"],
-            next_state=transition["next_observation"],
-            curr_available_actions=transition["curr_available_actions"],
-            next_available_actions=transition["next_available_actions"],
-            terminated=transition["done"],
-            truncated=False,
-            max_number_actions=max_number_actions_if_discrete,
+    offline_data_replay_buffer.push_batch(
+        TransitionBatch(
+            state=_stack([t["observation"] for t in raw_transitions]),
+            action=_stack([t["action"] for t in raw_transitions]),
+            reward=_stack([t["reward"] for t in raw_transitions]).view(-1),
+            next_state=_stack([t["next_observation"] for t in raw_transitions]),
+            curr_available_actions=curr_available_actions,
+            curr_unavailable_actions_mask=curr_unavailable_actions_mask,
+            next_available_actions=next_available_actions,
+            next_unavailable_actions_mask=next_unavailable_actions_mask,
+            terminated=_stack([t["done"] for t in raw_transitions]).view(-1).bool(),
+            truncated=torch.zeros(len(raw_transitions), dtype=torch.bool),
         )
+    )
 
     return offline_data_replay_buffer
 
 
+def _stack(values: list[object]) -> torch.Tensor:
+    return torch.stack(
+        [
+            (
+                value.detach().cpu()
+                if isinstance(value, torch.Tensor)
+                else torch.as_tensor(value)
+            )
+            for value in values
+        ]
+    )
+
+
+def _stack_padded_action_spaces(
+    action_spaces: list[object],
+    max_number_actions: int | None,
+    padded_action_spaces: dict[object, tuple[torch.Tensor, torch.Tensor]],
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Returns the padded available actions and unavailable actions masks of a list of
+    action spaces, as `TensorBasedReplayBuffer.create_action_tensor_and_mask` builds
+    them. Each distinct action space is padded once: Gym `Discrete` spaces are
+    identified by their size, Pearl action spaces by identity.
+    """
+    available_actions, unavailable_actions_masks = [], []
+    for action_space in action_spaces:
+        is_gym_discrete = action_space.__class__.__name__ == "Discrete"
+        # pyre-ignore[16]: Gym `Discrete` spaces have an `n` attribute
+        key = ("Discrete", action_space.n) if is_gym_discrete else id(action_space)
+        if key not in padded_action_spaces:
+            if is_gym_discrete:
+                action_space = DiscreteActionSpace(
+                    actions=list(torch.arange(action_space.n).view(-1, 1))
+                )
+            assert isinstance(action_space, DiscreteActionSpace)
+            padded_actions, mask = (
+                TensorBasedReplayBuffer.create_action_tensor_and_mask(
+                    max_number_actions, action_space
+                )
+            )
+            assert padded_actions is not None and mask is not None
+            padded_action_spaces[key] = (padded_actions, mask)
+        padded_actions, mask = padded_action_spaces[key]
+        available_actions.append(padded_actions)
+        unavailable_actions_masks.append(mask)
+    return torch.stack(available_actions), torch.stack(unavailable_actions_masks)
+
+
 def offline_learning(
     offline_agent: PearlAgent,
     data_buffer: ReplayBuffer,
@@ -147,6 +213,8 @@ def offline_learning(
     number_of_batches: Optional[int] = None,
     learning_logger: LearningLogger = null_learning_logger,
     seed: Optional[int] = None,
+    number_of_prefetched_batches: int = 0,
+    sample_without_replacement: bool = False,
 ) -> None:
     """
     Trains the offline agent using transition tuples from offline data (provided in
@@ -182,8 +250,21 @@ def offline_learning(
                                          to sample from the replay buffer.
                                          Mutually exclusive with training_epochs.
         logger (LearningLogger, optional): a LearningLogger to log the training loss
-                                           (default is no-op logger).
+                                           (default is no-op logger). If the
+                                           instrumentation of data_buffer is enabled,
+                                           its `instrumentation_summary` is logged
+                                           with the loss.
         seed (int, optional): random seed (default is `int(time.time())`).
+        number_of_prefetched_batches (int, default 0): if positive, batches are
+                                     sampled by a background thread, up to this
+                                     number of batches ahead of training
+                                     (see `PrefetchingReplayBuffer`).
+        sample_without_replacement (bool, default False): if True, batches are
+                                   drawn in epochs without replacement (see
+                                   `EpochIterator`), so that every transition is
+                                   used once per epoch, rather than independently.
+                                   Requires a `TensorBasedReplayBuffer` and no
+                                   prefetching.
     """
     if seed is None:
         seed = int(time.time())
@@ -216,15 +297,49 @@ def offline_learning(
         f"effective batch size {effective_batch_size}, and {number_of_batches} batches."
     )
 
+    epoch_iterator = None
+    if sample_without_replacement:
+        if not isinstance(data_buffer, TensorBasedReplayBuffer):
+            raise ValueError(
+                "sample_without_replacement requires a TensorBasedReplayBuffer but "
+                f"got {type(data_buffer).__name__}"
+            )
+        if number_of_prefetched_batches > 0:
+            raise ValueError(
+                "sample_without_replacement cannot be combined with prefetching"
+            )
+        epoch_iterator = EpochIterator(data_buffer, effective_batch_size, seed=seed)
+
     # move replay buffer to device of the offline agent
     data_buffer.device_for_batches = offline_agent.device
+    prefetching_data_buffer = None
+    if number_of_prefetched_batches > 0 and not isinstance(
+        data_buffer, PrefetchingReplayBuffer
+    ):
+        prefetching_data_buffer = PrefetchingReplayBuffer(
+            data_buffer, number_of_prefetched_batches
+        )
 
     # training loop
-    for i in range(number_of_batches):
-        batch = data_buffer.sample(effective_batch_size)
-        assert isinstance(batch, TransitionBatch)
-        loss = offline_agent.learn_batch(batch=batch)
-        learning_logger(loss, i, batch)
+    sampled_buffer = (
+        data_buffer if prefetching_data_buffer is None else prefetching_data_buffer
+    )
+    try:
+        for i in range(number_of_batches):
+            if epoch_iterator is not None:
+                batch = epoch_iterator.next_batch()
+            else:
+                batch = sampled_buffer.sample(effective_batch_size)
+            assert isinstance(batch, TransitionBatch)
+            loss = offline_agent.learn_batch(batch=batch)
+            if data_buffer.instrumentation is not None:
+                loss = {**loss, **data_buffer.instrumentation_summary()}
+            learning_logger(loss, i, batch)
+    finally:
+        if prefetching_data_buffer is not None:
+            prefetching_data_buffer.close()
+            # the prefetcher had the batches of data_buffer collated on the CPU
+            data_buffer.device_for_batches = offline_agent.device
 
 
 def offline_evaluation(
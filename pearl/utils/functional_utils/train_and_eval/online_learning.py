@@ -17,6 +17,13 @@ from pearl.api.environment import Environment
 from pearl.api.reward import Value
 from pearl.pearl_agent import PearlAgent
 from pearl.utils.functional_utils.experimentation.plots import fontsize_for
+from pearl.utils.functional_utils.train_and_eval.asynchronous_learner import (
+    AsynchronousLearner,
+)
+from pearl.utils.instantiations.environments.vector_gym_environment import (
+    VectorGymEnvironment,
+)
+from pearl.vector_pearl_agent import VectorPearlAgent
 
 MA_WINDOW_SIZE = 10
 
@@ -81,6 +88,10 @@ def online_learning(
     seed: int | None = None,
     record_period: int = 1,
     learning_start_step: int = 0,
+    asynchronous: bool = False,
+    update_to_data_ratio: float | None = None,
+    weight_sync_period: int = 1,
+    max_lag: int | None = 16,
     # TODO: use LearningLogger similarly to offline_learning
 ) -> dict[str, Any]:
     """
@@ -101,10 +112,72 @@ def online_learning(
         Episodic statistics collected within this period are averaged and then recorded.
         learning_start_step (int, optional): the agent starts to learn at learning_start_step.
             Defaults to 0.
+        asynchronous (bool, optional): learns in a background thread while the agent
+            acts (see `AsynchronousLearner`), instead of after every
+            learn_every_k_steps steps or every episode. Defaults to False.
+        update_to_data_ratio (float, optional): in asynchronous mode, the number of
+            calls to `learn` per environment step. Defaults to
+            1 / learn_every_k_steps.
+        weight_sync_period (int, optional): in asynchronous mode, the number of calls
+            to `learn` between two refreshes of the weights the agent acts with.
+            Defaults to 1.
+        max_lag (int, optional): in asynchronous mode, the number of calls to
+            `learn` the background thread may be behind before the agent waits for
+            it, or None to never wait. Defaults to 16.
     """
     assert (number_of_episodes is None and number_of_steps is not None) or (
         number_of_episodes is not None and number_of_steps is None
     )
+    asynchronous_learner = None
+    if asynchronous:
+        if learn_after_episode:
+            raise ValueError("learn_after_episode is not supported asynchronously")
+        asynchronous_learner = AsynchronousLearner(
+            agent,
+            update_to_data_ratio=(
+                1 / learn_every_k_steps
+                if update_to_data_ratio is None
+                else update_to_data_ratio
+            ),
+            weight_sync_period=weight_sync_period,
+            learning_start_step=learning_start_step,
+            max_lag=max_lag,
+        )
+        asynchronous_learner.start()
+    try:
+        return _online_learning(
+            agent=agent,
+            env=env,
+            number_of_episodes=number_of_episodes,
+            number_of_steps=number_of_steps,
+            learn_after_episode=learn_after_episode,
+            learn_every_k_steps=learn_every_k_steps,
+            print_every_x_episodes=print_every_x_episodes,
+            print_every_x_steps=print_every_x_steps,
+            seed=seed,
+            record_period=record_period,
+            learning_start_step=learning_start_step,
+            asynchronous_learner=asynchronous_learner,
+        )
+    finally:
+        if asynchronous_learner is not None:
+            asynchronous_learner.stop()
+
+
+def _online_learning(
+    agent: PearlAgent,
+    env: Environment,
+    number_of_episodes: int | None,
+    number_of_steps: int | None,
+    learn_after_episode: bool,
+    learn_every_k_steps: int,
+    print_every_x_episodes: int | None,
+    print_every_x_steps: int | None,
+    seed: int | None,
+    record_period: int,
+    learning_start_step: int,
+    asynchronous_learner: AsynchronousLearner | None,
+) -> dict[str, Any]:
     total_steps = 0
     total_episodes = 0
     info = {}
@@ -118,13 +191,14 @@ def online_learning(
         episode_info, episode_total_steps = run_episode(
             agent,
             env,
-            learn=True,
+            learn=asynchronous_learner is None,
             exploit=False,
             learn_after_episode=learn_after_episode,
             learn_every_k_steps=learn_every_k_steps,
             total_steps=old_total_steps,
             seed=seed,
             learning_start_step=learning_start_step,
+            asynchronous_learner=asynchronous_learner,
         )
         if number_of_steps is not None and episode_total_steps > record_period:
             print(
@@ -164,6 +238,73 @@ def online_learning(
     return info
 
 
+def vector_online_learning(
+    agent: VectorPearlAgent,
+    env: VectorGymEnvironment,
+    number_of_steps: int,
+    learn_every_k_steps: int = 1,
+    seed: int | None = None,
+    learning_start_step: int = 0,
+    exploit: bool = False,
+) -> dict[str, Any]:
+    """
+    Performs online learning in the environments of a `VectorGymEnvironment`,
+    collecting one transition from every environment per agent step.
+
+    Args:
+        agent (VectorPearlAgent): the agent, acting in all environments at once.
+        env (VectorGymEnvironment): the environments.
+        number_of_steps (int): the number of environment steps to run, summed over
+            environments.
+        learn_every_k_steps (int, optional): number of agent steps (each of one step
+            per environment) between two calls of agent.learn().
+        seed (int, optional): the seed for the environments. Defaults to None.
+        learning_start_step (int, optional): the agent starts to learn once this
+            number of environment steps, summed over environments, is taken.
+            Defaults to 0.
+        exploit (bool, optional): asks the agent to only exploit. Defaults to False.
+    Returns:
+        Dict[str, Any]: the returns of the completed episodes, in the order in which
+        they complete, under the key "return".
+    """
+    if agent.number_of_environments != env.number_of_environments:
+        raise ValueError(
+            f"The agent acts in {agent.number_of_environments} environments but "
+            f"there are {env.number_of_environments} environments"
+        )
+    assert learn_every_k_steps > 0, "learn_every_k_steps must be positive"
+    observations, action_space = env.reset(seed=seed)
+    agent.reset(observations, action_space)
+    episode_returns = np.zeros(env.number_of_environments)
+    returns = []
+    total_steps = 0
+    agent_steps = 0
+    while total_steps < number_of_steps:
+        actions = agent.act(exploit=exploit)
+        action_result = env.step(actions)
+        agent.observe(action_result)
+        episode_returns += action_result.reward
+        total_steps += env.number_of_environments
+        agent_steps += 1
+        if (
+            total_steps >= learning_start_step
+            and agent_steps % learn_every_k_steps == 0
+        ):
+            agent.learn()
+        done = np.logical_or(action_result.terminated, action_result.truncated)
+        if done.any():
+            returns.extend(episode_returns[done].tolist())
+            episode_returns[done] = 0.0
+            # the environments of the ended episodes are already reset
+            agent.reset(
+                # pyre-fixme[16]: observations are stacked in one array
+                env.current_observations[done],
+                action_space,
+                indices=np.flatnonzero(done).tolist(),
+            )
+    return {"return": returns}
+
+
 def target_return_is_reached(
     target_return: Value,
     max_episodes: int,
@@ -242,6 +383,7 @@ def run_episode(
     total_steps: int = 0,
     seed: int | None = None,
     learning_start_step: int = 0,
+    asynchronous_learner: AsynchronousLearner | None = None,
 ) -> tuple[dict[str, Any], int]:
     """
     Runs one episode and returns an info dict and number of steps taken.
@@ -258,6 +400,8 @@ def run_episode(
         seed (int, optional): the seed for the environment. Defaults to None.
         learning_start_step (int, optional): the agent starts to learn at learning_start_step.
             Defaults to 0.
+        asynchronous_learner (AsynchronousLearner, optional): a running asynchronous
+            learner, which records every step. Defaults to None.
     Returns:
         Tuple[Dict[str, Any], int]: the return of the episode and the number of steps taken.
     """
@@ -293,6 +437,8 @@ def run_episode(
         else:
             cum_cost = None
         agent.observe(action_result)
+        if asynchronous_learner is not None:
+            asynchronous_learner.step()
         done = action_result.done
         episode_steps += 1
         if learn and (total_steps + episode_steps >= learning_start_step):
@@ -26,6 +26,7 @@ from .sparse_reward_environment import (
     DiscreteSparseRewardEnvironment,
     SparseRewardEnvironment,
 )
+from .vector_gym_environment import VectorGymEnvironment
 
 
 __all__ = [
@@ -41,4 +42,5 @@ __all__ = [
     "RewardIsEqualToTenTimesActionMultiArmBanditEnvironment",
     "SLCBEnvironment",
     "SparseRewardEnvironment",
+    "VectorGymEnvironment",
 ]
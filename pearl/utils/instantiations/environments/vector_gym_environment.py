@@ -0,0 +1,274 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import functools
+import logging
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+import torch
+from pearl.api.action import Action
+from pearl.api.action_result import ActionResult
+from pearl.api.action_space import ActionSpace
+from pearl.api.environment import Environment
+from pearl.api.observation import Observation
+from pearl.api.space import Space
+from pearl.utils.instantiations.environments.gym_environment import (
+    _get_pearl_space,
+    GYM_TO_PEARL_ACTION_SPACE,
+    GYM_TO_PEARL_OBSERVATION_SPACE,
+)
+from torch import Tensor
+
+try:
+    import gymnasium as gym
+
+    logging.info("Using 'gymnasium' package.")
+except ModuleNotFoundError:
+    import gym
+
+    logging.warning("Using deprecated 'gym' package.")
+
+# the keys of the final observations of the episodes ending in a step, in the infos
+# of gymnasium >= 1.1 and of earlier versions
+_FINAL_OBSERVATION_KEYS = ("final_obs", "final_observation")
+
+
+class VectorGymEnvironment(Environment):
+    """
+    A wrapper for `gym.vector.VectorEnv` to behave like Pearl's `Environment`, for
+    agents acting in several copies of an environment at once (see
+    `VectorPearlAgent`). The environments run in the main process
+    (`gym.vector.SyncVectorEnv`) or in one subprocess each
+    (`gym.vector.AsyncVectorEnv`, which steps them on all CPU cores).
+
+    `reset` returns the observations of all environments, stacked in one array,
+    and `step` takes the actions of all environments, stacked in one tensor of
+    shape (number_of_environments, action_dim), and returns a batched
+    `ActionResult` whose observation, reward, terminated, truncated and cost fields
+    have one row per environment.
+
+    Environments whose episodes end are reset by the vector environment in the same
+    step. The observations of the batched action result are the last observations
+    of their transitions, that is, the final observations of the ended episodes,
+    while `current_observations` holds the observations the environments continue
+    from, that is, the first observations of the new episodes.
+
+    Args:
+        env_or_env_name: A `gym.vector.VectorEnv` instance, which must reset
+            environments in the same step as their episodes end, or a name of a
+            `gym.Env`.
+        number_of_environments: The number of environments created if
+            `env_or_env_name` is a name.
+        asynchronous: Whether environments created from a name run in subprocesses.
+        args: Arguments passed to `gym.make()` if the first argument is a string.
+        kwargs: Keyword arguments passed to `gym.make()` if the first argument is a
+            string.
+    """
+
+    def __init__(
+        self,
+        env_or_env_name: gym.vector.VectorEnv | str,
+        number_of_environments: int = 1,
+        asynchronous: bool = False,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        if isinstance(env_or_env_name, str):
+            env = _make_vector_env(
+                env_or_env_name, number_of_environments, asynchronous, args, kwargs
+            )
+            env_name = env_or_env_name
+        else:
+            env = env_or_env_name
+            env_name = _get_env_name(env)
+        if _resets_in_next_step(env):
+            raise ValueError(
+                "VectorGymEnvironment requires vector environments resetting "
+                "environments in the same step as their episodes end (see "
+                "gym.vector.AutoresetMode.SAME_STEP)"
+            )
+        self.env: gym.vector.VectorEnv = env
+        self._env_name: str = env_name
+        self._action_space: ActionSpace = _get_pearl_space(
+            gym_space=self.env.single_action_space,
+            gym_to_pearl_map=GYM_TO_PEARL_ACTION_SPACE,
+        )
+        self._observation_space: Space = _get_pearl_space(
+            gym_space=self.env.single_observation_space,
+            gym_to_pearl_map=GYM_TO_PEARL_OBSERVATION_SPACE,
+        )
+        # pyre-fixme[24]: Generic type `np.ndarray` expects 2 type parameters.
+        self._current_observations: np.ndarray | None = None
+
+    @property
+    def number_of_environments(self) -> int:
+        return self.env.num_envs
+
+    @property
+    def action_space(self) -> ActionSpace:
+        """Returns the Pearl action space of each environment."""
+        return self._action_space
+
+    @property
+    def observation_space(self) -> Space:
+        """Returns the Pearl observation space of each environment."""
+        return self._observation_space
+
+    @property
+    def current_observations(self) -> Observation:
+        """
+        The observations the environments continue from, which are the first
+        observations of their new episodes for the environments whose episodes
+        ended in the last step.
+        """
+        assert self._current_observations is not None
+        return self._current_observations
+
+    def reset(self, seed: int | None = None) -> tuple[Observation, ActionSpace]:
+        """Resets all environments and returns their initial observations, stacked
+        in one array, and the action space of each environment."""
+        # pyre-fixme[16]: `ActionSpace` has no attribute `gym_space`.
+        self._action_space.gym_space.seed(seed)
+        self.env.action_space.seed(seed)
+        observations, _ = self.env.reset(seed=seed)
+        self._current_observations = _as_float32(observations)
+        return self._current_observations, self.action_space
+
+    def step(self, action: Action | Sequence[Action]) -> ActionResult:
+        """
+        Steps all environments, given their actions stacked in one tensor of shape
+        (number_of_environments, action_dim) or as a sequence, and returns a batched
+        `ActionResult` (see the class docstring).
+        """
+        gym_actions = _get_gym_actions(
+            actions=action,
+            gym_space=self.env.single_action_space,
+            number_of_environments=self.number_of_environments,
+        )
+        observations, rewards, terminated, truncated, info = self.env.step(
+            gym_actions
+        )
+        observations = _as_float32(observations)
+        self._current_observations = observations
+        terminated = np.asarray(terminated, dtype=bool)
+        truncated = np.asarray(truncated, dtype=bool)
+        done = terminated | truncated
+        if done.any():
+            # the transitions of the ended episodes end at their final observations
+            final_observations = _final_observations(info)
+            observations = observations.copy()
+            for i in np.flatnonzero(done):
+                observations[i] = final_observations[i]
+        cost = info.get("cost")
+        return ActionResult(
+            observation=observations,
+            reward=np.asarray(rewards, dtype=np.float32),
+            # pyre-fixme[6]: flags are arrays with one element per environment
+            terminated=terminated,
+            # pyre-fixme[6]: flags are arrays with one element per environment
+            truncated=truncated,
+            info=info,
+            cost=None if cost is None else np.asarray(cost, dtype=np.float32),
+        )
+
+    def render(self) -> None:
+        self.env.render()
+
+    def close(self) -> None:
+        self.env.close()
+
+    def __str__(self) -> str:
+        return f"{self._env_name} x {self.number_of_environments}"
+
+
+def _get_env_name(env: gym.vector.VectorEnv) -> str:
+    # the spec of a vector environment is None in gymnasium >= 1.0, so the name is
+    # read from the spec of its first environment when it runs in the main process
+    spec = getattr(env, "spec", None)
+    if spec is None and len(getattr(env, "envs", ())) > 0:
+        spec = getattr(env.envs[0], "spec", None)
+    return spec.id if spec is not None else "CustomGymEnvironment"
+
+
+def _make_vector_env(
+    env_name: str,
+    number_of_environments: int,
+    asynchronous: bool,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> gym.vector.VectorEnv:
+    if number_of_environments < 1:
+        raise ValueError(
+            f"number_of_environments must be positive but is {number_of_environments}"
+        )
+    env_fns = [
+        functools.partial(gym.make, env_name, *args, **kwargs)
+    ] * number_of_environments
+    vector_env_kwargs = {}
+    if hasattr(gym.vector, "AutoresetMode"):
+        # gymnasium >= 1.1 resets environments in the step after their episodes end
+        # by default
+        vector_env_kwargs["autoreset_mode"] = gym.vector.AutoresetMode.SAME_STEP
+    if asynchronous:
+        return gym.vector.AsyncVectorEnv(env_fns, **vector_env_kwargs)
+    return gym.vector.SyncVectorEnv(env_fns, **vector_env_kwargs)
+
+
+def _resets_in_next_step(env: gym.vector.VectorEnv) -> bool:
+    autoreset_mode = getattr(gym.vector, "AutoresetMode", None)
+    if autoreset_mode is not None:
+        return (
+            env.metadata.get("autoreset_mode", autoreset_mode.NEXT_STEP)
+            == autoreset_mode.NEXT_STEP
+        )
+    # gymnasium 1.0 only resets in the next step, while earlier versions reset in
+    # the same step
+    return int(gym.__version__.split(".")[0]) >= 1
+
+
+# pyre-fixme[24]: Generic type `np.ndarray` expects 2 type parameters.
+def _as_float32(observations: np.ndarray) -> np.ndarray:
+    if isinstance(observations, np.ndarray) and observations.dtype == np.float64:
+        return observations.astype(np.float32)
+    return observations
+
+
+# pyre-fixme[24]: Generic type `np.ndarray` expects 2 type parameters.
+def _final_observations(info: dict[str, Any]) -> np.ndarray:
+    for key in _FINAL_OBSERVATION_KEYS:
+        if key in info:
+            return info[key]
+    raise ValueError(
+        "The vector environment ended episodes without reporting their final "
+        f"observations in its info (under one of the keys {_FINAL_OBSERVATION_KEYS})"
+    )
+
+
+def _get_gym_actions(
+    actions: Action | Sequence[Action],
+    gym_space: gym.Space,
+    number_of_environments: int,
+    # pyre-fixme[24]: Generic type `np.ndarray` expects 2 type parameters.
+) -> np.ndarray:
+    """A helper function to convert the Pearl actions of all environments to a batch
+    of actions of the Gym action space `gym_space`."""
+    if isinstance(actions, (list, tuple)):
+        actions = torch.stack([torch.as_tensor(action) for action in actions])
+    assert isinstance(actions, Tensor)
+    batched_actions = actions.numpy(force=True)
+    gym_space_name = gym_space.__class__.__name__
+    if gym_space_name == "Discrete":
+        return batched_actions.reshape(number_of_environments).astype(np.int64)
+    if gym_space_name == "Box":
+        return batched_actions.reshape((number_of_environments,) + gym_space.shape)
+    raise NotImplementedError(
+        f"The Gym space '{gym_space_name}' is not yet supported in Pearl."
+    )
@@ -1,7 +1,6 @@
 # (c) Meta Platforms, Inc. and affiliates. Confidential and proprietary.
 
 # pyre-strict
-import torch
 
 from pearl.api.action import Action
 from pearl.api.reward import Reward
@@ -11,31 +10,6 @@ from pearl.utils import get_subdataclass_specific_attributes
 from torch import Tensor
 
 
-def create_attribute_column_tensor(
-    attr_name: str,
-    transitions: list[Transition],
-) -> torch.Tensor | None:
-    """
-    Creates a tensor column from a list of transition objects.
-
-    Args:
-        attr_name (str): The name of the attribute to extract from each transition.
-        transitions (List[Transition]): A list of transition objects.
-
-    Returns:
-        Optional[torch.Tensor]: A tensor column containing the extracted attributes.
-        If any attribute is None, returns None.
-    """
-    list_of_values_of_attr = []
-    for transition in transitions:
-        value_of_attr = getattr(transition, attr_name)
-        if value_of_attr is None:
-            return None
-        list_of_values_of_attr.append(value_of_attr)
-    attr_column_tensor = torch.cat(list_of_values_of_attr)
-    return attr_column_tensor
-
-
 def make_replay_buffer_class_for_specific_transition_types(
     TransitionType: type[Transition], TransitionBatchType: type[TransitionBatch]
 ) -> type[TensorBasedReplayBuffer]:
@@ -93,35 +67,40 @@ def make_replay_buffer_class_for_specific_transition_types(
                 )
             )
 
-        @staticmethod
-        def include_attrs_in_batch(
-            attr_names: list[str],
-            transitions: list[Transition],
-            transition_batch: TransitionBatch,
-        ) -> TransitionBatchType:
-            new_columns = {
-                attr_name: create_attribute_column_tensor(attr_name, transitions)
-                for attr_name in attr_names
-            }
-
-            transition_batch = TransitionBatchType.from_parent(
-                transition_batch, **new_columns
+        def _store_batch(
+            self,
+            batch: TransitionBatch,
+            curr_available_actions_ids: Tensor | None,
+            next_available_actions_ids: Tensor | None,
+        ) -> None:
+            self.memory.append_batch(
+                self._transition_from_batch(
+                    batch,
+                    curr_available_actions_ids,
+                    next_available_actions_ids,
+                    transition_type=TransitionType,
+                )
             )
 
-            return transition_batch
-
         def _create_transition_batch(
             self,
-            transitions: list[Transition],
+            indices: Tensor,
             is_action_continuous: bool,
         ) -> TransitionBatchType:
             transition_batch = super()._create_transition_batch(
-                transitions,
+                indices,
                 is_action_continuous,
             )
 
-            transition_batch = self.include_attrs_in_batch(
-                self.attr_names, transitions, transition_batch
+            # Attributes not (yet) stored, such as PPO advantages before they are
+            # computed, are set to None in the batch.
+            new_columns = self.memory.gather(indices, self.attr_names)
+            transition_batch = TransitionBatchType.from_parent(
+                transition_batch,
+                **{
+                    attr_name: new_columns.get(attr_name)
+                    for attr_name in self.attr_names
+                },
             )
 
             return transition_batch.to(self.device_for_batches)
@@ -0,0 +1,301 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+from collections.abc import Sequence
+
+import torch
+from pearl.api.action_result import ActionResult
+from pearl.api.action_space import ActionSpace
+from pearl.api.observation import Observation
+from pearl.history_summarization_modules.history_summarization_module import (
+    HistorySummarizationModule,
+)
+from pearl.pearl_agent import PearlAgent
+from pearl.policy_learners.policy_learner import PolicyLearner
+from pearl.replay_buffers.replay_buffer import ReplayBuffer
+from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
+from pearl.replay_buffers.transition import TransitionBatch
+from pearl.safety_modules.safety_module import SafetyModule
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class VectorPearlAgent(PearlAgent):
+    """
+    A PearlAgent interacting with `number_of_environments` copies of an environment
+    at once, such as the environments of a `VectorGymEnvironment`. It keeps
+    one subjective state and one history per environment, and each call to `act`
+    or `observe` goes through the policy learner, the history summarization module
+    and the replay buffer once for all environments (see `PolicyLearner.act_batch`,
+    `HistorySummarizationModule.summarize_history_batch` and
+    `ReplayBuffer.push_batch`), instead of once per environment.
+
+    A typical loop is:
+
+        agent.reset(observations, action_space)
+        while ...:
+            actions = agent.act()
+            action_results = ...  # steps each environment with its action
+            agent.observe(action_results)
+            agent.learn()
+            agent.reset(new_observations, action_space, indices=done_environments)
+
+    (see `vector_online_learning`).
+
+    All environments share the same action space. Policy learners must work with
+    tensors, and on-policy learners are not supported since their replay buffers
+    expect the transitions of one episode at a time, as are replay buffers combining
+    each transition with the ones pushed before it (such as `NStepReplayBuffer`).
+
+    Args:
+        number_of_environments: The number of environments.
+        Other arguments are those of `PearlAgent`.
+    """
+
+    def __init__(
+        self,
+        number_of_environments: int,
+        policy_learner: PolicyLearner,
+        safety_module: SafetyModule | None = None,
+        replay_buffer: ReplayBuffer | None = None,
+        history_summarization_module: HistorySummarizationModule | None = None,
+        device_id: int = -1,
+    ) -> None:
+        if number_of_environments < 1:
+            raise ValueError(
+                "number_of_environments must be positive but is "
+                f"{number_of_environments}"
+            )
+        if not policy_learner.requires_tensors:
+            raise ValueError(
+                f"{type(policy_learner).__name__} does not support batches of "
+                "environments since it does not work with tensors"
+            )
+        if policy_learner.on_policy:
+            raise ValueError(
+                f"{type(policy_learner).__name__} does not support batches of "
+                "environments since it learns from complete episodes"
+            )
+        if (
+            replay_buffer is not None
+            and replay_buffer._requires_consecutive_transitions
+        ):
+            raise ValueError(
+                f"{type(replay_buffer).__name__} does not support batches of "
+                "environments since it requires consecutive transitions"
+            )
+        super().__init__(
+            policy_learner=policy_learner,
+            safety_module=safety_module,
+            replay_buffer=replay_buffer,
+            history_summarization_module=history_summarization_module,
+            device_id=device_id,
+        )
+        self.number_of_environments = number_of_environments
+        # the subjective states, latest actions and histories of the environments,
+        # one row per environment
+        self._subjective_states: torch.Tensor | None = None
+        self._latest_actions: torch.Tensor | None = None
+        self._histories: torch.Tensor | None = None
+
+    # pyre-fixme[14]: `act` overrides method defined in `PearlAgent` inconsistently.
+    def act(self, exploit: bool = False) -> torch.Tensor:
+        """
+        Returns the actions of all environments, of shape
+        (number_of_environments, action_dim).
+        """
+        subjective_states = self._subjective_states
+        assert subjective_states is not None and self._action_space is not None
+        safe_action_space = self.safety_module.filter_action(
+            subjective_states, self._action_space
+        )
+        if isinstance(safe_action_space, DiscreteActionSpace):
+            safe_action_space.to(self.device)
+        actions = self.policy_learner.act_batch(
+            subjective_states, safe_action_space, exploit=exploit
+        )
+        self._latest_actions = actions
+        return actions
+
+    # pyre-fixme[14]: `observe` overrides method defined in `PearlAgent`
+    #  inconsistently.
+    def observe(self, action_results: ActionResult | Sequence[ActionResult]) -> None:
+        """
+        Pushes the transitions of all environments to the replay buffer as one batch.
+        `action_results` is either one batched action result, whose fields have one
+        row per environment (as returned by `VectorGymEnvironment.step`), or a
+        sequence whose element `i` is the result of the latest action of
+        environment `i`.
+        """
+        latest_actions = self._latest_actions
+        action_space = self._action_space
+        assert latest_actions is not None and action_space is not None
+        observations, rewards, terminated, truncated, costs = (
+            self._batch_action_results(action_results)
+        )
+        if len(observations) != self.number_of_environments:
+            raise ValueError(
+                f"Expected the results of {self.number_of_environments} environments "
+                f"but got {len(observations)}"
+            )
+        actions = latest_actions.view(self.number_of_environments, -1)
+        action_representations = self.policy_learner.action_representation_module(
+            actions.to(self.device)
+        )
+        current_histories = self._histories
+        new_subjective_states, new_histories = (
+            self.history_summarization_module.summarize_history_batch(
+                observations, action_representations, current_histories
+            )
+        )
+        assert current_histories is not None
+
+        available_actions, unavailable_actions_mask = None, None
+        if not self.policy_learner._is_action_continuous:
+            max_number_actions = (
+                self.policy_learner.action_representation_module.max_number_actions
+            )
+            available_actions, unavailable_actions_mask = (
+                TensorBasedReplayBuffer.create_action_tensor_and_mask(
+                    max_number_actions, action_space
+                )
+            )
+            assert available_actions is not None
+            assert unavailable_actions_mask is not None
+            available_actions = available_actions.expand(
+                self.number_of_environments, -1, -1
+            )
+            unavailable_actions_mask = unavailable_actions_mask.expand(
+                self.number_of_environments, -1
+            )
+
+        self.replay_buffer.push_batch(
+            TransitionBatch(
+                state=current_histories,
+                action=actions,
+                reward=rewards,
+                next_state=new_histories,
+                curr_available_actions=available_actions,
+                curr_unavailable_actions_mask=unavailable_actions_mask,
+                next_available_actions=available_actions,
+                next_unavailable_actions_mask=unavailable_actions_mask,
+                terminated=terminated,
+                truncated=truncated,
+                cost=costs,
+            )
+        )
+        self._subjective_states = new_subjective_states
+        self._histories = new_histories
+
+    # pyre-fixme[14]: `reset` overrides method defined in `PearlAgent`
+    #  inconsistently.
+    def reset(
+        self,
+        observations: Sequence[Observation] | torch.Tensor,
+        available_action_space: ActionSpace,
+        indices: Sequence[int] | torch.Tensor | None = None,
+    ) -> None:
+        """
+        Starts new episodes in the environments of `indices`, whose first
+        observations are `observations` (one per index), or in all environments if
+        `indices` is None. The other environments continue their episodes.
+        """
+        stacked_observations = self._stack_observations(observations)
+        subjective_states, histories = (
+            self.history_summarization_module.summarize_history_batch(
+                stacked_observations, None, None
+            )
+        )
+        if indices is None:
+            if len(stacked_observations) != self.number_of_environments:
+                raise ValueError(
+                    f"Expected {self.number_of_environments} observations but got "
+                    f"{len(stacked_observations)}"
+                )
+            self._subjective_states = subjective_states
+            self._histories = histories
+            self._latest_actions = None
+        else:
+            current_subjective_states = self._subjective_states
+            current_histories = self._histories
+            assert current_subjective_states is not None
+            assert current_histories is not None
+            indices = torch.as_tensor(indices, dtype=torch.long, device=self.device)
+            # out of place, since the replay buffer may hold the current histories
+            self._subjective_states = current_subjective_states.index_copy(
+                0, indices, subjective_states.to(current_subjective_states.dtype)
+            )
+            self._histories = current_histories.index_copy(
+                0, indices, histories.to(current_histories.dtype)
+            )
+        self._action_space = available_action_space
+        self.policy_learner.reset(available_action_space)
+
+    def _batch_action_results(
+        self, action_results: ActionResult | Sequence[ActionResult]
+    ) -> tuple[
+        torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor | None
+    ]:
+        """
+        Returns the observations, rewards, terminated and truncated flags and costs
+        of the action results, with one row per environment.
+        """
+        if isinstance(action_results, ActionResult):
+            return (
+                self._stack_observations(action_results.observation),
+                self._as_tensor(action_results.reward),
+                self._as_tensor(action_results.terminated, dtype=torch.bool),
+                self._as_tensor(action_results.truncated, dtype=torch.bool),
+                (
+                    None
+                    if action_results.cost is None
+                    else self._as_tensor(action_results.cost)
+                ),
+            )
+        costs = [action_result.cost for action_result in action_results]
+        return (
+            self._stack_observations(
+                [action_result.observation for action_result in action_results]
+            ),
+            self._as_tensor(
+                [action_result.reward for action_result in action_results]
+            ),
+            self._as_tensor(
+                [action_result.terminated for action_result in action_results],
+                dtype=torch.bool,
+            ),
+            self._as_tensor(
+                [action_result.truncated for action_result in action_results],
+                dtype=torch.bool,
+            ),
+            None if any(cost is None for cost in costs) else self._as_tensor(costs),
+        )
+
+    def _stack_observations(
+        self, observations: Sequence[Observation] | Observation
+    ) -> torch.Tensor:
+        if isinstance(observations, (list, tuple)):
+            return torch.stack(
+                [torch.as_tensor(observation) for observation in observations]
+            ).to(self.device)
+        # observations batched in one array or tensor
+        return torch.as_tensor(observations).to(self.device)
+
+    def _as_tensor(
+        self, values: object, dtype: torch.dtype = torch.float32
+    ) -> torch.Tensor:
+        if isinstance(values, (list, tuple)):
+            values = [
+                value.item() if isinstance(value, torch.Tensor) else value
+                for value in values
+            ]
+        # pyre-fixme[6]: values are a sequence or an array of numbers
+        return torch.as_tensor(values, dtype=dtype, device=self.device).view(-1)
+
+    def __str__(self) -> str:
+        return f"Vector{super().__str__()} over {self.number_of_environments} envs"
@@ -0,0 +1,161 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.history_summarization_modules.lstm_history_summarization_module import (
+    LSTMHistorySummarizationModule,
+)
+from pearl.pearl_agent import PearlAgent
+from pearl.policy_learners.exploration_modules.common.epsilon_greedy_exploration import (
+    EGreedyExploration,
+)
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.policy_learners.sequential_decision_making.ppo import (
+    ProximalPolicyOptimization,
+)
+from pearl.replay_buffers import BasicReplayBuffer
+from pearl.utils.functional_utils.train_and_eval.asynchronous_learner import (
+    _acting_state_keys,
+    AsynchronousLearner,
+)
+from pearl.utils.functional_utils.train_and_eval.online_learning import (
+    online_learning,
+    run_episode,
+)
+from pearl.utils.instantiations.environments.gym_environment import GymEnvironment
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestAsynchronousLearner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.env = GymEnvironment("CartPole-v1")
+        action_space = self.env.action_space
+        assert isinstance(action_space, DiscreteActionSpace)
+        self.replay_buffer = BasicReplayBuffer(1000)
+        self.agent = PearlAgent(
+            policy_learner=DeepQLearning(
+                state_dim=4,
+                action_space=action_space,
+                hidden_dims=[16],
+                training_rounds=2,
+                batch_size=16,
+                exploration_module=EGreedyExploration(
+                    epsilon=0.1, start_epsilon=1.0, end_epsilon=0.1, warmup_steps=100
+                ),
+                action_representation_module=OneHotActionTensorRepresentationModule(
+                    max_number_actions=action_space.n
+                ),
+            ),
+            replay_buffer=self.replay_buffer,
+        )
+
+    def test_learn_while_acting(self) -> None:
+        initial_parameters = [
+            parameter.clone() for parameter in self.agent.policy_learner.parameters()
+        ]
+        asynchronous_learner = AsynchronousLearner(
+            self.agent, update_to_data_ratio=0.5, learning_start_step=10
+        )
+        number_of_steps = 0
+        with asynchronous_learner:
+            for _ in range(3):
+                _, episode_steps = run_episode(
+                    self.agent,
+                    self.env,
+                    exploit=False,
+                    asynchronous_learner=asynchronous_learner,
+                )
+                number_of_steps += episode_steps
+        self.assertGreater(asynchronous_learner.number_of_learn_calls, 0)
+        self.assertLessEqual(
+            asynchronous_learner.number_of_learn_calls, 0.5 * number_of_steps
+        )
+        # the agent gets its replay buffer and the learned parameters back
+        self.assertIs(self.agent.replay_buffer, self.replay_buffer)
+        self.assertEqual(len(self.replay_buffer), number_of_steps)
+        self.assertFalse(
+            all(
+                torch.equal(initial_parameter, parameter)
+                for initial_parameter, parameter in zip(
+                    initial_parameters, self.agent.policy_learner.parameters()
+                )
+            )
+        )
+        # exploration is scheduled by the steps of the acting policy learner
+        exploration_module = self.agent.policy_learner.exploration_module
+        assert isinstance(exploration_module, EGreedyExploration)
+        self.assertEqual(exploration_module.time_step, number_of_steps)
+
+    def test_achieved_update_to_data_ratio(self) -> None:
+        asynchronous_learner = AsynchronousLearner(
+            self.agent, update_to_data_ratio=2.0, max_lag=3
+        )
+        number_of_steps = 0
+        with asynchronous_learner:
+            for _ in range(3):
+                _, episode_steps = run_episode(
+                    self.agent,
+                    self.env,
+                    exploit=False,
+                    asynchronous_learner=asynchronous_learner,
+                )
+                number_of_steps += episode_steps
+                # the agent waits for the background thread when it falls behind
+                self.assertGreaterEqual(
+                    asynchronous_learner.number_of_learn_calls,
+                    2 * number_of_steps - 3,
+                )
+        self.assertLessEqual(
+            asynchronous_learner.number_of_learn_calls, 2 * number_of_steps
+        )
+
+    def test_invalid_max_lag(self) -> None:
+        with self.assertRaises(ValueError):
+            AsynchronousLearner(self.agent, max_lag=-1)
+
+    def test_online_learning(self) -> None:
+        info = online_learning(
+            self.agent, self.env, number_of_episodes=3, asynchronous=True
+        )
+        self.assertEqual(len(info["return"]), 3)
+        self.assertIs(self.agent.replay_buffer, self.replay_buffer)
+
+    def test_acting_state_keys(self) -> None:
+        policy_learner = self.agent.policy_learner
+        policy_learner.set_history_summarization_module(
+            LSTMHistorySummarizationModule(
+                observation_dim=4, action_dim=2, history_length=3, hidden_dim=4
+            )
+        )
+        keys = _acting_state_keys(policy_learner)
+        self.assertTrue(any(key.startswith("exploration_module.") for key in keys))
+        self.assertTrue(any(key.endswith(".history") for key in keys))
+        # the weights of the LSTM are learned
+        parameter_names = {name for name, _ in policy_learner.named_parameters()}
+        self.assertTrue(any("lstm" in name for name in parameter_names))
+        self.assertFalse(keys & parameter_names)
+
+    def test_on_policy_learners_are_not_supported(self) -> None:
+        agent = PearlAgent(
+            policy_learner=ProximalPolicyOptimization(
+                state_dim=4,
+                action_space=self.env.action_space,
+                actor_hidden_dims=[8],
+                critic_hidden_dims=[8],
+            )
+        )
+        with self.assertRaises(ValueError):
+            AsynchronousLearner(agent)
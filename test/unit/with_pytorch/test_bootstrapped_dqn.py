@@ -0,0 +1,126 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.neural_networks.sequential_decision_making.q_value_networks import (
+    EnsembleQValueNetwork,
+)
+from pearl.policy_learners.sequential_decision_making.bootstrapped_dqn import (
+    BootstrappedDQN,
+)
+from pearl.replay_buffers.sequential_decision_making.bootstrap_replay_buffer import (
+    BootstrapReplayBuffer,
+    hashed_bootstrap_masks,
+)
+from pearl.replay_buffers.transition import filter_batch_by_bootstrap_mask
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestBootstrappedDQN(unittest.TestCase):
+    def setUp(self) -> None:
+        self.state_dim = 3
+        self.ensemble_size = 4
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([1.0, 0.0]), torch.tensor([0.0, 1.0])]
+        )
+
+    def test_hashed_bootstrap_masks(self) -> None:
+        indices = torch.arange(10000)
+        masks = hashed_bootstrap_masks(indices, ensemble_size=3, p=0.3, seed=7)
+        self.assertEqual(masks.shape, (10000, 3))
+        # masks are a function of the index, head and seed only
+        tt.assert_close(
+            hashed_bootstrap_masks(indices[[5, 2]], 3, 0.3, 7), masks[[5, 2]]
+        )
+        self.assertFalse(
+            torch.equal(hashed_bootstrap_masks(indices, 3, 0.3, 8), masks)
+        )
+        tt.assert_close(masks.mean(dim=0), torch.full((3,), 0.3), atol=0.02, rtol=0)
+        # heads are not correlated
+        both = (masks[:, 0] * masks[:, 1]).mean()
+        tt.assert_close(both, torch.tensor(0.09), atol=0.02, rtol=0)
+
+    def test_single_pass_loss(self) -> None:
+        replay_buffer = BootstrapReplayBuffer(
+            capacity=20, p=0.5, ensemble_size=self.ensemble_size
+        )
+        for i in range(20):
+            action = self.action_space.sample()
+            replay_buffer.push(
+                state=torch.randn(self.state_dim),
+                action=action,
+                reward=float(i % 3),
+                terminated=i % 5 == 4,
+                truncated=False,
+                curr_available_actions=self.action_space,
+                next_state=torch.randn(self.state_dim),
+                next_available_actions=self.action_space,
+            )
+        batch = replay_buffer.sample(20)
+        learner = BootstrappedDQN(
+            action_space=self.action_space,
+            q_ensemble_network=EnsembleQValueNetwork(
+                state_dim=self.state_dim,
+                action_dim=2,
+                hidden_dims=[8],
+                output_dim=1,
+                ensemble_size=self.ensemble_size,
+            ),
+            learning_rate=0.0,
+        )
+        batch = learner.preprocess_batch(batch)
+
+        # the loss of the former implementation, with one pass per member
+        expected_loss = torch.tensor(0.0)
+        assert (mask := batch.bootstrap_mask) is not None
+        with torch.no_grad():
+            for z in range(self.ensemble_size):
+                if mask[:, z].sum() == 0:
+                    continue
+                member_batch = filter_batch_by_bootstrap_mask(batch, torch.tensor(z))
+                q_values = learner._Q.get_q_values(
+                    member_batch.state, member_batch.action, z=torch.tensor(z)
+                )
+                next_state_values = learner._get_all_next_state_values(
+                    member_batch, len(member_batch)
+                )[z]
+                targets = (
+                    next_state_values
+                    * 0.99
+                    * (1 - member_batch.terminated.float())
+                    + member_batch.reward
+                )
+                expected_loss += torch.nn.functional.mse_loss(q_values, targets)
+
+        report = learner.learn_batch(batch)
+        self.assertAlmostEqual(report["loss"], expected_loss.item(), places=5)
+
+    def test_gradients_reach_all_members(self) -> None:
+        network = EnsembleQValueNetwork(
+            state_dim=self.state_dim,
+            action_dim=2,
+            hidden_dims=[8],
+            output_dim=1,
+            ensemble_size=self.ensemble_size,
+        )
+        states = torch.randn(5, self.state_dim)
+        actions = torch.eye(2)[torch.randint(2, (5,))]
+        q_values = network.get_all_q_values(states, actions)
+        self.assertEqual(q_values.shape, (self.ensemble_size, 5))
+        for z in range(self.ensemble_size):
+            tt.assert_close(
+                q_values[z], network.get_q_values(states, actions, z=torch.tensor(z))
+            )
+        q_values.sum().backward()
+        for model in network._model.models:
+            for parameter in model.base_net.parameters():
+                self.assertIsNotNone(parameter.grad)
@@ -0,0 +1,116 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import os
+import tempfile
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import (
+    BasicReplayBuffer,
+    CastCodec,
+    QuantizedCodec,
+    ZlibCodec,
+)
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestCodecs(unittest.TestCase):
+    def setUp(self) -> None:
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0]), torch.tensor([1])]
+        )
+        # sparse pixel observations
+        self.states: torch.Tensor = torch.randint(0, 256, (12, 2, 8, 8)).float()
+        self.states *= torch.rand(12, 2, 8, 8) < 0.1
+
+    def push(self, replay_buffer: BasicReplayBuffer) -> None:
+        for i in range(len(self.states) - 1):
+            replay_buffer.push(
+                state=self.states[i],
+                action=self.action_space.sample(),
+                reward=float(i),
+                next_state=self.states[i + 1],
+                curr_available_actions=self.action_space,
+                next_available_actions=self.action_space,
+                terminated=False,
+                truncated=False,
+            )
+
+    def test_quantized_codec(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=8)
+        replay_buffer.set_codecs(
+            {"state": QuantizedCodec(), "next_state": QuantizedCodec()}
+        )
+        self.push(replay_buffer)
+        self.assertEqual(replay_buffer.memory._columns["state"].dtype, torch.uint8)
+        batch = replay_buffer._create_transition_batch(
+            torch.arange(8), is_action_continuous=False
+        )
+        # pixel intensities are stored losslessly, and sampled as floats
+        self.assertEqual(batch.state.dtype, torch.float32)
+        logical_order = replay_buffer.memory.logical_to_physical(torch.arange(8))
+        tt.assert_close(batch.state[logical_order], self.states[3:11])
+        assert (next_state := batch.next_state) is not None
+        tt.assert_close(next_state[logical_order], self.states[4:12])
+
+        codec = QuantizedCodec(scale=0.5, offset=-1.0)
+        values = torch.tensor([-2.0, -1.0, 0.3, 200.0])
+        tt.assert_close(
+            codec.decode(codec.encode(values), torch.float32),
+            torch.tensor([-1.0, -1.0, 0.5, 126.5]),
+        )
+
+    def test_cast_codec(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=20)
+        replay_buffer.set_codecs({"state": CastCodec(torch.bfloat16)})
+        self.push(replay_buffer)
+        self.assertEqual(replay_buffer.memory._columns["state"].dtype, torch.bfloat16)
+        batch = replay_buffer.sample(5)
+        self.assertEqual(batch.state.dtype, torch.float32)
+        tt.assert_close(
+            replay_buffer.memory.column("state"),
+            self.states[:11],
+            rtol=1e-2,
+            atol=0.0,
+        )
+        with self.assertRaises(ValueError):
+            CastCodec(torch.int8)
+        # codecs are set before columns are written
+        with self.assertRaises(ValueError):
+            replay_buffer.set_codecs({"state": CastCodec()})
+
+    def test_zlib_codec(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=8)
+        codec = ZlibCodec(number_of_threads=2)
+        replay_buffer.set_codecs({"state": codec, "next_state": codec})
+        self.push(replay_buffer)
+        self.assertNotIn("state", replay_buffer.memory._columns)
+        rows = replay_buffer.memory._byte_columns["state"]
+        self.assertLess(sum(len(row) for row in rows), 8 * self.states[0].nbytes)
+
+        # rows are decompressed exactly, in the order they are sampled
+        indices = torch.tensor([5, 0, 7, 5, 2, 1])
+        batch = replay_buffer._create_transition_batch(
+            indices, is_action_continuous=False
+        )
+        logical_indices = (indices - replay_buffer.memory.next_index) % 8
+        tt.assert_close(batch.state, self.states[3:11][logical_indices])
+        self.assertEqual(replay_buffer.memory[-1].state.shape, (1, 2, 8, 8))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "snapshot")
+            replay_buffer.save(path)
+            loaded_replay_buffer = BasicReplayBuffer(capacity=8)
+            loaded_replay_buffer.load(path)
+        tt.assert_close(
+            loaded_replay_buffer.memory.column("state"),
+            replay_buffer.memory.column("state"),
+        )
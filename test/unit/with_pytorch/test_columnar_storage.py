@@ -0,0 +1,109 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import BasicReplayBuffer
+from pearl.replay_buffers.columnar_storage import ColumnarStorage
+from pearl.replay_buffers.transition import Transition
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+def make_transition(i: int, reward: float | int | None = None) -> Transition:
+    return Transition(
+        state=torch.tensor([[float(i), 0.0]]),
+        action=torch.tensor([i]),
+        reward=torch.tensor([i if reward is None else reward]),
+        terminated=torch.tensor([False]),
+        truncated=torch.tensor([False]),
+    )
+
+
+class TestColumnarStorage(unittest.TestCase):
+    def test_circular_overwrite_keeps_newest_rows(self) -> None:
+        storage = ColumnarStorage(capacity=4)
+        for i in range(6):
+            storage.append(make_transition(i))
+
+        self.assertEqual(len(storage), 4)
+        # the oldest rows (0 and 1) were overwritten
+        state_column = storage.column("state")
+        assert state_column is not None
+        tt.assert_close(state_column[:, 0], torch.tensor([2.0, 3.0, 4.0, 5.0]))
+        tt.assert_close(storage[0].state, torch.tensor([[2.0, 0.0]]))
+        tt.assert_close(storage[-1].action, torch.tensor([5]))
+
+        # physical indices cover exactly the stored rows
+        gathered = storage.gather(torch.arange(4), ["action"])
+        self.assertEqual(sorted(gathered["action"].tolist()), [2, 3, 4, 5])
+
+    def test_dtype_is_promoted(self) -> None:
+        storage = ColumnarStorage(capacity=3)
+        storage.append(make_transition(0, reward=1))
+        storage.append(make_transition(1, reward=2.5))
+        reward_column = storage.column("reward")
+        assert reward_column is not None
+        self.assertEqual(reward_column.dtype, torch.float32)
+        tt.assert_close(reward_column, torch.tensor([1.0, 2.5]))
+
+    def test_inconsistent_rows_raise(self) -> None:
+        storage = ColumnarStorage(capacity=3)
+        storage.append(make_transition(0))
+        with_next_state = make_transition(1)
+        with_next_state.next_state = torch.tensor([[1.0, 0.0]])
+        with self.assertRaises(ValueError):
+            storage.append(with_next_state)
+        wrong_shape = make_transition(1)
+        wrong_shape.state = torch.tensor([[1.0, 0.0, 0.0]])
+        with self.assertRaises(ValueError):
+            storage.append(wrong_shape)
+
+    def test_set_column_uses_logical_order(self) -> None:
+        storage = ColumnarStorage(capacity=3)
+        for i in range(5):
+            storage.append(make_transition(i))
+        storage.set_column("weight", torch.tensor([10.0, 20.0, 30.0]))
+        weight_column = storage.column("weight")
+        assert weight_column is not None
+        tt.assert_close(weight_column, torch.tensor([10.0, 20.0, 30.0]))
+        tt.assert_close(storage[1].weight, torch.tensor([20.0]))
+
+    def test_basic_replay_buffer_sampling(self) -> None:
+        capacity = 5
+        replay_buffer = BasicReplayBuffer(capacity)
+        action_space = DiscreteActionSpace([torch.tensor([0]), torch.tensor([1])])
+        for i in range(2 * capacity):
+            replay_buffer.push(
+                state=torch.tensor([float(i)]),
+                action=torch.tensor([i % 2]),
+                reward=float(i),
+                next_state=torch.tensor([float(i + 1)]),
+                curr_available_actions=action_space,
+                next_available_actions=action_space,
+                terminated=False,
+                truncated=False,
+            )
+        self.assertEqual(len(replay_buffer), capacity)
+
+        batch = replay_buffer.sample(capacity)
+        # sampling is without replacement, so a full batch contains every transition
+        self.assertEqual(
+            sorted(batch.state.squeeze(-1).tolist()),
+            [float(i) for i in range(capacity, 2 * capacity)],
+        )
+        tt.assert_close(batch.next_state, batch.state + 1)
+        self.assertEqual(batch.curr_available_actions.shape, (capacity, 2, 1))
+        self.assertEqual(batch.next_unavailable_actions_mask.shape, (capacity, 2))
+
+        replay_buffer.clear()
+        self.assertEqual(len(replay_buffer), 0)
+        with self.assertRaises(ValueError):
+            replay_buffer.sample(1)
@@ -0,0 +1,99 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.nn.functional as F
+import torch.testing as tt
+from pearl.data_augmentation_modules import (
+    ComposedAugmentationModule,
+    CutoutAugmentationModule,
+    IntensityJitterAugmentationModule,
+    RandomShiftAugmentationModule,
+)
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.replay_buffers.transition import TransitionBatch
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestDataAugmentationModules(unittest.TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(0)
+        self.images: torch.Tensor = torch.randint(0, 256, (16, 3, 8, 10)).float()
+
+    def test_random_shift(self) -> None:
+        padding = 2
+        shifted = RandomShiftAugmentationModule(padding)(self.images)
+        self.assertEqual(shifted.shape, self.images.shape)
+        padded = F.pad(self.images, [padding] * 4, mode="replicate")
+        shifts = set()
+        for i in range(len(self.images)):
+            # each image is a crop of its padded image
+            matching_shifts = [
+                (top, left)
+                for top in range(2 * padding + 1)
+                for left in range(2 * padding + 1)
+                if torch.equal(
+                    shifted[i], padded[i, :, top : top + 8, left : left + 10]
+                )
+            ]
+            self.assertEqual(len(matching_shifts), 1)
+            shifts.add(matching_shifts[0])
+        # images are shifted independently
+        self.assertGreater(len(shifts), 1)
+        tt.assert_close(RandomShiftAugmentationModule(0)(self.images), self.images)
+
+    def test_intensity_jitter(self) -> None:
+        jittered = IntensityJitterAugmentationModule(scale=0.1)(self.images + 1.0)
+        ratios = jittered / (self.images + 1.0)
+        # each image is scaled by a single factor in [0.8, 1.2], up to the rounding
+        # of the division
+        tt.assert_close(ratios, ratios[:, :1, :1, :1].expand_as(ratios))
+        self.assertTrue(((ratios >= 0.8 - 1e-6) & (ratios <= 1.2 + 1e-6)).all())
+
+    def test_cutout(self) -> None:
+        cut = CutoutAugmentationModule(size=3, fill_value=-1.0)(self.images)
+        is_cut = cut == -1.0
+        # a 3 x 3 square is cut in every channel of every image
+        self.assertTrue((is_cut.sum(dim=(2, 3)) == 9).all())
+        self.assertTrue((is_cut == is_cut[:, :1]).all())
+        tt.assert_close(cut[~is_cut], self.images[~is_cut])
+        with self.assertRaises(ValueError):
+            CutoutAugmentationModule(size=9)(self.images)
+
+    def test_preprocess_batch(self) -> None:
+        policy_learner = DeepQLearning(
+            state_dim=3 * 8 * 10,
+            action_space=DiscreteActionSpace(
+                actions=[torch.tensor([0]), torch.tensor([1])]
+            ),
+            hidden_dims=[8],
+        )
+        policy_learner.set_data_augmentation_module(
+            ComposedAugmentationModule(
+                [RandomShiftAugmentationModule(2), IntensityJitterAugmentationModule()]
+            )
+        )
+        batch = TransitionBatch(
+            state=self.images.clone(),
+            action=torch.zeros(16, 1),
+            reward=torch.zeros(16),
+            next_state=self.images.clone(),
+            terminated=torch.zeros(16, dtype=torch.bool),
+            truncated=torch.zeros(16, dtype=torch.bool),
+        )
+        batch = policy_learner.preprocess_batch(batch)
+        self.assertEqual(batch.state.shape, self.images.shape)
+        self.assertFalse(torch.equal(batch.state, self.images))
+        # states and next states are augmented independently
+        assert (next_state := batch.next_state) is not None
+        self.assertFalse(torch.equal(batch.state, next_state))
@@ -0,0 +1,113 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import dataclasses
+import random
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import BasicReplayBuffer, PrefetchingReplayBuffer
+from pearl.replay_buffers.sequential_decision_making.prioritized_replay_buffer import (
+    PrioritizedReplayBuffer,
+)
+from pearl.replay_buffers.transition import TransitionBatch
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestDeviceResidentReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.device: torch.device = (
+            torch.device("cuda") if torch.cuda.is_available() else torch.device("cpu")
+        )
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0]), torch.tensor([1]), torch.tensor([2])]
+        )
+
+    def push(self, replay_buffers: list[BasicReplayBuffer], number: int) -> None:
+        for i in range(number):
+            state = torch.randn(4)
+            next_state = torch.randn(4)
+            action = self.action_space.sample()
+            for replay_buffer in replay_buffers:
+                replay_buffer.push(
+                    state=state,
+                    action=action,
+                    reward=float(i),
+                    next_state=next_state,
+                    curr_available_actions=self.action_space,
+                    next_available_actions=self.action_space,
+                    terminated=i % 5 == 4,
+                    truncated=False,
+                )
+
+    def sample(self, replay_buffer: BasicReplayBuffer, seed: int) -> TransitionBatch:
+        random.seed(seed)
+        torch.manual_seed(seed)
+        return replay_buffer.sample(6)
+
+    def test_same_batches(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=10)
+        replay_buffer.device_for_batches = self.device
+        device_resident_replay_buffer = BasicReplayBuffer(
+            capacity=10, device_resident=True
+        )
+        device_resident_replay_buffer.device_for_batches = self.device
+        self.push([replay_buffer, device_resident_replay_buffer], 13)
+
+        for column in device_resident_replay_buffer.memory._columns.values():
+            self.assertEqual(column.device.type, self.device.type)
+        for seed in range(3):
+            batch = self.sample(replay_buffer, seed)
+            device_resident_batch = self.sample(device_resident_replay_buffer, seed)
+            for field in dataclasses.fields(batch):
+                tt.assert_close(
+                    getattr(device_resident_batch, field.name),
+                    getattr(batch, field.name),
+                )
+
+    def test_batches_are_not_copied(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=10, device_resident=True)
+        replay_buffer.device_for_batches = self.device
+        self.push([replay_buffer], 8)
+        batch = replay_buffer.sample(4)
+        state = batch.state
+        self.assertIs(batch.to(self.device).state, state)
+
+    def test_move_storage(self) -> None:
+        replay_buffer = PrioritizedReplayBuffer(capacity=10)
+        self.push([replay_buffer], 8)
+        replay_buffer.device_resident = True
+        replay_buffer.device_for_batches = self.device
+        self.push([replay_buffer], 4)
+        for column in replay_buffer.memory._columns.values():
+            self.assertEqual(column.device.type, self.device.type)
+        assert (actions := replay_buffer._action_spaces._actions) is not None
+        self.assertEqual(actions.device.type, self.device.type)
+        batch = replay_buffer.sample(5)
+        self.assertEqual(batch.state.device.type, self.device.type)
+
+        replay_buffer.device_resident = False
+        for column in replay_buffer.memory._columns.values():
+            self.assertEqual(column.device.type, "cpu")
+
+    def test_prefetching(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=10, device_resident=True)
+        replay_buffer.device_for_batches = self.device
+        prefetching_replay_buffer = PrefetchingReplayBuffer(replay_buffer)
+        # the transitions stay on the device, where batches are gathered
+        self.assertEqual(replay_buffer.device_for_batches, self.device)
+        self.assertFalse(prefetching_replay_buffer._should_pin_memory())
+        self.push([replay_buffer], 8)
+        for column in replay_buffer.memory._columns.values():
+            self.assertEqual(column.device.type, self.device.type)
+        batch = prefetching_replay_buffer.sample(4)
+        assert isinstance(batch, TransitionBatch)
+        self.assertEqual(batch.state.device.type, self.device.type)
+        prefetching_replay_buffer.close()
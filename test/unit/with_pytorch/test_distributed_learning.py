@@ -0,0 +1,106 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import functools
+import unittest
+
+import torch
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.pearl_agent import PearlAgent
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.replay_buffers import BasicReplayBuffer, SharedMemoryReplayBuffer
+from pearl.utils.functional_utils.train_and_eval.distributed_learning import (
+    distributed_learning,
+    SharedWeights,
+)
+from pearl.utils.instantiations.environments.gym_environment import GymEnvironment
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestDistributedLearning(unittest.TestCase):
+    def setUp(self) -> None:
+        self.env_factory = functools.partial(GymEnvironment, "CartPole-v1")
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0]), torch.tensor([1])]
+        )
+
+    def dqn(self) -> DeepQLearning:
+        return DeepQLearning(
+            state_dim=4,
+            action_space=self.action_space,
+            hidden_dims=[16],
+            training_rounds=1,
+            batch_size=16,
+            action_representation_module=OneHotActionTensorRepresentationModule(
+                max_number_actions=2
+            ),
+        )
+
+    def test_actors_feed_learner(self) -> None:
+        for number_of_actors in [1, 2]:
+            replay_buffer = SharedMemoryReplayBuffer(capacity=1000)
+            agent = PearlAgent(policy_learner=self.dqn(), replay_buffer=replay_buffer)
+            initial_parameters = [
+                parameter.clone() for parameter in agent.policy_learner.parameters()
+            ]
+            info = distributed_learning(
+                agent,
+                self.env_factory,
+                number_of_actors=number_of_actors,
+                number_of_steps=200,
+                update_to_data_ratio=0.25,
+                learning_start_step=20,
+                seed=0,
+            )
+            # the first transition is pushed by the learner
+            self.assertEqual(len(replay_buffer), 201)
+            self.assertGreater(len(info["return"]), 0)
+            self.assertGreater(info["number_of_learn_calls"], 0)
+            self.assertLessEqual(info["number_of_learn_calls"], 50)
+            self.assertFalse(
+                all(
+                    torch.equal(initial_parameter, parameter)
+                    for initial_parameter, parameter in zip(
+                        initial_parameters, agent.policy_learner.parameters()
+                    )
+                )
+            )
+
+    def test_shared_weights(self) -> None:
+        learner, actor = self.dqn(), self.dqn()
+        shared_weights = SharedWeights(learner)
+        version = shared_weights.load(actor)
+        for learner_parameter, actor_parameter in zip(
+            learner.parameters(), actor.parameters()
+        ):
+            torch.testing.assert_close(learner_parameter, actor_parameter)
+        with torch.no_grad():
+            for parameter in learner.parameters():
+                parameter.add_(1.0)
+        # the actor only sees published weights
+        self.assertEqual(shared_weights.load(actor, version), version)
+        shared_weights.publish(learner)
+        self.assertEqual(shared_weights.load(actor, version), version + 1)
+        for learner_parameter, actor_parameter in zip(
+            learner.parameters(), actor.parameters()
+        ):
+            torch.testing.assert_close(learner_parameter, actor_parameter)
+
+    def test_requires_shared_memory_replay_buffer(self) -> None:
+        agent = PearlAgent(
+            policy_learner=self.dqn(), replay_buffer=BasicReplayBuffer(100)
+        )
+        with self.assertRaises(ValueError):
+            distributed_learning(
+                agent, self.env_factory, number_of_actors=1, number_of_steps=10
+            )
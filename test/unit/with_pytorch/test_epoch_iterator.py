@@ -0,0 +1,86 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import BasicReplayBuffer, EpochIterator
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestEpochIterator(unittest.TestCase):
+    def setUp(self) -> None:
+        action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0]), torch.tensor([1])]
+        )
+        self.replay_buffer = BasicReplayBuffer(capacity=20)
+        # rewards identify transitions
+        for i in range(10):
+            self.replay_buffer.push(
+                state=torch.randn(3),
+                action=action_space.sample(),
+                reward=float(i),
+                next_state=torch.randn(3),
+                curr_available_actions=action_space,
+                next_available_actions=action_space,
+                terminated=False,
+                truncated=False,
+            )
+
+    def test_epochs(self) -> None:
+        iterator = EpochIterator(self.replay_buffer, batch_size=4, seed=0)
+        self.assertEqual(len(iterator), 3)
+        epochs = []
+        for _ in range(2):
+            batches = list(iterator)
+            self.assertEqual([len(batch.reward) for batch in batches], [4, 4, 2])
+            rewards = torch.cat([batch.reward for batch in batches])
+            # every transition is used once per epoch
+            tt.assert_close(rewards.sort()[0], torch.arange(10.0))
+            epochs.append(rewards)
+        self.assertEqual(iterator.epoch, 2)
+        self.assertFalse(torch.equal(epochs[0], epochs[1]))
+
+        # permutations only depend on the seed and the epoch
+        same_seed_iterator = EpochIterator(self.replay_buffer, batch_size=4, seed=0)
+        rewards = torch.cat([batch.reward for batch in same_seed_iterator])
+        tt.assert_close(rewards, epochs[0])
+
+        # the next seed does not replay the permutation of the next epoch
+        next_seed_iterator = EpochIterator(self.replay_buffer, batch_size=4, seed=1)
+        rewards = torch.cat([batch.reward for batch in next_seed_iterator])
+        self.assertFalse(torch.equal(rewards, epochs[1]))
+
+    def test_drop_last(self) -> None:
+        iterator = EpochIterator(
+            self.replay_buffer, batch_size=4, drop_last=True, seed=0
+        )
+        self.assertEqual(len(iterator), 2)
+        self.assertEqual([len(batch.reward) for batch in iterator], [4, 4])
+        # next_batch moves on to the next epoch
+        for _ in range(3):
+            self.assertEqual(len(iterator.next_batch().reward), 4)
+        self.assertEqual(iterator.epoch, 2)
+
+        iterator = EpochIterator(self.replay_buffer, batch_size=11, drop_last=True)
+        with self.assertRaises(ValueError):
+            iterator.next_batch()
+
+    def test_resume_mid_epoch(self) -> None:
+        iterator = EpochIterator(self.replay_buffer, batch_size=3, seed=5)
+        for _ in range(5):
+            iterator.next_batch()
+        state_dict = iterator.state_dict()
+        expected_rewards = [iterator.next_batch().reward for _ in range(4)]
+
+        resumed_iterator = EpochIterator(self.replay_buffer, batch_size=3)
+        resumed_iterator.load_state_dict(state_dict)
+        for expected_reward in expected_rewards:
+            tt.assert_close(resumed_iterator.next_batch().reward, expected_reward)
@@ -0,0 +1,165 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+
+import torch
+from pearl.replay_buffers import (
+    BasicReplayBuffer,
+    EpisodeStratifiedEvictionPolicy,
+    RecencyBiasedEvictionPolicy,
+    ReservoirEvictionPolicy,
+    TensorBasedReplayBuffer,
+)
+from pearl.replay_buffers.columnar_storage import ColumnarStorage
+from pearl.replay_buffers.sequential_decision_making.history_replay_buffer import (
+    HistoryReplayBuffer,
+)
+from pearl.replay_buffers.sequential_decision_making.prioritized_replay_buffer import (
+    PrioritizedReplayBuffer,
+)
+from pearl.replay_buffers.transition import Transition
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestEvictionPolicies(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(0)
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0]), torch.tensor([1])]
+        )
+
+    def push(
+        self,
+        replay_buffer: TensorBasedReplayBuffer,
+        number: int,
+        episode_lengths: list[int] | None = None,
+    ) -> None:
+        """Pushes transitions whose rewards are their push order."""
+        is_episode_end = [False] * number
+        if episode_lengths is not None:
+            is_episode_end = []
+            for length in episode_lengths:
+                is_episode_end += [False] * (length - 1) + [True]
+        for i in range(number):
+            replay_buffer.push(
+                state=torch.randn(3),
+                action=self.action_space.sample(),
+                reward=float(i),
+                next_state=torch.randn(3),
+                curr_available_actions=self.action_space,
+                next_available_actions=self.action_space,
+                terminated=is_episode_end[i],
+                truncated=False,
+            )
+
+    def stored_rewards(self, replay_buffer: TensorBasedReplayBuffer) -> list[int]:
+        rewards = replay_buffer.memory.column("reward")
+        assert rewards is not None
+        return sorted(int(reward) for reward in rewards.tolist())
+
+    def test_reservoir(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=50)
+        replay_buffer.set_eviction_policy(ReservoirEvictionPolicy())
+        self.push(replay_buffer, 500)
+        rewards = self.stored_rewards(replay_buffer)
+        self.assertEqual(len(set(rewards)), 50)
+        # rows are kept from the whole history, not only the last 50 rows
+        self.assertLess(rewards[0], 250)
+        self.assertGreater(rewards[-1], 250)
+        self.assertEqual(len(replay_buffer.sample(20).reward), 20)
+
+        # batches are written with the same policy
+        storage = ColumnarStorage(capacity=50)
+        storage.set_eviction_policy(ReservoirEvictionPolicy())
+        for first in range(0, 500, 64):
+            number_of_rows = min(64, 500 - first)
+            indices = storage.append_batch(
+                Transition(
+                    state=torch.randn(number_of_rows, 3),
+                    action=torch.zeros(number_of_rows, 1),
+                    reward=torch.arange(first, first + number_of_rows).float(),
+                    terminated=torch.zeros(number_of_rows, dtype=torch.bool),
+                    truncated=torch.zeros(number_of_rows, dtype=torch.bool),
+                )
+            )
+            self.assertEqual(len(set(indices.tolist())), len(indices))
+        rewards = storage.gather(torch.arange(50), ["reward"])["reward"]
+        self.assertEqual(len(set(rewards.tolist())), 50)
+        self.assertLess(rewards.min().item(), 250)
+
+    def test_recency_biased(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=50)
+        replay_buffer.set_eviction_policy(RecencyBiasedEvictionPolicy())
+        self.push(replay_buffer, 500)
+        rewards = self.stored_rewards(replay_buffer)
+        # the last row is always stored, and some rows older than 50 rows are kept
+        self.assertEqual(rewards[-1], 499)
+        self.assertLess(rewards[0], 450)
+
+    def test_episode_stratified(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=20)
+        replay_buffer.set_eviction_policy(EpisodeStratifiedEvictionPolicy())
+        episode_lengths = [40, 5, 5, 5, 20]
+        self.push(replay_buffer, sum(episode_lengths), episode_lengths)
+        episode_of_reward = [
+            episode
+            for episode, length in enumerate(episode_lengths)
+            for _ in range(length)
+        ]
+        rewards = self.stored_rewards(replay_buffer)
+        counts = Counter(episode_of_reward[reward] for reward in rewards)
+        self.assertEqual(len(counts), 5)
+        self.assertLessEqual(max(counts.values()) - min(counts.values()), 2)
+        # the oldest rows of an episode are evicted first
+        self.assertEqual(rewards[: counts[0]], list(range(40 - counts[0], 40)))
+
+    def test_prioritized_replay_buffer(self) -> None:
+        replay_buffer = PrioritizedReplayBuffer(capacity=10)
+        replay_buffer.set_eviction_policy(ReservoirEvictionPolicy())
+        self.push(replay_buffer, 100)
+        # every stored transition has the initial priority
+        self.assertAlmostEqual(replay_buffer._sum_tree.reduce(), 10.0)
+        self.assertEqual(len(replay_buffer.sample(4).reward), 4)
+
+    def test_snapshot(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=20)
+        replay_buffer.set_eviction_policy(EpisodeStratifiedEvictionPolicy())
+        self.push(replay_buffer, 30, [12, 8, 10])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "snapshot")
+            replay_buffer.save(path)
+            loaded_replay_buffer = BasicReplayBuffer(capacity=20)
+            loaded_replay_buffer.set_eviction_policy(EpisodeStratifiedEvictionPolicy())
+            loaded_replay_buffer.load(path)
+        self.assertEqual(
+            loaded_replay_buffer.memory.eviction_policy.state_dict(),
+            replay_buffer.memory.eviction_policy.state_dict(),
+        )
+        self.push(replay_buffer, 6, [6])
+        self.push(loaded_replay_buffer, 6, [6])
+        self.assertEqual(
+            self.stored_rewards(loaded_replay_buffer),
+            self.stored_rewards(replay_buffer),
+        )
+
+    def test_insertion_order_is_required(self) -> None:
+        with self.assertRaises(ValueError):
+            HistoryReplayBuffer(capacity=10, history_length=2).set_eviction_policy(
+                ReservoirEvictionPolicy()
+            )
+        replay_buffer = BasicReplayBuffer(capacity=10)
+        self.push(replay_buffer, 1)
+        # policies are set before transitions are pushed
+        with self.assertRaises(ValueError):
+            replay_buffer.set_eviction_policy(ReservoirEvictionPolicy())
@@ -0,0 +1,122 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import BasicReplayBuffer
+from pearl.replay_buffers.frame_deduplicated_replay_buffer import (
+    FrameDeduplicatedReplayBuffer,
+)
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestFrameDeduplicatedReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.frame_stack_size = 3
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0]), torch.tensor([1])]
+        )
+
+    def push_episodes(
+        self,
+        replay_buffers: list[BasicReplayBuffer],
+        episode_lengths: list[int],
+    ) -> None:
+        """
+        Pushes episodes of stacked random frames, where the stack at the start of
+        an episode repeats the first frame, to all replay buffers.
+        """
+        for episode_length in episode_lengths:
+            frame = torch.randint(0, 256, (4, 5), dtype=torch.uint8)
+            state = frame.expand(self.frame_stack_size, 4, 5).clone()
+            for step in range(episode_length):
+                frame = torch.randint(0, 256, (4, 5), dtype=torch.uint8)
+                next_state = torch.cat([state[1:], frame.unsqueeze(0)])
+                action = self.action_space.sample()
+                for replay_buffer in replay_buffers:
+                    replay_buffer.push(
+                        state=state,
+                        action=action,
+                        reward=float(step),
+                        next_state=next_state,
+                        curr_available_actions=self.action_space,
+                        next_available_actions=self.action_space,
+                        terminated=step == episode_length - 1,
+                        truncated=False,
+                    )
+                state = next_state
+
+    def assert_same_batches(
+        self,
+        replay_buffer: FrameDeduplicatedReplayBuffer,
+        reference_replay_buffer: BasicReplayBuffer,
+    ) -> None:
+        self.assertEqual(len(replay_buffer), len(reference_replay_buffer))
+        indices = torch.arange(len(replay_buffer))
+        batch = replay_buffer._create_transition_batch(indices, False)
+        reference_batch = reference_replay_buffer._create_transition_batch(
+            indices, False
+        )
+        for name, value in reference_batch.__dict__.items():
+            tt.assert_close(getattr(batch, name), value, msg=name)
+
+    def test_batches_match_basic_replay_buffer(self) -> None:
+        replay_buffer = FrameDeduplicatedReplayBuffer(
+            capacity=10, frame_stack_size=self.frame_stack_size
+        )
+        reference_replay_buffer = BasicReplayBuffer(capacity=10)
+        buffers = [replay_buffer, reference_replay_buffer]
+
+        self.push_episodes(buffers, episode_lengths=[7])
+        # one frame for the start of the episode, then one frame per transition
+        self.assertEqual(len(replay_buffer._frame_store), 8)
+        self.assert_same_batches(replay_buffer, reference_replay_buffer)
+
+        # wrap around the buffer, with short episodes that add more frames per
+        # transition than the frame store initially holds
+        self.push_episodes(buffers, episode_lengths=[1, 1, 2, 1, 9, 1, 1, 1, 1])
+        self.assert_same_batches(replay_buffer, reference_replay_buffer)
+        batch = replay_buffer.sample(4)
+        self.assertEqual(batch.state.shape, (4, self.frame_stack_size, 4, 5))
+        self.assertEqual(batch.state.dtype, torch.float32)
+
+        replay_buffer.clear()
+        self.assertEqual(len(replay_buffer._frame_store), 0)
+
+    def test_single_frame_states(self) -> None:
+        replay_buffer = FrameDeduplicatedReplayBuffer(capacity=2)
+        states = [torch.full((2, 2), i, dtype=torch.uint8) for i in range(4)]
+        for state, next_state in zip(states[:-1], states[1:]):
+            replay_buffer.push(
+                state=state,
+                action=torch.tensor([0]),
+                reward=0.0,
+                next_state=next_state,
+                curr_available_actions=self.action_space,
+                next_available_actions=self.action_space,
+                terminated=False,
+                truncated=False,
+            )
+        batch = replay_buffer._create_transition_batch(torch.arange(2), False)
+        self.assertEqual(sorted(batch.state[:, 0, 0].tolist()), [1.0, 2.0])
+        tt.assert_close(batch.next_state, batch.state + 1)
+
+        with self.assertRaises(ValueError):
+            replay_buffer.push(
+                state=torch.zeros(2, 2),
+                action=torch.tensor([0]),
+                reward=0.0,
+                next_state=torch.zeros(2, 2),
+                curr_available_actions=self.action_space,
+                next_available_actions=self.action_space,
+                terminated=False,
+                truncated=False,
+            )
@@ -13,6 +13,7 @@ import torch
 import torch.testing as tt
 
 from pearl.replay_buffers.sequential_decision_making.hindsight_experience_replay_buffer import (
+    GoalSelectionStrategy,
     HindsightExperienceReplayBuffer,
 )
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
@@ -93,3 +94,53 @@ class TestHindsightExperienceReplayBuffer(unittest.TestCase):
             tt.assert_close(
                 batch_state[i][-2:], batch_next_state[i][-2:], rtol=0.0, atol=0.0
             )
+
+    def push_line_episode(
+        self, rb: HindsightExperienceReplayBuffer, length: int
+    ) -> None:
+        """Pushes an episode moving from position 0 to `length` with goal 100."""
+        action_space = DiscreteActionSpace(actions=[torch.tensor([1])])
+        for i in range(length):
+            rb.push(
+                state=torch.tensor([float(i), 100.0]),
+                action=torch.tensor([1]),
+                reward=0.0,
+                next_state=torch.tensor([float(i + 1), 100.0]),
+                curr_available_actions=action_space,
+                next_available_actions=action_space,
+                terminated=i == length - 1,
+                truncated=False,
+            )
+
+    def test_future_and_episode_strategies(self) -> None:
+        def reward_fn(state: torch.Tensor, action: torch.Tensor) -> torch.Tensor:
+            # batched: the next position is the goal
+            return (state[:, 0] + action[:, 0] == state[:, 1]).float()
+
+        length, k = 5, 3
+        for strategy in [GoalSelectionStrategy.FUTURE, GoalSelectionStrategy.EPISODE]:
+            rb = HindsightExperienceReplayBuffer(
+                capacity=100,
+                goal_dim=1,
+                reward_fn=reward_fn,
+                strategy=strategy,
+                number_of_additional_goals=k,
+                batched_fns=True,
+            )
+            self.push_line_episode(rb, length)
+            self.assertEqual(len(rb), length + k * length)
+            self.assertEqual(len(rb._trajectory), 0)
+
+            batch = rb.sample(len(rb))
+            relabeled = batch.state[:, 1] != 100.0
+            self.assertEqual(int(relabeled.sum()), k * length)
+            positions = batch.state[relabeled, 0]
+            goals = batch.state[relabeled, 1]
+            # goals are positions reached in the episode
+            self.assertTrue(torch.all((goals >= 1) & (goals <= length)))
+            if strategy == GoalSelectionStrategy.FUTURE:
+                self.assertTrue(torch.all(goals >= positions + 1))
+            tt.assert_close(
+                batch.reward[relabeled], (positions + 1 == goals).float()
+            )
+            tt.assert_close(batch.next_state[:, 1], batch.state[:, 1])
@@ -0,0 +1,129 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.history_summarization_modules.history_summarization_module import (
+    HistorySummarizationModule,
+)
+from pearl.history_summarization_modules.lstm_history_summarization_module import (
+    LSTMHistorySummarizationModule,
+)
+from pearl.history_summarization_modules.stacking_history_summarization_module import (
+    StackingHistorySummarizationModule,
+)
+from pearl.replay_buffers import BasicReplayBuffer
+from pearl.replay_buffers.sequential_decision_making.history_replay_buffer import (
+    HistoryReplayBuffer,
+)
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestHistoryReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.observation_dim = 3
+        self.action_dim = 2
+        self.history_length = 4
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0.0, 1.0]), torch.tensor([1.0, 0.0])]
+        )
+
+    def push_episodes(
+        self,
+        history_summarization_module: HistorySummarizationModule,
+        replay_buffers: list[BasicReplayBuffer],
+        episode_lengths: list[int],
+    ) -> None:
+        """Pushes histories to all replay buffers as `PearlAgent.observe` does."""
+        for episode_length in episode_lengths:
+            history_summarization_module.reset()
+            history_summarization_module.summarize_history(
+                torch.randn(self.observation_dim), None
+            )
+            for step in range(episode_length):
+                history = history_summarization_module.get_history()
+                action = self.action_space.sample()
+                history_summarization_module.summarize_history(
+                    torch.randn(self.observation_dim), action.view(1, -1)
+                )
+                for replay_buffer in replay_buffers:
+                    replay_buffer.push(
+                        state=history,
+                        action=action,
+                        reward=float(step),
+                        next_state=history_summarization_module.get_history(),
+                        curr_available_actions=self.action_space,
+                        next_available_actions=self.action_space,
+                        terminated=step == episode_length - 1,
+                        truncated=False,
+                    )
+
+    def assert_same_batches(
+        self,
+        replay_buffer: HistoryReplayBuffer,
+        reference_replay_buffer: BasicReplayBuffer,
+    ) -> None:
+        self.assertEqual(len(replay_buffer), len(reference_replay_buffer))
+        indices = torch.arange(len(replay_buffer))
+        batch = replay_buffer._create_transition_batch(indices, False)
+        reference_batch = reference_replay_buffer._create_transition_batch(
+            indices, False
+        )
+        for name, value in reference_batch.__dict__.items():
+            tt.assert_close(getattr(batch, name), value, msg=name)
+
+    def test_stacked_histories(self) -> None:
+        history_summarization_module = StackingHistorySummarizationModule(
+            observation_dim=self.observation_dim,
+            action_dim=self.action_dim,
+            history_length=self.history_length,
+        )
+        replay_buffer = HistoryReplayBuffer(
+            capacity=12, history_length=self.history_length
+        )
+        reference_replay_buffer = BasicReplayBuffer(capacity=12)
+        buffers = [replay_buffer, reference_replay_buffer]
+
+        self.push_episodes(history_summarization_module, buffers, [6])
+        # each row of the episode is stored once
+        self.assertEqual(len(replay_buffer._rows), 7)
+        self.assert_same_batches(replay_buffer, reference_replay_buffer)
+
+        # wrap around, with episodes shorter and longer than the history length
+        self.push_episodes(history_summarization_module, buffers, [1, 2, 9, 1, 1, 3])
+        self.assert_same_batches(replay_buffer, reference_replay_buffer)
+        batch = replay_buffer.sample(5)
+        self.assertEqual(
+            batch.state.shape,
+            (5, self.history_length * (self.observation_dim + self.action_dim)),
+        )
+
+    def test_lstm_histories(self) -> None:
+        history_summarization_module = LSTMHistorySummarizationModule(
+            observation_dim=self.observation_dim,
+            action_dim=self.action_dim,
+            history_length=self.history_length,
+        )
+        replay_buffer = HistoryReplayBuffer(
+            capacity=5, history_length=self.history_length
+        )
+        reference_replay_buffer = BasicReplayBuffer(capacity=5)
+        buffers = [replay_buffer, reference_replay_buffer]
+        self.push_episodes(history_summarization_module, buffers, [3, 7, 2])
+        self.assert_same_batches(replay_buffer, reference_replay_buffer)
+        batch = replay_buffer.sample(5)
+        self.assertEqual(
+            batch.next_state.shape,
+            (5, self.history_length, self.observation_dim + self.action_dim),
+        )
+
+        replay_buffer.clear()
+        self.assertEqual(len(replay_buffer._rows), 0)
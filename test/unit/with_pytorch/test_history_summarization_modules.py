@@ -7,9 +7,11 @@
 
 # pyre-strict
 
+import copy
 import unittest
 
 import torch
+import torch.testing as tt
 from pearl.history_summarization_modules.lstm_history_summarization_module import (
     LSTMHistorySummarizationModule,
 )
@@ -61,3 +63,39 @@ class TestHistorySummarizationModules(unittest.TestCase):
             self.assertEqual(
                 subjective_state.shape[0], self.observation_dim + self.action_dim
             )
+
+    def test_summarize_history_batch(self) -> None:
+        """
+        Summarizing a batch of histories matches summarizing each history on its own.
+        """
+        for summarization_module in [
+            StackingHistorySummarizationModule(
+                self.observation_dim, self.action_dim, self.history_length
+            ),
+            LSTMHistorySummarizationModule(
+                observation_dim=self.observation_dim,
+                action_dim=self.action_dim,
+                history_length=self.history_length,
+                hidden_dim=8,
+            ),
+        ]:
+            batch_size = 3
+            modules = [copy.deepcopy(summarization_module) for _ in range(batch_size)]
+            actions, histories = None, None
+            for _ in range(self.history_length + 2):
+                observations = torch.rand((batch_size, self.observation_dim))
+                subjective_states, histories = (
+                    summarization_module.summarize_history_batch(
+                        observations, actions, histories
+                    )
+                )
+                for i, module in enumerate(modules):
+                    subjective_state = module.summarize_history(
+                        observations[i : i + 1],
+                        None if actions is None else actions[i : i + 1],
+                    )
+                    tt.assert_close(subjective_states[i], subjective_state.view(-1))
+                    tt.assert_close(
+                        histories[i].view(-1), module.get_history().view(-1)
+                    )
+                actions = torch.rand((batch_size, self.action_dim))
@@ -0,0 +1,97 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import BasicReplayBuffer, TensorBasedReplayBuffer
+from pearl.replay_buffers.interned_action_spaces import InternedActionSpaces
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestInternedActionSpaces(unittest.TestCase):
+    def test_action_spaces_are_interned_by_content(self) -> None:
+        table = InternedActionSpaces()
+        action_space = DiscreteActionSpace([torch.tensor([0]), torch.tensor([2])])
+        self.assertIsNone(table.get_id(action_space, 3))
+        actions, mask = TensorBasedReplayBuffer.create_action_tensor_and_mask(
+            3, action_space
+        )
+        assert actions is not None and mask is not None
+        self.assertEqual(table.add(action_space, 3, actions, mask), 0)
+
+        # a different object with the same actions shares the entry
+        same_actions = DiscreteActionSpace([torch.tensor([0]), torch.tensor([2])])
+        self.assertEqual(table.get_id(same_actions, 3), 0)
+        # a different maximum number of actions does not
+        self.assertIsNone(table.get_id(action_space, 4))
+
+        restored = InternedActionSpaces()
+        restored.load_state_dict(table.state_dict())
+        self.assertEqual(restored.get_id(same_actions, 3), 0)
+
+    def test_batches_are_rebuilt_from_ids(self) -> None:
+        max_number_actions = 4
+        all_actions = [torch.tensor([float(i)]) for i in range(max_number_actions)]
+        replay_buffer = BasicReplayBuffer(capacity=8)
+        available_action_sets = []
+        for i in range(8):
+            # a new action space object at every step, as with dynamic action spaces
+            available_actions = DiscreteActionSpace(all_actions[: i % 3 + 1])
+            available_action_sets.append(available_actions)
+            replay_buffer.push(
+                state=torch.tensor([float(i)]),
+                action=available_actions.actions[0],
+                reward=0.0,
+                next_state=torch.tensor([float(i + 1)]),
+                curr_available_actions=available_actions,
+                next_available_actions=available_actions,
+                max_number_actions=max_number_actions,
+                terminated=False,
+                truncated=False,
+            )
+        self.assertEqual(len(replay_buffer._action_spaces), 3)
+        # transitions only store ids
+        curr_available_actions_column = replay_buffer.memory.column(
+            "curr_available_actions"
+        )
+        assert curr_available_actions_column is not None
+        self.assertEqual(curr_available_actions_column.shape, (8,))
+
+        batch = replay_buffer._create_transition_batch(torch.arange(8), False)
+        for i, available_actions in enumerate(available_action_sets):
+            expected_actions, expected_mask = (
+                TensorBasedReplayBuffer.create_action_tensor_and_mask(
+                    max_number_actions, available_actions
+                )
+            )
+            tt.assert_close(batch.curr_available_actions[i], expected_actions)
+            tt.assert_close(batch.next_unavailable_actions_mask[i], expected_mask)
+
+    def test_static_action_space(self) -> None:
+        action_space = DiscreteActionSpace([torch.tensor([0]), torch.tensor([1])])
+        replay_buffer = BasicReplayBuffer(capacity=4)
+        for i in range(4):
+            replay_buffer.push(
+                state=torch.tensor([float(i)]),
+                action=torch.tensor([0]),
+                reward=0.0,
+                next_state=torch.tensor([float(i + 1)]),
+                curr_available_actions=action_space,
+                next_available_actions=action_space,
+                terminated=False,
+                truncated=False,
+            )
+        batch = replay_buffer.sample(3)
+        self.assertEqual(batch.curr_available_actions.shape, (3, 2, 1))
+        self.assertFalse(batch.curr_unavailable_actions_mask.any())
+
+        replay_buffer.clear()
+        self.assertEqual(len(replay_buffer._action_spaces), 0)
@@ -0,0 +1,115 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import os
+import tempfile
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import (
+    FIFOEvictionPolicy,
+    MemoryMappedReplayBuffer,
+    ReservoirEvictionPolicy,
+)
+from pearl.replay_buffers.memory_mapped_replay_buffer import (
+    MemoryMappedColumnarStorage,
+)
+from pearl.replay_buffers.transition import Transition
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestMemoryMappedReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self.directory: str = self._temporary_directory.name
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0]), torch.tensor([1])]
+        )
+
+    def tearDown(self) -> None:
+        self._temporary_directory.cleanup()
+
+    def fill(self, replay_buffer: MemoryMappedReplayBuffer, start: int, n: int) -> None:
+        for i in range(start, start + n):
+            replay_buffer.push(
+                state=torch.tensor([float(i), 0.0]),
+                action=torch.tensor([i % 2]),
+                reward=float(i),
+                next_state=torch.tensor([float(i + 1), 0.0]),
+                curr_available_actions=self.action_space,
+                next_available_actions=self.action_space,
+                terminated=False,
+                truncated=False,
+            )
+
+    def test_push_and_sample(self) -> None:
+        replay_buffer = MemoryMappedReplayBuffer(capacity=4, directory=self.directory)
+        self.fill(replay_buffer, start=0, n=6)
+        self.assertEqual(len(replay_buffer), 4)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "state.bin")))
+
+        batch = replay_buffer.sample(4)
+        self.assertEqual(sorted(batch.reward.tolist()), [2.0, 3.0, 4.0, 5.0])
+        tt.assert_close(batch.next_state[:, 0], batch.state[:, 0] + 1)
+        self.assertEqual(batch.state.device, replay_buffer.device_for_batches)
+
+        replay_buffer.clear()
+        self.assertEqual(len(replay_buffer), 0)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "state.bin")))
+
+    def test_reopen(self) -> None:
+        replay_buffer = MemoryMappedReplayBuffer(capacity=4, directory=self.directory)
+        self.fill(replay_buffer, start=0, n=5)
+        replay_buffer.flush()
+        version = replay_buffer.memory.version
+        del replay_buffer
+
+        reopened = MemoryMappedReplayBuffer(capacity=4, directory=self.directory)
+        self.assertEqual(len(reopened), 4)
+        self.assertEqual(reopened.memory.version, version)
+        batch = reopened.sample(4)
+        self.assertEqual(sorted(batch.reward.tolist()), [1.0, 2.0, 3.0, 4.0])
+        # interned action spaces are reopened as well
+        tt.assert_close(
+            batch.curr_available_actions,
+            self.action_space.actions_batch.float().expand(4, -1, -1),
+        )
+        # the write cursor is restored too, so pushing overwrites the oldest transition
+        self.fill(reopened, start=5, n=1)
+        batch = reopened.sample(4)
+        self.assertEqual(sorted(batch.reward.tolist()), [2.0, 3.0, 4.0, 5.0])
+
+        with self.assertRaises(ValueError):
+            MemoryMappedReplayBuffer(capacity=8, directory=self.directory)
+
+    def test_only_fifo_eviction(self) -> None:
+        replay_buffer = MemoryMappedReplayBuffer(capacity=4, directory=self.directory)
+        with self.assertRaises(ValueError):
+            replay_buffer.set_eviction_policy(ReservoirEvictionPolicy())
+        replay_buffer.set_eviction_policy(FIFOEvictionPolicy())
+
+    def test_dtype_promotion_rewrites_column(self) -> None:
+        storage = MemoryMappedColumnarStorage(capacity=3, directory=self.directory)
+        for reward in [1, 2.5]:
+            storage.append(
+                Transition(
+                    state=torch.zeros(1, 2),
+                    action=torch.zeros(1, 1),
+                    reward=torch.tensor([reward]),
+                    terminated=torch.tensor([False]),
+                    truncated=torch.tensor([False]),
+                )
+            )
+        storage.flush()
+        reopened = MemoryMappedColumnarStorage(capacity=3, directory=self.directory)
+        reward_column = reopened.column("reward")
+        assert reward_column is not None
+        self.assertEqual(reward_column.dtype, torch.float32)
+        tt.assert_close(reward_column, torch.tensor([1.0, 2.5]))
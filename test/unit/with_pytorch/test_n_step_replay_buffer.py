@@ -0,0 +1,111 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import copy
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.replay_buffers.sequential_decision_making.n_step_replay_buffer import (
+    NStepReplayBuffer,
+)
+from pearl.replay_buffers.transition import get_discounts
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestNStepReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0]), torch.tensor([1])]
+        )
+
+    def push_episode(
+        self, replay_buffer: NStepReplayBuffer, length: int, truncated: bool = False
+    ) -> None:
+        """Pushes an episode with states 0, 1, ... and rewards 1, 2, ..."""
+        for i in range(length):
+            is_last_step = i == length - 1
+            replay_buffer.push(
+                state=torch.tensor([float(i)]),
+                action=torch.tensor([i % 2]),
+                reward=float(i + 1),
+                terminated=is_last_step and not truncated,
+                truncated=is_last_step and truncated,
+                curr_available_actions=self.action_space,
+                next_state=torch.tensor([float(i + 1)]),
+                next_available_actions=self.action_space,
+            )
+
+    def test_n_step_transitions(self) -> None:
+        replay_buffer = NStepReplayBuffer(capacity=10, n=3, discount_factor=0.5)
+        self.push_episode(replay_buffer, length=2)
+        # the window is only flushed at the end of the episode
+        self.assertEqual(len(replay_buffer), 2)
+        replay_buffer.clear()
+
+        self.push_episode(replay_buffer, length=4)
+        self.assertEqual(len(replay_buffer), 4)
+        batch = replay_buffer.sample(4)
+        order = batch.state.view(-1).argsort()
+        tt.assert_close(batch.state.view(-1)[order], torch.tensor([0.0, 1.0, 2.0, 3.0]))
+        # rewards 1, 2, 3, 4 summed over windows of at most 3 steps
+        tt.assert_close(
+            batch.reward[order],
+            torch.tensor(
+                [1 + 2 * 0.5 + 3 * 0.25, 2 + 3 * 0.5 + 4 * 0.25, 3 + 4 * 0.5, 4.0]
+            ),
+        )
+        tt.assert_close(batch.next_state.view(-1)[order], torch.tensor([3.0, 4, 4, 4]))
+        tt.assert_close(
+            batch.discount[order], torch.tensor([0.125, 0.125, 0.25, 0.5])
+        )
+        tt.assert_close(
+            batch.terminated[order], torch.tensor([False, True, True, True])
+        )
+
+    def test_truncated_episode(self) -> None:
+        replay_buffer = NStepReplayBuffer(capacity=10, n=2, discount_factor=0.5)
+        self.push_episode(replay_buffer, length=2, truncated=True)
+        batch = replay_buffer.sample(2)
+        self.assertFalse(batch.terminated.any())
+        self.assertTrue(batch.truncated.all())
+
+    def test_learner_uses_discounts(self) -> None:
+        replay_buffer = NStepReplayBuffer(capacity=10, n=2, discount_factor=0.9)
+        self.push_episode(replay_buffer, length=5)
+        batch = replay_buffer.sample(5)
+        dqn = DeepQLearning(
+            state_dim=1,
+            action_space=self.action_space,
+            hidden_dims=[3],
+            training_rounds=1,
+            action_representation_module=OneHotActionTensorRepresentationModule(
+                max_number_actions=2
+            ),
+        )
+        batch = dqn.preprocess_batch(batch)
+        predictions = dqn.forward(copy.deepcopy(batch))
+        _, expected = dqn.loss(batch, predictions)
+        next_state_values = dqn.get_next_state_values(batch, 5)
+        tt.assert_close(
+            expected,
+            next_state_values
+            * get_discounts(batch, 0.0)
+            * (1 - batch.terminated.float())
+            + batch.reward,
+        )
+        # batches without discounts use the discount factor of the learner
+        batch.discount = None
+        tt.assert_close(get_discounts(batch, 0.9), torch.full((5,), 0.9))
@@ -0,0 +1,99 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import threading
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import BasicReplayBuffer, PrefetchingReplayBuffer
+from pearl.replay_buffers.sequential_decision_making.prioritized_replay_buffer import (
+    PrioritizedReplayBuffer,
+)
+from pearl.replay_buffers.transition import TransitionBatch
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+ACTION_SPACE = DiscreteActionSpace(actions=[torch.tensor([0]), torch.tensor([1])])
+
+
+def push_transitions(
+    replay_buffer: PrefetchingReplayBuffer, start: int, n: int
+) -> None:
+    for i in range(start, start + n):
+        replay_buffer.push(
+            state=torch.tensor([float(i)]),
+            action=torch.tensor([i % 2]),
+            reward=float(i),
+            terminated=False,
+            truncated=False,
+            curr_available_actions=ACTION_SPACE,
+            next_state=torch.tensor([float(i + 1)]),
+            next_available_actions=ACTION_SPACE,
+        )
+
+
+class TestPrefetchingReplayBuffer(unittest.TestCase):
+    def test_sample(self) -> None:
+        replay_buffer = PrefetchingReplayBuffer(
+            BasicReplayBuffer(capacity=10), number_of_prefetched_batches=3
+        )
+        push_transitions(replay_buffer, start=0, n=10)
+        self.assertEqual(len(replay_buffer), 10)
+        for batch_size in [4, 4, 2, 4]:
+            batch = replay_buffer.sample(batch_size)
+            assert isinstance(batch, TransitionBatch)
+            self.assertEqual(len(batch), batch_size)
+            tt.assert_close(batch.next_state, batch.state + 1)
+            self.assertEqual(batch.state.device, replay_buffer.device_for_batches)
+        # the wrapped buffer collates batches on the CPU
+        self.assertEqual(
+            replay_buffer.replay_buffer.device_for_batches, torch.device("cpu")
+        )
+        replay_buffer.close()
+
+    def test_too_large_batch_is_sampled_from_wrapped_buffer(self) -> None:
+        replay_buffer = PrefetchingReplayBuffer(BasicReplayBuffer(capacity=10))
+        push_transitions(replay_buffer, start=0, n=2)
+        with self.assertRaises(ValueError):
+            replay_buffer.sample(3)
+
+    def test_push_while_prefetching(self) -> None:
+        replay_buffer = PrefetchingReplayBuffer(BasicReplayBuffer(capacity=50))
+        push_transitions(replay_buffer, start=0, n=5)
+        replay_buffer.sample(5)
+
+        pusher = threading.Thread(
+            target=push_transitions, args=(replay_buffer, 5, 200)
+        )
+        pusher.start()
+        for _ in range(50):
+            batch = replay_buffer.sample(5)
+            assert isinstance(batch, TransitionBatch)
+            tt.assert_close(batch.reward, batch.state.view(-1))
+        pusher.join()
+        self.assertEqual(len(replay_buffer), 50)
+
+        replay_buffer.clear()
+        self.assertEqual(len(replay_buffer), 0)
+        push_transitions(replay_buffer, start=0, n=5)
+        batch = replay_buffer.sample(5)
+        assert isinstance(batch, TransitionBatch)
+        self.assertEqual(sorted(batch.reward.tolist()), [0.0, 1.0, 2.0, 3.0, 4.0])
+        replay_buffer.close()
+
+    def test_update_priorities(self) -> None:
+        prioritized_replay_buffer = PrioritizedReplayBuffer(capacity=4)
+        replay_buffer = PrefetchingReplayBuffer(prioritized_replay_buffer)
+        push_transitions(replay_buffer, start=0, n=4)
+        replay_buffer.update_priorities(torch.tensor([1]), torch.tensor([3.0]))
+        self.assertEqual(prioritized_replay_buffer._max_priority, 3.0 + 1e-6)
+        # replay buffers without priorities ignore them
+        replay_buffer = PrefetchingReplayBuffer(BasicReplayBuffer(4))
+        push_transitions(replay_buffer, start=0, n=4)
+        replay_buffer.update_priorities(torch.tensor([1]), torch.tensor([3.0]))
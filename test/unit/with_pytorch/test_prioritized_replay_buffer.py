@@ -0,0 +1,133 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.pearl_agent import PearlAgent
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.policy_learners.sequential_decision_making.quantile_regression_deep_q_learning import (
+    QuantileRegressionDeepQLearning,
+)
+from pearl.replay_buffers.segment_tree import MinSegmentTree, SumSegmentTree
+from pearl.replay_buffers.sequential_decision_making.prioritized_replay_buffer import (
+    PrioritizedReplayBuffer,
+)
+from pearl.replay_buffers.transition import PrioritizedTransitionBatch
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestSegmentTree(unittest.TestCase):
+    def test_sum_tree(self) -> None:
+        tree = SumSegmentTree(capacity=5)
+        tree.update(torch.arange(5), torch.tensor([1.0, 0.0, 2.0, 3.0, 4.0]))
+        self.assertEqual(tree.reduce(), 10.0)
+        # leaf i covers the prefix sums [sum(leaves[:i]), sum(leaves[:i + 1]))
+        indices = tree.find_prefix_sum_index(
+            torch.tensor([0.0, 0.99, 1.0, 2.5, 3.0, 5.9, 6.0, 9.99])
+        )
+        tt.assert_close(indices, torch.tensor([0, 0, 2, 2, 3, 3, 4, 4]))
+
+        tree.update(torch.tensor([0, 4]), torch.tensor([5.0, 0.0]))
+        self.assertEqual(tree.reduce(), 10.0)
+        tt.assert_close(tree[torch.tensor([0, 4])], torch.tensor([5.0, 0.0]).double())
+
+    def test_min_tree(self) -> None:
+        tree = MinSegmentTree(capacity=3)
+        self.assertEqual(tree.reduce(), float("inf"))
+        tree.update(torch.tensor([0, 1]), torch.tensor([3.0, 2.0]))
+        self.assertEqual(tree.reduce(), 2.0)
+        tree.clear()
+        self.assertEqual(tree.reduce(), float("inf"))
+
+
+class TestPrioritizedReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.state_dim = 3
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(2)]
+        )
+
+    def fill(self, replay_buffer: PrioritizedReplayBuffer, n: int) -> None:
+        for i in range(n):
+            replay_buffer.push(
+                state=torch.full((self.state_dim,), float(i)),
+                action=self.action_space.sample(),
+                reward=float(i),
+                next_state=torch.full((self.state_dim,), float(i + 1)),
+                curr_available_actions=self.action_space,
+                next_available_actions=self.action_space,
+                terminated=False,
+                truncated=False,
+            )
+
+    def test_sampling_follows_priorities(self) -> None:
+        replay_buffer = PrioritizedReplayBuffer(capacity=10, alpha=1.0, beta=1.0)
+        self.fill(replay_buffer, 10)
+
+        batch = replay_buffer.sample(10)
+        self.assertIsInstance(batch, PrioritizedTransitionBatch)
+        assert batch.indices is not None
+        assert batch.weight is not None
+        # all transitions have the same (maximum) priority when they are pushed
+        tt.assert_close(batch.weight, torch.ones(10))
+
+        # only transition 7 keeps a non-negligible priority
+        td_errors = torch.zeros(10)
+        td_errors[7] = 1.0
+        replay_buffer.update_priorities(torch.arange(10), td_errors)
+        batch = replay_buffer.sample(8)
+        assert batch.indices is not None
+        tt.assert_close(batch.indices, torch.full((8,), 7))
+        tt.assert_close(batch.state[:, 0], torch.full((8,), 7.0))
+        # the most sampled transition has the smallest importance sampling weight
+        assert batch.weight is not None
+        self.assertTrue(torch.all(batch.weight < 1e-5))
+
+    def test_clear(self) -> None:
+        replay_buffer = PrioritizedReplayBuffer(capacity=4)
+        self.fill(replay_buffer, 6)
+        self.assertEqual(len(replay_buffer), 4)
+        replay_buffer.clear()
+        self.assertEqual(len(replay_buffer), 0)
+        self.assertEqual(replay_buffer._sum_tree.reduce(), 0.0)
+
+    def test_learners_update_priorities(self) -> None:
+        for policy_learner in [
+            DeepQLearning(
+                state_dim=self.state_dim,
+                action_space=self.action_space,
+                hidden_dims=[8],
+                training_rounds=2,
+                batch_size=4,
+            ),
+            QuantileRegressionDeepQLearning(
+                state_dim=self.state_dim,
+                action_space=self.action_space,
+                hidden_dims=[8],
+                num_quantiles=4,
+                training_rounds=2,
+                batch_size=4,
+            ),
+        ]:
+            replay_buffer = PrioritizedReplayBuffer(capacity=16)
+            agent = PearlAgent(
+                policy_learner=policy_learner, replay_buffer=replay_buffer
+            )
+            self.fill(replay_buffer, 16)
+            initial_total_priority = replay_buffer._sum_tree.reduce()
+            self.assertEqual(initial_total_priority, 16.0)
+            report = agent.learn()
+            self.assertEqual(len(report["loss"]), 2)
+            self.assertNotEqual(
+                replay_buffer._sum_tree.reduce(), initial_total_priority
+            )
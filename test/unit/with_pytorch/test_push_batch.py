@@ -0,0 +1,245 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import BasicReplayBuffer, TensorBasedReplayBuffer
+from pearl.replay_buffers.examples.single_transition_replay_buffer import (
+    SingleTransitionReplayBuffer,
+)
+from pearl.replay_buffers.sequential_decision_making.bootstrap_replay_buffer import (
+    BootstrapReplayBuffer,
+)
+from pearl.replay_buffers.sequential_decision_making.hindsight_experience_replay_buffer import (
+    HindsightExperienceReplayBuffer,
+)
+from pearl.replay_buffers.sequential_decision_making.prioritized_replay_buffer import (
+    PrioritizedReplayBuffer,
+)
+from pearl.replay_buffers.sequential_decision_making.sarsa_replay_buffer import (
+    SARSAReplayBuffer,
+)
+from pearl.replay_buffers.transition import TransitionBatch
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+MAX_NUMBER_ACTIONS = 3
+ACTION_SPACES = [
+    DiscreteActionSpace(actions=[torch.tensor([i]) for i in range(3)]),
+    DiscreteActionSpace(actions=[torch.tensor([0]), torch.tensor([2])]),
+]
+
+
+def make_batch(n: int, state_dim: int = 2) -> TransitionBatch:
+    """A batch of n transitions alternating between the two action spaces."""
+    padded = [
+        TensorBasedReplayBuffer.create_action_tensor_and_mask(MAX_NUMBER_ACTIONS, space)
+        for space in ACTION_SPACES
+    ]
+    space_indices = [i % 2 for i in range(n)]
+    return TransitionBatch(
+        state=torch.arange(n * state_dim, dtype=torch.float32).view(n, state_dim),
+        action=torch.tensor([[i % 2] for i in range(n)]),
+        reward=torch.arange(n, dtype=torch.float32),
+        next_state=torch.arange(n * state_dim, dtype=torch.float32).view(n, state_dim)
+        + 1,
+        curr_available_actions=torch.stack([padded[j][0] for j in space_indices]),
+        curr_unavailable_actions_mask=torch.stack(
+            [padded[j][1] for j in space_indices]
+        ),
+        next_available_actions=torch.stack([padded[1 - j][0] for j in space_indices]),
+        next_unavailable_actions_mask=torch.stack(
+            [padded[1 - j][1] for j in space_indices]
+        ),
+        terminated=torch.tensor([i % 4 == 3 for i in range(n)]),
+        truncated=torch.zeros(n, dtype=torch.bool),
+    )
+
+
+def push_row_by_row(replay_buffer: TensorBasedReplayBuffer, n: int) -> None:
+    batch = make_batch(n)
+    for i in range(n):
+        replay_buffer.push(
+            state=batch.state[i],
+            action=batch.action[i],
+            reward=batch.reward[i].item(),
+            terminated=bool(batch.terminated[i]),
+            truncated=False,
+            curr_available_actions=ACTION_SPACES[i % 2],
+            next_state=batch.next_state[i],
+            next_available_actions=ACTION_SPACES[1 - i % 2],
+            max_number_actions=MAX_NUMBER_ACTIONS,
+        )
+
+
+def stored_batch(replay_buffer: TensorBasedReplayBuffer) -> TransitionBatch:
+    """All stored transitions, oldest first."""
+    indices = replay_buffer.memory.logical_to_physical(torch.arange(len(replay_buffer)))
+    return replay_buffer._create_transition_batch(indices, False)
+
+
+class TestPushBatch(unittest.TestCase):
+    def assert_same_contents(
+        self,
+        replay_buffer: TensorBasedReplayBuffer,
+        expected_replay_buffer: TensorBasedReplayBuffer,
+    ) -> None:
+        self.assertEqual(len(replay_buffer), len(expected_replay_buffer))
+        batch = stored_batch(replay_buffer)
+        expected_batch = stored_batch(expected_replay_buffer)
+        for name in [
+            "state",
+            "action",
+            "reward",
+            "next_state",
+            "curr_available_actions",
+            "curr_unavailable_actions_mask",
+            "next_available_actions",
+            "next_unavailable_actions_mask",
+            "terminated",
+            "truncated",
+        ]:
+            tt.assert_close(getattr(batch, name), getattr(expected_batch, name))
+
+    def test_basic_replay_buffer(self) -> None:
+        # 9 transitions in a buffer of capacity 5 wrap around, and 12 transitions
+        # in a single batch exceed the capacity
+        for batch_sizes in [[4, 5], [12]]:
+            replay_buffer = BasicReplayBuffer(capacity=5)
+            for batch_size, start in zip(batch_sizes, [0, batch_sizes[0]]):
+                batch = make_batch(start + batch_size)
+                replay_buffer.push_batch(
+                    TransitionBatch(
+                        **{
+                            name: value[start:] if value is not None else None
+                            for name, value in batch.__dict__.items()
+                        }
+                    )
+                )
+            expected_replay_buffer = BasicReplayBuffer(capacity=5)
+            push_row_by_row(expected_replay_buffer, sum(batch_sizes))
+            self.assert_same_contents(replay_buffer, expected_replay_buffer)
+            # each action space is interned once
+            self.assertEqual(len(replay_buffer._action_spaces), 2)
+
+    def test_continuous_actions(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=4)
+        replay_buffer.is_action_continuous = True
+        batch = make_batch(4)
+        batch.curr_available_actions = None
+        batch.curr_unavailable_actions_mask = None
+        batch.next_available_actions = None
+        batch.next_unavailable_actions_mask = None
+        replay_buffer.push_batch(batch)
+        sampled = replay_buffer.sample(4)
+        self.assertIsNone(sampled.curr_available_actions)
+        tt.assert_close(sampled.reward.sort().values, batch.reward)
+
+    def test_bootstrap_replay_buffer(self) -> None:
+        replay_buffer = BootstrapReplayBuffer(capacity=8, p=1.0, ensemble_size=3)
+        replay_buffer.push_batch(make_batch(6))
+        batch = replay_buffer.sample(6)
+        tt.assert_close(batch.bootstrap_mask, torch.ones(6, 3))
+
+    def test_prioritized_replay_buffer(self) -> None:
+        replay_buffer = PrioritizedReplayBuffer(capacity=4)
+        replay_buffer.push_batch(make_batch(2))
+        replay_buffer.update_priorities(torch.tensor([0]), torch.tensor([3.0]))
+        # the last 4 of 5 transitions are kept, with the maximum priority
+        replay_buffer.push_batch(make_batch(5))
+        self.assertEqual(len(replay_buffer), 4)
+        tt.assert_close(
+            replay_buffer._sum_tree[torch.arange(4)],
+            torch.full((4,), (3.0 + 1e-6) ** 0.6, dtype=torch.float64),
+        )
+
+    def test_sarsa_replay_buffer(self) -> None:
+        replay_buffer = SARSAReplayBuffer(capacity=4)
+        batch = make_batch(3)
+        with self.assertRaises(ValueError):
+            replay_buffer.push_batch(batch)
+        batch.next_action = batch.action.flip(0)
+        replay_buffer.push_batch(batch)
+        sampled = stored_batch(replay_buffer)
+        tt.assert_close(sampled.next_action, batch.next_action)
+
+    def test_hindsight_experience_replay_buffer(self) -> None:
+        # states are (position, goal); the reward is 1 if the next position,
+        # position + action, is the goal
+        def reward_fn(state: torch.Tensor, action: torch.Tensor) -> float:
+            return float(state[0] + action[0] == state[1])
+
+        replay_buffer = HindsightExperienceReplayBuffer(
+            capacity=20, goal_dim=1, reward_fn=reward_fn
+        )
+        expected_replay_buffer = HindsightExperienceReplayBuffer(
+            capacity=20, goal_dim=1, reward_fn=reward_fn
+        )
+        # two episodes of positions 0, 1, 2, 3 with goal 10, the second one
+        # split across two batches
+        n = 8
+        batch = make_batch(n)
+        batch.state = torch.tensor([[float(i % 4), 10.0] for i in range(n)])
+        batch.next_state = torch.tensor([[float(i % 4 + 1), 10.0] for i in range(n)])
+        batch.action = torch.ones(n, 1, dtype=torch.long)
+        batch.reward = torch.zeros(n)
+        for start, end in [(0, 6), (6, 8)]:
+            replay_buffer.push_batch(
+                TransitionBatch(
+                    **{
+                        name: value[start:end] if value is not None else None
+                        for name, value in batch.__dict__.items()
+                    }
+                )
+            )
+            if start == 0:
+                # originals of both episodes and relabeled transitions of the first
+                self.assertEqual(len(replay_buffer), 6 + 4)
+        self.assertEqual(len(replay_buffer), 2 * n)
+
+        for i in range(n):
+            expected_replay_buffer.push(
+                state=batch.state[i].clone(),
+                action=batch.action[i],
+                reward=0.0,
+                terminated=bool(batch.terminated[i]),
+                truncated=False,
+                curr_available_actions=ACTION_SPACES[i % 2],
+                next_state=batch.next_state[i].clone(),
+                next_available_actions=ACTION_SPACES[1 - i % 2],
+                max_number_actions=MAX_NUMBER_ACTIONS,
+            )
+        stored = stored_batch(replay_buffer)
+        expected = stored_batch(expected_replay_buffer)
+        # the same transitions are stored, in a different order
+        for name in ["state", "reward", "next_state"]:
+            tt.assert_close(
+                getattr(stored, name).view(2 * n, -1).sum(0),
+                getattr(expected, name).view(2 * n, -1).sum(0),
+            )
+        # relabeled transitions have the final position 4 as goal, and the last
+        # transition of each episode reaches it
+        relabeled = stored.state[:, 1] == 4.0
+        self.assertEqual(int(relabeled.sum()), n)
+        self.assertEqual(float(stored.reward[relabeled].sum()), 2.0)
+
+    def test_default_push_batch_pushes_rows(self) -> None:
+        replay_buffer = SingleTransitionReplayBuffer()
+        batch = make_batch(3)
+        replay_buffer.push_batch(batch)
+        (transition,) = replay_buffer.sample(1)
+        state, action, reward, next_state, curr_available_actions = transition[:5]
+        tt.assert_close(state, batch.state[-1])
+        self.assertEqual(reward, 2.0)
+        assert isinstance(curr_available_actions, DiscreteActionSpace)
+        # padding is removed from the available actions
+        tt.assert_close(
+            curr_available_actions.actions_batch, ACTION_SPACES[0].actions_batch.float()
+        )
@@ -0,0 +1,95 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import pickle
+import unittest
+
+import torch
+from pearl.replay_buffers import BasicReplayBuffer, QuantizedCodec
+from pearl.replay_buffers.instrumentation import LatencyHistogram
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestReplayBufferInstrumentation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0]), torch.tensor([1])]
+        )
+        self.replay_buffer = BasicReplayBuffer(capacity=20)
+
+    def push(self, number: int) -> None:
+        for i in range(number):
+            self.replay_buffer.push(
+                state=torch.randn(4),
+                action=self.action_space.sample(),
+                reward=float(i),
+                next_state=torch.randn(4),
+                curr_available_actions=self.action_space,
+                next_available_actions=self.action_space,
+                terminated=False,
+                truncated=False,
+            )
+
+    def test_memory_footprint(self) -> None:
+        self.replay_buffer.set_codecs({"state": QuantizedCodec()})
+        self.push(5)
+        summary = self.replay_buffer.instrumentation_summary()
+        self.assertEqual(summary["replay_buffer/size"], 5)
+        self.assertEqual(summary["replay_buffer/occupancy"], 0.25)
+        # columns are preallocated for the whole capacity
+        self.assertEqual(summary["replay_buffer/bytes/state"], 20 * 4)
+        self.assertEqual(summary["replay_buffer/dtype/state"], "torch.uint8")
+        self.assertEqual(summary["replay_buffer/bytes/next_state"], 20 * 4 * 4)
+        self.assertIn("replay_buffer/bytes/action_spaces/available_actions", summary)
+        self.assertEqual(
+            summary["replay_buffer/bytes"],
+            sum(
+                number_of_bytes
+                for number_of_bytes, _ in self.replay_buffer.memory_footprint().values()
+            ),
+        )
+        # latencies are only reported if instrumentation is enabled
+        self.assertFalse(any("latency" in key for key in summary))
+
+    def test_latencies(self) -> None:
+        self.replay_buffer.enable_instrumentation()
+        self.push(10)
+        for _ in range(3):
+            self.replay_buffer.sample(4)
+        summary = self.replay_buffer.instrumentation_summary()
+        self.assertEqual(summary["replay_buffer/latency/push/count"], 10)
+        self.assertEqual(summary["replay_buffer/latency/sample/count"], 3)
+        self.assertEqual(summary["replay_buffer/latency/collate/count"], 3)
+        self.assertGreater(summary["replay_buffer/latency/sample/max_ms"], 0.0)
+        self.assertLessEqual(
+            summary["replay_buffer/latency/collate/mean_ms"],
+            summary["replay_buffer/latency/sample/mean_ms"],
+        )
+
+        # copies of the replay buffer are not instrumented
+        copied_replay_buffer = pickle.loads(pickle.dumps(self.replay_buffer))
+        self.assertIsNone(copied_replay_buffer.instrumentation)
+        self.assertEqual(len(copied_replay_buffer), 10)
+
+        self.replay_buffer.disable_instrumentation()
+        self.assertNotIn("push", self.replay_buffer.__dict__)
+        self.push(1)
+        self.assertIsNone(self.replay_buffer.instrumentation)
+
+    def test_latency_histogram(self) -> None:
+        histogram = LatencyHistogram()
+        for seconds in [1e-5] * 90 + [1e-2] * 9 + [1.0]:
+            histogram.record(seconds)
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["mean_ms"], (90 * 1e-2 + 9 * 10 + 1000) / 100)
+        self.assertEqual(summary["max_ms"], 1000.0)
+        # percentiles are within a factor of 2
+        self.assertTrue(1e-2 <= summary["p50_ms"] < 2e-2)
+        self.assertTrue(10 <= summary["p99_ms"] < 20)
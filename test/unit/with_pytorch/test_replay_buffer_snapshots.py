@@ -0,0 +1,222 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import dataclasses
+import os
+import tempfile
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import BasicReplayBuffer, TensorBasedReplayBuffer
+from pearl.replay_buffers.frame_deduplicated_replay_buffer import (
+    FrameDeduplicatedReplayBuffer,
+)
+from pearl.replay_buffers.sequential_decision_making.bootstrap_replay_buffer import (
+    BootstrapReplayBuffer,
+)
+from pearl.replay_buffers.sequential_decision_making.prioritized_replay_buffer import (
+    PrioritizedReplayBuffer,
+)
+from pearl.utils.instantiations.spaces.box_action import BoxActionSpace
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestReplayBufferSnapshots(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path: str = os.path.join(self.directory.name, "snapshot")
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0]), torch.tensor([1])]
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def push(self, replay_buffer: TensorBasedReplayBuffer, number: int) -> None:
+        for i in range(number):
+            replay_buffer.push(
+                state=torch.randn(3),
+                action=torch.tensor([i % 2]),
+                reward=float(i),
+                next_state=torch.randn(3),
+                curr_available_actions=self.action_space,
+                next_available_actions=self.action_space,
+                terminated=i % 4 == 3,
+                truncated=False,
+            )
+
+    def push_frames(
+        self, replay_buffer: FrameDeduplicatedReplayBuffer, number: int
+    ) -> None:
+        state = torch.randint(0, 256, (2, 4), dtype=torch.uint8)
+        for i in range(number):
+            next_state = torch.cat(
+                [state[1:], torch.randint(0, 256, (1, 4), dtype=torch.uint8)]
+            )
+            replay_buffer.push(
+                state=state,
+                action=self.action_space.sample(),
+                reward=float(i),
+                next_state=next_state,
+                curr_available_actions=self.action_space,
+                next_available_actions=self.action_space,
+                terminated=False,
+                truncated=False,
+            )
+            state = next_state
+
+    def assert_same_transitions(
+        self,
+        replay_buffer: TensorBasedReplayBuffer,
+        loaded_replay_buffer: TensorBasedReplayBuffer,
+    ) -> None:
+        self.assertEqual(len(loaded_replay_buffer), len(replay_buffer))
+        self.assertEqual(
+            loaded_replay_buffer.memory.next_index, replay_buffer.memory.next_index
+        )
+        self.assertEqual(
+            loaded_replay_buffer.is_action_continuous,
+            replay_buffer.is_action_continuous,
+        )
+        indices = torch.arange(len(replay_buffer))
+        batch = replay_buffer._create_transition_batch(
+            indices, replay_buffer.is_action_continuous
+        )
+        loaded_batch = loaded_replay_buffer._create_transition_batch(
+            indices, loaded_replay_buffer.is_action_continuous
+        )
+        self.assertIs(type(loaded_batch), type(batch))
+        for field in dataclasses.fields(batch):
+            tt.assert_close(
+                getattr(loaded_batch, field.name), getattr(batch, field.name)
+            )
+
+    def test_full_snapshot(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=10)
+        self.push(replay_buffer, 14)
+        replay_buffer.save(self.path).result()
+
+        loaded_replay_buffer = BasicReplayBuffer(capacity=10)
+        self.push(loaded_replay_buffer, 3)
+        loaded_replay_buffer.load(self.path)
+        self.assert_same_transitions(replay_buffer, loaded_replay_buffer)
+
+        # both resume from the same write cursor
+        for buffer in [replay_buffer, loaded_replay_buffer]:
+            torch.manual_seed(0)
+            self.push(buffer, 2)
+        self.assert_same_transitions(replay_buffer, loaded_replay_buffer)
+
+        with self.assertRaises(ValueError):
+            BasicReplayBuffer(capacity=11).load(self.path)
+
+    def test_continuous_actions(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=10)
+        replay_buffer.is_action_continuous = True
+        action_space = BoxActionSpace(
+            low=torch.tensor([-1.0]), high=torch.tensor([1.0])
+        )
+        for _ in range(5):
+            replay_buffer.push(
+                state=torch.randn(3),
+                action=action_space.sample(),
+                reward=0.0,
+                next_state=torch.randn(3),
+                terminated=False,
+                truncated=False,
+            )
+        replay_buffer.save(self.path)
+        loaded_replay_buffer = BasicReplayBuffer(capacity=10)
+        loaded_replay_buffer.load(self.path)
+        self.assertTrue(loaded_replay_buffer.is_action_continuous)
+        self.assert_same_transitions(replay_buffer, loaded_replay_buffer)
+
+    def test_incremental_snapshots(self) -> None:
+        # each call to push_frames writes 2 more frames than transitions, and the 24
+        # frames of the store are enough until the last push below
+        replay_buffer = FrameDeduplicatedReplayBuffer(capacity=20, frame_stack_size=2)
+        self.push_frames(replay_buffer, 6)
+        replay_buffer.save(self.path, incremental=True)
+        self.push_frames(replay_buffer, 4)
+        replay_buffer.save(self.path, incremental=True)
+        self.push_frames(replay_buffer, 3)
+        replay_buffer.save(self.path, incremental=True)
+        self.assertEqual(len(os.listdir(self.path)), 3)
+
+        loaded_replay_buffer = FrameDeduplicatedReplayBuffer(
+            capacity=20, frame_stack_size=2
+        )
+        loaded_replay_buffer.load(self.path)
+        self.assert_same_transitions(replay_buffer, loaded_replay_buffer)
+
+        # an incremental snapshot only holds the rows written since the last one
+        self.push_frames(replay_buffer, 2)
+        replay_buffer.save(self.path, incremental=True)
+        delta = torch.load(
+            os.path.join(self.path, "snapshot-00003.pt"), weights_only=False
+        )
+        self.assertEqual(len(delta["memory"]["indices"]), 2)
+        self.assertEqual(len(delta["frame_store"]["frame_ids"]), 4)
+        self.assertLess(
+            len(delta["frame_store"]["frame_ids"]), len(replay_buffer._frame_store)
+        )
+
+        # once the frame store grows, snapshots hold all of its frames
+        self.push_frames(replay_buffer, 2)
+        replay_buffer.save(self.path, incremental=True)
+        delta = torch.load(
+            os.path.join(self.path, "snapshot-00004.pt"), weights_only=False
+        )
+        self.assertEqual(len(delta["memory"]["indices"]), 2)
+        self.assertNotIn("frame_ids", delta["frame_store"])
+        loaded_replay_buffer.load(self.path)
+        self.assert_same_transitions(replay_buffer, loaded_replay_buffer)
+
+        # clearing the replay buffer makes the next snapshot a full one
+        replay_buffer.clear()
+        self.push_frames(replay_buffer, 3)
+        replay_buffer.save(self.path, incremental=True)
+        loaded_replay_buffer.load(self.path)
+        self.assert_same_transitions(replay_buffer, loaded_replay_buffer)
+
+        # saving to another directory starts over with a full snapshot
+        other_path = os.path.join(self.directory.name, "other")
+        replay_buffer.save(other_path, incremental=True)
+        self.assertEqual(os.listdir(other_path), ["snapshot-00000.pt"])
+
+    def test_background_snapshot(self) -> None:
+        replay_buffer = PrioritizedReplayBuffer(capacity=10)
+        self.push(replay_buffer, 6)
+        replay_buffer.update_priorities(torch.arange(6), torch.arange(6.0))
+        future = replay_buffer.save(self.path, background=True)
+        # pushes do not change the snapshot being written
+        self.push(replay_buffer, 2)
+        future.result()
+
+        loaded_replay_buffer = PrioritizedReplayBuffer(capacity=10)
+        loaded_replay_buffer.load(self.path)
+        self.assertEqual(len(loaded_replay_buffer), 6)
+        tt.assert_close(
+            loaded_replay_buffer._sum_tree[torch.arange(6)],
+            replay_buffer._sum_tree[torch.arange(6)],
+        )
+        self.assertEqual(
+            loaded_replay_buffer._max_priority, replay_buffer._max_priority
+        )
+
+    def test_bootstrap_masks(self) -> None:
+        replay_buffer = BootstrapReplayBuffer(capacity=10, p=0.5, ensemble_size=4)
+        self.push(replay_buffer, 10)
+        replay_buffer.save(self.path)
+        loaded_replay_buffer = BootstrapReplayBuffer(
+            capacity=10, p=0.5, ensemble_size=4
+        )
+        loaded_replay_buffer.load(self.path)
+        self.assert_same_transitions(replay_buffer, loaded_replay_buffer)
@@ -0,0 +1,164 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.history_summarization_modules.lstm_history_summarization_module import (
+    LSTMHistorySummarizationModule,
+)
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.replay_buffers.sequential_decision_making.sequence_replay_buffer import (
+    SequenceReplayBuffer,
+)
+from pearl.replay_buffers.transition import SequenceTransitionBatch
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestSequenceReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.observation_dim = 3
+        self.action_dim = 2
+        self.history_length = 4
+        self.sequence_length = 3
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([0.0, 1.0]), torch.tensor([1.0, 0.0])]
+        )
+        self.history_summarization_module = LSTMHistorySummarizationModule(
+            observation_dim=self.observation_dim,
+            action_dim=self.action_dim,
+            history_length=self.history_length,
+            hidden_dim=5,
+        )
+
+    def push_episodes(
+        self, replay_buffer: SequenceReplayBuffer, episode_lengths: list[int]
+    ) -> None:
+        """Pushes histories as `PearlAgent.observe` does, with rewards 0, 1, ..."""
+        module = self.history_summarization_module
+        for episode_length in episode_lengths:
+            module.reset()
+            module.summarize_history(torch.randn(self.observation_dim), None)
+            for step in range(episode_length):
+                history = module.get_history()
+                action = self.action_space.sample()
+                module.summarize_history(
+                    torch.randn(self.observation_dim), action.view(1, -1)
+                )
+                replay_buffer.push(
+                    state=history,
+                    action=action,
+                    reward=float(step),
+                    next_state=module.get_history(),
+                    curr_available_actions=self.action_space,
+                    next_available_actions=self.action_space,
+                    terminated=step == episode_length - 1,
+                    truncated=False,
+                )
+
+    def test_sequences(self) -> None:
+        replay_buffer = SequenceReplayBuffer(
+            capacity=20,
+            history_length=self.history_length,
+            sequence_length=self.sequence_length,
+        )
+        self.push_episodes(replay_buffer, [9])
+        batch = replay_buffer.sample(9)
+        self.assertIsInstance(batch, SequenceTransitionBatch)
+        assert (sequence_rows := batch.sequence_rows) is not None
+        assert (sequence_mask := batch.sequence_mask) is not None
+        self.assertEqual(sequence_mask.shape, (3, self.sequence_length))
+        self.assertEqual(
+            sequence_rows.shape,
+            (3, self.history_length + self.sequence_length, 5),
+        )
+        # sequences are cut at the end of the episode
+        first_steps = batch.reward.view(3, self.sequence_length)[:, 0]
+        tt.assert_close(
+            sequence_mask.sum(dim=1),
+            (9 - first_steps.long()).clamp(max=self.sequence_length),
+        )
+        # with the default burn-in, the windows of the transitions are windows of
+        # the rows of their sequence
+        for i in range(3):
+            for j in range(int(sequence_mask[i].sum())):
+                k = i * self.sequence_length + j
+                tt.assert_close(
+                    sequence_rows[i, j : j + self.history_length], batch.state[k]
+                )
+                tt.assert_close(
+                    sequence_rows[i, j + 1 : j + 1 + self.history_length],
+                    batch.next_state[k],
+                )
+
+        # sequences do not cross episodes
+        self.push_episodes(replay_buffer, [1, 2, 1, 3])
+        batch = replay_buffer.sample(15)
+        assert (sequence_mask := batch.sequence_mask) is not None
+        self.assertTrue(sequence_mask[:, 0].all())
+        steps = batch.reward.view(-1, self.sequence_length)
+        continues = steps[:, 1:] == steps[:, :-1] + 1
+        self.assertTrue(torch.all(continues | ~sequence_mask[:, 1:]))
+
+    def test_burn_in(self) -> None:
+        with self.assertRaises(ValueError):
+            SequenceReplayBuffer(
+                capacity=10, history_length=4, sequence_length=2, burn_in=4
+            )
+
+    def test_preprocess_batch(self) -> None:
+        replay_buffer = SequenceReplayBuffer(
+            capacity=20,
+            history_length=self.history_length,
+            sequence_length=self.sequence_length,
+        )
+        self.push_episodes(replay_buffer, [5, 4])
+        dqn = DeepQLearning(
+            state_dim=5,
+            action_space=self.action_space,
+            hidden_dims=[3],
+            training_rounds=1,
+        )
+        dqn.set_history_summarization_module(self.history_summarization_module)
+        batch = replay_buffer.sample(9)
+        assert (sequence_mask := batch.sequence_mask) is not None
+        first_windows = batch.state[:: self.sequence_length].clone()
+        summarized_batch = dqn.preprocess_batch(batch)
+
+        self.assertEqual(len(summarized_batch), int(sequence_mask.sum()))
+        self.assertTrue(summarized_batch.state.requires_grad)
+        assert (next_state := summarized_batch.next_state) is not None
+        self.assertFalse(next_state.requires_grad)
+        # the first states of sequences are unrolled over their whole windows
+        first_positions = torch.cat(
+            [torch.zeros(1, dtype=torch.long), sequence_mask.sum(dim=1).cumsum(0)]
+        )[:-1]
+        tt.assert_close(
+            summarized_batch.state[first_positions],
+            self.history_summarization_module(first_windows),
+        )
+
+    def test_summarize_sequences_without_rows(self) -> None:
+        replay_buffer = SequenceReplayBuffer(
+            capacity=20,
+            history_length=self.history_length,
+            sequence_length=self.sequence_length,
+        )
+        self.push_episodes(replay_buffer, [5])
+        batch = replay_buffer.sample(5)
+        batch.sequence_rows = None
+        # each transition is summarized from its own window
+        states, next_states = self.history_summarization_module.summarize_sequences(
+            batch
+        )
+        tt.assert_close(states, self.history_summarization_module(batch.state))
+        self.assertFalse(next_states.requires_grad)
@@ -0,0 +1,106 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.multiprocessing as mp
+import torch.testing as tt
+from pearl.replay_buffers import SharedMemoryReplayBuffer
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+def push_transitions(
+    replay_buffer: SharedMemoryReplayBuffer, start: int, n: int, number_of_actions: int
+) -> None:
+    action_space = DiscreteActionSpace(
+        actions=[torch.tensor([i]) for i in range(number_of_actions)]
+    )
+    for i in range(start, start + n):
+        replay_buffer.push(
+            state=torch.tensor([float(i)]),
+            action=torch.tensor([i % number_of_actions]),
+            reward=float(i),
+            terminated=False,
+            truncated=False,
+            curr_available_actions=action_space,
+            next_state=torch.tensor([float(i + 1)]),
+            next_available_actions=action_space,
+            max_number_actions=3,
+        )
+
+
+class TestSharedMemoryReplayBuffer(unittest.TestCase):
+    def test_actors_push_to_learner(self) -> None:
+        replay_buffer = SharedMemoryReplayBuffer(capacity=100)
+        # the first push allocates the shared columns
+        push_transitions(replay_buffer, start=0, n=1, number_of_actions=2)
+
+        context = mp.get_context("spawn")
+        # each actor interns an action space with a different number of actions
+        actors = [
+            context.Process(
+                target=push_transitions,
+                args=(replay_buffer, 1 + 10 * actor, 10, 2 + actor),
+            )
+            for actor in range(2)
+        ]
+        for actor in actors:
+            actor.start()
+        for actor in actors:
+            actor.join()
+            self.assertEqual(actor.exitcode, 0)
+
+        self.assertEqual(len(replay_buffer), 21)
+        batch = replay_buffer.sample(21)
+        self.assertEqual(sorted(batch.reward.tolist()), [float(i) for i in range(21)])
+        tt.assert_close(batch.next_state, batch.state + 1)
+        # transitions of the second actor have 3 available actions
+        number_of_available_actions = (~batch.curr_unavailable_actions_mask).sum(1)
+        tt.assert_close(
+            number_of_available_actions,
+            torch.where(batch.reward > 10, 3, 2),
+        )
+
+    def test_clear(self) -> None:
+        replay_buffer = SharedMemoryReplayBuffer(capacity=4)
+        push_transitions(replay_buffer, start=0, n=6, number_of_actions=2)
+        self.assertEqual(len(replay_buffer), 4)
+        replay_buffer.clear()
+        self.assertEqual(len(replay_buffer), 0)
+        push_transitions(replay_buffer, start=0, n=2, number_of_actions=3)
+        batch = replay_buffer.sample(2)
+        tt.assert_close(
+            (~batch.curr_unavailable_actions_mask).sum(1), torch.tensor([3, 3])
+        )
+
+    def test_columns_must_be_allocated_before_sharing(self) -> None:
+        replay_buffer = SharedMemoryReplayBuffer(capacity=4)
+        replay_buffer.memory._owner_pid = -1
+        with self.assertRaises(ValueError):
+            push_transitions(replay_buffer, start=0, n=1, number_of_actions=2)
+
+    def test_lock_is_shared_with_any_start_method(self) -> None:
+        # the lock is created in the "spawn" context, whose locks can also be
+        # inherited by forked processes
+        for start_method in mp.get_all_start_methods():
+            replay_buffer = SharedMemoryReplayBuffer(capacity=8)
+            push_transitions(replay_buffer, start=0, n=1, number_of_actions=2)
+            actor = mp.get_context(start_method).Process(
+                target=push_transitions, args=(replay_buffer, 1, 10, 2)
+            )
+            actor.start()
+            actor.join()
+            self.assertEqual(actor.exitcode, 0)
+            self.assertEqual(len(replay_buffer), 8)
+            # the oldest transitions were overwritten
+            batch = replay_buffer.sample(8)
+            self.assertEqual(
+                sorted(batch.reward.tolist()), [float(i) for i in range(3, 11)]
+            )
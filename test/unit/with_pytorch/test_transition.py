@@ -314,3 +314,57 @@ class TestTransitionBatch(unittest.TestCase):
             self.assertEqual(
                 batch_4d.next_state.shape, (batch_size, state_dim, extra_dim, 2)
             )
+
+    def test_without_validation(self) -> None:
+        batch = TransitionBatch.without_validation(
+            state=self.state,
+            action=self.action,
+            reward=self.reward,
+            terminated=torch.tensor([True, False, True]),
+            truncated=torch.tensor([False, True, False]),
+        )
+        self.assertIs(batch.state, self.state)
+        self.assertIsNone(batch.next_state)
+        # terminated and truncated have no defaults
+        with self.assertRaises(TypeError):
+            TransitionBatch.without_validation(
+                state=self.state, action=self.action, reward=self.reward
+            )
+
+    def test_pack(self) -> None:
+        batch = TransitionBatch(
+            state=self.state,
+            action=self.action.long(),
+            reward=self.reward.double(),
+            next_state=self.next_state,
+            terminated=torch.tensor([True, False, True]),
+            weight=torch.empty(3, 0),
+        )
+        packed_batch = batch.pack()
+        self.assertIsNone(batch._packed_buffer())
+        buffer = packed_batch._packed_buffer()
+        assert buffer is not None
+        for name in [
+            "state",
+            "action",
+            "reward",
+            "next_state",
+            "terminated",
+            "truncated",
+            "weight",
+        ]:
+            tensor = getattr(packed_batch, name)
+            self.assertEqual(tensor.dtype, getattr(batch, name).dtype)
+            self.assertTrue(torch.equal(tensor, getattr(batch, name)))
+            # every tensor is a view into the buffer
+            self.assertEqual(
+                tensor.untyped_storage().data_ptr(), buffer.untyped_storage().data_ptr()
+            )
+        self.assertIsNone(packed_batch.next_action)
+
+        if not torch.cuda.is_available():
+            self.skipTest("CUDA not available")
+        cuda_batch = batch.pack(pin_memory=True).to(torch.device("cuda"))
+        self.assertIsNotNone(cuda_batch._packed_buffer())
+        self.assertEqual(cuda_batch.terminated.device.type, "cuda")
+        self.assertTrue(torch.equal(cuda_batch.action.cpu(), batch.action))
@@ -0,0 +1,103 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import numpy as np
+import torch
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.replay_buffers import BasicReplayBuffer
+from pearl.utils.functional_utils.train_and_eval.online_learning import (
+    vector_online_learning,
+)
+from pearl.utils.instantiations.environments.vector_gym_environment import (
+    VectorGymEnvironment,
+)
+from pearl.utils.instantiations.spaces.box_action import BoxActionSpace
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+from pearl.vector_pearl_agent import VectorPearlAgent
+
+
+class TestVectorGymEnvironment(unittest.TestCase):
+    def test_discrete_actions(self) -> None:
+        env = VectorGymEnvironment("CartPole-v1", number_of_environments=4)
+        observations, action_space = env.reset(seed=0)
+        assert isinstance(observations, np.ndarray)
+        self.assertEqual(observations.shape, (4, 4))
+        self.assertEqual(observations.dtype, np.float32)
+        assert isinstance(action_space, DiscreteActionSpace)
+        self.assertEqual(action_space.n, 2)
+
+        number_of_ended_episodes = 0
+        for _ in range(100):
+            action_result = env.step(torch.ones((4, 1), dtype=torch.long))
+            self.assertEqual(action_result.reward.shape, (4,))
+            done = action_result.terminated | action_result.truncated
+            self.assertEqual(done.shape, (4,))
+            current_observations = env.current_observations
+            assert isinstance(current_observations, np.ndarray)
+            # environments whose episodes end continue from new episodes, while
+            # the others continue from the observations of their transitions
+            np.testing.assert_array_equal(
+                action_result.observation[~done], current_observations[~done]
+            )
+            for i in np.flatnonzero(done):
+                self.assertFalse(
+                    np.array_equal(
+                        action_result.observation[i], current_observations[i]
+                    )
+                )
+            number_of_ended_episodes += int(done.sum())
+        # always pushing right ends episodes quickly
+        self.assertGreater(number_of_ended_episodes, 4)
+        env.close()
+
+    def test_continuous_actions(self) -> None:
+        env = VectorGymEnvironment("Pendulum-v1", number_of_environments=3)
+        observations, action_space = env.reset(seed=0)
+        assert isinstance(action_space, BoxActionSpace)
+        action_result = env.step(torch.zeros((3, 1)))
+        self.assertEqual(action_result.observation.shape, (3, 3))
+        self.assertEqual(action_result.reward.shape, (3,))
+        env.close()
+
+    def test_str(self) -> None:
+        env = VectorGymEnvironment("CartPole-v1", number_of_environments=2)
+        self.assertEqual(str(env), "CartPole-v1 x 2")
+        # the name of a wrapped vector environment comes from its environments
+        self.assertEqual(str(VectorGymEnvironment(env.env)), "CartPole-v1 x 2")
+        env.close()
+
+    def test_vector_online_learning(self) -> None:
+        env = VectorGymEnvironment("CartPole-v1", number_of_environments=4)
+        assert isinstance(env.action_space, DiscreteActionSpace)
+        replay_buffer = BasicReplayBuffer(1000)
+        agent = VectorPearlAgent(
+            number_of_environments=4,
+            policy_learner=DeepQLearning(
+                state_dim=4,
+                action_space=env.action_space,
+                hidden_dims=[16],
+                training_rounds=1,
+                batch_size=8,
+                action_representation_module=OneHotActionTensorRepresentationModule(
+                    max_number_actions=2
+                ),
+            ),
+            replay_buffer=replay_buffer,
+        )
+        info = vector_online_learning(agent, env, number_of_steps=200, seed=0)
+        self.assertEqual(len(replay_buffer), 200)
+        self.assertGreater(len(info["return"]), 0)
+        env.close()
@@ -0,0 +1,147 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.api.action_result import ActionResult
+from pearl.policy_learners.exploration_modules.common.epsilon_greedy_exploration import (
+    EGreedyExploration,
+)
+from pearl.policy_learners.exploration_modules.wrappers.warmup import Warmup
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.policy_learners.sequential_decision_making.ppo import (
+    ProximalPolicyOptimization,
+)
+from pearl.replay_buffers import BasicReplayBuffer
+from pearl.replay_buffers.sequential_decision_making.n_step_replay_buffer import (
+    NStepReplayBuffer,
+)
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+from pearl.vector_pearl_agent import VectorPearlAgent
+
+
+class TestVectorPearlAgent(unittest.TestCase):
+    def setUp(self) -> None:
+        self.number_of_environments = 4
+        self.state_dim = 3
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(3)]
+        )
+
+    def dqn(self, epsilon: float = 0.0) -> DeepQLearning:
+        return DeepQLearning(
+            state_dim=self.state_dim,
+            action_space=self.action_space,
+            hidden_dims=[8],
+            batch_size=4,
+            exploration_module=EGreedyExploration(epsilon),
+            action_representation_module=OneHotActionTensorRepresentationModule(
+                max_number_actions=3
+            ),
+        )
+
+    def action_results(self, terminated: list[bool]) -> list[ActionResult]:
+        return [
+            ActionResult(
+                observation=torch.randn(self.state_dim),
+                reward=float(i),
+                terminated=is_terminated,
+                truncated=False,
+            )
+            for i, is_terminated in enumerate(terminated)
+        ]
+
+    def test_act_batch(self) -> None:
+        policy_learner = self.dqn()
+        states = torch.randn(self.number_of_environments, self.state_dim)
+        actions = policy_learner.act_batch(states, self.action_space, exploit=True)
+        self.assertEqual(actions.shape, (self.number_of_environments, 1))
+        # a batched act picks the action of each state
+        for state, action in zip(states, actions):
+            tt.assert_close(
+                policy_learner.act(state, self.action_space, exploit=True), action
+            )
+
+        exploration_module = EGreedyExploration(epsilon=1.0)
+        exploit_actions = torch.zeros((1000, 1), dtype=torch.long)
+        actions = exploration_module.act_batch(
+            subjective_state=torch.randn(1000, self.state_dim),
+            action_space=self.action_space,
+            exploit_action=exploit_actions,
+        )
+        self.assertEqual(actions.shape, (1000, 1))
+        self.assertEqual(set(actions.view(-1).tolist()), {0, 1, 2})
+
+        # warmup draws random actions until `warmup_steps` decisions were made
+        warmup = Warmup(EGreedyExploration(epsilon=0.0), warmup_steps=1000)
+        actions = warmup.act_batch(
+            subjective_state=torch.randn(1000, self.state_dim),
+            action_space=self.action_space,
+            exploit_action=exploit_actions,
+        )
+        self.assertEqual(actions.shape, (1000, 1))
+        self.assertEqual(set(actions.view(-1).tolist()), {0, 1, 2})
+        actions = warmup.act_batch(
+            subjective_state=torch.randn(1000, self.state_dim),
+            action_space=self.action_space,
+            exploit_action=exploit_actions,
+        )
+        tt.assert_close(actions, exploit_actions)
+
+    def test_act_and_observe(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=100)
+        agent = VectorPearlAgent(
+            number_of_environments=self.number_of_environments,
+            policy_learner=self.dqn(epsilon=0.5),
+            replay_buffer=replay_buffer,
+        )
+        agent.reset(
+            torch.randn(self.number_of_environments, self.state_dim), self.action_space
+        )
+        for _ in range(3):
+            actions = agent.act()
+            self.assertEqual(actions.shape, (self.number_of_environments, 1))
+            agent.observe(self.action_results([False, True, False, False]))
+            agent.learn()
+            observation = torch.randn(1, self.state_dim)
+            agent.reset(observation, self.action_space, indices=[1])
+            # the reset environment starts from its new observation
+            assert (subjective_states := agent._subjective_states) is not None
+            tt.assert_close(subjective_states[1], observation[0])
+        self.assertEqual(len(replay_buffer), 3 * self.number_of_environments)
+        batch = replay_buffer.sample(2 * self.number_of_environments)
+        # the reward of each transition is the index of its environment
+        self.assertLessEqual(
+            set(batch.reward.tolist()), set(range(self.number_of_environments))
+        )
+
+    def test_unsupported_components(self) -> None:
+        with self.assertRaises(ValueError):
+            VectorPearlAgent(
+                number_of_environments=2,
+                policy_learner=self.dqn(),
+                replay_buffer=NStepReplayBuffer(capacity=10),
+            )
+        with self.assertRaises(ValueError):
+            VectorPearlAgent(
+                number_of_environments=2,
+                policy_learner=ProximalPolicyOptimization(
+                    state_dim=self.state_dim,
+                    action_space=self.action_space,
+                    actor_hidden_dims=[8],
+                    critic_hidden_dims=[8],
+                ),
+            )